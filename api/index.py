@@ -8,11 +8,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Configurar variável de ambiente para detectar Vercel
 os.environ['VERCEL'] = '1'
 
-from app import app, init_db
+from app import criar_app
 
-# Inicializar banco na primeira execução
-with app.app_context():
-    init_db()
+# O banco é inicializado na primeira requisição que precisar dele, e não na
+# importação: o cold start termina mais cedo (veja criar_app() no app.py)
+app = criar_app(banco='preguicoso')
 
 # Export para Vercel - a variável deve se chamar 'app' ou 'application'
 application = app
@@ -4,17 +4,47 @@
 
 # IMPORTAÇÕES NECESSÁRIAS
 # =====================================================
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from markupsafe import Markup
+from flask import Flask, render_template, stream_template, stream_with_context, request, redirect, url_for, flash, session, jsonify, abort, g
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from datetime import datetime, timezone
+from sqlalchemy.exc import IntegrityError, OperationalError
+from datetime import datetime, timedelta, timezone
 import os
 import json
-import urllib.parse
-from dotenv import load_dotenv
+import math
+import bisect
+import hashlib
+import secrets
+import threading
+import time
 
-# Carrega variáveis de ambiente do arquivo .env
-load_dotenv()
+from catalogo import CacheCatalogo, EstoqueCatalogo, ProdutoCatalogo
+from carrinho import Carrinho
+from carrinho_store import criar_store
+import perfil_sqlite
+import snapshot_banco
+import busca
+import reservas
+from cache_fragmentos import CacheFragmentos
+from mensagens import ConfigLoja, MensagemWhatsApp
+import mensagens
+from instrumentacao import Instrumentacao
+import imagens
+import assets
+from compressao import Compressao
+import compressao
+# Módulos usados só em alguns caminhos são importados onde são usados (o
+# custo fica fora da importação do app.py, que todo cold start paga):
+# fila_pedidos (FILA_PEDIDOS=1), sitemap (/sitemap.xml), artefato_catalogo
+# (init_db) e plano_consultas (linha de comando e testes)
+
+# Carrega variáveis de ambiente do arquivo .env (se existir)
+# O python-dotenv só é importado quando há um .env: na Vercel as variáveis
+# vêm do painel e a importação ficaria no caminho do cold start
+_ARQUIVO_ENV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+if os.path.exists(_ARQUIVO_ENV):
+    from dotenv import load_dotenv
+    load_dotenv(_ARQUIVO_ENV)
 
 # CONFIGURAÇÃO DA APLICAÇÃO FLASK
 # =====================================================
@@ -28,7 +58,10 @@ app.config['SECRET_KEY'] = 'sua-chave-secreta-aqui-mude-em-producao'
 # SQLite é um banco de dados simples, ideal para desenvolvimento
 # O arquivo será criado na pasta instance/
 # Na Vercel, usa /tmp para banco temporário
-if os.environ.get('VERCEL'):
+# A variável DATABASE_URL (definida em vercel.json ou no .env) tem prioridade
+if os.environ.get('DATABASE_URL'):
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ['DATABASE_URL']
+elif os.environ.get('VERCEL'):
     # Em produção na Vercel
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:////tmp/adega.db'
 else:
@@ -37,13 +70,177 @@ else:
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Snapshot do banco (veja snapshot_banco.py): um banco SQLite que ainda não
+# existe (ex: /tmp de uma instância nova na Vercel) começa de uma cópia de
+# data/catalogo.db, já com tabelas, índices e catálogo
+# BANCO_SNAPSHOT vazio desativa
+app.config['BANCO_SNAPSHOT'] = os.environ.get('BANCO_SNAPSHOT', snapshot_banco.SNAPSHOT_PATH)
+
+# Perfil do SQLite (veja perfil_sqlite.py): WAL, cache, mmap e busy_timeout
+# SQLITE_PERFIL=padrao volta ao comportamento original do SQLite
+app.config['SQLITE_PERFIL'] = os.environ.get('SQLITE_PERFIL', perfil_sqlite.PERFIL_PADRAO)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = perfil_sqlite.opcoes_engine(
+    app.config['SQLALCHEMY_DATABASE_URI'], app.config['SQLITE_PERFIL']
+)
+
+# Configuração do armazenamento do carrinho (veja carrinho_store.py)
+# O cookie de sessão guarda apenas o ID do carrinho; os itens ficam no servidor
+# Na Vercel cada instância tem seu próprio /tmp, então o padrão é guardar os
+# itens (compactos) no próprio cookie
+app.config['CARRINHO_BACKEND'] = os.environ.get(
+    'CARRINHO_BACKEND', 'sessao' if os.environ.get('VERCEL') else 'sqlite'
+)
+if os.environ.get('VERCEL'):
+    app.config['CARRINHO_SQLITE_PATH'] = os.environ.get('CARRINHO_SQLITE_PATH', '/tmp/adega_carrinhos.db')
+else:
+    app.config['CARRINHO_SQLITE_PATH'] = os.environ.get(
+        'CARRINHO_SQLITE_PATH', os.path.join(app.instance_path, 'carrinhos.db')
+    )
+    os.makedirs(app.instance_path, exist_ok=True)
+
+# Fila de pedidos (veja fila_pedidos.py) - desativada por padrão
+# Com FILA_PEDIDOS=1 o checkout só registra o pedido na fila e responde;
+# threads em segundo plano gravam os pedidos no banco
+# (não use em ambientes serverless, onde o processo congela após a resposta)
+app.config['FILA_PEDIDOS'] = os.environ.get('FILA_PEDIDOS') == '1'
+app.config['FILA_PEDIDOS_PATH'] = os.environ.get(
+    'FILA_PEDIDOS_PATH', os.path.join(app.instance_path, 'fila_pedidos.db')
+)
+app.config['FILA_PEDIDOS_WORKERS'] = int(os.environ.get('FILA_PEDIDOS_WORKERS', 2))
+# Prazo de um pedido em processamento; depois dele, outro processo pode
+# pegá-lo (o processo que o pegou parou no meio)
+app.config['FILA_PEDIDOS_LEASE_SEGUNDOS'] = float(os.environ.get('FILA_PEDIDOS_LEASE_SEGUNDOS', 60))
+
+# Reserva de estoque dos carrinhos (veja reservas.py)
+# Cada produto colocado no carrinho fica reservado por RESERVA_TTL_MINUTOS;
+# a limpeza em segundo plano devolve as reservas vencidas a cada
+# RESERVAS_LIMPEZA_SEGUNDOS (0 desliga a thread; na Vercel ela não roda e as
+# reservas vencidas são devolvidas quando uma nova reserva falha)
+app.config['RESERVA_TTL_MINUTOS'] = float(os.environ.get('RESERVA_TTL_MINUTOS', 15))
+app.config['RESERVAS_LIMPEZA_SEGUNDOS'] = float(os.environ.get(
+    'RESERVAS_LIMPEZA_SEGUNDOS', 0 if os.environ.get('VERCEL') else 60
+))
+
+# Estoque livre mostrado no catálogo (veja EstoqueCatalogo em catalogo.py)
+# As vendas e reservas deste processo aparecem na hora; as de outros
+# processos, em até CATALOGO_ESTOQUE_SEGUNDOS
+app.config['CATALOGO_ESTOQUE_SEGUNDOS'] = float(os.environ.get('CATALOGO_ESTOQUE_SEGUNDOS', 5))
+
+# Cache da grade de produtos já renderizada (veja cache_fragmentos.py)
+# CACHE_FRAGMENTOS=0 desliga o cache (útil ao editar os templates)
+app.config['CACHE_FRAGMENTOS'] = os.environ.get('CACHE_FRAGMENTOS', '1') != '0'
+app.config['CACHE_FRAGMENTOS_BYTES'] = int(os.environ.get('CACHE_FRAGMENTOS_BYTES', 8 * 1024 * 1024))
+
+# Compressão gzip das respostas (veja compressao.py)
+# COMPRESSAO=0 desliga (ex: quando um proxy na frente já comprime)
+# COMPRESSAO_NIVEL: 1 (mais rápido) a 9 (menor); COMPRESSAO_MIN_BYTES:
+# respostas menores saem sem compressão
+app.config['COMPRESSAO'] = os.environ.get('COMPRESSAO', '1') != '0'
+app.config['COMPRESSAO_NIVEL'] = int(os.environ.get('COMPRESSAO_NIVEL', 6))
+app.config['COMPRESSAO_MIN_BYTES'] = int(os.environ.get('COMPRESSAO_MIN_BYTES', 500))
+
+# INDEX_STREAMING=1: a página inicial é enviada em pedaços enquanto é
+# renderizada (o cabeçalho e os primeiros cards chegam antes do resto)
+app.config['INDEX_STREAMING'] = os.environ.get('INDEX_STREAMING') == '1'
+
+# Dados da loja e idioma da mensagem do WhatsApp (veja mensagens.py)
+app.config['LOJA_NOME'] = os.environ.get('LOJA_NOME', 'ADEGA RÁDIO TATUAPÉ FM')
+app.config['LOJA_WHATSAPP'] = os.environ.get('LOJA_WHATSAPP', '5511970603441')  # +55 11 970603441
+app.config['LOJA_PIX'] = os.environ.get('LOJA_PIX', 'radiotatuapefm@gmail.com')
+app.config['MENSAGEM_LOCALE'] = os.environ.get('MENSAGEM_LOCALE', 'pt_BR')
+app.config['MENSAGEM_LIMITE'] = int(os.environ.get('MENSAGEM_LIMITE', mensagens.LIMITE_PADRAO))
+
+# Endereço público da loja (esquema + domínio), usado nas URLs do sitemap
+# Vem da configuração, nunca do cabeçalho Host da requisição: o sitemap é
+# guardado em memória e servido a todos os clientes
+app.config['SITE_URL'] = os.environ.get('SITE_URL', 'https://adega-24-horas-ifood.vercel.app')
+
+# Proxy de imagens (veja imagens.py): miniaturas das imagens dos produtos
+# servidas por /img/<hash>/<largura>, com cache em disco
+# IMAGENS_PROXY=0 volta a usar as URLs originais nas páginas
+# IMAGENS_ORIGEM: pasta com os originais (sem rede); vazio baixa pela internet
+app.config['IMAGENS_PROXY'] = os.environ.get('IMAGENS_PROXY', '1') != '0'
+app.config['IMAGENS_ORIGEM'] = os.environ.get('IMAGENS_ORIGEM', '')
+app.config['IMAGENS_CACHE_PASTA'] = os.environ.get(
+    'IMAGENS_CACHE_PASTA',
+    '/tmp/adega_imagens' if os.environ.get('VERCEL') else os.path.join(app.instance_path, 'imagens')
+)
+app.config['IMAGENS_CACHE_BYTES'] = int(os.environ.get('IMAGENS_CACHE_BYTES', 100 * 1024 * 1024))
+
+# Instrumentação (veja instrumentacao.py) - desativada por padrão
+# INSTRUMENTACAO=1 adiciona o cabeçalho Server-Timing e a rota /metrics
+# INSTRUMENTACAO_PROFILE=0.01 executa 1% das requisições sob o cProfile
+app.config['INSTRUMENTACAO'] = os.environ.get('INSTRUMENTACAO') == '1'
+app.config['INSTRUMENTACAO_PROFILE'] = float(os.environ.get('INSTRUMENTACAO_PROFILE', 0))
+app.config['INSTRUMENTACAO_PROFILE_PASTA'] = os.environ.get(
+    'INSTRUMENTACAO_PROFILE_PASTA', os.path.join(app.instance_path, 'perfis')
+)
+
 # INICIALIZAÇÃO DAS EXTENSÕES
 # =====================================================
 # SQLAlchemy - ORM (Object Relational Mapping) para trabalhar com banco de dados
 db = SQLAlchemy(app)
+# Nenhuma conexão é aberta na importação: os PRAGMAs do perfil e a
+# instrumentação das consultas são ligados em criar_app (veja
+# _configurar_servicos)
+
+# Instrumentação: medir() funciona sempre; só mede quando está ativada
+# (ligada em criar_app)
+instrumentacao = Instrumentacao(
+    taxa_profile=app.config['INSTRUMENTACAO_PROFILE'],
+    pasta_profile=app.config['INSTRUMENTACAO_PROFILE_PASTA']
+)
+
+# CSS e JavaScript (veja assets.py): url_for('static', filename='js/loja.js')
+# aponta para o arquivo com hash de static/dist, servido pré-comprimido
+assets_estaticos = assets.Assets(app.static_folder)
+assets_estaticos.init_app(app)
+
+# Compressão das respostas (veja compressao.py) - ligada em criar_app,
+# depois da instrumentação
+compressao_respostas = Compressao()
+
+# Migrate - As migrações do banco (flask db ...) só são usadas pela linha de
+# comando, então o Flask-Migrate é configurado em manage.py
+
+# Cache do catálogo - snapshot em memória dos produtos ativos
+# É invalidado explicitamente por init_db() quando o catálogo é sincronizado
+cache_catalogo = CacheCatalogo()
+
+# Estoque livre dos produtos - fora do snapshot, relido por produto a cada
+# venda ou reserva (o snapshot e os caches por versão continuam valendo)
+estoque_catalogo = EstoqueCatalogo(validade=app.config['CATALOGO_ESTOQUE_SEGUNDOS'])
+
+# Cache de fragmentos - HTML da grade de produtos por (versão do catálogo,
+# categoria, estoque dos produtos da grade)
+cache_fragmentos = CacheFragmentos(
+    capacidade_bytes=app.config['CACHE_FRAGMENTOS_BYTES'],
+    ativo=app.config['CACHE_FRAGMENTOS']
+)
+
+# Mensagem do WhatsApp - modelos compilados uma vez, na inicialização
+mensagem_whatsapp = MensagemWhatsApp(
+    ConfigLoja(app.config['LOJA_NOME'], app.config['LOJA_WHATSAPP'], app.config['LOJA_PIX']),
+    locale=app.config['MENSAGEM_LOCALE'],
+    limite=app.config['MENSAGEM_LIMITE']
+)
+
+# Proxy de imagens - o cache em disco só é aberto na primeira imagem pedida
+proxy_imagens = None
+_proxy_imagens_lock = threading.Lock()
+
+# Store do carrinho - guarda {produto_id: quantidade} de cada carrinho
+# Criado no primeiro uso (veja obter_carrinho_store): o backend sqlite abre
+# um arquivo, o que não precisa acontecer na importação
+carrinho_store = None
+_carrinho_store_lock = threading.Lock()
+
+# Fila de pedidos e workers (só criados por criar_app, quando FILA_PEDIDOS=1)
+fila_pedidos = None
+worker_pool = None
 
-# Migrate - Para criar e gerenciar migrações do banco de dados
-migrate = Migrate(app, db)
+# Thread de limpeza das reservas (criada por criar_app)
+limpeza_reservas = None
 
 # MODELOS DO BANCO DE DADOS
 # =====================================================
@@ -57,8 +254,17 @@ class Produto(db.Model):
     - db.Column: Define uma coluna na tabela do banco de dados
     - primary_key: Chave primária (identificador único)
     - nullable: Se o campo pode ser nulo/vazio
+    - Index: Estrutura que permite ao banco achar linhas sem ler a tabela toda
     """
     
+    # Índices que atendem às consultas mais frequentes:
+    # - catálogo filtrado por (ativo, categoria)
+    # - init_db procura produtos pelo nome, que é a chave do JSON (único)
+    __table_args__ = (
+        db.Index('ix_produto_ativo_categoria', 'ativo', 'categoria'),
+        db.Index('uq_produto_nome', 'nome', unique=True),
+    )
+    
     # ID único para cada produto (chave primária)
     id = db.Column(db.Integer, primary_key=True)
     
@@ -80,12 +286,20 @@ class Produto(db.Model):
     # Estoque disponível
     estoque = db.Column(db.Integer, default=0)
     
+    # Unidades reservadas pelos carrinhos (veja reservas.py)
+    # Livre para novos carrinhos: estoque - reservado
+    reservado = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Se o produto está ativo/disponível
     ativo = db.Column(db.Boolean, default=True)
     
     # Data de criação do produto
     data_criacao = db.Column(db.DateTime, default=datetime.now)
     
+    # Hash dos campos sincronizados com o JSON (usado por init_db para
+    # regravar apenas os produtos que realmente mudaram)
+    fingerprint = db.Column(db.String(40), nullable=True)
+    
     def __repr__(self):
         """
         Método especial que define como o objeto é representado quando impresso
@@ -115,6 +329,13 @@ class Pedido(db.Model):
     Modelo Pedido - Representa um pedido feito por um cliente
     """
     
+    # Índice para o painel: pedidos ordenados por data (e id, para a paginação)
+    # Índice único no token da fila: o mesmo pedido da fila nunca é gravado duas vezes
+    __table_args__ = (
+        db.Index('ix_pedido_data_pedido_id', 'data_pedido', 'id'),
+        db.Index('uq_pedido_token_fila', 'token_fila', unique=True),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     
     # Informações do cliente
@@ -134,6 +355,10 @@ class Pedido(db.Model):
     # Observações adicionais
     observacoes = db.Column(db.Text, nullable=True)
     
+    # Token do pedido na fila (veja fila_pedidos.py); None nos pedidos
+    # gravados direto pelo checkout
+    token_fila = db.Column(db.String(64), nullable=True)
+    
     # Relacionamento com os itens do pedido
     # backref cria automaticamente uma propriedade 'pedido' em ItemPedido
     itens = db.relationship('ItemPedido', backref='pedido', lazy=True)
@@ -154,6 +379,12 @@ class ItemPedido(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     
+    # Índices nas chaves estrangeiras (usadas nos JOINs e no carregamento dos itens)
+    __table_args__ = (
+        db.Index('ix_item_pedido_pedido_id', 'pedido_id'),
+        db.Index('ix_item_pedido_produto_id', 'produto_id'),
+    )
+    
     # Chave estrangeira para o pedido (relacionamento)
     pedido_id = db.Column(db.Integer, db.ForeignKey('pedido.id'), nullable=False)
     
@@ -178,84 +409,459 @@ class ItemPedido(db.Model):
         return self.quantidade * self.preco_unitario
     
     def __repr__(self):
-        return f'<ItemPedido {self.produto.nome} x{self.quantidade}>'
+        # Usa produto_id (e não self.produto.nome) para não disparar uma consulta
+        return f'<ItemPedido produto={self.produto_id} x{self.quantidade}>'
+
+# Modelo para as reservas de estoque dos carrinhos
+class ReservaEstoque(db.Model):
+    """
+    Modelo ReservaEstoque - Unidades de um produto separadas para um carrinho
+
+    As reservas são gravadas e devolvidas por reservas.py (SQL direto);
+    o modelo existe para criar a tabela e para consultas no painel
+
+    - Uma linha por (carrinho, produto): a chave única permite o
+      INSERT ... ON CONFLICT DO UPDATE
+    - Índice em expira_em: a limpeza procura só as reservas vencidas
+    """
+
+    __table_args__ = (
+        db.UniqueConstraint('carrinho_id', 'produto_id', name='uq_reserva_carrinho_produto'),
+        db.Index('ix_reserva_expira_em', 'expira_em'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # ID do carrinho guardado na sessão (session['carrinho_id'])
+    carrinho_id = db.Column(db.String(32), nullable=False)
+
+    produto_id = db.Column(db.Integer, db.ForeignKey('produto.id'), nullable=False)
+    quantidade = db.Column(db.Integer, nullable=False)
+
+    # Depois deste instante a reserva pode ser devolvida ao estoque livre
+    expira_em = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<ReservaEstoque {self.carrinho_id} produto={self.produto_id} x{self.quantidade}>'
+
+# Modelo para registrar cada sincronização do catálogo
+class SyncCatalogo(db.Model):
+    """
+    Modelo SyncCatalogo - Histórico das sincronizações com data/produtos.json
+    
+    O hash do conteúdo do JSON permite que init_db() não faça nada
+    quando o arquivo não mudou desde a última sincronização
+    """
+    
+    __tablename__ = 'sync_catalogo'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # SHA-256 do conteúdo do arquivo JSON
+    hash_conteudo = db.Column(db.String(64), nullable=False)
+    
+    # Quantidade de produtos afetados
+    inseridos = db.Column(db.Integer, default=0)
+    atualizados = db.Column(db.Integer, default=0)
+    desativados = db.Column(db.Integer, default=0)
+    
+    # Tempo gasto na sincronização (milissegundos)
+    duracao_ms = db.Column(db.Float, nullable=True)
+    
+    data_sync = db.Column(db.DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f'<SyncCatalogo {self.hash_conteudo[:12]}>'
 
 # FUNÇÕES AUXILIARES
 # =====================================================
+def _pedido_da_fila(token):
+    """
+    Id do pedido já gravado para o token da fila (ou None)
+    """
+    return db.session.execute(db.select(Pedido.id).where(Pedido.token_fila == token)).scalar()
+
+def _processar_pedido_da_fila(token, payload):
+    """
+    Grava no banco um pedido retirado da fila (executado pelos workers)
+
+    A fila entrega cada pedido "pelo menos uma vez": se o processo parar
+    depois do commit do pedido e antes de marcar a fila como concluída (ou
+    se o lease vencer nesse meio-tempo), o mesmo token volta a ser
+    processado. O token fica gravado no pedido, em uma coluna única; um
+    token já gravado devolve o pedido existente, sem gravar outro nem
+    baixar o estoque de novo.
+    """
+    itens = {int(produto_id): quantidade for produto_id, quantidade in payload['itens'].items()}
+    with app.app_context():
+        pedido_id = _pedido_da_fila(token)
+        if pedido_id is not None:
+            return pedido_id
+        try:
+            # carrinho_id: as reservas do carrinho viram a baixa do estoque
+            # (pedidos enfileirados antes das reservas não têm o campo)
+            pedido, _ = criar_pedido(payload['dados'], itens, payload.get('carrinho_id'),
+                                     token_fila=token)
+        except IntegrityError:
+            # Outro worker gravou o mesmo token entre a consulta e o commit
+            pedido_id = _pedido_da_fila(token)
+            if pedido_id is None:
+                raise
+            return pedido_id
+        return pedido.id
+
+def _montar_snapshot_catalogo():
+    """
+    Lê os produtos ativos do banco e monta os registros do snapshot
+
+    Conceitos:
+    - with_entities(): Busca apenas as colunas necessárias, sem criar
+      objetos do ORM para cada produto
+    - A versão é um hash do conteúdo, então é igual em todas as instâncias
+      que tiverem o mesmo catálogo
+    - O estoque fica fora da versão: muda a cada venda e é aplicado na
+      leitura (veja obter_estoque)
+    - A data de atualização é a da última sincronização com o JSON (vem
+      do banco, então não muda a cada reinício do processo)
+
+    Returns:
+        Tupla (versao, lista de ProdutoCatalogo, atualizado_em)
+    """
+    linhas = (
+        Produto.query
+        .filter_by(ativo=True)
+        .with_entities(
+            Produto.id, Produto.nome, Produto.descricao, Produto.preco,
+            Produto.categoria, Produto.imagem_url, Produto.estoque,
+            Produto.reservado, Produto.data_criacao
+        )
+        .order_by(Produto.id)
+        .all()
+    )
+
+    produtos = [
+        ProdutoCatalogo(
+            id=linha.id,
+            nome=linha.nome,
+            descricao=linha.descricao,
+            preco=float(linha.preco),
+            categoria=linha.categoria,
+            imagem_url=linha.imagem_url,
+            estoque=(linha.estoque or 0) - (linha.reservado or 0),
+            data_criacao=linha.data_criacao
+        )
+        for linha in linhas
+    ]
+
+    versao = hashlib.sha1(
+        repr([tuple(p._replace(estoque=None)) for p in produtos]).encode('utf-8')
+    ).hexdigest()[:16]
+    
+    ultima_sync = db.session.execute(db.select(db.func.max(SyncCatalogo.data_sync))).scalar()
+    if ultima_sync is None:
+        # Banco sem sincronizações: a data do produto mais recente
+        ultima_sync = max((p.data_criacao for p in produtos if p.data_criacao), default=None)
+    # data_sync é gravada no horário local: astimezone() converte para UTC
+    atualizado_em = ultima_sync.astimezone(timezone.utc).replace(microsecond=0) if ultima_sync else None
+    return versao, produtos, atualizado_em
+
+def obter_catalogo():
+    """
+    Retorna o snapshot atual do catálogo (sem consultar o banco se estiver em cache)
+    """
+    return cache_catalogo.obter(_montar_snapshot_catalogo)
+
+def _ler_estoque_livre(ids=None):
+    """
+    Lê o estoque livre (estoque - reservado) dos produtos ativos
+
+    Args:
+        ids: Produtos a ler (pela chave primária); None lê todos
+    
+    Returns:
+        Dicionário {produto_id: unidades livres}
+    """
+    consulta = db.select(Produto.id, Produto.estoque, Produto.reservado).where(Produto.ativo.is_(True))
+    if ids is not None:
+        consulta = consulta.where(Produto.id.in_(list(ids)))
+    return {linha.id: (linha.estoque or 0) - (linha.reservado or 0)
+            for linha in db.session.execute(consulta)}
+
+def obter_estoque():
+    """
+    Retorna o estado do estoque livre da requisição atual
+    
+    Conceitos:
+    - As páginas aplicam este estado aos produtos do snapshot
+      (estoque.aplicar(produtos)) e o usam nas chaves dos caches
+    - g: O mesmo estado vale para a requisição inteira
+    """
+    if '_estoque' not in g:
+        g._estoque = estoque_catalogo.obter(_ler_estoque_livre)
+    return g._estoque
+
+def obter_carrinho_store():
+    """
+    Cria o store do carrinho na primeira chamada (veja carrinho_store.py)
+    
+    Mesmo padrão de obter_proxy_imagens(), com uma verificação antes do
+    lock: depois da criação, cada chamada é só uma leitura
+    """
+    global carrinho_store
+    if carrinho_store is None:
+        with _carrinho_store_lock:
+            if carrinho_store is None:
+                carrinho_store = criar_store(
+                    app.config['CARRINHO_BACKEND'],
+                    caminho_sqlite=app.config['CARRINHO_SQLITE_PATH']
+                )
+    return carrinho_store
+
 def obter_carrinho():
     """
-    Função para obter o carrinho da sessão
+    Função para obter o carrinho da requisição atual
     
     Conceitos importantes:
-    - session: Armazena dados do usuário durante a navegação
-    - get(): Método seguro para obter valor, retorna None se não existir
-    - list(): Converte para lista (caso não seja)
+    - session: Guarda apenas o ID do carrinho (cookie pequeno)
+    - carrinho_store: Guarda os itens no servidor como {produto_id: quantidade}
+    - Nome, preço e imagem vêm do snapshot do catálogo; produtos que
+      saíram do catálogo são ignorados
+    - g: Objeto do Flask que vive durante uma requisição; evita
+      montar o carrinho mais de uma vez por requisição
+    
+    Returns:
+        Objeto Carrinho (veja carrinho.py)
+    """
+    if '_carrinho' not in g:
+        carrinho_id = session.get('carrinho_id')
+        with instrumentacao.medir('carrinho'):
+            itens = obter_carrinho_store().carregar(carrinho_id) if carrinho_id else {}
+        g._carrinho = Carrinho.de_compacto(itens, obter_catalogo().por_id)
+    return g._carrinho
+
+def id_carrinho():
+    """
+    ID do carrinho da sessão, criado na primeira chamada
+
+    É a chave dos itens no carrinho_store e das reservas de estoque
     """
-    return session.get('carrinho', [])
+    carrinho_id = session.get('carrinho_id')
+    if not carrinho_id:
+        carrinho_id = session['carrinho_id'] = secrets.token_urlsafe(16)
+    return carrinho_id
 
 def salvar_carrinho(carrinho):
     """
-    Função para salvar o carrinho na sessão
+    Função para salvar o carrinho no store (formato compacto)
+    
+    Cria o ID do carrinho na sessão na primeira gravação
     """
-    session['carrinho'] = carrinho
+    carrinho_id = id_carrinho()
+    with instrumentacao.medir('carrinho'):
+        obter_carrinho_store().salvar(carrinho_id, carrinho.to_compacto())
+    g._carrinho = carrinho
 
-def calcular_total_carrinho(carrinho):
+def limpar_carrinho(liberar_reservas=True):
+    """
+    Função para esvaziar o carrinho (após finalizar o pedido)
+
+    Args:
+        liberar_reservas: Se False, as reservas do carrinho continuam no
+                          banco (o pedido na fila ainda vai usá-las)
     """
-    Função para calcular o valor total do carrinho
+    carrinho_id = session.pop('carrinho_id', None)
+    if carrinho_id:
+        obter_carrinho_store().remover(carrinho_id)
+        if liberar_reservas:
+            devolvidas = reservas.liberar(db.session.connection(), carrinho_id)
+            db.session.commit()
+            estoque_catalogo.marcar(devolvidas)
+    g._carrinho = Carrinho()
+
+def ttl_reserva():
+    return timedelta(minutes=app.config['RESERVA_TTL_MINUTOS'])
+
+def reservar_estoque(produto_id, quantidade):
+    """
+    Ajusta a reserva do carrinho da sessão para `quantidade` unidades
+
+    Faz o commit na hora: a reserva só vale para os outros carrinhos
+    depois de gravada, e a transação de escrita do SQLite fica curta
+
+    Returns:
+        True se a reserva foi feita; False se falta estoque livre
+    """
+    try:
+        ok = reservas.reservar(db.session.connection(), id_carrinho(), produto_id,
+                               quantidade, ttl=ttl_reserva())
+        db.session.commit()
+        estoque_catalogo.marcar([produto_id])
+        return ok
+    except Exception:
+        db.session.rollback()
+        raise
+
+def ler_quantidade(valor):
+    """
+    Converte a quantidade enviada pelo cliente em um inteiro >= 1
+
+    Aceita int ou texto com um inteiro ("3"); recusa negativos, zero,
+    frações (2.5) e booleanos (em Python, True é o inteiro 1)
+
+    Returns:
+        A quantidade (int), ou None se o valor não for válido
+    """
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, float):
+        if not valor.is_integer():
+            return None
+        valor = int(valor)
+    try:
+        quantidade = int(valor)
+    except (TypeError, ValueError):
+        return None
+    return quantidade if quantidade >= 1 else None
+
+class EstoqueInsuficiente(Exception):
+    """
+    Erro lançado quando algum produto do pedido não tem estoque suficiente
+    (ou não está mais disponível) no momento de finalizar o pedido
+    """
+
+def criar_pedido(pedido_dados, itens, carrinho_id=None, token_fila=None):
+    """
+    Cria o pedido, seus itens e baixa o estoque em uma única transação
     
     Conceitos:
-    - sum(): Função built-in do Python para somar elementos
-    - Generator expression: (item['subtotal'] for item in carrinho)
-    - É mais eficiente que list comprehension para somas
+    - Transação: Ou tudo é gravado (pedido, itens e estoque) ou nada é;
+      não ficam pedidos "pela metade" no banco
+    - Um único commit: No SQLite cada commit custa um fsync no disco
+    - Preços relidos do banco: O cliente paga o preço atual do produto
+    - UPDATE ... WHERE estoque - reservado >= quantidade: A própria linha
+      garante que o estoque nunca fica negativo nem leva unidades
+      reservadas por outros carrinhos, mesmo com pedidos simultâneos
+    - As reservas do próprio carrinho viram a baixa do estoque
+      (veja reservas.confirmar)
+    - Depois do commit, os produtos do pedido são marcados no estoque
+      do catálogo (veja EstoqueCatalogo): a próxima página relê só eles,
+      sem descartar o snapshot
+    
+    Args:
+        pedido_dados: Dicionário com nome, telefone, endereco e observacoes
+        itens: Dicionário {produto_id: quantidade}
+        carrinho_id: ID do carrinho dono das reservas (None: sem reservas)
+        token_fila: Token do pedido na fila (só para pedidos vindos da fila)
+    
+    Returns:
+        Tupla (pedido, carrinho_confirmado) com o Pedido gravado e um
+        Carrinho com os preços efetivamente cobrados
+    
+    Raises:
+        EstoqueInsuficiente: Se algum produto não puder ser vendido
+        IntegrityError: Se já existir um pedido com o mesmo token_fila
+    """
+    try:
+        conexao = db.session.connection()
+        # Devolve as reservas vencidas antes de conferir o estoque livre
+        expiradas = reservas.recuperar_expiradas(conexao)
+        reservas_carrinho = reservas.reservas_do_carrinho(conexao, carrinho_id) if carrinho_id else {}
+        
+        # Relê preço e estoque de todos os produtos em uma única consulta
+        produtos = {
+            linha.id: linha
+            for linha in db.session.execute(
+                db.select(Produto.id, Produto.nome, Produto.preco,
+                          Produto.imagem_url, Produto.estoque, Produto.reservado)
+                .where(Produto.id.in_(list(itens)), Produto.ativo.is_(True))
+            )
+        }
+        
+        confirmado = Carrinho()
+        for produto_id, quantidade in itens.items():
+            produto = produtos.get(produto_id)
+            # Livre para este carrinho: o que ninguém reservou + a sua reserva
+            livre = produto.estoque - produto.reservado + reservas_carrinho.get(produto_id, 0) if produto else 0
+            if produto is None or livre < quantidade:
+                nome = produto.nome if produto else f'#{produto_id}'
+                raise EstoqueInsuficiente(f'Estoque insuficiente para {nome}')
+            confirmado.adicionar(produto, quantidade)
+        
+        novo_pedido = Pedido(
+            nome_cliente=pedido_dados['nome'],
+            telefone_cliente=pedido_dados['telefone'],
+            endereco_cliente=pedido_dados['endereco'],
+            valor_total=sum(produtos[pid].preco * qtd for pid, qtd in itens.items()),
+            observacoes=pedido_dados['observacoes'],
+            token_fila=token_fila
+        )
+        db.session.add(novo_pedido)
+        # flush(): Envia o INSERT (para obter o id) sem fazer commit
+        db.session.flush()
+        
+        # Todos os itens em um único INSERT com vários parâmetros
+        db.session.execute(db.insert(ItemPedido), [
+            {
+                'pedido_id': novo_pedido.id,
+                'produto_id': produto_id,
+                'quantidade': quantidade,
+                'preco_unitario': produtos[produto_id].preco
+            }
+            for produto_id, quantidade in itens.items()
+        ])
+        
+        # Baixa de estoque em lote (com as reservas do carrinho), protegida
+        # contra venda acima do estoque
+        if not reservas.confirmar(conexao, carrinho_id, itens, reservas_carrinho):
+            # Outro pedido levou o estoque entre a leitura e a baixa
+            raise EstoqueInsuficiente('Estoque insuficiente para um ou mais produtos')
+        
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    # O estoque mudou só nos produtos do pedido (e nos que tinham reservas
+    # do carrinho); reservas vencidas devolvidas podem ser de qualquer produto
+    estoque_catalogo.marcar(set(itens) | set(reservas_carrinho))
+    if expiradas:
+        estoque_catalogo.invalidar()
+    return novo_pedido, confirmado
+
+def montar_whatsapp_url(pedido_dados, carrinho):
     """
-    return sum(item['subtotal'] for item in carrinho)
+    Monta o link do WhatsApp com a mensagem do pedido já codificada
+    
+    O texto fixo da mensagem já foi codificado para URL quando os modelos
+    foram compilados; aqui só os dados do pedido são codificados
+    """
+    return mensagem_whatsapp.url(pedido_dados, carrinho)
 
 def gerar_mensagem_whatsapp(pedido_dados, carrinho):
     """
-    Função para gerar mensagem formatada para WhatsApp
+    Função para gerar mensagem formatada para WhatsApp (texto puro)
     
     Args:
         pedido_dados: Dicionário com dados do cliente
-        carrinho: Lista com itens do carrinho
+        carrinho: Objeto Carrinho com os itens
     
     Returns:
         String com mensagem formatada
     """
-    
-    # Cabeçalho da mensagem
-    mensagem = "🍷 *PEDIDO ADEGA RÁDIO TATUAPÉ FM* 🍷\n\n"
-    
-    # Informações do cliente
-    mensagem += f"👤 *Cliente:* {pedido_dados['nome']}\n"
-    mensagem += f"📞 *Telefone:* {pedido_dados['telefone']}\n"
-    mensagem += f"📍 *Endereço:* {pedido_dados['endereco']}\n"
-    mensagem += f"🕐 *Data/Hora:* {datetime.now().strftime('%d/%m/%Y às %H:%M')}\n\n"
-    
-    # Itens do pedido
-    mensagem += "🛒 *ITENS DO PEDIDO:*\n"
-    mensagem += "-" * 30 + "\n"
-    
-    total = 0
-    for item in carrinho:
-        subtotal = item['quantidade'] * item['preco']
-        total += subtotal
-        mensagem += f"• {item['nome']}\n"
-        mensagem += f"  Qtd: {item['quantidade']} x R$ {item['preco']:.2f}\n"
-        mensagem += f"  Subtotal: R$ {subtotal:.2f}\n\n"
-    
-    mensagem += "-" * 30 + "\n"
-    mensagem += f"💰 *TOTAL: R$ {total:.2f}*\n\n"
-    
-    # Instruções de pagamento
-    mensagem += "💳 *PAGAMENTO:*\n"
-    mensagem += "PIX: radiotatuapefm@gmail.com\n\n"
-    mensagem += "⚠️ *IMPORTANTE:*\n"
-    mensagem += "• Efetue o pagamento via PIX\n"
-    mensagem += "• Envie o comprovante para este número\n"
-    mensagem += "• A entrega será liberada após confirmação\n\n"
-    mensagem += "Obrigado pela preferência! 🙏"
-    
-    return mensagem
+    return mensagem_whatsapp.texto(pedido_dados, carrinho)
+
+def ler_filtro_preco(nome):
+    """
+    Lê ?preco_min= / ?preco_max= da URL (None se ausente ou inválido)
+
+    Aceita vírgula decimal (19,90); valores como "nan" e "inf" são ignorados
+    """
+    valor = request.args.get(nome, '').strip().replace(',', '.')
+    try:
+        preco = float(valor)
+    except ValueError:
+        return None
+    return preco if math.isfinite(preco) else None
 
 # ROTAS DA APLICAÇÃO
 # =====================================================
@@ -270,30 +876,263 @@ def index():
     - render_template(): Função que renderiza um template HTML
     - Query do banco: Produto.query.filter_by().all()
     - Filtros por categoria via query string (?categoria=cerveja)
+    - Filtros de preço e estoque (?preco_min=10&preco_max=50&em_estoque=1),
+      respondidos pelo índice de facetas com bisect (veja facetas.py)
+    - Cache de fragmentos: A grade de produtos vem pronta do cache
+    - INDEX_STREAMING=1: stream_template() envia a página em pedaços,
+      enquanto os cards ainda estão sendo renderizados
     """
     
-    # Obtém parâmetro de categoria da URL (se houver)
+    # Obtém parâmetros de filtro da URL (se houver)
     categoria_filtro = request.args.get('categoria')
+    preco_min = ler_filtro_preco('preco_min')
+    preco_max = ler_filtro_preco('preco_max')
+    em_estoque = request.args.get('em_estoque') in ('1', 'on', 'true')
+    
+    # Busca produtos no snapshot do catálogo (sem consultar o banco), com
+    # o estoque livre atual
+    catalogo = obter_catalogo()
+    estoque = obter_estoque()
+    produtos = estoque.aplicar(catalogo.facetas(estoque.esgotados)
+                               .filtrar(categoria_filtro, preco_min, preco_max, em_estoque))
+    filtros = {'preco_min': preco_min, 'preco_max': preco_max, 'em_estoque': em_estoque}
     
-    # Busca produtos baseado no filtro de categoria
     if categoria_filtro:
-        produtos = Produto.query.filter_by(ativo=True, categoria=categoria_filtro).all()
         titulo_categoria = categoria_filtro.replace('_', ' ').title()
     else:
-        produtos = Produto.query.filter_by(ativo=True).all()
         titulo_categoria = None
     
-    # Obter carrinho atual
-    carrinho = obter_carrinho()
-    total_itens = sum(item['quantidade'] for item in carrinho)
+    # Total de itens do carrinho atual (já calculado pelo Carrinho)
+    total_itens = obter_carrinho().total_itens
+    
+    if app.config['INDEX_STREAMING']:
+        # Streaming: sem grade_produtos, o template inclui
+        # _grade_produtos.html e os cards são enviados conforme ficam
+        # prontos. O contexto (carrinho, sessão) é montado antes do
+        # primeiro pedaço; stream_with_context mantém a requisição
+        # disponível enquanto o resto da página é gerado.
+        pedacos = stream_template('index.html',
+                                  produtos=produtos,
+                                  filtros=filtros,
+                                  total_itens=total_itens,
+                                  categoria_atual=categoria_filtro,
+                                  titulo_categoria=titulo_categoria)
+        return app.response_class(
+            stream_with_context(compressao.agrupar(pedacos)), mimetype='text/html'
+        )
+    
+    # A grade de produtos é igual para todos os clientes: é renderizada uma
+    # vez por versão do catálogo, categoria, filtro de estoque e estoque dos
+    # produtos da grade, e depois vem do cache (uma venda só refaz as
+    # grades que mostram o produto vendido). Faixas de preço (valores livres, digitados pelo cliente)
+    # não entram no cache, para não enchê-lo de combinações usadas uma vez.
+    # Markup(): Indica ao Jinja2 que o HTML já é seguro (não escapar de novo)
+    renderizar_grade = lambda: render_template('_grade_produtos.html', produtos=produtos)
+    if preco_min is None and preco_max is None:
+        grade_produtos = Markup(cache_fragmentos.obter(
+            ('grade_produtos', catalogo.versao, categoria_filtro, em_estoque,
+             estoque.de(produtos)),
+            renderizar_grade
+        ))
+    else:
+        grade_produtos = Markup(renderizar_grade())
     
     # Renderiza o template passando os produtos
     return render_template('index.html', 
                          produtos=produtos, 
+                         filtros=filtros,
+                         grade_produtos=grade_produtos,
                          total_itens=total_itens,
                          categoria_atual=categoria_filtro,
                          titulo_categoria=titulo_categoria)
 
+@app.route('/buscar')
+def buscar():
+    """
+    Busca de produtos por nome e descrição (?q=gin+apogee)
+    
+    Conceitos:
+    - FTS5: Índice de busca textual do SQLite (veja busca.py)
+    - O índice devolve só os ids, na ordem de relevância; os dados dos
+      produtos vêm do snapshot do catálogo (sem outra consulta ao banco)
+    - A mesma rota responde HTML ou JSON (?formato=json ou
+      cabeçalho Accept: application/json)
+    """
+    termo = request.args.get('q', '').strip()
+    limite = min(max(request.args.get('limite', busca.LIMITE_PADRAO, type=int), 1),
+                 busca.LIMITE_MAXIMO)
+    
+    catalogo = obter_catalogo()
+    ids = busca.buscar_ids(db.session.connection(), termo, limite)
+    if ids is None:
+        # Sem FTS5: busca em memória sobre o snapshot
+        resultados = busca.buscar_em_memoria(catalogo.produtos, termo, limite)
+    else:
+        # Produtos desativados depois da indexação são ignorados
+        resultados = [catalogo.por_id[i] for i in ids if i in catalogo.por_id]
+    resultados = obter_estoque().aplicar(resultados)
+    
+    quer_json = (request.args.get('formato') == 'json' or
+                 request.accept_mimetypes.best == 'application/json')
+    if quer_json:
+        return jsonify({
+            'termo': termo,
+            'total': len(resultados),
+            'produtos': [produto.to_dict() for produto in resultados]
+        })
+    
+    return render_template('index.html',
+                         produtos=resultados,
+                         total_itens=obter_carrinho().total_itens,
+                         categoria_atual=None,
+                         titulo_categoria=None,
+                         termo_busca=termo)
+
+def _resposta_condicional(etag, modificado_em, mimetype, gerar_corpo):
+    """
+    Responde 304 Not Modified se o cliente já tem esta versão; senão gera o corpo
+    
+    Args:
+        etag: ETag da resposta (sem aspas)
+        modificado_em: Data do Last-Modified (datetime com fuso UTC)
+        mimetype: Tipo do conteúdo
+        gerar_corpo: Função sem argumentos que devolve o corpo (bytes ou
+                     um iterável de bytes, enviado em streaming)
+    """
+    # If-None-Match tem prioridade; If-Modified-Since só vale sem ele
+    # contains_weak: a comparação do If-None-Match é fraca (a compressão
+    # em compressao.py devolve a ETag como W/"...")
+    if request.if_none_match:
+        nao_modificado = request.if_none_match.contains_weak(etag)
+    else:
+        nao_modificado = (request.if_modified_since is not None and
+                          request.if_modified_since >= modificado_em)
+    
+    if nao_modificado:
+        resposta = app.response_class(status=304)
+    else:
+        resposta = app.response_class(gerar_corpo(), mimetype=mimetype)
+    
+    resposta.set_etag(etag)
+    resposta.last_modified = modificado_em
+    # public: CDNs podem guardar; no-cache: sempre revalidar (If-None-Match)
+    resposta.cache_control.public = True
+    resposta.cache_control.no_cache = True
+    return resposta
+
+# Campos que podem ser pedidos em /api/produtos?campos=...
+CAMPOS_API_PRODUTOS = ('id', 'nome', 'descricao', 'preco', 'categoria', 'imagem_url', 'estoque')
+
+def _pagina_produtos(catalogo, categoria, apos, limite):
+    """
+    Produtos de uma página de /api/produtos (depois do id `apos`)
+    
+    Returns:
+        Tupla (pagina, tem_mais)
+    """
+    produtos = catalogo.filtrar(categoria)
+    # Ids em ordem crescente: bisect encontra o início da página em O(log n)
+    ids = catalogo.memo(('ids', categoria), lambda: [p.id for p in produtos])
+    inicio = bisect.bisect_right(ids, apos)
+    return produtos[inicio:inicio + limite], inicio + limite < len(produtos)
+
+def _serializar_pagina_produtos(catalogo, pagina, tem_mais, campos):
+    """
+    Gera o corpo JSON (bytes) de uma página de /api/produtos
+    
+    Chamada no máximo uma vez por versão do catálogo, combinação de
+    parâmetros e estoque da página: o resultado fica guardado no snapshot
+    (catalogo.memo)
+    """
+    corpo = {
+        'versao': catalogo.versao,
+        'produtos': [{campo: getattr(produto, campo) for campo in campos} for produto in pagina],
+        'proximo_cursor': pagina[-1].id if tem_mais else None
+    }
+    return json.dumps(corpo, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+@app.route('/api/produtos')
+def api_produtos():
+    """
+    API JSON do catálogo (?categoria=vinho&campos=id,nome,preco&apos=10&limite=50)
+    
+    Conceitos:
+    - Projeção: ?campos= escolhe quais campos de cada produto são enviados
+    - Paginação por cursor: ?apos=<id> começa depois do último produto
+      recebido (o valor vem em "proximo_cursor")
+    - ETag: "Impressão digital" da resposta. O cliente (ou a CDN) reenvia
+      o valor em If-None-Match e, se o catálogo não mudou, recebe
+      304 Not Modified sem corpo - nada é serializado
+    - O corpo de cada página é serializado uma vez por versão do catálogo
+      (e estoque dos produtos da página, se o campo estoque foi pedido) e
+      depois servido da memória
+    """
+    categoria = request.args.get('categoria') or None
+    
+    campos = CAMPOS_API_PRODUTOS
+    if request.args.get('campos'):
+        # dict.fromkeys: Remove repetidos mantendo a ordem pedida
+        campos = tuple(dict.fromkeys(
+            campo.strip() for campo in request.args['campos'].split(',') if campo.strip()
+        ))
+        invalidos = [campo for campo in campos if campo not in CAMPOS_API_PRODUTOS]
+        if invalidos or not campos:
+            return jsonify({
+                'error': f"Campos inválidos: {', '.join(invalidos) or '(vazio)'}",
+                'campos_disponiveis': CAMPOS_API_PRODUTOS
+            }), 400
+    
+    apos = max(request.args.get('apos', 0, type=int), 0)
+    limite = min(max(request.args.get('limite', 50, type=int), 1), 200)
+    
+    catalogo = obter_catalogo()
+    pagina, tem_mais = _pagina_produtos(catalogo, categoria, apos, limite)
+    modificado_em = catalogo.atualizado_em
+    if 'estoque' in campos:
+        # O estoque da página entra na ETag e na chave do memo: uma venda
+        # só muda as páginas que mostram o produto vendido
+        estoque = obter_estoque()
+        parametros = (categoria, campos, apos, limite, estoque.de(pagina))
+        pagina = estoque.aplicar(pagina)
+        modificado_em = max(modificado_em, estoque.alterado_em)
+    else:
+        parametros = (categoria, campos, apos, limite)
+    # ETag forte: versão do catálogo + parâmetros (sem serializar nada)
+    etag = f"{catalogo.versao}-{hashlib.sha1(repr(parametros).encode('utf-8')).hexdigest()[:10]}"
+    
+    return _resposta_condicional(
+        etag, modificado_em, 'application/json',
+        lambda: catalogo.memo(
+            ('api_produtos',) + parametros,
+            lambda: _serializar_pagina_produtos(catalogo, pagina, tem_mais, campos)
+        )
+    )
+
+@app.route('/api/facetas')
+def api_facetas():
+    """
+    API JSON das facetas: categorias com quantidade de produtos, quantos
+    têm estoque e preço mínimo/máximo, e os totais do catálogo
+
+    Conceitos:
+    - Calculadas uma vez por versão do catálogo e conjunto de produtos
+      esgotados (veja facetas.py); o JSON também é serializado uma vez e
+      servido da memória
+    - ETag: A versão do catálogo e os esgotados; sem mudança, a resposta é 304
+    """
+    catalogo = obter_catalogo()
+    estoque = obter_estoque()
+    esgotados = hashlib.sha1(repr(sorted(estoque.esgotados)).encode('utf-8')).hexdigest()[:10]
+    return _resposta_condicional(
+        f'{catalogo.versao}-facetas-{esgotados}',
+        max(catalogo.atualizado_em, estoque.alterado_em), 'application/json',
+        lambda: catalogo.memo(
+            ('api_facetas', estoque.esgotados),
+            lambda: json.dumps(dict(catalogo.facetas(estoque.esgotados).to_dict(), versao=catalogo.versao),
+                               ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        )
+    )
+
 @app.route('/produto/<int:produto_id>')
 def detalhes_produto(produto_id):
     """
@@ -301,12 +1140,14 @@ def detalhes_produto(produto_id):
     
     Conceitos:
     - <int:produto_id>: Parâmetro da URL que é convertido para inteiro
-    - get_or_404(): Busca o produto ou retorna erro 404 se não encontrar
+    - abort(404): Retorna erro 404 se o produto não estiver no catálogo
     """
     
-    produto = Produto.query.get_or_404(produto_id)
-    carrinho = obter_carrinho()
-    total_itens = sum(item['quantidade'] for item in carrinho)
+    produto = obter_catalogo().por_id.get(produto_id)
+    if produto is None:
+        abort(404)
+    produto = obter_estoque().aplicar_um(produto)
+    total_itens = obter_carrinho().total_itens
     
     return render_template('produto_detalhes.html', 
                          produto=produto,
@@ -329,57 +1170,46 @@ def adicionar_carrinho():
         if request.is_json:
             dados = request.get_json()
             produto_id = dados.get('produto_id')
-            quantidade = dados.get('quantidade', 1)
+            quantidade = ler_quantidade(dados.get('quantidade', 1))
         else:
             # Dados de formulário tradicional
             produto_id = int(request.form.get('produto_id'))
-            quantidade = int(request.form.get('quantidade', 1))
+            quantidade = ler_quantidade(request.form.get('quantidade', 1))
+        
+        # Quantidade negativa, zero ou fracionada: recusa antes de reservar
+        if quantidade is None:
+            if request.is_json:
+                return jsonify({'error': 'Quantidade deve ser um número inteiro maior que zero'}), 400
+            flash('Quantidade inválida!', 'error')
+            return redirect(url_for('index'))
         
         # Busca o produto no banco
         produto = Produto.query.get_or_404(produto_id)
         
-        # Verifica se há estoque suficiente
-        if produto.estoque < quantidade:
+        # Obter carrinho atual
+        carrinho = obter_carrinho()
+        
+        # Reserva o estoque para a nova quantidade total do carrinho
+        # (falha se outros carrinhos já reservaram as unidades livres)
+        item = carrinho.get(produto.id)
+        if not reservar_estoque(produto.id, (item.quantidade if item else 0) + quantidade):
             if request.is_json:
                 return jsonify({'error': 'Estoque insuficiente'}), 400
             flash('Estoque insuficiente!', 'error')
             return redirect(url_for('index'))
         
-        # Obter carrinho atual
-        carrinho = obter_carrinho()
-        
-        # Verifica se o produto já está no carrinho
-        produto_no_carrinho = None
-        for item in carrinho:
-            if item['produto_id'] == produto_id:
-                produto_no_carrinho = item
-                break
-        
-        if produto_no_carrinho:
-            # Atualiza quantidade se produto já existe
-            produto_no_carrinho['quantidade'] += quantidade
-            produto_no_carrinho['subtotal'] = produto_no_carrinho['quantidade'] * produto_no_carrinho['preco']
-        else:
-            # Adiciona novo produto ao carrinho
-            carrinho.append({
-                'produto_id': produto_id,
-                'nome': produto.nome,
-                'preco': float(produto.preco),
-                'quantidade': quantidade,
-                'subtotal': quantidade * float(produto.preco),
-                'imagem_url': produto.imagem_url
-            })
+        # Soma a quantidade (ou adiciona o produto, se ainda não estiver no carrinho)
+        carrinho.adicionar(produto, quantidade)
         
-        # Salva carrinho na sessão
+        # Salva carrinho no store
         salvar_carrinho(carrinho)
         
         # Resposta baseada no tipo de requisição
         if request.is_json:
-            total_itens = sum(item['quantidade'] for item in carrinho)
             return jsonify({
                 'success': True,
                 'message': 'Produto adicionado ao carrinho!',
-                'total_itens': total_itens
+                'total_itens': carrinho.total_itens
             })
         else:
             flash('Produto adicionado ao carrinho!', 'success')
@@ -398,11 +1228,10 @@ def carrinho():
     Rota para exibir o carrinho de compras
     """
     carrinho = obter_carrinho()
-    total = calcular_total_carrinho(carrinho)
     
     return render_template('carrinho.html', 
                          carrinho=carrinho, 
-                         total=total)
+                         total=carrinho.total)
 
 @app.route('/remover_carrinho/<int:produto_id>')
 def remover_carrinho(produto_id):
@@ -411,8 +1240,9 @@ def remover_carrinho(produto_id):
     """
     carrinho = obter_carrinho()
     
-    # Remove o produto do carrinho
-    carrinho = [item for item in carrinho if item['produto_id'] != produto_id]
+    # Remove o produto do carrinho e devolve a reserva
+    carrinho.remover(produto_id)
+    reservar_estoque(produto_id, 0)
     
     salvar_carrinho(carrinho)
     flash('Produto removido do carrinho!', 'info')
@@ -427,36 +1257,132 @@ def atualizar_quantidade():
     try:
         dados = request.get_json()
         produto_id = dados.get('produto_id')
-        nova_quantidade = dados.get('quantidade')
+        nova_quantidade = ler_quantidade(dados.get('quantidade'))
         
-        if nova_quantidade <= 0:
-            return jsonify({'error': 'Quantidade deve ser maior que zero'}), 400
+        if nova_quantidade is None:
+            return jsonify({'error': 'Quantidade deve ser um número inteiro maior que zero'}), 400
         
         carrinho = obter_carrinho()
         
-        # Encontra e atualiza o produto
-        for item in carrinho:
-            if item['produto_id'] == produto_id:
-                # Verifica estoque
-                produto = Produto.query.get(produto_id)
-                if produto.estoque < nova_quantidade:
-                    return jsonify({'error': 'Estoque insuficiente'}), 400
-                
-                item['quantidade'] = nova_quantidade
-                item['subtotal'] = nova_quantidade * item['preco']
-                break
-        
-        salvar_carrinho(carrinho)
-        total = calcular_total_carrinho(carrinho)
+        # Atualiza o produto (se estiver no carrinho)
+        if produto_id in carrinho:
+            # Ajusta a reserva (diminuir sempre funciona)
+            if not reservar_estoque(produto_id, nova_quantidade):
+                return jsonify({'error': 'Estoque insuficiente'}), 400
+            
+            carrinho.definir_quantidade(produto_id, nova_quantidade)
+            salvar_carrinho(carrinho)
         
         return jsonify({
             'success': True,
-            'novo_total': total
+            'novo_total': carrinho.total,
+            'total_itens': carrinho.total_itens
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/carrinho/batch', methods=['POST'])
+def carrinho_batch():
+    """
+    Rota para aplicar várias alterações no carrinho de uma só vez (AJAX)
+    
+    Corpo esperado (JSON):
+        {"operacoes": [
+            {"acao": "adicionar", "produto_id": 1, "quantidade": 2},
+            {"acao": "atualizar", "produto_id": 3, "quantidade": 5},
+            {"acao": "remover", "produto_id": 4}
+        ]}
+    
+    Conceitos:
+    - Atomicidade: As operações são aplicadas em uma cópia do carrinho;
+      se alguma falhar, nada é salvo
+    - Uma única consulta: Os produtos envolvidos são lidos com um só
+      SELECT ... WHERE id IN (...)
+    - Uma única transação: As reservas de todos os produtos afetados são
+      ajustadas juntas; se faltar estoque para algum, nenhuma muda
+    """
+    carrinho_atual = obter_carrinho()
+    
+    try:
+        dados = request.get_json() or {}
+        operacoes = dados.get('operacoes') or []
+        if not isinstance(operacoes, list):
+            raise ValueError('operacoes deve ser uma lista')
+        if not all(isinstance(op, dict) for op in operacoes):
+            raise ValueError('cada operação deve ser um objeto')
+        
+        # Busca todos os produtos envolvidos em uma única consulta
+        ids = {int(op['produto_id']) for op in operacoes}
+        produtos = {
+            linha.id: linha
+            for linha in db.session.execute(
+                db.select(Produto.id, Produto.nome, Produto.preco, Produto.imagem_url)
+                .where(Produto.id.in_(ids), Produto.ativo.is_(True))
+            )
+        } if ids else {}
+        
+        # Aplica as operações em uma cópia do carrinho
+        carrinho = carrinho_atual.copia()
+        erros = []
+        for op in operacoes:
+            acao = op.get('acao')
+            produto_id = int(op['produto_id'])
+            quantidade = ler_quantidade(op.get('quantidade', 1))
+            
+            if acao == 'remover':
+                carrinho.remover(produto_id)
+            elif produto_id not in produtos:
+                erros.append({'produto_id': produto_id, 'error': 'Produto não encontrado'})
+            elif quantidade is None:
+                erros.append({'produto_id': produto_id,
+                              'error': 'Quantidade deve ser um número inteiro maior que zero'})
+            elif acao == 'adicionar':
+                carrinho.adicionar(produtos[produto_id], quantidade)
+            elif acao == 'atualizar':
+                carrinho.definir_quantidade(produto_id, quantidade)
+            else:
+                erros.append({'produto_id': produto_id, 'error': f'Ação inválida: {acao}'})
+        
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Requisição inválida: {e}',
+                        'carrinho': carrinho_atual.to_dict()}), 400
+    
+    if not erros:
+        # Reserva o estoque de todos os produtos afetados na mesma transação
+        try:
+            conexao = db.session.connection()
+            for produto_id in sorted(ids):
+                item = carrinho.get(produto_id)
+                if not reservas.reservar(conexao, id_carrinho(), produto_id,
+                                         item.quantidade if item else 0, ttl=ttl_reserva()):
+                    erros.append({'produto_id': produto_id, 'error': 'Estoque insuficiente'})
+            if erros:
+                db.session.rollback()
+            else:
+                db.session.commit()
+                estoque_catalogo.marcar(ids)
+        except Exception as e:
+            # Erro do banco no meio do lote: desfaz as reservas já ajustadas
+            # e responde em JSON, no mesmo formato dos erros de validação
+            # (o CarrinhoBatch do app.js sempre lê a resposta como JSON)
+            db.session.rollback()
+            app.logger.exception('Erro ao reservar o estoque do lote')
+            if isinstance(e, OperationalError):
+                # Banco ocupado (ex: "database is locked"): vale tentar de novo
+                return jsonify({'error': 'Carrinho indisponível no momento, tente novamente',
+                                'carrinho': carrinho_atual.to_dict()}), 503, {'Retry-After': '1'}
+            return jsonify({'error': 'Erro ao atualizar o carrinho',
+                            'carrinho': carrinho_atual.to_dict()}), 500
+    
+    if erros:
+        # Nada é salvo: devolve o estado atual para a interface se corrigir
+        return jsonify({'error': erros[0]['error'], 'erros': erros,
+                        'carrinho': carrinho_atual.to_dict()}), 400
+    
+    salvar_carrinho(carrinho)
+    return jsonify(dict(carrinho.to_dict(), success=True))
+
 @app.route('/checkout')
 def checkout():
     """
@@ -468,11 +1394,13 @@ def checkout():
         flash('Carrinho vazio!', 'warning')
         return redirect(url_for('index'))
     
-    total = calcular_total_carrinho(carrinho)
+    # O cliente está preenchendo os dados: estende o prazo das reservas
+    reservas.renovar(db.session.connection(), id_carrinho(), ttl=ttl_reserva())
+    db.session.commit()
     
     return render_template('checkout.html', 
                          carrinho=carrinho, 
-                         total=total)
+                         total=carrinho.total)
 
 @app.route('/finalizar_pedido', methods=['POST'])
 def finalizar_pedido():
@@ -480,6 +1408,11 @@ def finalizar_pedido():
     Rota para finalizar o pedido e enviar para WhatsApp
     """
     try:
+        # Reenvio de um formulário já registrado na fila: mostra a mesma confirmação
+        token = request.form.get('token_pedido')
+        if app.config['FILA_PEDIDOS'] and token and fila_pedidos.obter(token):
+            return _confirmacao_pedido_fila(token)
+        
         carrinho = obter_carrinho()
         
         if not carrinho:
@@ -499,63 +1432,300 @@ def finalizar_pedido():
             flash('Todos os campos são obrigatórios!', 'error')
             return redirect(url_for('checkout'))
         
-        # Gera mensagem para WhatsApp
-        mensagem = gerar_mensagem_whatsapp(pedido_dados, carrinho)
+        if app.config['FILA_PEDIDOS']:
+            # Modo assíncrono: apenas registra o pedido na fila e responde
+            return _enfileirar_pedido(pedido_dados, carrinho)
         
-        # Número do WhatsApp (com código do país)
-        numero_whatsapp = "5511970603441"  # +55 11 970603441
+        # Salva o pedido, os itens e a baixa de estoque em uma única transação
+        novo_pedido, carrinho_confirmado = criar_pedido(pedido_dados, carrinho.to_compacto(),
+                                                        session.get('carrinho_id'))
         
-        # Encode da mensagem para URL
-        mensagem_encoded = urllib.parse.quote(mensagem)
-        
-        # URL do WhatsApp
-        whatsapp_url = f"https://wa.me/{numero_whatsapp}?text={mensagem_encoded}"
-        
-        # Salva o pedido no banco de dados (opcional)
-        valor_total = calcular_total_carrinho(carrinho)
-        
-        novo_pedido = Pedido(
-            nome_cliente=pedido_dados['nome'],
-            telefone_cliente=pedido_dados['telefone'],
-            endereco_cliente=pedido_dados['endereco'],
-            valor_total=valor_total,
-            observacoes=pedido_dados['observacoes']
-        )
-        
-        db.session.add(novo_pedido)
-        db.session.commit()
-        
-        # Adiciona os itens do pedido
-        for item in carrinho:
-            item_pedido = ItemPedido(
-                pedido_id=novo_pedido.id,
-                produto_id=item['produto_id'],
-                quantidade=item['quantidade'],
-                preco_unitario=item['preco']
-            )
-            db.session.add(item_pedido)
-        
-        db.session.commit()
+        # Link do WhatsApp (com os preços efetivamente cobrados)
+        whatsapp_url = montar_whatsapp_url(pedido_dados, carrinho_confirmado)
         
         # Limpa o carrinho
-        session.pop('carrinho', None)
+        limpar_carrinho()
         
         # Renderiza página de confirmação com link do WhatsApp
         return render_template('pedido_confirmado.html', 
                              whatsapp_url=whatsapp_url,
                              pedido=novo_pedido)
         
+    except EstoqueInsuficiente as e:
+        flash(f'{e}. Revise as quantidades do carrinho.', 'error')
+        return redirect(url_for('carrinho'))
     except Exception as e:
         flash(f'Erro ao processar pedido: {str(e)}', 'error')
         return redirect(url_for('checkout'))
 
+def _enfileirar_pedido(pedido_dados, carrinho):
+    """
+    Registra o pedido na fila e renderiza a confirmação
+    
+    O token vem do formulário (gerado no navegador); se o cliente enviar
+    o mesmo formulário duas vezes, o pedido só entra na fila uma vez
+    """
+    token = request.form.get('token_pedido') or secrets.token_hex(16)
+    fila_pedidos.enfileirar(token, {
+        'dados': pedido_dados,
+        'itens': {str(produto_id): quantidade for produto_id, quantidade in carrinho.to_compacto().items()},
+        # Nome e preço de cada produto como o cliente viu (usados na mensagem do WhatsApp)
+        'produtos': {str(item.produto_id): {'nome': item.nome, 'preco': item.preco} for item in carrinho},
+        'valor_total': carrinho.total,
+        'carrinho_id': session.get('carrinho_id')
+    })
+    worker_pool.iniciar()
+    worker_pool.notificar()
+    
+    # As reservas ficam para o worker transformar em baixa de estoque
+    limpar_carrinho(liberar_reservas=False)
+    return _confirmacao_pedido_fila(token)
+
+def _confirmacao_pedido_fila(token):
+    """
+    Renderiza a confirmação de um pedido registrado na fila
+    
+    A mensagem do WhatsApp só é montada quando o cliente clicar no link.
+    Um pedido que falhou de vez (ex: estoque insuficiente) mostra o erro,
+    sem confirmação nem link do WhatsApp
+    """
+    from fila_pedidos import PedidoRecebido, FALHOU
+    
+    registro = fila_pedidos.obter(token)
+    recibo = PedidoRecebido(
+        id=token[:8].upper(),
+        data_pedido=datetime.fromtimestamp(registro['criado_em']),
+        nome_cliente=registro['payload']['dados']['nome'],
+        telefone_cliente=registro['payload']['dados']['telefone'],
+        endereco_cliente=registro['payload']['dados']['endereco'],
+        observacoes=registro['payload']['dados']['observacoes'],
+        valor_total=registro['payload']['valor_total']
+    )
+    if registro['status'] == FALHOU:
+        # 409 Conflict: o pedido existe, mas não pode ser atendido
+        return render_template('pedido_falhou.html', pedido=recibo, erro=registro['erro']), 409
+    return render_template('pedido_confirmado.html',
+                         whatsapp_url=url_for('whatsapp_pedido', token=token),
+                         pedido=recibo)
+
+@app.route('/pedido/<token>/whatsapp')
+def whatsapp_pedido(token):
+    """
+    Rota que monta a mensagem de um pedido da fila e redireciona para o WhatsApp
+    
+    - Nomes e preços vêm do próprio pedido na fila (o que o cliente viu ao
+      finalizar), não do catálogo atual
+    - Pedido que falhou de vez: mostra o erro em vez de abrir o WhatsApp
+    """
+    from fila_pedidos import ProdutoRecebido, FALHOU
+    
+    registro = fila_pedidos.obter(token) if fila_pedidos else None
+    if registro is None:
+        abort(404)
+    if registro['status'] == FALHOU:
+        return _confirmacao_pedido_fila(token)
+    
+    payload = registro['payload']
+    itens = {int(produto_id): quantidade for produto_id, quantidade in payload['itens'].items()}
+    if 'produtos' in payload:
+        produtos = {
+            int(produto_id): ProdutoRecebido(int(produto_id), dados['nome'], dados['preco'])
+            for produto_id, dados in payload['produtos'].items()
+        }
+    else:
+        # Pedidos enfileirados antes de o payload guardar os preços
+        produtos = obter_catalogo().por_id
+    carrinho = Carrinho.de_compacto(itens, produtos)
+    return redirect(montar_whatsapp_url(payload['dados'], carrinho))
+
+@app.route('/admin/fila')
+def admin_fila():
+    """
+    Rota para monitorar a fila de pedidos (profundidade e atraso)
+    """
+    if not app.config['FILA_PEDIDOS']:
+        return jsonify({'ativa': False})
+    return jsonify(dict(fila_pedidos.metricas(), ativa=True))
+
+def _ler_cursor_pedidos(cursor):
+    """
+    Converte o cursor da URL ("<data_iso>_<id>") em (data_pedido, id)
+    """
+    try:
+        data_iso, pedido_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(data_iso), int(pedido_id)
+    except (AttributeError, ValueError):
+        return None
+
+def resumo_pedidos(dias=30, limite_produtos=10):
+    """
+    Calcula os indicadores do painel com agregações no próprio banco
+    
+    Conceitos:
+    - GROUP BY: O banco soma/conta por grupo e devolve só o resultado,
+      em vez de carregar todos os pedidos para somar em Python
+    - func.date(): Extrai o dia (AAAA-MM-DD) da data do pedido
+    
+    Returns:
+        Dicionário com totais gerais, faturamento por dia e produtos mais vendidos
+    """
+    inicio = datetime.now() - timedelta(days=dias)
+    
+    total_pedidos, faturamento_total = db.session.execute(
+        db.select(db.func.count(Pedido.id), db.func.coalesce(db.func.sum(Pedido.valor_total), 0))
+    ).one()
+    
+    dia = db.func.date(Pedido.data_pedido)
+    por_dia = db.session.execute(
+        db.select(dia.label('dia'),
+                  db.func.count(Pedido.id).label('pedidos'),
+                  db.func.sum(Pedido.valor_total).label('faturamento'))
+        .where(Pedido.data_pedido >= inicio)
+        .group_by(dia)
+        .order_by(dia.desc())
+    ).all()
+    
+    quantidade = db.func.sum(ItemPedido.quantidade)
+    mais_vendidos = db.session.execute(
+        db.select(Produto.id, Produto.nome,
+                  quantidade.label('quantidade'),
+                  db.func.sum(ItemPedido.quantidade * ItemPedido.preco_unitario).label('faturamento'))
+        .join(ItemPedido, ItemPedido.produto_id == Produto.id)
+        .join(Pedido, Pedido.id == ItemPedido.pedido_id)
+        .where(Pedido.data_pedido >= inicio)
+        .group_by(Produto.id, Produto.nome)
+        .order_by(quantidade.desc())
+        .limit(limite_produtos)
+    ).all()
+    
+    return {
+        'dias': dias,
+        'total_pedidos': total_pedidos,
+        'faturamento_total': faturamento_total,
+        'por_dia': por_dia,
+        'mais_vendidos': mais_vendidos
+    }
+
 @app.route('/admin')
 def admin():
     """
     Rota para área administrativa (lista de pedidos)
+    
+    Conceitos:
+    - Paginação por cursor (keyset): Em vez de OFFSET, a próxima página
+      começa depois do último pedido exibido (data_pedido, id). O custo
+      é o mesmo na primeira ou na milésima página
+    - selectinload(): Carrega itens e produtos de todos os pedidos da
+      página em poucas consultas "WHERE id IN (...)", evitando uma
+      consulta por pedido (problema N+1)
+    """
+    limite = min(max(request.args.get('limite', 50, type=int), 1), 200)
+    
+    consulta = (
+        Pedido.query
+        .options(db.selectinload(Pedido.itens).selectinload(ItemPedido.produto))
+        .order_by(Pedido.data_pedido.desc(), Pedido.id.desc())
+    )
+    
+    cursor = _ler_cursor_pedidos(request.args.get('antes'))
+    if cursor:
+        data_cursor, id_cursor = cursor
+        consulta = consulta.filter(db.or_(
+            Pedido.data_pedido < data_cursor,
+            db.and_(Pedido.data_pedido == data_cursor, Pedido.id < id_cursor)
+        ))
+    
+    # Busca um pedido a mais só para saber se existe próxima página
+    pedidos = consulta.limit(limite + 1).all()
+    proximo_cursor = None
+    if len(pedidos) > limite:
+        pedidos = pedidos[:limite]
+        ultimo = pedidos[-1]
+        proximo_cursor = f"{ultimo.data_pedido.isoformat()}_{ultimo.id}"
+    
+    return render_template('admin.html',
+                         pedidos=pedidos,
+                         resumo=resumo_pedidos(),
+                         proximo_cursor=proximo_cursor,
+                         limite=limite,
+                         primeira_pagina=cursor is None)
+
+@app.route('/admin/catalogo')
+def admin_catalogo():
+    """
+    Rota para monitorar o cache do catálogo (versão, hits e misses)
+
+    Se os hits crescem e os misses não, as páginas do catálogo
+    estão sendo servidas da memória, sem consultar o SQLite
+    """
+    return jsonify(dict(cache_catalogo.estatisticas(),
+                        estoque=estoque_catalogo.estatisticas(),
+                        fragmentos=cache_fragmentos.estatisticas(),
+                        imagens=proxy_imagens.estatisticas() if proxy_imagens else None,
+                        compressao=compressao_respostas.estatisticas()
+                        if app.config['COMPRESSAO'] else None))
+
+# IMAGENS DOS PRODUTOS
+# =====================================================
+def obter_proxy_imagens():
+    """
+    Cria o proxy de imagens na primeira chamada (a pasta do cache só é
+    lida quando alguma imagem é pedida)
     """
-    pedidos = Pedido.query.order_by(Pedido.data_pedido.desc()).all()
-    return render_template('admin.html', pedidos=pedidos)
+    global proxy_imagens
+    with _proxy_imagens_lock:
+        if proxy_imagens is None:
+            origem = app.config['IMAGENS_ORIGEM']
+            proxy_imagens = imagens.ProxyImagens(
+                app.config['IMAGENS_CACHE_PASTA'],
+                imagens.BuscadorLocal(origem) if origem else imagens.BuscadorHTTP(),
+                capacidade_bytes=app.config['IMAGENS_CACHE_BYTES']
+            )
+        return proxy_imagens
+
+def _imagens_do_catalogo():
+    """
+    Hash -> URL das imagens do catálogo atual (calculado uma vez por versão)
+
+    Só imagens de produtos podem ser pedidas: o proxy não baixa URLs
+    quaisquer enviadas pelo navegador
+    """
+    catalogo = obter_catalogo()
+    return catalogo.memo(('imagens',), lambda: {
+        imagens.hash_url(produto.imagem_url): produto.imagem_url
+        for produto in catalogo.produtos if produto.imagem_url
+    })
+
+@app.route('/img/<hash_imagem>/<int:largura>')
+def imagem(hash_imagem, largura):
+    """
+    Rota que entrega uma imagem do catálogo redimensionada
+
+    Conceitos:
+    - Cache-Control immutable: O endereço muda se a URL original mudar,
+      então o navegador pode guardar a imagem por um ano sem perguntar
+    - Vary: Accept: O mesmo endereço entrega WebP ou JPEG conforme o navegador
+    - Se o original não puder ser baixado, redireciona para a URL original
+      (sem cache), e a página continua mostrando a imagem
+    """
+    if not app.config['IMAGENS_PROXY'] or largura not in imagens.TAMANHOS:
+        abort(404)
+    url = _imagens_do_catalogo().get(hash_imagem)
+    if url is None:
+        abort(404)
+
+    formato = imagens.formato_preferido(request.headers.get('Accept'))
+    try:
+        dados, content_type, etag = obter_proxy_imagens().obter(url, largura, formato)
+    except imagens.ImagemIndisponivel as e:
+        app.logger.warning('%s', e)
+        return redirect(url)
+
+    resposta = app.response_class(dados, mimetype=content_type)
+    resposta.set_etag(etag)
+    resposta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    resposta.headers['Vary'] = 'Accept'
+    return resposta.make_conditional(request)
 
 # ROTAS PARA SEO
 # =====================================================
@@ -567,63 +1737,84 @@ def robots_txt():
     from flask import send_from_directory
     return send_from_directory(app.static_folder, 'robots.txt')
 
-@app.route('/sitemap.xml')
-def sitemap_xml():
+def _entradas_sitemap(catalogo):
     """
-    Rota para gerar sitemap.xml dinâmico
-    Lista todas as URLs importantes do site
-    """
-    from flask import make_response
-    from datetime import datetime
-    
-    # URLs estáticas do site
-    urls = [
-        {
-            'loc': url_for('index', _external=True),
-            'lastmod': datetime.now().strftime('%Y-%m-%d'),
-            'changefreq': 'daily',
-            'priority': '1.0'
-        },
-        {
-            'loc': url_for('carrinho', _external=True),
-            'lastmod': datetime.now().strftime('%Y-%m-%d'),
-            'changefreq': 'weekly',
-            'priority': '0.8'
-        },
-        {
-            'loc': url_for('checkout', _external=True),
-            'lastmod': datetime.now().strftime('%Y-%m-%d'),
-            'changefreq': 'monthly',
-            'priority': '0.7'
-        }
-    ]
+    Lista as URLs do site: páginas fixas, categorias e produtos
     
-    # Adiciona URLs de produtos individuais
-    produtos = Produto.query.filter_by(ativo=True).all()
-    for produto in produtos:
-        urls.append({
-            'loc': url_for('detalhes_produto', produto_id=produto.id, _external=True),
-            'lastmod': produto.data_criacao.strftime('%Y-%m-%d'),
-            'changefreq': 'weekly',
-            'priority': '0.6'
-        })
+    As categorias vêm do próprio catálogo (não de uma lista fixa no código)
+    """
+    from sitemap import EntradaSitemap
     
-    # Adiciona URLs de categorias
-    categorias = ['cerveja', 'vinho', 'destilados', 'refrigerante', 'agua', 'energetico', 'suco']
-    for categoria in categorias:
-        urls.append({
-            'loc': url_for('index', categoria=categoria, _external=True),
-            'lastmod': datetime.now().strftime('%Y-%m-%d'),
-            'changefreq': 'weekly',
-            'priority': '0.8'
-        })
+    hoje = catalogo.atualizado_em.strftime('%Y-%m-%d')
+    entradas = [
+        EntradaSitemap(url_for('index'), hoje, 'daily', '1.0'),
+        EntradaSitemap(url_for('carrinho'), hoje, 'weekly', '0.8'),
+        EntradaSitemap(url_for('checkout'), hoje, 'monthly', '0.7'),
+    ]
+    for categoria in catalogo.categorias:
+        entradas.append(EntradaSitemap(url_for('index', categoria=categoria), hoje, 'weekly', '0.8'))
+    for produto in catalogo.produtos:
+        lastmod = produto.data_criacao.strftime('%Y-%m-%d') if produto.data_criacao else hoje
+        entradas.append(EntradaSitemap(
+            url_for('detalhes_produto', produto_id=produto.id), lastmod, 'weekly', '0.6'
+        ))
+    return entradas
+
+def obter_sitemap():
+    """
+    Retorna o sitemap da versão atual do catálogo (gerado uma única vez)
+    
+    - As URLs usam o endereço canônico (SITE_URL), não o Host da
+      requisição: quem mandasse outro Host faria o sitemap guardado em
+      memória (e servido a todos) apontar para o seu domínio
+    - ETag e lastmod vêm do conteúdo (versão do catálogo) e da data da
+      última sincronização: são iguais em todas as instâncias e não mudam
+      quando o processo reinicia
+    """
+    from sitemap import Sitemap
+    
+    catalogo = obter_catalogo()
+    base_url = app.config['SITE_URL']
+    sitemap = catalogo.memo(
+        ('sitemap',),
+        lambda: Sitemap(base_url, _entradas_sitemap(catalogo),
+                        catalogo.atualizado_em.strftime('%Y-%m-%d'))
+    )
+    etag_base = f"{catalogo.versao}-{hashlib.sha1(base_url.encode('utf-8')).hexdigest()[:8]}"
+    return catalogo, sitemap, etag_base
+
+@app.route('/sitemap.xml')
+def sitemap_xml():
+    """
+    Rota do sitemap.xml
     
-    # Gera XML do sitemap
-    sitemap_xml = render_template('sitemap.xml', urls=urls)
-    response = make_response(sitemap_xml)
-    response.headers["Content-Type"] = "application/xml"
+    Conceitos:
+    - Gerado uma vez por versão do catálogo e guardado em memória
+    - Streaming: O corpo é enviado bloco a bloco (iter dos blocos)
+    - ETag: Buscadores que já têm esta versão recebem 304 sem corpo
+    - Acima de 50.000 URLs, vira um índice de sitemaps .xml.gz
+    """
+    catalogo, sitemap, etag_base = obter_sitemap()
+    return _resposta_condicional(
+        f'{etag_base}-0', catalogo.atualizado_em, 'application/xml',
+        lambda: iter(sitemap.principal)
+    )
+
+@app.route('/sitemap-<int:numero>.xml.gz')
+def sitemap_parte(numero):
+    """
+    Uma parte do sitemap (só existe quando há mais de 50.000 URLs)
     
-    return response
+    O arquivo é o próprio .gz (Content-Type application/gzip); os buscadores
+    descompactam
+    """
+    catalogo, sitemap, etag_base = obter_sitemap()
+    if not 1 <= numero <= len(sitemap.partes):
+        abort(404)
+    return _resposta_condicional(
+        f'{etag_base}-{numero}', catalogo.atualizado_em, 'application/gzip',
+        lambda: sitemap.partes[numero - 1]
+    )
 
 # CONTEXT PROCESSORS
 # =====================================================
@@ -635,98 +1826,477 @@ def inject_carrinho_info():
     Conceito: Context processors são funções que executam antes de renderizar
     qualquer template, permitindo adicionar variáveis globais
     """
-    carrinho = obter_carrinho()
     return {
-        'carrinho_total_itens': sum(item['quantidade'] for item in carrinho)
+        'carrinho_total_itens': obter_carrinho().total_itens
     }
 
+@app.context_processor
+def inject_facetas():
+    """
+    Disponibiliza as facetas do catálogo (categorias com contagem e faixa
+    de preço) em todos os templates; usadas no menu e nos filtros
+
+    Uso no template: {% for faceta in facetas %}{{ faceta.rotulo }}{% endfor %}
+    """
+    return {'facetas': obter_catalogo().facetas(obter_estoque().esgotados)}
+
+# FUNÇÕES PARA OS TEMPLATES (IMAGENS)
+# =====================================================
+IMAGEM_PADRAO = '/static/images/default-product.jpg'
+
+@app.template_global()
+def imagem_src(url, largura=imagens.TAMANHOS[-1]):
+    """
+    Endereço da imagem na largura pedida (proxy) ou a própria URL
+
+    Uso no template: <img src="{{ imagem_src(produto.imagem_url, 320) }}">
+    """
+    if not url:
+        return IMAGEM_PADRAO
+    if not app.config['IMAGENS_PROXY']:
+        return url
+    return url_for('imagem', hash_imagem=imagens.hash_url(url), largura=largura)
+
+@app.template_global()
+def imagem_srcset(url):
+    """
+    Lista de larguras para o atributo srcset ("" sem o proxy)
+
+    O navegador escolhe a menor imagem que preenche o espaço na tela
+    (atributo sizes), considerando também a densidade de pixels
+    """
+    if not url or not app.config['IMAGENS_PROXY']:
+        return ''
+    return ', '.join(f'{imagem_src(url, largura)} {largura}w' for largura in imagens.TAMANHOS)
+
 # FILTROS PERSONALIZADOS PARA TEMPLATES
 # =====================================================
+# Tabela de tradução para o formato brasileiro de moeda (usada por currency)
+_TROCA_SEPARADORES = str.maketrans(',.', '.,')
+
 @app.template_filter('currency')
 def currency_filter(value):
     """
     Filtro personalizado para formatar valores como moeda brasileira
     
     Uso no template: {{ produto.preco|currency }}
+    
+    translate() troca "," por "." e "." por "," em uma única passada
+    (1,234.50 -> 1.234,50)
+    """
+    return f"R$ {value:,.2f}".translate(_TROCA_SEPARADORES)
+
+# FILA DE PEDIDOS
+# =====================================================
+def iniciar_workers_fila():
+    """
+    before_request (registrado por criar_app com FILA_PEDIDOS=1): inicia os
+    workers na primeira requisição, para processar também pedidos que
+    ficaram pendentes antes de um reinício
+    """
+    worker_pool.iniciar()
+
+# LIMPEZA DAS RESERVAS VENCIDAS
+# =====================================================
+def _recuperar_reservas_expiradas():
+    """
+    Devolve ao estoque livre as reservas vencidas (executado pela thread de limpeza)
+    
+    Aproveita a mesma thread para apagar os carrinhos abandonados do
+    store (só o backend sqlite guarda carrinhos com prazo)
+    """
+    try:
+        obter_carrinho_store().limpar_expirados()
+    except Exception as e:
+        # Um erro no arquivo dos carrinhos não impede a devolução das reservas
+        print(f"Erro na limpeza dos carrinhos: {e}")
+    
+    with app.app_context():
+        try:
+            devolvidas = reservas.recuperar_expiradas(db.session.connection())
+            db.session.commit()
+            if devolvidas:
+                # Reservas de vários produtos: relê o estoque de todos
+                estoque_catalogo.invalidar()
+            return devolvidas
+        except Exception:
+            db.session.rollback()
+            raise
+
+def iniciar_limpeza_reservas():
+    """
+    before_request (registrado por criar_app): inicia a thread de limpeza
+    na primeira requisição
     """
-    return f"R$ {value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    limpeza_reservas.iniciar()
 
 # FUNÇÃO PARA INICIALIZAR O BANCO DE DADOS
 # =====================================================
-def init_db():
+# Versão do esquema (tabelas, colunas e índices) criado por init_db()
+# Aumente este número sempre que mudar os modelos: bancos com a versão atual
+# pulam o create_all() e a conferência das colunas na inicialização
+VERSAO_ESQUEMA = 3
+
+def _versao_esquema_banco():
+    """
+    Versão do esquema gravada no banco (PRAGMA user_version do SQLite)
+
+    Returns:
+        Número da versão, ou None em bancos que não são SQLite
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return None
+    with db.engine.connect() as conn:
+        return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+def _gravar_versao_esquema():
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.begin() as conn:
+            # PRAGMA não aceita parâmetros; VERSAO_ESQUEMA é um inteiro do código
+            conn.exec_driver_sql(f'PRAGMA user_version = {int(VERSAO_ESQUEMA)}')
+
+def _restaurar_snapshot():
+    """
+    Cria o banco a partir do snapshot quando o arquivo ainda não existe
+
+    Returns:
+        True se o banco foi criado a partir do snapshot
+    """
+    url = db.engine.url
+    if not app.config['BANCO_SNAPSHOT'] or url.get_backend_name() != 'sqlite':
+        return False
+    if not url.database or url.database == ':memory:':
+        return False
+    return snapshot_banco.restaurar(app.config['BANCO_SNAPSHOT'], url.database, VERSAO_ESQUEMA)
+
+def _garantir_colunas_produto():
+    """
+    Adiciona colunas e índices novos em bancos criados antes deles existirem
+
+    db.create_all() cria tabelas que faltam, mas não altera tabelas existentes
+    (para bancos gerenciados pelo Flask-Migrate, use `flask db upgrade`)
+    """
+    inspector = db.inspect(db.engine)
+    colunas = {c['name'] for c in inspector.get_columns('produto')}
+    colunas_pedido = {c['name'] for c in inspector.get_columns('pedido')}
+    with db.engine.begin() as conn:
+        if 'fingerprint' not in colunas:
+            conn.execute(db.text('ALTER TABLE produto ADD COLUMN fingerprint VARCHAR(40)'))
+        if 'reservado' not in colunas:
+            conn.execute(db.text('ALTER TABLE produto ADD COLUMN reservado INTEGER NOT NULL DEFAULT 0'))
+        if 'token_fila' not in colunas_pedido:
+            conn.execute(db.text('ALTER TABLE pedido ADD COLUMN token_fila VARCHAR(64)'))
+        # checkfirst=True: só cria o índice se ele ainda não existir
+        for modelo in (Produto, Pedido, ItemPedido, ReservaEstoque):
+            for indice in modelo.__table__.indexes:
+                indice.create(conn, checkfirst=True)
+
+def init_db(forcar=False):
     """
     Sincroniza (upsert) os produtos com o arquivo JSON data/produtos.json
-    - Cria as tabelas se não existirem
-    - Atualiza preço/descrição/categoria/imagem/estoque de produtos existentes (por nome)
+    - Banco novo: começa de uma cópia do snapshot (data/catalogo.db)
+    - Cria as tabelas se não existirem (só quando a versão do esquema
+      gravada no banco é diferente de VERSAO_ESQUEMA)
+    - Se o hash do JSON for igual ao da última sincronização, não faz nada
+    - Atualiza apenas os produtos cujo fingerprint mudou (por nome)
     - Insere novos produtos que não existem
     - Desativa (ativo=False) produtos que não estão mais no JSON
+    - Reconstrói o índice de busca (FTS5) com os produtos ativos
+    - Todas as escritas são feitas em lote e em um único commit
+
+    Args:
+        forcar: Se True, ignora o hash e compara todos os produtos
+
+    Returns:
+        Dicionário com o resultado da sincronização (ou None em caso de erro)
     """
-    # Cria as tabelas
-    db.create_all()
+    inicio = time.perf_counter()
+
+    # Banco que ainda não existe: copia o snapshot, que já tem as tabelas e o
+    # catálogo; a sincronização abaixo só confere o hash do JSON
+    if not forcar and _restaurar_snapshot():
+        print(f"Banco criado a partir do snapshot {app.config['BANCO_SNAPSHOT']}")
+
+    # Cria as tabelas (bancos já na versão atual do esquema pulam esta etapa)
+    if _versao_esquema_banco() != VERSAO_ESQUEMA:
+        db.create_all()
+        _garantir_colunas_produto()
+        _gravar_versao_esquema()
 
     try:
-        # Carrega produtos do arquivo JSON
-        json_path = os.path.join(os.path.dirname(__file__), 'data', 'produtos.json')
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        produtos_data = data.get('produtos', [])
+        # Hash do conteúdo do JSON: vem do cabeçalho do artefato quando o
+        # JSON é o mesmo arquivo de onde ele foi gerado (mesmo tamanho e
+        # data); senão o JSON é lido (conteudo) e o hash calculado
+        import artefato_catalogo
+        hash_json, conteudo = artefato_catalogo.hash_json_atual()
+
+        ultima_sync = SyncCatalogo.query.order_by(SyncCatalogo.id.desc()).first()
+        if not forcar and ultima_sync is not None and ultima_sync.hash_conteudo == hash_json:
+            # Banco criado antes da busca existir: cria e preenche o índice
+            if busca.garantir_indice(db.session.connection()):
+                busca.reconstruir_indice(db.session.connection())
+            db.session.commit()
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            print(f"Catálogo inalterado (hash {hash_json[:12]}), sincronização ignorada em {duracao_ms:.1f} ms")
+            return {'alterado': False, 'inseridos': 0, 'atualizados': 0,
+                    'desativados': 0, 'duracao_ms': duracao_ms}
+
+        # Usa o catálogo pré-compilado (data/produtos.catalogo) quando ele
+        # corresponde ao JSON atual; senão interpreta o próprio JSON
+        produtos_data = artefato_catalogo.carregar_produtos(conteudo, hash_json)
+
+        # Busca só as colunas necessárias para comparar (sem objetos do ORM)
+        existentes = {
+            linha.nome: linha
+            for linha in db.session.execute(
+                db.select(Produto.id, Produto.nome, Produto.fingerprint, Produto.ativo)
+            )
+        }
 
-        existentes = {p.nome: p for p in Produto.query.all()}
         nomes_json = set()
-        inseridos = 0
-        atualizados = 0
+        novos = []
+        alterados = []
 
         for pd in produtos_data:
-            nome = pd.get('nome').strip()
+            # pd já vem normalizado (nome sem espaços, estoque padrão e fingerprint)
+            nome = pd['nome']
             nomes_json.add(nome)
-            preco = pd.get('preco')
-            descricao = pd.get('descricao')
-            categoria = pd.get('categoria')
-            imagem_url = pd.get('imagem_url')
-            estoque = pd.get('estoque', 100)
-
-            if nome in existentes:
-                p = existentes[nome]
-                p.descricao = descricao
-                p.preco = preco
-                p.categoria = categoria
-                p.imagem_url = imagem_url
-                p.estoque = estoque
-                p.ativo = True
-                atualizados += 1
-            else:
-                novo = Produto(
-                    nome=nome,
-                    descricao=descricao,
-                    preco=preco,
-                    categoria=categoria,
-                    imagem_url=imagem_url,
-                    estoque=estoque,
-                    ativo=True
-                )
-                db.session.add(novo)
-                inseridos += 1
 
-        # Desativa produtos não listados no JSON
-        desativados = 0
-        for p in existentes.values():
-            if p.nome not in nomes_json and p.ativo:
-                p.ativo = False
-                desativados += 1
+            existente = existentes.get(nome)
+            if existente is None:
+                novos.append(dict(pd, ativo=True))
+            elif existente.fingerprint != pd['fingerprint'] or not existente.ativo:
+                novo_estado = dict(pd, id=existente.id, ativo=True)
+                del novo_estado['nome']
+                alterados.append(novo_estado)
+
+        # Produtos ativos que não estão mais no JSON
+        ids_desativar = [
+            linha.id for nome, linha in existentes.items()
+            if nome not in nomes_json and linha.ativo
+        ]
+
+        # Escritas em lote: um INSERT e um UPDATE com vários parâmetros (executemany)
+        if novos:
+            db.session.execute(db.insert(Produto), novos)
+        if alterados:
+            db.session.execute(db.update(Produto), alterados)
+        if ids_desativar:
+            db.session.execute(
+                db.update(Produto)
+                .where(Produto.id.in_(ids_desativar))
+                .values(ativo=False)
+            )
 
+        # Índice de busca (FTS5) atualizado na mesma transação
+        busca.reconstruir_indice(db.session.connection())
+        
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        db.session.add(SyncCatalogo(
+            hash_conteudo=hash_json,
+            inseridos=len(novos),
+            atualizados=len(alterados),
+            desativados=len(ids_desativar),
+            duracao_ms=duracao_ms
+        ))
         db.session.commit()
-        print(f"Produtos sincronizados: inseridos={inseridos}, atualizados={atualizados}, desativados={desativados}")
+
+        # O catálogo mudou: descarta o snapshot para ser reconstruído no próximo acesso
+        cache_catalogo.invalidar()
+        estoque_catalogo.invalidar()
+        print(f"Produtos sincronizados: inseridos={len(novos)}, atualizados={len(alterados)}, "
+              f"desativados={len(ids_desativar)} em {duracao_ms:.1f} ms")
+        return {'alterado': True, 'inseridos': len(novos), 'atualizados': len(alterados),
+                'desativados': len(ids_desativar), 'duracao_ms': duracao_ms}
 
     except Exception as e:
+        db.session.rollback()
         print(f"Erro ao sincronizar produtos do JSON: {e}")
         # Em caso de erro, não interrompe a aplicação
+        return None
+
+# VERIFICAÇÃO DOS ÍNDICES (EXPLAIN QUERY PLAN)
+# =====================================================
+def consultas_frequentes():
+    """
+    Consultas mais usadas pelas rotas e o índice que cada uma deve usar
+
+    Os valores são apenas exemplos: o plano não depende deles
+    """
+    from plano_consultas import ConsultaVerificada
+    
+    agora = datetime.now()
+    return [
+        ConsultaVerificada(
+            'catálogo: produtos ativos por categoria',
+            db.select(Produto.id).where(Produto.ativo.is_(True), Produto.categoria == 'cerveja'),
+            'produto', 'ix_produto_ativo_categoria'),
+        ConsultaVerificada(
+            'init_db: produto pelo nome',
+            db.select(Produto.id).where(Produto.nome == 'Exemplo'),
+            'produto', 'uq_produto_nome'),
+        ConsultaVerificada(
+            'admin: pedidos mais recentes',
+            db.select(Pedido.id).order_by(Pedido.data_pedido.desc(), Pedido.id.desc()).limit(51),
+            'pedido', 'ix_pedido_data_pedido_id'),
+        ConsultaVerificada(
+            'admin: próxima página (cursor)',
+            db.select(Pedido.id)
+            .where(db.or_(Pedido.data_pedido < agora,
+                          db.and_(Pedido.data_pedido == agora, Pedido.id < 100)))
+            .order_by(Pedido.data_pedido.desc(), Pedido.id.desc()).limit(51),
+            'pedido', 'ix_pedido_data_pedido_id'),
+        ConsultaVerificada(
+            'fila: pedido já gravado para o token',
+            db.select(Pedido.id).where(Pedido.token_fila == 'exemplo'),
+            'pedido', 'uq_pedido_token_fila'),
+        ConsultaVerificada(
+            'admin: itens dos pedidos da página (selectinload)',
+            db.select(ItemPedido.id).where(ItemPedido.pedido_id.in_([1, 2, 3])),
+            'item_pedido', 'ix_item_pedido_pedido_id'),
+        ConsultaVerificada(
+            'admin: vendas de um produto (JOIN)',
+            db.select(db.func.sum(ItemPedido.quantidade))
+            .join(Produto, Produto.id == ItemPedido.produto_id)
+            .where(Produto.id == 1),
+            'item_pedido', 'ix_item_pedido_produto_id'),
+        ConsultaVerificada(
+            'reservas: vencidas (limpeza em lote)',
+            db.select(ReservaEstoque.id).where(ReservaEstoque.expira_em <= agora),
+            'reserva_estoque', 'ix_reserva_expira_em'),
+        ConsultaVerificada(
+            'reservas: reserva do carrinho para o produto',
+            db.select(ReservaEstoque.quantidade)
+            .where(ReservaEstoque.carrinho_id == 'exemplo', ReservaEstoque.produto_id == 1),
+            'reserva_estoque', 'sqlite_autoindex_reserva_estoque_1'),
+    ]
+
+# FÁBRICA DA APLICAÇÃO
+# =====================================================
+# Endpoints que respondem sem consultar o banco (não disparam o init_db)
+ENDPOINTS_SEM_BANCO = frozenset({'static', 'robots_txt', 'metrics'})
+
+_banco_pronto = threading.Event()
+_banco_lock = threading.Lock()
+
+def garantir_banco():
+    """
+    Executa o init_db() uma única vez por processo
+
+    Conceitos:
+    - threading.Event: Depois da primeira inicialização, a verificação é só
+      uma leitura (sem lock)
+    - Lock: Se várias requisições chegarem juntas no cold start, só a
+      primeira inicializa; as outras esperam por ela
+    - Se o init_db() levantar uma exceção, a próxima requisição tenta de novo
+    """
+    if _banco_pronto.is_set():
+        return
+    with _banco_lock:
+        if not _banco_pronto.is_set():
+            init_db()
+            _banco_pronto.set()
+
+def _inicializar_banco_preguicoso():
+    """
+    before_request: inicializa o banco na primeira requisição que precisar dele
+    """
+    if request.endpoint not in ENDPOINTS_SEM_BANCO:
+        garantir_banco()
+
+_servicos_lock = threading.Lock()
+_servicos_configurados = False
+
+def _configurar_servicos(banco):
+    """
+    Liga o que depende do banco ou cria threads, uma única vez por processo
+
+    A ordem importa:
+    - PRAGMAs do perfil antes da primeira conexão do banco
+    - Instrumentação antes da compressão: o Flask chama os after_request na
+      ordem inversa do registro, então a compressão roda antes da
+      instrumentação e o tempo gasto comprimindo entra no Server-Timing
+    - Hook do banco preguiçoso antes dos hooks da fila e da limpeza: os
+      workers e a thread de limpeza usam o banco, que precisa estar pronto
+      quando eles começam
+    """
+    global _servicos_configurados, fila_pedidos, worker_pool, limpeza_reservas
+    with _servicos_lock:
+        if _servicos_configurados:
+            return
+        _servicos_configurados = True
+        
+        with app.app_context():
+            perfil_sqlite.aplicar_perfil(db.engine, app.config['SQLITE_PERFIL'])
+            if app.config['INSTRUMENTACAO']:
+                instrumentacao.init_app(app, db.engine)
+        if app.config['COMPRESSAO']:
+            compressao_respostas.init_app(app)
+        
+        if banco == 'preguicoso':
+            app.before_request(_inicializar_banco_preguicoso)
+        
+        if app.config['FILA_PEDIDOS']:
+            from fila_pedidos import FilaPedidos, WorkerPool
+            fila_pedidos = FilaPedidos(app.config['FILA_PEDIDOS_PATH'],
+                                       lease_segundos=app.config['FILA_PEDIDOS_LEASE_SEGUNDOS'])
+            worker_pool = WorkerPool(
+                fila_pedidos,
+                _processar_pedido_da_fila,
+                num_workers=app.config['FILA_PEDIDOS_WORKERS'],
+                erros_definitivos=(EstoqueInsuficiente,)
+            )
+            app.before_request(iniciar_workers_fila)
+        
+        if app.config['RESERVAS_LIMPEZA_SEGUNDOS'] > 0:
+            limpeza_reservas = reservas.LimpezaReservas(
+                _recuperar_reservas_expiradas,
+                intervalo=app.config['RESERVAS_LIMPEZA_SEGUNDOS']
+            )
+            app.before_request(iniciar_limpeza_reservas)
+
+def criar_app(banco='imediato'):
+    """
+    Prepara a aplicação para um ponto de entrada
+
+    Conceitos:
+    - Fábrica da aplicação: Cada ponto de entrada (python app.py, Vercel em
+      api/index.py, linha de comando em manage.py) chama criar_app() e
+      escolhe como o banco é inicializado
+    - O que só a linha de comando usa (Flask-Migrate, flask plano-consultas)
+      fica em manage.py e não é importado pelo site
+    - Inicialização preguiçosa: Em serverless, o processo pode nascer só para
+      servir /robots.txt ou um arquivo estático. Com banco='preguicoso' o
+      init_db() fica para a primeira requisição que usa o banco
+    - Importar o app.py não abre o banco, o store do carrinho nem a fila:
+      o engine, a fila e a thread de limpeza são ligados aqui (veja
+      _configurar_servicos), e o store do carrinho no primeiro uso
+
+    Args:
+        banco: 'imediato' (init_db agora), 'preguicoso' (na primeira
+               requisição que precisar) ou None (não inicializa)
+
+    Returns:
+        A aplicação Flask
+    """
+    if banco not in ('imediato', 'preguicoso', None):
+        raise ValueError(f"Modo de inicialização do banco desconhecido: {banco}")
+    
+    _configurar_servicos(banco)
+    if banco == 'imediato':
+        with app.app_context():
+            garantir_banco()
+    elif banco == 'preguicoso':
+        # criar_app() chamada de novo com outro modo: o hook ainda não existe
+        if _inicializar_banco_preguicoso not in app.before_request_funcs.get(None, []):
+            app.before_request(_inicializar_banco_preguicoso)
+    return app
 
 # PONTO DE ENTRADA DA APLICAÇÃO
 # =====================================================
 if __name__ == '__main__':
-    # Cria contexto da aplicação para operações de banco
-    with app.app_context():
-        init_db()
+    # Inicializa o banco antes de subir o servidor
+    app = criar_app(banco='imediato')
     
     # Inicia o servidor de desenvolvimento
     # debug=True: Recarrega automaticamente quando há mudanças no código
@@ -0,0 +1,311 @@
+# artefato_catalogo.py - Catálogo pré-compilado
+# Este módulo "compila" o arquivo data/produtos.json em um artefato binário
+# compacto (data/produtos.catalogo), que é carregado no início da aplicação
+# sem precisar interpretar o JSON nem recalcular os fingerprints.
+#
+# Build (rode sempre que alterar data/produtos.json):
+#     python artefato_catalogo.py
+#
+# Se o artefato não existir, estiver corrompido ou desatualizado em relação
+# ao JSON, a aplicação volta a ler o JSON normalmente.
+#
+# O cabeçalho do artefato guarda o hash, o tamanho e a data de modificação
+# do JSON de onde ele foi gerado. Se o JSON no disco tem o mesmo tamanho e a
+# mesma data, o hash do cabeçalho é usado e o JSON nem é aberto. Uma cópia
+# nova dos arquivos (git clone, deploy) muda a data: nesse caso o JSON é
+# lido uma vez para conferir o hash, e o artefato continua valendo para os
+# produtos (rodar o build na própria máquina volta a evitar a leitura).
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import os
+import json
+import pickle
+import hashlib
+
+# CAMINHOS E FORMATO
+# =====================================================
+PASTA_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+JSON_PATH = os.path.join(PASTA_DADOS, 'produtos.json')
+ARTEFATO_PATH = os.path.join(PASTA_DADOS, 'produtos.catalogo')
+
+# Cabeçalho do arquivo: identifica o formato e a versão
+# Layout: MAGICO + cabeçalho (uma linha JSON: hash_json, tamanho e mtime_ns
+# do JSON de origem) + checksum SHA-256 do payload (32 bytes) + payload (pickle)
+MAGICO = b'ADEGACAT2\n'
+TAMANHO_CHECKSUM = 32
+# Limite de leitura da linha do cabeçalho (protege contra arquivos estranhos)
+TAMANHO_MAX_CABECALHO = 1024
+
+# Colunas guardadas no artefato (uma tupla por coluna)
+COLUNAS = ('nome', 'descricao', 'preco', 'categoria', 'imagem_url', 'estoque', 'fingerprint')
+
+
+# NORMALIZAÇÃO DOS PRODUTOS
+# =====================================================
+def fingerprint_produto(descricao, preco, categoria, imagem_url, estoque):
+    """
+    Calcula a "impressão digital" dos campos sincronizados de um produto
+
+    Se o fingerprint salvo no banco for igual ao calculado a partir do JSON,
+    o produto não mudou e não precisa ser regravado
+    """
+    conteudo = json.dumps(
+        [descricao, f"{float(preco):.2f}", categoria, imagem_url, int(estoque)],
+        ensure_ascii=False
+    )
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+def normalizar_produto(pd):
+    """
+    Converte um produto do JSON no dicionário usado pela sincronização
+
+    - Remove espaços extras do nome (o nome é a chave do produto)
+    - Aplica o estoque padrão (100) quando não informado
+    - Calcula o fingerprint
+    """
+    produto = {
+        'nome': pd.get('nome').strip(),
+        'descricao': pd.get('descricao'),
+        'preco': pd.get('preco'),
+        'categoria': pd.get('categoria'),
+        'imagem_url': pd.get('imagem_url'),
+        'estoque': pd.get('estoque', 100),
+    }
+    produto['fingerprint'] = fingerprint_produto(
+        produto['descricao'], produto['preco'], produto['categoria'],
+        produto['imagem_url'], produto['estoque']
+    )
+    return produto
+
+
+# TABELA DO CATÁLOGO
+# =====================================================
+class TabelaCatalogo:
+    """
+    Tabela de produtos armazenada por colunas
+
+    Conceitos:
+    - Armazenamento colunar: Cada coluna é uma tupla; a linha i é formada
+      pelo i-ésimo elemento de cada coluna
+    - Índice por nome: Dicionário nome -> posição, para buscas em O(1)
+    """
+
+    __slots__ = ('hash_json', 'colunas', 'indice')
+
+    def __init__(self, hash_json, colunas, indice):
+        self.hash_json = hash_json
+        self.colunas = colunas
+        self.indice = indice
+
+    @classmethod
+    def de_produtos(cls, hash_json, produtos):
+        """
+        Monta a tabela a partir de uma lista de produtos normalizados
+        """
+        colunas = {nome: tuple(p[nome] for p in produtos) for nome in COLUNAS}
+        indice = {nome: i for i, nome in enumerate(colunas['nome'])}
+        return cls(hash_json, colunas, indice)
+
+    def linha(self, posicao):
+        """
+        Retorna o produto da posição informada como dicionário
+        """
+        return {nome: self.colunas[nome][posicao] for nome in COLUNAS}
+
+    def get(self, nome):
+        """
+        Busca um produto pelo nome (ou None se não existir)
+        """
+        posicao = self.indice.get(nome)
+        return None if posicao is None else self.linha(posicao)
+
+    def __len__(self):
+        return len(self.colunas['nome'])
+
+    def __iter__(self):
+        # zip(*colunas): Percorre todas as colunas ao mesmo tempo, linha a linha
+        for valores in zip(*(self.colunas[nome] for nome in COLUNAS)):
+            yield dict(zip(COLUNAS, valores))
+
+
+# COMPILAÇÃO E CARREGAMENTO
+# =====================================================
+def hash_conteudo(conteudo):
+    """
+    SHA-256 do conteúdo (bytes) do arquivo JSON
+    """
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def ler_json(conteudo):
+    """
+    Interpreta o conteúdo do JSON e retorna a lista de produtos normalizados
+    """
+    return [normalizar_produto(pd) for pd in json.loads(conteudo).get('produtos', [])]
+
+
+def compilar(json_path=JSON_PATH, destino=ARTEFATO_PATH):
+    """
+    Gera o artefato binário a partir do JSON
+
+    O arquivo é escrito em um temporário e depois renomeado (os.replace),
+    assim um processo lendo o artefato nunca vê um arquivo pela metade
+
+    Returns:
+        TabelaCatalogo gerada
+    """
+    with open(json_path, 'rb') as f:
+        # fstat do arquivo aberto: tamanho e data do mesmo conteúdo lido
+        estado = os.fstat(f.fileno())
+        conteudo = f.read()
+
+    tabela = TabelaCatalogo.de_produtos(hash_conteudo(conteudo), ler_json(conteudo))
+    payload = pickle.dumps(
+        {'hash_json': tabela.hash_json, 'colunas': tabela.colunas, 'indice': tabela.indice},
+        protocol=pickle.HIGHEST_PROTOCOL
+    )
+    cabecalho = {'hash_json': tabela.hash_json, 'tamanho': estado.st_size,
+                 'mtime_ns': estado.st_mtime_ns}
+
+    temporario = destino + '.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(MAGICO)
+        f.write(json.dumps(cabecalho).encode('ascii') + b'\n')
+        f.write(hashlib.sha256(payload).digest())
+        f.write(payload)
+    os.replace(temporario, destino)
+    return tabela
+
+
+def _ler_cabecalho(f):
+    """
+    Lê o MAGICO e a linha do cabeçalho de um artefato aberto
+
+    Returns:
+        Dicionário do cabeçalho, ou None se o arquivo não for um artefato
+        deste formato
+    """
+    if f.read(len(MAGICO)) != MAGICO:
+        return None
+    linha = f.readline(TAMANHO_MAX_CABECALHO)
+    try:
+        cabecalho = json.loads(linha)
+    except ValueError:
+        return None
+    return cabecalho if isinstance(cabecalho, dict) else None
+
+
+def ler_cabecalho(caminho=ARTEFATO_PATH):
+    """
+    Lê só o cabeçalho do artefato (algumas dezenas de bytes)
+
+    Returns:
+        Dicionário com hash_json, tamanho e mtime_ns do JSON de origem,
+        ou None se o artefato não existir ou for de outro formato
+    """
+    try:
+        with open(caminho, 'rb') as f:
+            return _ler_cabecalho(f)
+    except OSError:
+        return None
+
+
+def hash_json_atual(json_path=JSON_PATH, caminho=ARTEFATO_PATH):
+    """
+    Hash do JSON atual, sem ler o JSON quando o artefato já o conhece
+
+    Conceitos:
+    - os.stat(): Tamanho e data de modificação do arquivo, sem abri-lo
+    - Se o JSON tem o mesmo tamanho e data gravados no cabeçalho do
+      artefato, é o mesmo arquivo de onde o artefato foi gerado: o hash do
+      cabeçalho vale e o JSON não é lido
+    - Senão (JSON editado, ou cópia nova dos arquivos com outra data), o
+      JSON é lido e o hash é calculado
+
+    Returns:
+        Tupla (hash_json, conteudo); conteudo é None quando o JSON não
+        precisou ser lido
+    """
+    cabecalho = ler_cabecalho(caminho)
+    if cabecalho is not None:
+        try:
+            estado = os.stat(json_path)
+        except OSError:
+            estado = None
+        if (estado is not None and cabecalho.get('tamanho') == estado.st_size
+                and cabecalho.get('mtime_ns') == estado.st_mtime_ns):
+            return cabecalho.get('hash_json'), None
+
+    with open(json_path, 'rb') as f:
+        conteudo = f.read()
+    return hash_conteudo(conteudo), conteudo
+
+
+def carregar(hash_json, caminho=ARTEFATO_PATH):
+    """
+    Carrega o artefato se ele existir, estiver íntegro e corresponder ao JSON
+
+    Args:
+        hash_json: Hash do JSON atual (o artefato precisa ter sido gerado dele)
+        caminho: Caminho do artefato
+
+    Returns:
+        TabelaCatalogo ou None (quando for preciso voltar a ler o JSON)
+    """
+    try:
+        with open(caminho, 'rb') as f:
+            cabecalho = _ler_cabecalho(f)
+            if cabecalho is None or cabecalho.get('hash_json') != hash_json:
+                # Outro formato, ou artefato desatualizado (o JSON foi
+                # alterado depois da compilação): nem lê o resto do arquivo
+                return None
+            checksum = f.read(TAMANHO_CHECKSUM)
+            payload = f.read()
+    except OSError:
+        return None
+
+    if hashlib.sha256(payload).digest() != checksum:
+        return None
+
+    try:
+        conteudo = pickle.loads(payload)
+    except Exception:
+        return None
+
+    if conteudo.get('hash_json') != hash_json:
+        # Artefato desatualizado: o JSON foi alterado depois da compilação
+        return None
+
+    return TabelaCatalogo(conteudo['hash_json'], conteudo['colunas'], conteudo['indice'])
+
+
+def carregar_produtos(conteudo=None, hash_json=None, json_path=JSON_PATH):
+    """
+    Retorna os produtos normalizados do catálogo
+
+    Usa o artefato pré-compilado quando ele corresponde ao JSON;
+    caso contrário, interpreta o próprio JSON
+
+    Args:
+        conteudo: Bytes do arquivo data/produtos.json (None: lido só se
+                  o artefato não servir)
+        hash_json: Hash já calculado do conteúdo (veja hash_json_atual)
+    """
+    if hash_json is None:
+        hash_json, conteudo = hash_json_atual(json_path)
+    tabela = carregar(hash_json)
+    if tabela is not None:
+        return tabela
+    if conteudo is None:
+        with open(json_path, 'rb') as f:
+            conteudo = f.read()
+    return ler_json(conteudo)
+
+
+# PONTO DE ENTRADA (BUILD)
+# =====================================================
+if __name__ == '__main__':
+    tabela = compilar()
+    print(f"Artefato gerado: {ARTEFATO_PATH} ({len(tabela)} produtos, hash {tabela.hash_json[:12]})")
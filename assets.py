@@ -0,0 +1,378 @@
+# assets.py - CSS e JavaScript empacotados, minificados e com hash no nome
+# Sem este módulo, o navegador recebe style.css e app.js como estão no
+# repositório e, como o nome nunca muda, precisa perguntar ao servidor se
+# o arquivo mudou a cada visita.
+#
+# O build (python assets.py) gera, em static/dist:
+# - Um arquivo por pacote (ex: js/loja.js = app.js + base.js), minificado e
+#   com o hash do conteúdo no nome: js/loja.3f2a1b9c0d.js
+# - Versões já comprimidas ao lado: .gz (sempre) e .br (se o módulo brotli
+#   estiver instalado)
+# - manifest.json: nome do pacote -> nome com hash
+#
+# Na aplicação, url_for('static', filename='js/loja.js') passa a gerar o
+# endereço com hash, servido com Cache-Control immutable e na compressão
+# que o navegador aceitar. Sem o build (ou com os fontes alterados depois
+# dele), os pacotes são montados na hora, sem minificar e sem cache longo.
+#
+# Build (rode sempre que alterar static/css ou static/js):
+#     python assets.py
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+# CONFIGURAÇÃO
+# =====================================================
+PASTA_STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+PASTA_DIST = 'dist'
+MANIFESTO = 'manifest.json'
+
+# Pacote (nome usado nos templates) -> arquivos de origem, em ordem
+# As páginas têm pacotes próprios: cada uma define funções com os mesmos
+# nomes (ex: showToast) e só é carregada na sua página
+PACOTES = {
+    'css/loja.css': ('css/style.css',),
+    'js/loja.js': ('js/app.js', 'js/base.js'),
+    'js/index.js': ('js/paginas/index.js',),
+    'js/carrinho.js': ('js/paginas/carrinho.js',),
+    'js/checkout.js': ('js/paginas/checkout.js',),
+}
+
+# Um ano: o nome muda quando o conteúdo muda
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+
+# Compressões geradas no build, na ordem de preferência ao servir
+COMPRESSOES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _hash(dados):
+    return hashlib.sha256(dados).hexdigest()[:10]
+
+
+# MINIFICAÇÃO
+# =====================================================
+# Strings e comentários do CSS (as strings são mantidas como estão)
+_CSS_TOKENS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/)''', re.S)
+
+
+def minificar_css(codigo):
+    """
+    Remove comentários e espaços desnecessários do CSS
+
+    Conservador: não reescreve cores nem valores, só espaços. Espaços em
+    volta de + e - são mantidos (calc() precisa deles)
+    """
+    def compactar(trecho):
+        trecho = re.sub(r'\s+', ' ', trecho)
+        trecho = re.sub(r'\s*([{};,>])\s*', r'\1', trecho)
+        return re.sub(r':\s+', ':', trecho)
+
+    partes, trecho = [], ''
+    for i, parte in enumerate(_CSS_TOKENS.split(codigo)):
+        if not i % 2:
+            trecho += parte
+        elif parte.startswith('/*'):
+            trecho += ' '
+        else:
+            # String: o código antes dela é compactado; ela fica como está
+            partes += [compactar(trecho), parte]
+            trecho = ''
+    partes.append(compactar(trecho))
+    return ''.join(partes).replace(';}', '}').strip() + '\n'
+
+
+_ID = re.compile(r'[A-Za-z0-9_$]')
+
+# Depois destes caracteres (ou palavras), uma "/" começa uma expressão
+# regular, e não uma divisão
+_ANTES_DE_REGEX = set('(,=:[!&|?{};+-*%<>~^\n')
+_PALAVRAS_ANTES_DE_REGEX = ('return', 'typeof', 'case', 'in', 'of', 'delete', 'void', 'throw')
+
+# Não há ASI (inserção automática de ";") depois destes caracteres: a
+# quebra de linha seguinte pode ser removida sem mudar o significado
+_SEM_ASI_DEPOIS = set('{;,([')
+
+
+def _palavra_final(saida):
+    """
+    Última palavra já escrita na saída (ex: "return"), ou "" se não houver
+    """
+    encontrada = re.search(r'([A-Za-z_$][\w$]*)$', ''.join(saida[-20:]))
+    return encontrada.group(1) if encontrada else ''
+
+
+def _fim_string(codigo, inicio):
+    """
+    Posição logo depois da string (ou template literal) que começa em `inicio`
+    """
+    aspa = codigo[inicio]
+    i = inicio + 1
+    while i < len(codigo) and codigo[i] != aspa:
+        i += 2 if codigo[i] == '\\' else 1
+    return i + 1
+
+
+def _fim_regex(codigo, inicio):
+    """
+    Posição logo depois da expressão regular (com as flags) que começa em `inicio`
+    """
+    i, classe = inicio + 1, False
+    while i < len(codigo):
+        c = codigo[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            classe = True
+        elif c == ']':
+            classe = False
+        elif c == '/' and not classe:
+            break
+        i += 1
+    i += 1
+    while i < len(codigo) and codigo[i].isalpha():
+        i += 1
+    return i
+
+
+def minificar_js(codigo):
+    """
+    Remove comentários, indentação e linhas em branco do JavaScript
+
+    Conservador (sem renomear variáveis): percorre o código caractere a
+    caractere para não alterar strings, template literals e expressões
+    regulares, e mantém as quebras de linha onde o JavaScript poderia
+    inserir um ";" automaticamente (ASI)
+    """
+    saida = []
+    i, n = 0, len(codigo)
+
+    def anterior():
+        return saida[-1][-1] if saida else '\n'
+
+    while i < n:
+        c = codigo[i]
+        if c in '"\'`':
+            fim = _fim_string(codigo, i)
+            saida.append(codigo[i:fim])
+            i = fim
+        elif codigo.startswith('//', i):
+            fim = codigo.find('\n', i)
+            i = n if fim == -1 else fim
+        elif codigo.startswith('/*', i):
+            fim = codigo.find('*/', i + 2)
+            i = n if fim == -1 else fim + 2
+            # O comentário separava dois tokens: vira um espaço
+            if i < n and not codigo[i].isspace():
+                saida.append(' ')
+        elif c == '/' and (anterior() in _ANTES_DE_REGEX or _palavra_final(saida) in _PALAVRAS_ANTES_DE_REGEX):
+            fim = _fim_regex(codigo, i)
+            saida.append(codigo[i:fim])
+            i = fim
+        elif c.isspace():
+            inicio = i
+            while i < n and codigo[i].isspace():
+                i += 1
+            quebra = '\n' in codigo[inicio:i]
+            ultimo = anterior()
+            proximo = codigo[i] if i < n else '\n'
+            if saida and saida[-1] == ' ':
+                saida.pop()
+                ultimo = anterior()
+            if quebra:
+                if ultimo not in _SEM_ASI_DEPOIS and ultimo != '\n' and i < n:
+                    saida.append('\n')
+            elif (_ID.match(ultimo) and _ID.match(proximo)) or (ultimo in '+-/' and proximo in '+-/'):
+                saida.append(' ')
+        else:
+            saida.append(c)
+            i += 1
+    return ''.join(saida).strip() + '\n'
+
+
+def minificar(nome, codigo):
+    if nome.endswith('.css'):
+        return minificar_css(codigo)
+    if nome.endswith('.js'):
+        return minificar_js(codigo)
+    return codigo
+
+
+# PACOTES
+# =====================================================
+def _ler(pasta_static, origem):
+    with open(os.path.join(pasta_static, origem), 'rb') as f:
+        return f.read()
+
+
+def montar_pacote(pasta_static, nome):
+    """
+    Conteúdo do pacote sem minificar (os arquivos de origem concatenados)
+    """
+    return b'\n'.join(_ler(pasta_static, origem) for origem in PACOTES[nome])
+
+
+def hash_fontes(pasta_static):
+    """
+    Hash de cada arquivo de origem (para saber se o build está atualizado)
+    """
+    return {
+        origem: _hash(_ler(pasta_static, origem))
+        for origens in PACOTES.values() for origem in origens
+    }
+
+
+def construir(pasta_static=PASTA_STATIC):
+    """
+    Gera static/dist: pacotes minificados com hash no nome, .gz, .br e o manifest.json
+
+    A pasta é recriada do zero: arquivos de builds anteriores são removidos
+
+    Returns:
+        Dicionário do manifest
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    dist = os.path.join(pasta_static, PASTA_DIST)
+    shutil.rmtree(dist, ignore_errors=True)
+
+    arquivos = {}
+    for nome in PACOTES:
+        dados = minificar(nome, montar_pacote(pasta_static, nome).decode('utf-8')).encode('utf-8')
+        base, extensao = os.path.splitext(nome)
+        final = f'{base}.{_hash(dados)}{extensao}'
+        caminho = os.path.join(dist, final)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+        with open(caminho, 'wb') as f:
+            f.write(dados)
+        # mtime=0: o .gz é igual a cada build (não entra a data no cabeçalho)
+        with open(caminho + '.gz', 'wb') as f:
+            f.write(gzip.compress(dados, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(caminho + '.br', 'wb') as f:
+                f.write(brotli.compress(dados, quality=11))
+        arquivos[nome] = final
+
+    manifesto = {'arquivos': arquivos, 'fontes': hash_fontes(pasta_static)}
+    with open(os.path.join(dist, MANIFESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+    return manifesto
+
+
+def carregar_manifesto(pasta_static=PASTA_STATIC):
+    """
+    Lê o manifest.json do último build
+
+    Returns:
+        Dicionário pacote -> nome com hash, ou None se não houver build ou
+        se algum arquivo de origem mudou depois dele
+    """
+    try:
+        with open(os.path.join(pasta_static, PASTA_DIST, MANIFESTO), encoding='utf-8') as f:
+            manifesto = json.load(f)
+        if manifesto.get('fontes') != hash_fontes(pasta_static):
+            print('static/dist desatualizado (rode: python assets.py); usando os arquivos de origem')
+            return None
+        return manifesto['arquivos']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# INTEGRAÇÃO COM O FLASK
+# =====================================================
+class Assets:
+    """
+    Faz url_for('static', ...) e a rota /static usarem os pacotes
+
+    Conceitos:
+    - url_defaults: Função chamada pelo url_for() antes de montar a URL;
+      troca o nome do pacote pelo nome com hash (os templates continuam
+      usando url_for('static', filename='js/loja.js'))
+    - A rota 'static' do Flask é substituída por uma que entrega a versão
+      pré-comprimida (.br/.gz) conforme o Accept-Encoding, sem comprimir
+      nada durante a requisição
+    """
+
+    def __init__(self, pasta_static=PASTA_STATIC):
+        self.pasta_static = pasta_static
+        self.manifesto = None
+
+    def init_app(self, app):
+        from flask import send_from_directory
+
+        self._send_from_directory = send_from_directory
+        self._app = app
+        self.manifesto = carregar_manifesto(self.pasta_static)
+        app.url_defaults(self._url_defaults)
+        app.view_functions['static'] = self.servir
+
+    def url(self, nome):
+        """
+        Caminho (relativo a /static) do pacote ou arquivo `nome`
+        """
+        if self.manifesto and nome in self.manifesto:
+            return f'{PASTA_DIST}/{self.manifesto[nome]}'
+        return nome
+
+    def _url_defaults(self, endpoint, valores):
+        if endpoint == 'static' and 'filename' in valores:
+            valores['filename'] = self.url(valores['filename'])
+
+    def servir(self, filename):
+        from flask import request
+
+        if self.manifesto and filename.startswith(PASTA_DIST + '/'):
+            return self._servir_dist(filename, request)
+        if filename in PACOTES:
+            # Sem build: monta o pacote na hora (desenvolvimento)
+            resposta = self._app.response_class(
+                montar_pacote(self.pasta_static, filename),
+                mimetype=mimetypes.guess_type(filename)[0]
+            )
+            resposta.headers['Cache-Control'] = 'no-cache'
+            return resposta
+        return self._app.send_static_file(filename)
+
+    def _servir_dist(self, filename, request):
+        dist = os.path.join(self.pasta_static, PASTA_DIST)
+        nome = filename[len(PASTA_DIST) + 1:]
+        arquivo, codificacao = nome, None
+        for encoding, sufixo in COMPRESSOES:
+            if request.accept_encodings[encoding] and os.path.exists(os.path.join(dist, nome + sufixo)):
+                arquivo, codificacao = nome + sufixo, encoding
+                break
+
+        # mimetype do arquivo original (não do .gz/.br)
+        resposta = self._send_from_directory(
+            dist, arquivo, mimetype=mimetypes.guess_type(nome)[0], max_age=31536000
+        )
+        if codificacao:
+            resposta.headers['Content-Encoding'] = codificacao
+        resposta.headers['Cache-Control'] = CACHE_IMUTAVEL
+        resposta.headers['Vary'] = 'Accept-Encoding'
+        return resposta
+
+
+# PONTO DE ENTRADA (BUILD)
+# =====================================================
+if __name__ == '__main__':
+    manifesto = construir()
+    dist = os.path.join(PASTA_STATIC, PASTA_DIST)
+    for nome, final in sorted(manifesto['arquivos'].items()):
+        original = len(montar_pacote(PASTA_STATIC, nome))
+        tamanhos = [f'{os.path.getsize(os.path.join(dist, final)):>7} min']
+        for _encoding, sufixo in reversed(COMPRESSOES):
+            if os.path.exists(os.path.join(dist, final + sufixo)):
+                tamanhos.append(f'{os.path.getsize(os.path.join(dist, final + sufixo)):>6} {sufixo[1:]}')
+        print(f'{nome:<16} -> {final:<28} {original:>7} bytes -> ' + '  '.join(tamanhos))
@@ -0,0 +1,560 @@
+# carga.py - Teste de carga reproduzível dos fluxos da loja
+# Cria catálogos sintéticos (100, 10.000 e 100.000 produtos) com histórico
+# de pedidos em um banco SQLite temporário e mede, para cada fluxo:
+# - index:                GET /
+# - detalhes_produto:     GET /produto/<id>
+# - adicionar_carrinho:   POST /adicionar_carrinho (JSON, como o app.js)
+# - atualizar_quantidade: POST /atualizar_quantidade
+# - finalizar_pedido:     POST /finalizar_pedido
+# - admin:                GET /admin
+#
+# Cada fluxo roda de duas formas:
+# - test_client: O cliente de testes do Flask (sem rede, uma requisição por vez)
+# - wsgi:        Um servidor WSGI local (werkzeug) com várias threads cliente,
+#                passando por HTTP de verdade
+#
+# O resultado (requisições/s, p50/p95/p99) é gravado em JSON. Com --baseline,
+# ele é comparado com um resultado anterior e o script termina com código 1
+# se algum fluxo piorar além da tolerância (útil antes do deploy).
+#
+# Uso (na raiz do projeto):
+#     python benchmarks/carga.py
+#     python benchmarks/carga.py --tamanhos 100,10000 --requisicoes 100
+#     python benchmarks/carga.py --saida benchmarks/carga_baseline.json
+#     python benchmarks/carga.py --baseline benchmarks/carga_baseline.json
+#
+# Cada tamanho de catálogo roda em um processo separado, com um banco novo
+# em uma pasta temporária, porque a configuração do banco é lida quando
+# app.py é importado.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+from http.cookiejar import CookieJar
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TAMANHOS_PADRAO = '100,10000,100000'
+MODOS = ('test_client', 'wsgi')
+
+# Semente fixa: os mesmos produtos, pedidos e requisições a cada execução
+SEMENTE = 42
+
+CATEGORIAS = ('cerveja', 'vinho', 'whisky', 'vodka', 'gin', 'destilados',
+              'refrigerante', 'suco', 'agua', 'energetico')
+DADOS_CLIENTE = {'nome': 'Cliente Carga', 'telefone': '11999999999',
+                 'endereco': 'Rua Dante Pellacani, 92 - Tatuapé', 'observacoes': ''}
+
+
+# DADOS SINTÉTICOS
+# =====================================================
+def semear(db, Produto, Pedido, ItemPedido, total_produtos, rng):
+    """
+    Completa o catálogo até `total_produtos` e cria um histórico de pedidos
+
+    Tudo é gravado com INSERTs em lote (executemany) em uma transação.
+    O estoque fica alto para que nenhum pedido do teste falhe por falta
+    de produto.
+
+    Returns:
+        Quantidade de pedidos criados
+    """
+    db.session.execute(db.update(Produto).values(estoque=10 ** 9))
+    existentes = db.session.execute(db.select(db.func.count(Produto.id))).scalar()
+
+    novos = [
+        {
+            'nome': f'Produto Sintético {numero:06d}',
+            'descricao': f'Produto gerado para o teste de carga ({numero})',
+            'preco': round(rng.uniform(2.5, 250.0), 2),
+            'categoria': CATEGORIAS[numero % len(CATEGORIAS)],
+            'imagem_url': None,
+            'estoque': 10 ** 9,
+            'ativo': True,
+        }
+        for numero in range(max(total_produtos - existentes, 0))
+    ]
+    if novos:
+        db.session.execute(db.insert(Produto), novos)
+
+    ids = db.session.execute(db.select(Produto.id).where(Produto.ativo.is_(True))).scalars().all()
+    if total_produtos < len(ids):
+        # Catálogo menor que o data/produtos.json: desativa o excedente
+        db.session.execute(db.update(Produto).where(Produto.id.in_(ids[total_produtos:])).values(ativo=False))
+        ids = ids[:total_produtos]
+
+    # Histórico: 1 pedido para cada 5 produtos (mínimo 200, máximo 20.000),
+    # espalhados pelos últimos 60 dias, com 1 a 4 itens cada
+    quantidade_pedidos = min(max(total_produtos // 5, 200), 20000)
+    agora = datetime.now()
+    pedidos, itens = [], []
+    for pedido_id in range(1, quantidade_pedidos + 1):
+        total = 0.0
+        for produto_id in rng.sample(ids, min(rng.randint(1, 4), len(ids))):
+            quantidade = rng.randint(1, 6)
+            preco = round(rng.uniform(2.5, 250.0), 2)
+            total += quantidade * preco
+            itens.append({'pedido_id': pedido_id, 'produto_id': produto_id,
+                          'quantidade': quantidade, 'preco_unitario': preco})
+        pedidos.append({
+            'id': pedido_id,
+            'nome_cliente': f'Cliente {pedido_id}',
+            'telefone_cliente': '11999999999',
+            'endereco_cliente': 'Rua Teste, 1',
+            'valor_total': round(total, 2),
+            'status': 'pendente',
+            'data_pedido': agora - timedelta(minutes=rng.randint(0, 60 * 24 * 60)),
+        })
+    db.session.execute(db.insert(Pedido), pedidos)
+    db.session.execute(db.insert(ItemPedido), itens)
+    db.session.commit()
+    return quantidade_pedidos
+
+
+# CLIENTES
+# =====================================================
+class ClienteTeste:
+    """
+    Envia requisições pelo test_client do Flask (sem rede)
+    """
+
+    def __init__(self, app):
+        self._cliente = app.test_client()
+
+    def enviar(self, metodo, caminho, json=None, form=None):
+        resposta = self._cliente.open(caminho, method=metodo, json=json, data=form)
+        resposta.get_data()
+        return resposta.status_code
+
+
+class _SemRedirecionar(urllib.request.HTTPRedirectHandler):
+    # Mede só a requisição pedida, não a página para onde ela redireciona
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class ClienteHTTP:
+    """
+    Envia requisições HTTP de verdade para o servidor local
+
+    Cada cliente tem seus próprios cookies (e, portanto, seu carrinho)
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._abridor = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _SemRedirecionar
+        )
+
+    def enviar(self, metodo, caminho, json=None, form=None):
+        corpo, cabecalhos = None, {}
+        if json is not None:
+            corpo = _json_bytes(json)
+            cabecalhos['Content-Type'] = 'application/json'
+        elif form is not None:
+            corpo = urllib.parse.urlencode(form).encode('utf-8')
+            cabecalhos['Content-Type'] = 'application/x-www-form-urlencoded'
+        requisicao = urllib.request.Request(self.base_url + caminho, data=corpo,
+                                            headers=cabecalhos, method=metodo)
+        try:
+            with self._abridor.open(requisicao) as resposta:
+                resposta.read()
+                return resposta.status
+        except urllib.error.HTTPError as erro:
+            # 3xx (não seguido) e 4xx/5xx chegam como exceção
+            erro.read()
+            return erro.code
+
+
+def _json_bytes(dados):
+    return json.dumps(dados).encode('utf-8')
+
+
+# FLUXOS
+# =====================================================
+# Cada fluxo: (preparar, requisicao, status esperados)
+# - preparar(cliente, rng, ids) roda antes de cada requisição e NÃO é medido
+#   (ex: colocar um produto no carrinho antes de finalizar o pedido)
+# - requisicao(rng, ids, contexto) devolve (método, caminho, argumentos)
+def _preparar_um_item(cliente, rng, ids):
+    produto_id = rng.choice(ids)
+    cliente.enviar('POST', '/adicionar_carrinho', json={'produto_id': produto_id, 'quantidade': 1})
+    return produto_id
+
+
+def _preparar_dois_itens(cliente, rng, ids):
+    for produto_id in rng.sample(ids, min(2, len(ids))):
+        cliente.enviar('POST', '/adicionar_carrinho', json={'produto_id': produto_id, 'quantidade': 1})
+
+
+FLUXOS = {
+    'index': (
+        None,
+        lambda rng, ids, contexto: ('GET', '/', {}),
+        {200},
+    ),
+    'detalhes_produto': (
+        None,
+        lambda rng, ids, contexto: ('GET', f'/produto/{rng.choice(ids)}', {}),
+        {200},
+    ),
+    'adicionar_carrinho': (
+        None,
+        lambda rng, ids, contexto: ('POST', '/adicionar_carrinho',
+                                    {'json': {'produto_id': rng.choice(ids), 'quantidade': 1}}),
+        {200},
+    ),
+    'atualizar_quantidade': (
+        _preparar_um_item,
+        lambda rng, ids, produto_id: ('POST', '/atualizar_quantidade',
+                                      {'json': {'produto_id': produto_id, 'quantidade': rng.randint(1, 5)}}),
+        {200},
+    ),
+    'finalizar_pedido': (
+        _preparar_dois_itens,
+        lambda rng, ids, contexto: ('POST', '/finalizar_pedido', {'form': DADOS_CLIENTE}),
+        {200},
+    ),
+    'admin': (
+        None,
+        lambda rng, ids, contexto: ('GET', '/admin', {}),
+        {200},
+    ),
+}
+
+
+# MEDIÇÃO
+# =====================================================
+def percentil(ordenados, p):
+    """
+    Percentil pelo método "nearest-rank" (valores já ordenados): o menor
+    valor com pelo menos p% das amostras <= a ele
+
+    math.ceil e não round(): round() arredonda 99.5 para 100 (arredondamento
+    "do banqueiro"), o que deslocava o p95/p99 uma posição para cima
+    """
+    if not ordenados:
+        return None
+    posicao = max(math.ceil(p * len(ordenados) / 100) - 1, 0)
+    return ordenados[min(posicao, len(ordenados) - 1)]
+
+
+def executar_fluxo(cliente, fluxo, repeticoes, ids, rng, prazo=None):
+    """
+    Executa o fluxo `repeticoes` vezes com um cliente
+
+    Args:
+        prazo: Instante (time.perf_counter) em que o fluxo para, mesmo sem
+               completar as repetições. Evita que páginas muito lentas em
+               catálogos grandes façam o teste demorar horas
+
+    Returns:
+        Tupla (latências em segundos, quantidade de erros)
+    """
+    preparar, montar, esperados = FLUXOS[fluxo]
+    latencias, erros = [], 0
+    for _ in range(repeticoes):
+        if prazo is not None and latencias and time.perf_counter() > prazo:
+            break
+        contexto = preparar(cliente, rng, ids) if preparar else None
+        metodo, caminho, argumentos = montar(rng, ids, contexto)
+        inicio = time.perf_counter()
+        status = cliente.enviar(metodo, caminho, **argumentos)
+        latencias.append(time.perf_counter() - inicio)
+        if status not in esperados:
+            erros += 1
+    return latencias, erros
+
+
+def resumir(latencias, erros, concorrencia):
+    """
+    Requisições/s e percentis em milissegundos
+
+    O tempo do preparo não entra na conta: a vazão é calculada pela soma
+    das latências medidas dividida entre os clientes simultâneos
+    """
+    ordenados = sorted(latencias)
+    soma = sum(ordenados)
+    ms = lambda valor: round(valor * 1000, 3)
+    return {
+        'requisicoes': len(ordenados),
+        'erros': erros,
+        'req_s': round(len(ordenados) * concorrencia / soma, 1) if soma else None,
+        'media_ms': ms(soma / len(ordenados)),
+        'p50_ms': ms(percentil(ordenados, 50)),
+        'p95_ms': ms(percentil(ordenados, 95)),
+        'p99_ms': ms(percentil(ordenados, 99)),
+    }
+
+
+def medir_test_client(app, fluxos, requisicoes, aquecimento, ids, tempo_maximo):
+    resultados = {}
+    for fluxo in fluxos:
+        rng = random.Random(SEMENTE)
+        cliente = ClienteTeste(app)
+        executar_fluxo(cliente, fluxo, aquecimento, ids, rng, time.perf_counter() + tempo_maximo)
+        latencias, erros = executar_fluxo(cliente, fluxo, requisicoes, ids, rng,
+                                          time.perf_counter() + tempo_maximo)
+        resultados[fluxo] = resumir(latencias, erros, 1)
+    return resultados
+
+
+def medir_wsgi(app, fluxos, requisicoes, aquecimento, ids, concorrencia, tempo_maximo):
+    from werkzeug.serving import make_server
+
+    # Sem o log de cada requisição no terminal
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    thread_servidor = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread_servidor.start()
+    base_url = f'http://127.0.0.1:{servidor.server_port}'
+
+    resultados = {}
+    try:
+        for fluxo in fluxos:
+            executar_fluxo(ClienteHTTP(base_url), fluxo, aquecimento, ids, random.Random(SEMENTE),
+                           time.perf_counter() + tempo_maximo)
+
+            por_cliente = [None] * concorrencia
+            repeticoes = max(requisicoes // concorrencia, 1)
+            prazo = time.perf_counter() + tempo_maximo
+
+            def trabalhar(numero):
+                rng = random.Random(SEMENTE + numero)
+                por_cliente[numero] = executar_fluxo(ClienteHTTP(base_url), fluxo, repeticoes, ids, rng, prazo)
+
+            threads = [threading.Thread(target=trabalhar, args=(n,)) for n in range(concorrencia)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            latencias = [valor for lista, _erros in por_cliente for valor in lista]
+            erros = sum(erros for _lista, erros in por_cliente)
+            resultados[fluxo] = resumir(latencias, erros, concorrencia)
+    finally:
+        servidor.shutdown()
+    return resultados
+
+
+# EXECUÇÃO DE UM TAMANHO DE CATÁLOGO (PROCESSO FILHO)
+# =====================================================
+def executar_tamanho(args):
+    """
+    Semeia o banco, mede os fluxos e imprime o resultado em JSON
+    """
+    sys.path.insert(0, RAIZ)
+    from app import app, criar_app, db, Produto, Pedido, ItemPedido, init_db, obter_catalogo, cache_catalogo, estoque_catalogo
+    criar_app(banco=None)  # PRAGMAs, instrumentação e fila; o init_db vem abaixo
+    import busca
+
+    inicio = time.perf_counter()
+    with app.app_context():
+        init_db()
+        pedidos = semear(db, Produto, Pedido, ItemPedido, args.produtos, random.Random(SEMENTE))
+        busca.reconstruir_indice(db.session.connection())
+        db.session.commit()
+        cache_catalogo.invalidar()
+        estoque_catalogo.invalidar()
+        ids = [produto.id for produto in obter_catalogo().produtos]
+    semeadura_s = round(time.perf_counter() - inicio, 2)
+    print(f"{args.produtos} produtos, {pedidos} pedidos semeados em {semeadura_s}s", file=sys.stderr)
+
+    fluxos = args.fluxos.split(',')
+    resultado = {'produtos': len(ids), 'pedidos': pedidos, 'semeadura_s': semeadura_s}
+    for modo in args.modos.split(','):
+        if modo == 'test_client':
+            resultado[modo] = medir_test_client(app, fluxos, args.requisicoes, args.aquecimento, ids,
+                                                args.tempo_maximo)
+        else:
+            resultado[modo] = medir_wsgi(app, fluxos, args.requisicoes, args.aquecimento, ids,
+                                         args.concorrencia, args.tempo_maximo)
+        print(f"  {modo}: ok", file=sys.stderr)
+
+    print(json.dumps(resultado))
+
+
+# COMPARAÇÃO COM O BASELINE
+# =====================================================
+def comparar_baseline(atual, baseline, tolerancia):
+    """
+    Lista os fluxos que pioraram em relação ao baseline
+
+    Um fluxo regrediu se o p95 aumentou ou a vazão caiu mais que a
+    tolerância (ex: 0.25 = 25%), ou se o modo falhou nesta execução.
+    Fluxos que não foram medidos nesta execução são ignorados.
+
+    Returns:
+        Lista de tuplas (tamanho, modo, fluxo, métrica, antes, depois, variação)
+    """
+    regressoes = []
+    for tamanho, base_tamanho in baseline.get('resultados', {}).items():
+        atual_tamanho = atual['resultados'].get(tamanho)
+        if atual_tamanho is None:
+            continue
+        for modo in MODOS:
+            base_modo = base_tamanho.get(modo) or {}
+            atual_modo = atual_tamanho.get(modo)
+            if atual_modo is None or 'erro' in base_modo:
+                continue
+            if 'erro' in atual_modo:
+                regressoes.append((tamanho, modo, '*', 'erro', 'ok', atual_modo['erro'], None))
+                continue
+            for fluxo, base in base_modo.items():
+                medida = atual_modo.get(fluxo)
+                if medida is None:
+                    continue
+                if base['p95_ms'] and medida['p95_ms'] > base['p95_ms'] * (1 + tolerancia):
+                    regressoes.append((tamanho, modo, fluxo, 'p95_ms', base['p95_ms'], medida['p95_ms'],
+                                       medida['p95_ms'] / base['p95_ms'] - 1))
+                if base['req_s'] and medida['req_s'] < base['req_s'] * (1 - tolerancia):
+                    regressoes.append((tamanho, modo, fluxo, 'req_s', base['req_s'], medida['req_s'],
+                                       medida['req_s'] / base['req_s'] - 1))
+    return regressoes
+
+
+def imprimir_tabela(resultados):
+    for tamanho, por_modo in resultados.items():
+        if 'pedidos' in por_modo:
+            print(f"\n{tamanho} produtos ({por_modo['pedidos']} pedidos, semeados em {por_modo['semeadura_s']}s)")
+        else:
+            print(f"\n{tamanho} produtos")
+        print(f"{'modo':<13}{'fluxo':<22}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'erros':>7}")
+        for modo in MODOS:
+            medidas = por_modo.get(modo, {})
+            if 'erro' in medidas:
+                print(f"{modo:<13}FALHOU: {medidas['erro']}")
+                continue
+            for fluxo, m in medidas.items():
+                print(f"{modo:<13}{fluxo:<22}{m['req_s']:>9}{m['p50_ms']:>10}"
+                      f"{m['p95_ms']:>10}{m['p99_ms']:>10}{m['erros']:>7}")
+
+
+# EXECUÇÃO COMPLETA (PROCESSO PRINCIPAL)
+# =====================================================
+def executar_filho(args, tamanho, modo):
+    """
+    Roda um tamanho de catálogo e um modo em um processo novo
+
+    Um processo por modo: se o servidor WSGI esgotar a memória em um
+    catálogo grande, o resultado do test_client não se perde
+
+    Returns:
+        Dicionário do resultado, ou {'erro': ...} se o processo falhar
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        env = dict(os.environ,
+                   DATABASE_URL=f"sqlite:///{os.path.join(pasta, 'adega.db')}",
+                   CARRINHO_BACKEND='memoria',
+                   FILA_PEDIDOS='0',
+                   INSTRUMENTACAO='0')
+        processo = subprocess.run(
+            [sys.executable, __file__, '--filho', '--produtos', tamanho,
+             '--modos', modo, '--fluxos', args.fluxos,
+             '--requisicoes', str(args.requisicoes), '--aquecimento', str(args.aquecimento),
+             '--concorrencia', str(args.concorrencia), '--tempo-maximo', str(args.tempo_maximo)],
+            env=env, cwd=RAIZ, stdout=subprocess.PIPE, text=True
+        )
+    if processo.returncode != 0:
+        motivo = (f'sinal {-processo.returncode}' if processo.returncode < 0
+                  else f'código {processo.returncode}')
+        # SIGKILL (9) costuma ser o sistema matando o processo por falta de memória
+        return {'erro': f'processo terminou com {motivo}'}
+    # A última linha é o JSON (as anteriores são mensagens do init_db)
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def executar(args):
+    resultados = {}
+    falhas = 0
+    for tamanho in args.tamanhos.split(','):
+        resultados[tamanho] = {}
+        for modo in args.modos.split(','):
+            resultado = executar_filho(args, tamanho, modo)
+            if 'erro' in resultado:
+                falhas += 1
+                resultados[tamanho][modo] = resultado
+            else:
+                resultados[tamanho].update(resultado)
+
+    atual = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'sqlite_perfil': os.environ.get('SQLITE_PERFIL', 'desempenho'),
+        },
+        'parametros': {
+            'requisicoes': args.requisicoes,
+            'aquecimento': args.aquecimento,
+            'concorrencia': args.concorrencia,
+            'tempo_maximo': args.tempo_maximo,
+        },
+        'resultados': resultados,
+    }
+    imprimir_tabela(resultados)
+
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(atual, f, indent=2, ensure_ascii=False)
+    print(f"\nResultado gravado em {args.saida}")
+    codigo = 1 if falhas else 0
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressoes = comparar_baseline(atual, baseline, args.tolerancia)
+        if regressoes:
+            print(f"\nRegressões em relação a {args.baseline} (tolerância {args.tolerancia:.0%}):")
+            for tamanho, modo, fluxo, metrica, antes, depois, variacao in regressoes:
+                variacao = '' if variacao is None else f'({variacao:+.0%})'
+                print(f"  {tamanho:>7} {modo:<12}{fluxo:<22}{metrica:<8}{antes:>10} -> {depois} {variacao}")
+            return 1
+        print(f"\nSem regressões em relação a {args.baseline} (tolerância {args.tolerancia:.0%})")
+    return codigo
+
+
+# PONTO DE ENTRADA
+# =====================================================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Teste de carga dos fluxos da loja')
+    parser.add_argument('--tamanhos', default=TAMANHOS_PADRAO,
+                        help='Tamanhos de catálogo separados por vírgula')
+    parser.add_argument('--modos', default=','.join(MODOS))
+    parser.add_argument('--fluxos', default=','.join(FLUXOS))
+    parser.add_argument('--requisicoes', type=int, default=200, help='Requisições medidas por fluxo')
+    parser.add_argument('--aquecimento', type=int, default=10, help='Requisições descartadas antes de medir')
+    parser.add_argument('--concorrencia', type=int, default=4, help='Clientes simultâneos no modo wsgi')
+    parser.add_argument('--tempo-maximo', type=float, default=30,
+                        help='Segundos por fluxo (o fluxo para antes de completar as requisições)')
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'benchmarks', 'carga_resultado.json'))
+    parser.add_argument('--baseline', help='Resultado anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help='Piora aceitável antes de acusar regressão (0.25 = 25%%)')
+    parser.add_argument('--filho', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--produtos', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    for nome, validos in (('modos', MODOS), ('fluxos', FLUXOS)):
+        desconhecidos = set(getattr(args, nome).split(',')) - set(validos)
+        if desconhecidos:
+            parser.error(f"--{nome} desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    if args.filho:
+        executar_tamanho(args)
+    else:
+        sys.exit(executar(args))
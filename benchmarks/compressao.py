@@ -0,0 +1,162 @@
+# compressao.py - Benchmark da página inicial: streaming e compressão gzip
+# Compara, para catálogos de 100 e 5.000 produtos, as quatro combinações:
+# - buffer:    render_template (a página inteira é montada antes de enviar)
+# - streaming: stream_template (INDEX_STREAMING=1, enviada em pedaços)
+# cada uma sem compressão (identity) e com gzip (Accept-Encoding: gzip).
+#
+# Mede, com um socket HTTP de verdade contra um servidor WSGI local:
+# - TTFB: tempo até o primeiro byte da resposta chegar ao cliente
+# - Total: tempo até o último byte
+# - Bytes na rede: tudo o que foi recebido (cabeçalhos + corpo)
+#
+# Uso (na raiz do projeto):
+#     python benchmarks/compressao.py
+#     python benchmarks/compressao.py --tamanhos 100,5000,20000 --requisicoes 20
+#
+# Cada tamanho de catálogo roda em um processo separado, com um banco novo
+# em uma pasta temporária, porque a configuração do banco é lida quando
+# app.py é importado.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from carga import SEMENTE, semear
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TAMANHOS_PADRAO = '100,5000'
+
+# (modo, codificação) -> INDEX_STREAMING e cabeçalho Accept-Encoding
+COMBINACOES = (
+    ('buffer', 'identity'),
+    ('buffer', 'gzip'),
+    ('streaming', 'identity'),
+    ('streaming', 'gzip'),
+)
+
+
+# MEDIÇÃO (PROCESSO FILHO)
+# =====================================================
+def requisitar(porta, codificacao):
+    """
+    Faz GET / e lê a resposta inteira direto do socket
+
+    Connection: close faz o servidor fechar a conexão no fim da resposta,
+    então o fim do corpo é simplesmente o fim dos dados (funciona com e
+    sem streaming, sem precisar interpretar Content-Length)
+
+    Returns:
+        Tupla (ttfb em segundos, total em segundos, bytes recebidos)
+    """
+    pedido = (f'GET / HTTP/1.1\r\nHost: 127.0.0.1:{porta}\r\n'
+              f'Accept-Encoding: {codificacao}\r\nConnection: close\r\n\r\n').encode()
+    with socket.create_connection(('127.0.0.1', porta)) as conexao:
+        inicio = time.perf_counter()
+        conexao.sendall(pedido)
+        ttfb = None
+        recebidos = 0
+        while True:
+            dados = conexao.recv(65536)
+            if not dados:
+                break
+            if ttfb is None:
+                ttfb = time.perf_counter() - inicio
+            recebidos += len(dados)
+        total = time.perf_counter() - inicio
+    return ttfb, total, recebidos
+
+
+def executar_filho(args):
+    sys.path.insert(0, RAIZ)
+    from werkzeug.serving import make_server
+    from app import app, criar_app, db, init_db, Produto, Pedido, ItemPedido
+    criar_app(banco=None)  # PRAGMAs, instrumentação e fila; o init_db vem abaixo
+
+    with app.app_context():
+        init_db()
+        semear(db, Produto, Pedido, ItemPedido, args.produtos, random.Random(SEMENTE))
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    resultados = {}
+    try:
+        for modo, codificacao in COMBINACOES:
+            app.config['INDEX_STREAMING'] = modo == 'streaming'
+            for _ in range(args.aquecimento):
+                requisitar(servidor.server_port, codificacao)
+            medidas = [requisitar(servidor.server_port, codificacao) for _ in range(args.requisicoes)]
+            ms = lambda valores: round(statistics.median(valores) * 1000, 2)
+            resultados[f'{modo}/{codificacao}'] = {
+                'ttfb_ms': ms([ttfb for ttfb, _t, _b in medidas]),
+                'total_ms': ms([total for _f, total, _b in medidas]),
+                'bytes': medidas[-1][2],
+            }
+    finally:
+        servidor.shutdown()
+
+    print(json.dumps(resultados))
+
+
+# EXECUÇÃO (PROCESSO PRINCIPAL)
+# =====================================================
+def executar(args):
+    resultados = {}
+    for tamanho in args.tamanhos.split(','):
+        with tempfile.TemporaryDirectory() as pasta:
+            env = dict(os.environ,
+                       DATABASE_URL=f"sqlite:///{os.path.join(pasta, 'adega.db')}",
+                       CARRINHO_BACKEND='memoria',
+                       FILA_PEDIDOS='0',
+                       INSTRUMENTACAO='0',
+                       COMPRESSAO='1',
+                       COMPRESSAO_NIVEL=str(args.nivel))
+            processo = subprocess.run(
+                [sys.executable, __file__, '--filho', '--produtos', tamanho,
+                 '--requisicoes', str(args.requisicoes), '--aquecimento', str(args.aquecimento)],
+                env=env, cwd=RAIZ, stdout=subprocess.PIPE, text=True, check=True
+            )
+        # A última linha é o JSON (as anteriores são mensagens do init_db)
+        resultados[tamanho] = json.loads(processo.stdout.strip().splitlines()[-1])
+
+    print(f"GET / - mediana de {args.requisicoes} requisições, gzip nível {args.nivel}\n")
+    print(f"{'produtos':>8}  {'modo':<20}{'TTFB ms':>10}{'total ms':>10}{'bytes':>12}")
+    for tamanho, por_combinacao in resultados.items():
+        for nome, medida in por_combinacao.items():
+            print(f"{tamanho:>8}  {nome:<20}{medida['ttfb_ms']:>10}{medida['total_ms']:>10}"
+                  f"{medida['bytes']:>12}")
+        print()
+    return 0
+
+
+# PONTO DE ENTRADA
+# =====================================================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de streaming e compressão da página inicial')
+    parser.add_argument('--tamanhos', default=TAMANHOS_PADRAO,
+                        help='Quantidades de produtos separadas por vírgula')
+    parser.add_argument('--requisicoes', type=int, default=10, help='Requisições medidas por combinação')
+    parser.add_argument('--aquecimento', type=int, default=2,
+                        help='Requisições descartadas antes de medir (enchem os caches)')
+    parser.add_argument('--nivel', type=int, default=6, help='Nível do gzip (1 a 9)')
+    parser.add_argument('--produtos', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--filho', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        executar_filho(args)
+        sys.exit(0)
+    sys.exit(executar(args))
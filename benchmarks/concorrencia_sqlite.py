@@ -0,0 +1,152 @@
+# concorrencia_sqlite.py - Benchmark de checkouts e leituras simultâneas
+# Compara os perfis do SQLite (perfil_sqlite.py) com várias threads gravando
+# pedidos (criar_pedido) enquanto outras leem o catálogo do banco
+# (_montar_snapshot_catalogo), que é o que acontece em um horário de pico.
+#
+# Uso (na raiz do projeto):
+#     python benchmarks/concorrencia_sqlite.py
+#     python benchmarks/concorrencia_sqlite.py --escritores 8 --leitores 8 --duracao 10
+#
+# Cada perfil roda em um processo separado, com um banco novo em uma pasta
+# temporária, porque a configuração do banco é lida quando app.py é importado.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# EXECUÇÃO DE UM PERFIL (PROCESSO FILHO)
+# =====================================================
+def executar_perfil(escritores, leitores, duracao):
+    """
+    Roda as threads por `duracao` segundos e imprime o resultado em JSON
+    """
+    sys.path.insert(0, RAIZ)
+    from app import app, criar_app, db, Produto, init_db, criar_pedido, _montar_snapshot_catalogo, EstoqueInsuficiente
+    criar_app(banco=None)  # PRAGMAs, instrumentação e fila; o init_db vem abaixo
+
+    with app.app_context():
+        init_db()
+        # Estoque alto para que nenhum pedido falhe por falta de produto
+        db.session.execute(db.update(Produto).values(estoque=10 ** 9))
+        db.session.commit()
+        ids = [p.id for p in _montar_snapshot_catalogo()[1]][:5]
+
+    contadores = {'pedidos': 0, 'leituras': 0, 'erros': 0}
+    latencias = {'pedidos': [], 'leituras': []}
+    lock = threading.Lock()
+    fim = time.perf_counter() + duracao
+
+    def registrar(tipo, inicio, erro=False):
+        with lock:
+            if erro:
+                contadores['erros'] += 1
+            else:
+                contadores[tipo] += 1
+                latencias[tipo].append(time.perf_counter() - inicio)
+
+    def escritor(numero):
+        dados = {'nome': f'Cliente {numero}', 'telefone': '11999999999',
+                 'endereco': 'Rua Teste, 1', 'observacoes': ''}
+        with app.app_context():
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                try:
+                    criar_pedido(dados, {ids[numero % len(ids)]: 1, ids[0]: 1})
+                    registrar('pedidos', inicio)
+                except EstoqueInsuficiente:
+                    registrar('pedidos', inicio, erro=True)
+                except Exception:
+                    # "database is locked" no perfil padrão
+                    registrar('pedidos', inicio, erro=True)
+
+    def leitor():
+        with app.app_context():
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                try:
+                    _montar_snapshot_catalogo()
+                    db.session.rollback()
+                    registrar('leituras', inicio)
+                except Exception:
+                    db.session.rollback()
+                    registrar('leituras', inicio, erro=True)
+
+    threads = [threading.Thread(target=escritor, args=(n,)) for n in range(escritores)]
+    threads += [threading.Thread(target=leitor) for _ in range(leitores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def p95(valores):
+        valores = sorted(valores)
+        return round(valores[int(len(valores) * 0.95)] * 1000, 2) if valores else None
+
+    print(json.dumps({
+        'perfil': app.config['SQLITE_PERFIL'],
+        'pedidos_s': round(contadores['pedidos'] / duracao, 1),
+        'leituras_s': round(contadores['leituras'] / duracao, 1),
+        'erros': contadores['erros'],
+        'p95_pedido_ms': p95(latencias['pedidos']),
+        'p95_leitura_ms': p95(latencias['leituras']),
+    }))
+
+
+# COMPARAÇÃO ENTRE PERFIS (PROCESSO PRINCIPAL)
+# =====================================================
+def comparar(perfis, escritores, leitores, duracao):
+    resultados = []
+    for perfil in perfis:
+        with tempfile.TemporaryDirectory() as pasta:
+            env = dict(os.environ,
+                       SQLITE_PERFIL=perfil,
+                       DATABASE_URL=f"sqlite:///{os.path.join(pasta, 'adega.db')}",
+                       CARRINHO_BACKEND='memoria',
+                       FILA_PEDIDOS='0')
+            saida = subprocess.run(
+                [sys.executable, __file__, '--filho',
+                 '--escritores', str(escritores), '--leitores', str(leitores),
+                 '--duracao', str(duracao)],
+                env=env, cwd=RAIZ, capture_output=True, text=True, check=True
+            ).stdout
+            # A última linha é o JSON (as anteriores são mensagens do init_db)
+            resultados.append(json.loads(saida.strip().splitlines()[-1]))
+
+    print(f"{escritores} escritores, {leitores} leitores, {duracao}s por perfil\n")
+    print(f"{'perfil':<12}{'pedidos/s':>11}{'leituras/s':>12}{'erros':>7}{'p95 pedido':>12}{'p95 leitura':>13}")
+    for r in resultados:
+        print(f"{r['perfil']:<12}{r['pedidos_s']:>11}{r['leituras_s']:>12}{r['erros']:>7}"
+              f"{str(r['p95_pedido_ms']) + ' ms':>12}{str(r['p95_leitura_ms']) + ' ms':>13}")
+
+    if len(resultados) >= 2:
+        base, novo = resultados[0], resultados[-1]
+        for chave in ('pedidos_s', 'leituras_s'):
+            if base[chave]:
+                print(f"{chave}: {novo[chave] / base[chave]:.1f}x ({base['perfil']} -> {novo['perfil']})")
+
+
+# PONTO DE ENTRADA
+# =====================================================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de concorrência do SQLite')
+    parser.add_argument('--perfis', default='padrao,desempenho')
+    parser.add_argument('--escritores', type=int, default=4)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--duracao', type=float, default=5)
+    parser.add_argument('--filho', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        executar_perfil(args.escritores, args.leitores, args.duracao)
+    else:
+        comparar(args.perfis.split(','), args.escritores, args.leitores, args.duracao)
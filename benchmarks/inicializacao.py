@@ -0,0 +1,173 @@
+# inicializacao.py - Benchmark do cold start (importação + primeira resposta)
+# Em serverless (Vercel) cada instância nova importa o app.py e responde à
+# primeira requisição com o usuário esperando. Este script mede, em
+# processos Python novos:
+# - processo:  Do início do processo até a primeira resposta (medido de fora)
+# - importacao: Tempo para importar o ponto de entrada
+# - primeira:  Primeira requisição (inclui o init_db() preguiçoso)
+# - segunda:   Segunda requisição (já com tudo pronto)
+#
+# para cada ponto de entrada:
+# - api/index.py  (Vercel, banco inicializado na primeira requisição)
+# - app.py        (criar_app() com o banco inicializado na importação)
+# - manage.py     (linha de comando, com o Flask-Migrate)
+#
+# em três cenários:
+# - banco vazio:     Instância nova na Vercel (/tmp vazio), sem o snapshot
+# - snapshot:        Instância nova, banco copiado de data/catalogo.db
+# - banco existente: Esquema e catálogo já gravados por um processo anterior
+#
+# Também mostra os módulos que mais pesam na importação (python -X importtime).
+#
+# Uso (na raiz do projeto):
+#     python benchmarks/inicializacao.py
+#     python benchmarks/inicializacao.py --repeticoes 10 --caminho /robots.txt
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRADAS = ('api', 'app', 'manage')
+NOMES_ENTRADAS = {'api': 'api/index.py', 'app': 'app.py', 'manage': 'manage.py'}
+
+
+# MEDIÇÃO DENTRO DO PROCESSO NOVO (PROCESSO FILHO)
+# =====================================================
+def medir_filho(entrada, caminho):
+    """
+    Importa o ponto de entrada, faz duas requisições e imprime os tempos em JSON
+    """
+    inicio = time.perf_counter()
+    sys.path.insert(0, RAIZ)
+    if entrada == 'api':
+        aplicacao = importlib.import_module('api.index').app
+    elif entrada == 'app':
+        aplicacao = importlib.import_module('app').criar_app(banco='imediato')
+    else:
+        aplicacao = importlib.import_module('manage').app
+    importado = time.perf_counter()
+
+    cliente = aplicacao.test_client()
+    status = cliente.get(caminho).status_code
+    primeira = time.perf_counter()
+    cliente.get(caminho)
+    segunda = time.perf_counter()
+
+    print(json.dumps({
+        'status': status,
+        'importacao_ms': (importado - inicio) * 1000,
+        'primeira_ms': (primeira - importado) * 1000,
+        'segunda_ms': (segunda - primeira) * 1000,
+    }))
+
+
+# EXECUÇÃO DOS PROCESSOS (PROCESSO PRINCIPAL)
+# =====================================================
+def executar_processo(entrada, caminho, env):
+    inicio = time.perf_counter()
+    saida = subprocess.run(
+        [sys.executable, __file__, '--filho', entrada, '--caminho', caminho],
+        env=env, cwd=RAIZ, capture_output=True, text=True, check=True
+    ).stdout
+    processo_ms = (time.perf_counter() - inicio) * 1000
+    # A última linha é o JSON (as anteriores são mensagens do init_db)
+    resultado = json.loads(saida.strip().splitlines()[-1])
+    resultado['processo_ms'] = processo_ms
+    return resultado
+
+
+def ambiente(pasta, **extras):
+    # Banco e carrinhos na pasta temporária (nada de instance/ é alterado)
+    return dict(os.environ,
+                DATABASE_URL=f"sqlite:///{os.path.join(pasta, 'adega.db')}",
+                CARRINHO_SQLITE_PATH=os.path.join(pasta, 'carrinhos.db'),
+                FILA_PEDIDOS='0',
+                INSTRUMENTACAO='0',
+                **extras)
+
+
+def medir_cenarios(entrada, caminho, repeticoes):
+    """
+    Mediana de cada tempo em cada cenário
+    """
+    medianas = {}
+    for cenario in ('banco vazio', 'snapshot', 'banco existente'):
+        resultados = []
+        for _ in range(repeticoes):
+            with tempfile.TemporaryDirectory() as pasta:
+                # BANCO_SNAPSHOT vazio: o init_db() cria tudo do zero
+                env = ambiente(pasta) if cenario == 'snapshot' else ambiente(pasta, BANCO_SNAPSHOT='')
+                if cenario == 'banco existente':
+                    # Um processo anterior cria o banco e sincroniza o catálogo
+                    executar_processo('app', '/', env)
+                resultados.append(executar_processo(entrada, caminho, env))
+        medianas[cenario] = {
+            chave: statistics.median(r[chave] for r in resultados)
+            for chave in ('processo_ms', 'importacao_ms', 'primeira_ms', 'segunda_ms')
+        }
+        medianas[cenario]['status'] = resultados[-1]['status']
+    return medianas
+
+
+def modulos_mais_pesados(entrada, quantidade):
+    """
+    Roda python -X importtime e soma o tempo de importação por pacote
+
+    Formato de cada linha (stderr): "import time: self [us] | cumulative | nome".
+    Soma-se o tempo próprio (self) de cada módulo no pacote de nível mais
+    alto (ex: sqlalchemy.orm.query conta para sqlalchemy), sem contar duas
+    vezes o tempo de quem foi importado por outro módulo
+    """
+    modulo = {'api': 'api.index', 'app': 'app', 'manage': 'manage'}[entrada]
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+            env=ambiente(pasta), cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stderr
+
+    pacotes = {}
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        proprio, _acumulado, nome = linha[len('import time:'):].split('|')
+        raiz = nome.strip().split('.')[0]
+        pacotes[raiz] = pacotes.get(raiz, 0) + int(proprio) / 1000
+    return sorted(pacotes.items(), key=lambda item: item[1], reverse=True)[:quantidade]
+
+
+# PONTO DE ENTRADA
+# =====================================================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de inicialização (cold start)')
+    parser.add_argument('--entradas', default=','.join(ENTRADAS))
+    parser.add_argument('--caminho', default='/', help='Página da primeira requisição')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--modulos', type=int, default=10, help='Quantos módulos listar no importtime')
+    parser.add_argument('--filho', choices=ENTRADAS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        medir_filho(args.filho, args.caminho)
+        sys.exit(0)
+
+    print(f"Primeira requisição: GET {args.caminho} (mediana de {args.repeticoes} processos)\n")
+    print(f"{'entrada':<14}{'cenário':<17}{'processo':>11}{'importação':>12}{'primeira':>11}{'segunda':>10}")
+    for entrada in args.entradas.split(','):
+        for cenario, m in medir_cenarios(entrada, args.caminho, args.repeticoes).items():
+            print(f"{NOMES_ENTRADAS[entrada]:<14}{cenario:<17}{m['processo_ms']:>8.0f} ms"
+                  f"{m['importacao_ms']:>9.0f} ms{m['primeira_ms']:>8.0f} ms{m['segunda_ms']:>7.1f} ms")
+
+    for entrada in args.entradas.split(','):
+        print(f"\nMódulos mais pesados ao importar {NOMES_ENTRADAS[entrada]} (-X importtime):")
+        for pacote, ms in modulos_mais_pesados(entrada, args.modulos):
+            print(f"  {pacote:<24}{ms:>8.1f} ms")
@@ -0,0 +1,85 @@
+# mensagem_whatsapp.py - Microbenchmark da mensagem do pedido
+# Mede o custo de montar o link do WhatsApp de um pedido com 1, 50 e 500
+# itens diferentes no carrinho, comparando:
+# - anterior:   Concatenação com += e urllib.parse.quote na mensagem inteira
+# - modelos:    mensagens.MensagemWhatsApp sem limite de tamanho
+# - com limite: mensagens.MensagemWhatsApp com o limite padrão (itens cortados)
+#
+# Uso (na raiz do projeto):
+#     python benchmarks/mensagem_whatsapp.py
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import os
+import sys
+import timeit
+import urllib.parse
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from carrinho import Carrinho
+from mensagens import ConfigLoja, MensagemWhatsApp
+
+LOJA = ConfigLoja('ADEGA RÁDIO TATUAPÉ FM', '5511970603441', 'radiotatuapefm@gmail.com')
+PEDIDO = {'nome': 'José da Silva', 'telefone': '11999999999',
+          'endereco': 'Rua Dante Pellacani, 92 - Tatuapé', 'observacoes': ''}
+
+
+# IMPLEMENTAÇÃO ANTERIOR (REFERÊNCIA)
+# =====================================================
+def url_anterior(pedido_dados, carrinho):
+    mensagem = "🍷 *PEDIDO ADEGA RÁDIO TATUAPÉ FM* 🍷\n\n"
+    mensagem += f"👤 *Cliente:* {pedido_dados['nome']}\n"
+    mensagem += f"📞 *Telefone:* {pedido_dados['telefone']}\n"
+    mensagem += f"📍 *Endereço:* {pedido_dados['endereco']}\n"
+    mensagem += f"🕐 *Data/Hora:* {datetime.now().strftime('%d/%m/%Y às %H:%M')}\n\n"
+    mensagem += "🛒 *ITENS DO PEDIDO:*\n"
+    mensagem += "-" * 30 + "\n"
+    for item in carrinho:
+        mensagem += f"• {item.nome}\n"
+        mensagem += f"  Qtd: {item.quantidade} x R$ {item.preco:.2f}\n"
+        mensagem += f"  Subtotal: R$ {item.subtotal:.2f}\n\n"
+    mensagem += "-" * 30 + "\n"
+    mensagem += f"💰 *TOTAL: R$ {carrinho.total:.2f}*\n\n"
+    mensagem += "💳 *PAGAMENTO:*\n"
+    mensagem += "PIX: radiotatuapefm@gmail.com\n\n"
+    mensagem += "⚠️ *IMPORTANTE:*\n"
+    mensagem += "• Efetue o pagamento via PIX\n"
+    mensagem += "• Envie o comprovante para este número\n"
+    mensagem += "• A entrega será liberada após confirmação\n\n"
+    mensagem += "Obrigado pela preferência! 🙏"
+    return f"https://wa.me/5511970603441?text={urllib.parse.quote(mensagem)}"
+
+
+# BENCHMARK
+# =====================================================
+def montar_carrinho(linhas):
+    carrinho = Carrinho()
+    for numero in range(1, linhas + 1):
+        produto = SimpleNamespace(id=numero, nome=f'Cerveja Império Puro Malte {numero} 269ml',
+                                  preco=3.99 + numero % 7, imagem_url=None)
+        carrinho.adicionar(produto, 1 + numero % 3)
+    return carrinho
+
+
+def medir(funcao, repeticoes):
+    # min() de várias rodadas: a menos afetada por ruído do sistema
+    tempos = timeit.repeat(funcao, number=repeticoes, repeat=5)
+    return min(tempos) / repeticoes * 1e6
+
+
+if __name__ == '__main__':
+    sem_limite = MensagemWhatsApp(LOJA, limite=None)
+    com_limite = MensagemWhatsApp(LOJA)
+
+    print(f"{'linhas':>7}{'anterior':>14}{'modelos':>14}{'com limite':>14}{'tamanho link':>20}")
+    for linhas in (1, 50, 500):
+        carrinho = montar_carrinho(linhas)
+        repeticoes = max(20, 5000 // linhas)
+        anterior = medir(lambda: url_anterior(PEDIDO, carrinho), repeticoes)
+        modelos = medir(lambda: sem_limite.url(PEDIDO, carrinho), repeticoes)
+        limitado = medir(lambda: com_limite.url(PEDIDO, carrinho), repeticoes)
+        tamanhos = f"{len(sem_limite.url(PEDIDO, carrinho))} / {len(com_limite.url(PEDIDO, carrinho))}"
+        print(f"{linhas:>7}{anterior:>11.1f} µs{modelos:>11.1f} µs{limitado:>11.1f} µs{tamanhos:>20}")
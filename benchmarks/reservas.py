@@ -0,0 +1,210 @@
+# reservas.py - Benchmark das reservas de estoque (rajadas de "adicionar ao carrinho")
+# Simula uma promoção: muitos clientes clicam em "adicionar" no mesmo
+# produto ao mesmo tempo, com menos unidades em estoque do que pedidos.
+#
+# Cada rodada:
+# 1. O produto volta a ter --estoque unidades e nenhuma reserva
+# 2. --clientes threads (cada uma com seu carrinho) esperam em uma barreira
+#    e disparam juntas --cliques POST /adicionar_carrinho de 1 unidade
+# 3. Os carrinhos que conseguiram reservar finalizam o pedido
+#
+# Mede requisições/s e p50/p95/p99 dos cliques e confere, a cada rodada:
+# - reservado == soma das linhas de reserva_estoque == cliques aceitos
+# - aceitos == min(cliques, estoque) (ninguém reserva acima do estoque)
+# - depois dos pedidos: estoque vendido == aceitos e estoque >= 0
+#
+# Uso (na raiz do projeto):
+#     python benchmarks/reservas.py
+#     python benchmarks/reservas.py --clientes 32 --estoque 50 --rodadas 10
+#
+# Roda em um processo separado, com um banco novo em uma pasta temporária,
+# porque a configuração do banco é lida quando app.py é importado.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from carga import ClienteHTTP, DADOS_CLIENTE, percentil
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# RODADAS (PROCESSO FILHO)
+# =====================================================
+def preparar_rodada(app, db, Produto, produto_id, estoque):
+    """
+    Estoque cheio, sem reservas e sem pedidos anteriores do produto
+    """
+    with app.app_context():
+        db.session.execute(db.text('DELETE FROM reserva_estoque'))
+        db.session.execute(db.update(Produto).where(Produto.id == produto_id)
+                           .values(estoque=estoque, reservado=0, ativo=True))
+        db.session.commit()
+
+
+def estado(app, db, Produto, produto_id):
+    with app.app_context():
+        produto = db.session.execute(
+            db.select(Produto.estoque, Produto.reservado).where(Produto.id == produto_id)
+        ).one()
+        reservas = db.session.execute(
+            db.text('SELECT COALESCE(SUM(quantidade), 0) FROM reserva_estoque WHERE produto_id = :id'),
+            {'id': produto_id}
+        ).scalar()
+        return produto.estoque, produto.reservado, reservas
+
+
+def rodada(base_url, produto_id, clientes, cliques):
+    """
+    Dispara a rajada e finaliza os pedidos de quem conseguiu reservar
+
+    Returns:
+        Tupla (latências dos cliques, aceitos, recusados, erros, clientes com reserva)
+    """
+    barreira = threading.Barrier(clientes)
+    por_cliente = [None] * clientes
+
+    def trabalhar(numero):
+        cliente = ClienteHTTP(base_url)
+        latencias, aceitos, recusados, erros = [], 0, 0, 0
+        barreira.wait()
+        for _ in range(cliques):
+            inicio = time.perf_counter()
+            status = cliente.enviar('POST', '/adicionar_carrinho',
+                                    json={'produto_id': produto_id, 'quantidade': 1})
+            latencias.append(time.perf_counter() - inicio)
+            if status == 200:
+                aceitos += 1
+            elif status == 400:
+                recusados += 1
+            else:
+                erros += 1
+        por_cliente[numero] = (cliente, latencias, aceitos, recusados, erros)
+
+    threads = [threading.Thread(target=trabalhar, args=(n,)) for n in range(clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencias = [valor for _c, lista, _a, _r, _e in por_cliente for valor in lista]
+    aceitos = sum(a for _c, _l, a, _r, _e in por_cliente)
+    recusados = sum(r for _c, _l, _a, r, _e in por_cliente)
+    erros = sum(e for _c, _l, _a, _r, e in por_cliente)
+    compradores = [c for c, _l, a, _r, _e in por_cliente if a]
+    return latencias, aceitos, recusados, erros, compradores
+
+
+def executar_filho(args):
+    sys.path.insert(0, RAIZ)
+    from werkzeug.serving import make_server
+    from app import app, criar_app, db, init_db, Produto
+    criar_app(banco=None)  # PRAGMAs, instrumentação e fila; o init_db vem abaixo
+
+    with app.app_context():
+        init_db()
+        produto_id = db.session.execute(db.select(Produto.id).order_by(Produto.id)).scalars().first()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{servidor.server_port}'
+
+    latencias, aceitos, recusados, erros, falhas = [], 0, 0, 0, []
+    duracao = 0.0
+    try:
+        for numero in range(args.rodadas):
+            preparar_rodada(app, db, Produto, produto_id, args.estoque)
+            inicio = time.perf_counter()
+            lat, a, r, e, compradores = rodada(base_url, produto_id, args.clientes, args.cliques)
+            duracao += time.perf_counter() - inicio
+            latencias += lat
+            aceitos, recusados, erros = aceitos + a, recusados + r, erros + e
+
+            # Conferências da rodada
+            esperado = min(args.clientes * args.cliques, args.estoque)
+            estoque, reservado, soma_reservas = estado(app, db, Produto, produto_id)
+            if not (reservado == soma_reservas == a == esperado):
+                falhas.append(f'rodada {numero}: aceitos={a} reservado={reservado} '
+                              f'reservas={soma_reservas} esperado={esperado}')
+
+            for cliente in compradores:
+                cliente.enviar('POST', '/finalizar_pedido', form=DADOS_CLIENTE)
+            estoque, reservado, soma_reservas = estado(app, db, Produto, produto_id)
+            if estoque < 0 or args.estoque - estoque != a or reservado or soma_reservas:
+                falhas.append(f'rodada {numero}: após os pedidos estoque={estoque} '
+                              f'reservado={reservado} reservas={soma_reservas} aceitos={a}')
+    finally:
+        servidor.shutdown()
+
+    ordenados = sorted(latencias)
+    ms = lambda valor: round(valor * 1000, 3)
+    print(json.dumps({
+        'cliques': len(ordenados),
+        'aceitos': aceitos,
+        'recusados': recusados,
+        'erros': erros,
+        'req_s': round(len(ordenados) / duracao, 1) if duracao else None,
+        'p50_ms': ms(percentil(ordenados, 50)),
+        'p95_ms': ms(percentil(ordenados, 95)),
+        'p99_ms': ms(percentil(ordenados, 99)),
+        'falhas': falhas,
+    }))
+
+
+# EXECUÇÃO (PROCESSO PRINCIPAL)
+# =====================================================
+def executar(args):
+    with tempfile.TemporaryDirectory() as pasta:
+        env = dict(os.environ,
+                   DATABASE_URL=f"sqlite:///{os.path.join(pasta, 'adega.db')}",
+                   CARRINHO_BACKEND='memoria',
+                   FILA_PEDIDOS='0',
+                   INSTRUMENTACAO='0')
+        processo = subprocess.run(
+            [sys.executable, __file__, '--filho', '--clientes', str(args.clientes),
+             '--cliques', str(args.cliques), '--estoque', str(args.estoque),
+             '--rodadas', str(args.rodadas)],
+            env=env, cwd=RAIZ, stdout=subprocess.PIPE, text=True, check=True
+        )
+    # A última linha é o JSON (as anteriores são mensagens do init_db)
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+
+    print(f"{args.rodadas} rodadas: {args.clientes} clientes x {args.cliques} cliques, "
+          f"estoque {args.estoque}\n")
+    print(f"cliques {resultado['cliques']}  aceitos {resultado['aceitos']}  "
+          f"recusados {resultado['recusados']}  erros {resultado['erros']}")
+    print(f"{resultado['req_s']} req/s  p50 {resultado['p50_ms']} ms  "
+          f"p95 {resultado['p95_ms']} ms  p99 {resultado['p99_ms']} ms")
+    if resultado['falhas'] or resultado['erros']:
+        print('\nInconsistências encontradas:')
+        for falha in resultado['falhas']:
+            print(f'  {falha}')
+        return 1
+    print('\nSem venda acima do estoque; reservas e produto.reservado conferem')
+    return 0
+
+
+# PONTO DE ENTRADA
+# =====================================================
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark das reservas de estoque')
+    parser.add_argument('--clientes', type=int, default=16, help='Clientes simultâneos na rajada')
+    parser.add_argument('--cliques', type=int, default=4, help='Cliques em "adicionar" por cliente')
+    parser.add_argument('--estoque', type=int, default=20, help='Unidades do produto em cada rodada')
+    parser.add_argument('--rodadas', type=int, default=5)
+    parser.add_argument('--filho', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        executar_filho(args)
+        sys.exit(0)
+    sys.exit(executar(args))
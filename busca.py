@@ -0,0 +1,173 @@
+# busca.py - Busca de produtos por texto (SQLite FTS5)
+# FTS5 é o módulo de busca textual do SQLite: ele mantém um índice invertido
+# (palavra -> produtos que a contêm), então encontrar "gin apogee" entre
+# milhares de produtos não exige ler a tabela inteira.
+#
+# - Sem acentos: "cachaca" encontra "Cachaça" (tokenizer unicode61 com
+#   remove_diacritics)
+# - Por prefixo: "apo" encontra "Apogee" (cada palavra vira "apo"*)
+# - Ordenado por relevância: bm25(), com peso maior para o nome
+#
+# Se o SQLite não tiver FTS5 (ou o banco não for SQLite), a busca é feita
+# em memória sobre o snapshot do catálogo, com as mesmas regras.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import re
+import unicodedata
+
+# CONFIGURAÇÃO
+# =====================================================
+TABELA = 'produto_busca'
+
+# prefix='2 3': Índices extras para prefixos de 2 e 3 letras (acelera "ap"*)
+SQL_CRIAR = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} USING fts5("
+    " nome, descricao,"
+    " tokenize = 'unicode61 remove_diacritics 2',"
+    " prefix = '2 3')"
+)
+
+# bm25(tabela, peso_nome, peso_descricao): quanto menor, mais relevante
+PESO_NOME = 10.0
+PESO_DESCRICAO = 1.0
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+# Uma "palavra" da busca: letras e números (com ou sem acento)
+_PALAVRA = re.compile(r'\w+', re.UNICODE)
+
+
+# FUNÇÕES AUXILIARES
+# =====================================================
+def sem_acentos(texto):
+    """
+    Remove acentos e deixa em minúsculas ("Cachaça" -> "cachaca")
+
+    NFKD separa a letra do acento; os acentos (combining) são descartados
+    """
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def palavras(termo):
+    """
+    Quebra o texto digitado em palavras (no máximo 8)
+    """
+    return _PALAVRA.findall(termo or '')[:8]
+
+
+def expressao_fts(termo):
+    """
+    Monta a expressão MATCH do FTS5: cada palavra entre aspas e com *
+
+    Aspas impedem que o texto do cliente seja interpretado como operador
+    (AND, OR, NEAR...). Exemplo: 'gin apo' -> '"gin"* "apo"*'
+    """
+    return ' '.join(f'"{palavra}"*' for palavra in palavras(termo))
+
+
+def _eh_sqlite(conexao):
+    return conexao.dialect.name == 'sqlite'
+
+
+# ÍNDICE FTS5
+# =====================================================
+def garantir_indice(conexao):
+    """
+    Cria a tabela de busca se ela ainda não existir
+
+    Returns:
+        True se a tabela foi criada agora (precisa ser preenchida),
+        False se já existia, None se o banco não suporta FTS5
+    """
+    if not _eh_sqlite(conexao):
+        return None
+    existia = conexao.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABELA,)
+    ).first() is not None
+    if existia:
+        return False
+    try:
+        conexao.exec_driver_sql(SQL_CRIAR)
+    except Exception:
+        # "no such module: fts5": SQLite compilado sem FTS5
+        return None
+    return True
+
+
+def reconstruir_indice(conexao):
+    """
+    Preenche o índice com os produtos ativos (rowid = id do produto)
+
+    Roda na mesma transação da sincronização do catálogo (init_db), então
+    o índice nunca fica diferente da tabela produto
+    """
+    if garantir_indice(conexao) is None:
+        return 0
+    conexao.exec_driver_sql(f'DELETE FROM {TABELA}')
+    resultado = conexao.exec_driver_sql(
+        f'INSERT INTO {TABELA} (rowid, nome, descricao) '
+        'SELECT id, nome, descricao FROM produto WHERE ativo = 1'
+    )
+    # 'optimize': Junta os segmentos do índice em um só (buscas mais rápidas)
+    conexao.exec_driver_sql(f"INSERT INTO {TABELA} ({TABELA}) VALUES ('optimize')")
+    return resultado.rowcount
+
+
+# BUSCA
+# =====================================================
+def buscar_ids(conexao, termo, limite=LIMITE_PADRAO):
+    """
+    Busca no índice FTS5 e retorna os ids dos produtos, do mais relevante
+    para o menos relevante
+
+    Returns:
+        Lista de ids, ou None se o índice não estiver disponível
+    """
+    expressao = expressao_fts(termo)
+    if not expressao:
+        return []
+    if not _eh_sqlite(conexao):
+        return None
+    try:
+        linhas = conexao.exec_driver_sql(
+            f'SELECT rowid FROM {TABELA} WHERE {TABELA} MATCH ? '
+            f'ORDER BY bm25({TABELA}, ?, ?) LIMIT ?',
+            (expressao, PESO_NOME, PESO_DESCRICAO, limite)
+        )
+        return [linha[0] for linha in linhas]
+    except Exception:
+        # Tabela inexistente ou SQLite sem FTS5
+        return None
+
+
+def buscar_em_memoria(produtos, termo, limite=LIMITE_PADRAO):
+    """
+    Busca alternativa (sem FTS5) sobre a lista de produtos do snapshot
+
+    Mesmas regras: sem acentos, por prefixo, todas as palavras precisam
+    aparecer; produtos com as palavras no nome vêm primeiro
+    """
+    termos = [sem_acentos(p) for p in palavras(termo)]
+    if not termos:
+        return []
+
+    encontrados = []
+    for produto in produtos:
+        palavras_nome = _PALAVRA.findall(sem_acentos(produto.nome))
+        palavras_descricao = _PALAVRA.findall(sem_acentos(produto.descricao))
+        pontos = 0
+        for t in termos:
+            if any(p.startswith(t) for p in palavras_nome):
+                pontos += PESO_NOME
+            elif any(p.startswith(t) for p in palavras_descricao):
+                pontos += PESO_DESCRICAO
+            else:
+                break
+        else:
+            encontrados.append((-pontos, produto.id, produto))
+
+    encontrados.sort(key=lambda item: item[:2])
+    return [produto for _pontos, _id, produto in encontrados[:limite]]
@@ -0,0 +1,104 @@
+# cache_fragmentos.py - Cache de trechos de HTML já renderizados
+# A grade de produtos da página inicial é igual para todos os clientes:
+# depende apenas da versão do catálogo e da categoria escolhida. Em vez de
+# renderizar todos os cards (e formatar todos os preços) a cada requisição,
+# o HTML da grade é guardado e reutilizado.
+#
+# O que muda por cliente (como o contador do carrinho) fica fora do trecho
+# guardado, no template da página.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import threading
+from collections import OrderedDict
+
+
+# CACHE LRU LIMITADO POR TAMANHO
+# =====================================================
+class CacheFragmentos:
+    """
+    Guarda fragmentos de HTML com descarte LRU e limite de bytes
+
+    Conceitos:
+    - Chave: Tudo de que o fragmento depende (ex: versão do catálogo e
+      categoria). Quando o catálogo muda, a versão muda e as chaves antigas
+      deixam de ser usadas até serem descartadas
+    - LRU com limite de bytes: Fragmentos têm tamanhos muito diferentes,
+      então o limite é pela soma dos tamanhos, não pela quantidade
+    - ativo=False: Desliga o cache (útil em desenvolvimento, ao editar
+      os templates)
+
+    Args:
+        capacidade_bytes: Tamanho máximo somado dos fragmentos (UTF-8)
+        ativo: Se False, obter() sempre renderiza
+    """
+
+    def __init__(self, capacidade_bytes=8 * 1024 * 1024, ativo=True):
+        self.capacidade_bytes = capacidade_bytes
+        self.ativo = ativo
+        self._fragmentos = OrderedDict()
+        self._tamanho_total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.descartes = 0
+
+    def obter(self, chave, renderizar):
+        """
+        Retorna o fragmento da chave, renderizando-o se necessário
+
+        Args:
+            chave: Tupla com tudo de que o fragmento depende
+            renderizar: Função sem argumentos que devolve o HTML (str)
+        """
+        if not self.ativo:
+            return renderizar()
+
+        with self._lock:
+            item = self._fragmentos.get(chave)
+            if item is not None:
+                self._fragmentos.move_to_end(chave)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+
+        # Renderiza fora do lock: outras requisições não ficam esperando
+        html = renderizar()
+        tamanho = len(html.encode('utf-8'))
+        if tamanho > self.capacidade_bytes:
+            # Maior que o cache inteiro: não vale a pena guardar
+            return html
+
+        with self._lock:
+            anterior = self._fragmentos.pop(chave, None)
+            if anterior is not None:
+                self._tamanho_total -= anterior[1]
+            self._fragmentos[chave] = (html, tamanho)
+            self._tamanho_total += tamanho
+            while self._tamanho_total > self.capacidade_bytes:
+                _chave, (_html, tamanho_descartado) = self._fragmentos.popitem(last=False)
+                self._tamanho_total -= tamanho_descartado
+                self.descartes += 1
+        return html
+
+    def limpar(self):
+        """
+        Remove todos os fragmentos
+        """
+        with self._lock:
+            self._fragmentos.clear()
+            self._tamanho_total = 0
+
+    def estatisticas(self):
+        """
+        Contadores do cache (útil para monitoramento)
+        """
+        return {
+            'ativo': self.ativo,
+            'fragmentos': len(self._fragmentos),
+            'bytes': self._tamanho_total,
+            'capacidade_bytes': self.capacidade_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'descartes': self.descartes
+        }
@@ -0,0 +1,202 @@
+# carrinho.py - Modelo do carrinho de compras
+# O carrinho guarda os itens em um dicionário indexado por produto_id, então
+# adicionar, alterar e remover um produto não precisa percorrer a lista.
+# Os totais (valor e quantidade de itens) são atualizados a cada alteração,
+# em vez de recalculados a cada requisição.
+
+# ITEM DO CARRINHO
+# =====================================================
+class ItemCarrinho:
+    """
+    Um produto dentro do carrinho
+
+    Conceitos:
+    - __slots__: Define os atributos fixos do objeto; economiza memória
+      e deixa o acesso aos atributos mais rápido que em um dicionário
+    - Centavos: O preço é guardado também em centavos (inteiro), para que
+      os totais acumulados não sofram erros de arredondamento de float
+    """
+
+    __slots__ = ('produto_id', 'nome', 'preco', 'quantidade', 'imagem_url', 'preco_centavos')
+
+    def __init__(self, produto_id, nome, preco, quantidade, imagem_url=None):
+        self.produto_id = produto_id
+        self.nome = nome
+        self.preco = float(preco)
+        self.quantidade = quantidade
+        self.imagem_url = imagem_url
+        self.preco_centavos = round(self.preco * 100)
+
+    @property
+    def subtotal(self):
+        """
+        Subtotal do item (quantidade × preço)
+        """
+        return self.quantidade * self.preco_centavos / 100
+
+    def __repr__(self):
+        return f'<ItemCarrinho {self.nome} x{self.quantidade}>'
+
+
+# CARRINHO
+# =====================================================
+class Carrinho:
+    """
+    Carrinho de compras com itens indexados por produto_id
+
+    Atributos:
+        total_itens: Soma das quantidades (atualizada a cada alteração)
+        total: Valor total em reais (atualizado a cada alteração)
+
+    Uso nos templates:
+        {% for item in carrinho %} ... {{ item.subtotal|currency }}
+        {{ carrinho|length }} itens diferentes, {{ carrinho.total_itens }} unidades
+    """
+
+    __slots__ = ('_itens', '_total_centavos', 'total_itens')
+
+    def __init__(self):
+        self._itens = {}
+        self._total_centavos = 0
+        self.total_itens = 0
+
+    @classmethod
+    def de_compacto(cls, itens, catalogo_por_id):
+        """
+        Reconstrói o carrinho a partir do formato compacto {produto_id: quantidade}
+
+        Nome, preço e imagem vêm do catálogo; produtos que não estão mais
+        no catálogo são descartados
+
+        Args:
+            itens: Dicionário {produto_id: quantidade} vindo do store
+            catalogo_por_id: Dicionário id -> produto do snapshot do catálogo
+        """
+        carrinho = cls()
+        for produto_id, quantidade in itens.items():
+            produto = catalogo_por_id.get(produto_id)
+            if produto is not None and quantidade > 0:
+                carrinho.adicionar(produto, quantidade)
+        return carrinho
+
+    def to_compacto(self):
+        """
+        Formato compacto para o store: {produto_id: quantidade}
+        """
+        return {produto_id: item.quantidade for produto_id, item in self._itens.items()}
+
+    def to_dict(self):
+        """
+        Estado do carrinho para respostas JSON
+        """
+        return {
+            'itens': {
+                str(produto_id): {'quantidade': item.quantidade, 'subtotal': item.subtotal}
+                for produto_id, item in self._itens.items()
+            },
+            'total': self.total,
+            'total_itens': self.total_itens
+        }
+
+    # OPERAÇÕES (todas O(1))
+    # =================================================
+    def adicionar(self, produto, quantidade=1):
+        """
+        Adiciona um produto (ou soma à quantidade, se já estiver no carrinho)
+
+        Args:
+            produto: Objeto com id, nome, preco e imagem_url
+            quantidade: Quantidade a adicionar
+        """
+        item = self._itens.get(produto.id)
+        if item is None:
+            item = ItemCarrinho(produto.id, produto.nome, produto.preco, 0, produto.imagem_url)
+            self._itens[produto.id] = item
+        self._alterar(item, item.quantidade + quantidade)
+        return item
+
+    def definir_quantidade(self, produto_id, quantidade):
+        """
+        Define a quantidade de um produto que já está no carrinho
+
+        Returns:
+            True se o produto estava no carrinho, False caso contrário
+        """
+        item = self._itens.get(produto_id)
+        if item is None:
+            return False
+        if quantidade <= 0:
+            self.remover(produto_id)
+        else:
+            self._alterar(item, quantidade)
+        return True
+
+    def remover(self, produto_id):
+        """
+        Remove um produto do carrinho (se estiver nele)
+        """
+        item = self._itens.pop(produto_id, None)
+        if item is not None:
+            self._total_centavos -= item.quantidade * item.preco_centavos
+            self.total_itens -= item.quantidade
+        return item
+
+    def limpar(self):
+        """
+        Esvazia o carrinho
+        """
+        self._itens.clear()
+        self._total_centavos = 0
+        self.total_itens = 0
+
+    def _alterar(self, item, quantidade):
+        """
+        Altera a quantidade de um item atualizando os totais pela diferença
+        """
+        diferenca = quantidade - item.quantidade
+        item.quantidade = quantidade
+        self._total_centavos += diferenca * item.preco_centavos
+        self.total_itens += diferenca
+
+    # CONSULTAS
+    # =================================================
+    @property
+    def total(self):
+        """
+        Valor total do carrinho em reais
+        """
+        return self._total_centavos / 100
+
+    def get(self, produto_id):
+        """
+        Retorna o item do produto (ou None se não estiver no carrinho)
+        """
+        return self._itens.get(produto_id)
+
+    def copia(self):
+        """
+        Cria uma cópia independente (para alterações que podem ser descartadas)
+        """
+        novo = Carrinho()
+        for item in self._itens.values():
+            novo._itens[item.produto_id] = ItemCarrinho(
+                item.produto_id, item.nome, item.preco, item.quantidade, item.imagem_url
+            )
+        novo._total_centavos = self._total_centavos
+        novo.total_itens = self.total_itens
+        return novo
+
+    def __contains__(self, produto_id):
+        return produto_id in self._itens
+
+    def __iter__(self):
+        return iter(self._itens.values())
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __bool__(self):
+        return bool(self._itens)
+
+    def __repr__(self):
+        return f'<Carrinho itens={self.total_itens} total={self.total:.2f}>'
@@ -0,0 +1,207 @@
+# carrinho_store.py - Armazenamento do carrinho no servidor
+# Em vez de guardar o carrinho inteiro (nome, preço, imagem...) no cookie de
+# sessão, guardamos apenas {produto_id: quantidade} em um "store" no servidor.
+# O cookie passa a carregar somente o ID do carrinho.
+#
+# Backends disponíveis (variável de ambiente CARRINHO_BACKEND):
+# - memoria: Dicionário em memória com descarte LRU (rápido, por processo)
+# - sqlite:  Arquivo SQLite local (sobrevive a reinícios do processo)
+# - sessao:  Itens compactos no próprio cookie (para deploys com várias
+#            instâncias sem armazenamento compartilhado, como a Vercel)
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# FUNÇÕES AUXILIARES
+# =====================================================
+def _normalizar_itens(itens):
+    """
+    Converte as chaves para int (JSON só aceita chaves string)
+    e descarta quantidades inválidas
+    """
+    return {int(produto_id): int(qtd) for produto_id, qtd in (itens or {}).items() if int(qtd) > 0}
+
+
+# INTERFACE DOS STORES
+# =====================================================
+class CarrinhoStore:
+    """
+    Interface comum a todos os backends de carrinho
+
+    Conceitos:
+    - Classe base: Define os métodos que todo backend precisa implementar
+    - Polimorfismo: O app usa qualquer backend da mesma forma
+    """
+
+    def carregar(self, carrinho_id):
+        """Retorna {produto_id: quantidade} (vazio se o carrinho não existir)"""
+        raise NotImplementedError
+
+    def salvar(self, carrinho_id, itens):
+        """Grava {produto_id: quantidade}"""
+        raise NotImplementedError
+
+    def remover(self, carrinho_id):
+        """Apaga o carrinho"""
+        raise NotImplementedError
+
+    def limpar_expirados(self):
+        """
+        Apaga carrinhos abandonados e retorna quantos foram removidos
+
+        Chamado periodicamente pela thread de limpeza (veja app.py); os
+        backends sem expiração (memória com LRU, cookie) não fazem nada
+        """
+        return 0
+
+
+# BACKEND: SESSÃO (COOKIE)
+# =====================================================
+class SessaoCarrinhoStore(CarrinhoStore):
+    """
+    Guarda os itens compactos no cookie de sessão do Flask
+
+    O cookie fica bem menor que antes (apenas ids e quantidades),
+    mas continua crescendo com o número de produtos diferentes
+    """
+
+    CHAVE = 'carrinho_itens'
+
+    def carregar(self, carrinho_id):
+        from flask import session
+        return _normalizar_itens(session.get(self.CHAVE))
+
+    def salvar(self, carrinho_id, itens):
+        from flask import session
+        session[self.CHAVE] = {str(produto_id): qtd for produto_id, qtd in itens.items()}
+
+    def remover(self, carrinho_id):
+        from flask import session
+        session.pop(self.CHAVE, None)
+
+
+# BACKEND: MEMÓRIA COM LRU
+# =====================================================
+class MemoriaCarrinhoStore(CarrinhoStore):
+    """
+    Guarda os carrinhos em memória, descartando os menos usados
+
+    Conceitos:
+    - LRU (Least Recently Used): Quando atinge a capacidade, remove o
+      carrinho que está há mais tempo sem ser acessado
+    - OrderedDict.move_to_end(): Marca o carrinho como usado recentemente
+    """
+
+    def __init__(self, capacidade=10000):
+        self.capacidade = capacidade
+        self._carrinhos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def carregar(self, carrinho_id):
+        with self._lock:
+            itens = self._carrinhos.get(carrinho_id)
+            if itens is None:
+                return {}
+            self._carrinhos.move_to_end(carrinho_id)
+            return dict(itens)
+
+    def salvar(self, carrinho_id, itens):
+        with self._lock:
+            self._carrinhos[carrinho_id] = dict(itens)
+            self._carrinhos.move_to_end(carrinho_id)
+            while len(self._carrinhos) > self.capacidade:
+                self._carrinhos.popitem(last=False)
+
+    def remover(self, carrinho_id):
+        with self._lock:
+            self._carrinhos.pop(carrinho_id, None)
+
+    def __len__(self):
+        return len(self._carrinhos)
+
+
+# BACKEND: SQLITE
+# =====================================================
+class SQLiteCarrinhoStore(CarrinhoStore):
+    """
+    Guarda os carrinhos em um arquivo SQLite separado do banco principal
+
+    Conceitos:
+    - threading.local(): Cada thread tem sua própria conexão SQLite
+    - INSERT ... ON CONFLICT: "Upsert" (insere ou atualiza) em um comando
+    - expiracao: Carrinhos sem uso há mais tempo que isso são apagados
+    """
+
+    def __init__(self, caminho, expiracao=7 * 24 * 3600):
+        self.caminho = caminho
+        self.expiracao = expiracao
+        self._local = threading.local()
+        with self._conexao() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS carrinho ('
+                ' id TEXT PRIMARY KEY,'
+                ' itens TEXT NOT NULL,'
+                ' atualizado_em REAL NOT NULL)'
+            )
+
+    def _conexao(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def carregar(self, carrinho_id):
+        linha = self._conexao().execute(
+            'SELECT itens FROM carrinho WHERE id = ?', (carrinho_id,)
+        ).fetchone()
+        return _normalizar_itens(json.loads(linha[0])) if linha else {}
+
+    def salvar(self, carrinho_id, itens):
+        with self._conexao() as conn:
+            conn.execute(
+                'INSERT INTO carrinho (id, itens, atualizado_em) VALUES (?, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET itens = excluded.itens, atualizado_em = excluded.atualizado_em',
+                (carrinho_id, json.dumps(itens, separators=(',', ':')), time.time())
+            )
+
+    def remover(self, carrinho_id):
+        with self._conexao() as conn:
+            conn.execute('DELETE FROM carrinho WHERE id = ?', (carrinho_id,))
+
+    def limpar_expirados(self):
+        """
+        Apaga carrinhos abandonados e retorna quantos foram removidos
+        """
+        with self._conexao() as conn:
+            cursor = conn.execute(
+                'DELETE FROM carrinho WHERE atualizado_em < ?',
+                (time.time() - self.expiracao,)
+            )
+            return cursor.rowcount
+
+
+# FÁBRICA DE STORES
+# =====================================================
+def criar_store(backend, caminho_sqlite=None, capacidade=10000):
+    """
+    Cria o store do carrinho a partir do nome do backend
+
+    Args:
+        backend: 'memoria', 'sqlite' ou 'sessao'
+        caminho_sqlite: Arquivo usado pelo backend 'sqlite'
+        capacidade: Número máximo de carrinhos do backend 'memoria'
+    """
+    if backend == 'memoria':
+        return MemoriaCarrinhoStore(capacidade=capacidade)
+    if backend == 'sqlite':
+        return SQLiteCarrinhoStore(caminho_sqlite)
+    if backend == 'sessao':
+        return SessaoCarrinhoStore()
+    raise ValueError(f"Backend de carrinho desconhecido: {backend}")
@@ -0,0 +1,386 @@
+# catalogo.py - Snapshot do catálogo em memória
+# Este módulo guarda uma "fotografia" (snapshot) somente leitura do catálogo
+# de produtos ativos, para que as páginas do catálogo não consultem o banco
+# a cada requisição.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from datetime import datetime, timezone
+
+from facetas import IndiceFacetas
+
+
+# REGISTRO COMPACTO DE PRODUTO
+# =====================================================
+class ProdutoCatalogo(NamedTuple):
+    """
+    Registro imutável de um produto do catálogo
+
+    Conceitos:
+    - NamedTuple: Tupla com campos nomeados (produto.nome, produto.preco...)
+    - Imutável: Não pode ser alterado depois de criado, então pode ser
+      compartilhado entre requisições (e threads) sem cópias
+    - Compacto: Ocupa bem menos memória que um objeto do SQLAlchemy
+    """
+    id: int
+    nome: str
+    descricao: Optional[str]
+    preco: float
+    categoria: str
+    imagem_url: Optional[str]
+    estoque: int
+    data_criacao: Optional[datetime]
+
+    def to_dict(self):
+        """
+        Mesmo formato de Produto.to_dict(), útil para APIs e JSON
+        """
+        return {
+            'id': self.id,
+            'nome': self.nome,
+            'descricao': self.descricao,
+            'preco': self.preco,
+            'categoria': self.categoria,
+            'imagem_url': self.imagem_url,
+            'estoque': self.estoque,
+            'ativo': True
+        }
+
+
+# SNAPSHOT DO CATÁLOGO
+# =====================================================
+# Quantos resultados derivados (respostas JSON já serializadas etc.)
+# cada snapshot guarda; os menos usados são descartados
+MEMO_CAPACIDADE = 256
+
+
+class CatalogoSnapshot:
+    """
+    Fotografia somente leitura do catálogo em uma determinada versão
+
+    Atributos:
+        versao: Identificador da versão do catálogo (muda a cada sincronização)
+        produtos: Tupla com todos os produtos ativos, ordenados por id
+        por_id: Dicionário (somente leitura) id -> produto
+        por_categoria: Dicionário (somente leitura) categoria -> tupla de produtos
+        categorias: Tupla com as categorias existentes, em ordem alfabética
+        atualizado_em: Data (UTC, sem frações de segundo) da última
+                       alteração do catálogo; igual em todas as instâncias
+                       com o mesmo banco, usada no Last-Modified e no
+                       lastmod do sitemap
+        construido_em: Momento (UTC, sem frações de segundo) em que o
+                       snapshot foi montado neste processo
+    """
+
+    __slots__ = ('versao', 'produtos', 'por_id', 'por_categoria', 'categorias',
+                 'atualizado_em', 'construido_em', '_memo', '_memo_lock')
+
+    def __init__(self, versao, produtos, atualizado_em=None):
+        produtos = tuple(sorted(produtos, key=lambda p: p.id))
+
+        agrupados = {}
+        for produto in produtos:
+            agrupados.setdefault(produto.categoria, []).append(produto)
+
+        self.versao = versao
+        self.produtos = produtos
+        # MappingProxyType: "vista" somente leitura de um dicionário
+        self.por_id = MappingProxyType({p.id: p for p in produtos})
+        self.por_categoria = MappingProxyType(
+            {categoria: tuple(itens) for categoria, itens in agrupados.items()}
+        )
+        self.categorias = tuple(sorted(agrupados))
+        self.construido_em = datetime.now(timezone.utc).replace(microsecond=0)
+        self.atualizado_em = atualizado_em or self.construido_em
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+    def filtrar(self, categoria=None):
+        """
+        Retorna os produtos ativos, opcionalmente filtrados por categoria
+        """
+        if categoria:
+            return self.por_categoria.get(categoria, ())
+        return self.produtos
+
+    def facetas(self, esgotados=None):
+        """
+        Contagens e faixas de preço por categoria, e filtros de
+        preço/estoque (veja facetas.py)
+
+        Args:
+            esgotados: Ids dos produtos sem estoque livre agora (veja
+                       EstadoEstoque); None usa o estoque do snapshot
+
+        O índice é montado uma vez por conjunto de esgotados: só muda
+        quando algum produto esgota ou volta a ter estoque, não a cada venda
+        """
+        return self.memo(('facetas', esgotados),
+                         lambda: IndiceFacetas(self.produtos, esgotados))
+
+    def memo(self, chave, calcular):
+        """
+        Calcula um resultado derivado do catálogo uma única vez por versão
+
+        Como o snapshot nunca muda, qualquer coisa calculada a partir dele
+        (ex: o JSON de uma página da API) vale enquanto ele for o atual;
+        quando o catálogo é sincronizado, o snapshot novo começa vazio
+
+        Args:
+            chave: Identifica o resultado (precisa ser "hashable", ex: tupla)
+            calcular: Função sem argumentos chamada só na primeira vez
+        """
+        with self._memo_lock:
+            if chave in self._memo:
+                self._memo.move_to_end(chave)
+                return self._memo[chave]
+
+        valor = calcular()
+
+        with self._memo_lock:
+            self._memo[chave] = valor
+            while len(self._memo) > MEMO_CAPACIDADE:
+                self._memo.popitem(last=False)
+        return valor
+
+    def __len__(self):
+        return len(self.produtos)
+
+    def __repr__(self):
+        return f'<CatalogoSnapshot versao={self.versao} produtos={len(self.produtos)}>'
+
+
+# ESTOQUE LIVRE
+# =====================================================
+class EstadoEstoque:
+    """
+    Estoque livre (estoque - reservado) dos produtos em um momento
+
+    Imutável, como o snapshot: a requisição usa o mesmo estado do começo
+    ao fim, mesmo que outra thread venda um produto no meio dela
+
+    Atributos:
+        valores: Dicionário (somente leitura) id -> unidades livres
+        esgotados: frozenset com os ids sem unidades livres
+        alterado_em: Momento (UTC, sem frações de segundo) em que algum
+                     valor mudou pela última vez; usado no Last-Modified
+    """
+
+    __slots__ = ('valores', 'esgotados', 'alterado_em')
+
+    def __init__(self, valores, alterado_em):
+        self.valores = MappingProxyType(valores)
+        self.esgotados = frozenset(i for i, livre in valores.items() if livre <= 0)
+        self.alterado_em = alterado_em
+
+    def de(self, produtos):
+        """
+        Tupla com o estoque livre de cada produto, na mesma ordem
+
+        Entra nas chaves de cache (grade de produtos, páginas da API): uma
+        venda só invalida o que mostra o produto vendido
+        """
+        return tuple(self.valores.get(p.id, p.estoque) for p in produtos)
+
+    def aplicar_um(self, produto):
+        """
+        O produto do snapshot com o estoque livre atual
+        """
+        livre = self.valores.get(produto.id, produto.estoque)
+        # _replace(): Cria uma tupla nova só quando o valor mudou
+        return produto if livre == produto.estoque else produto._replace(estoque=livre)
+
+    def aplicar(self, produtos):
+        """
+        Tupla com os produtos do snapshot com o estoque livre atual
+        """
+        return tuple(self.aplicar_um(produto) for produto in produtos)
+
+
+class EstoqueCatalogo:
+    """
+    Mantém o estoque livre dos produtos fora do snapshot do catálogo
+
+    Conceitos:
+    - O snapshot (nome, preço, categoria...) só muda quando o catálogo é
+      sincronizado; o estoque muda a cada venda e reserva. Com o estoque à
+      parte, uma venda não descarta o snapshot nem o que foi calculado a
+      partir dele (grade em cache, respostas da API, facetas, sitemap)
+    - Atualização seletiva: quem grava estoque ou reservas chama
+      marcar(ids), e a próxima leitura relê só esses produtos (pela
+      chave primária)
+    - Validade: A cada `validade` segundos o estoque de todos os produtos é
+      relido, para acompanhar as vendas feitas por outros processos
+      (workers do gunicorn, outras instâncias), que não chamam marcar()
+    """
+
+    def __init__(self, validade=5.0):
+        self.validade = validade
+        self._estado = None
+        self._lido_em = 0.0
+        self._marcados = set()
+        self._reler_tudo = True
+        # _marcas_lock protege as marcações (rápido, usado por quem grava);
+        # _lock garante que só uma thread relê o banco por vez
+        self._marcas_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.leituras_completas = 0
+        self.leituras_parciais = 0
+
+    def _atual(self):
+        """
+        O estado guardado, se ainda vale (None se precisa reler algo)
+        """
+        if self._marcados or self._reler_tudo:
+            return None
+        if time.monotonic() - self._lido_em >= self.validade:
+            return None
+        return self._estado
+
+    def obter(self, ler):
+        """
+        Retorna o estado atual do estoque, relendo o que for necessário
+
+        Args:
+            ler: Função ler(ids) que devolve {id: unidades livres} lendo o
+                 banco; ids=None lê todos os produtos ativos
+        """
+        estado = self._atual()
+        if estado is not None:
+            return estado
+
+        with self._lock:
+            # Outra thread pode ter relido enquanto esperávamos o lock
+            estado = self._atual()
+            if estado is not None:
+                return estado
+
+            # As marcações são retiradas antes da leitura: o que for gravado
+            # depois dela marca de novo e é relido na próxima vez
+            with self._marcas_lock:
+                vencido = time.monotonic() - self._lido_em >= self.validade
+                reler_tudo = self._estado is None or self._reler_tudo or vencido
+                ids = set(self._marcados)
+                self._marcados.clear()
+                self._reler_tudo = False
+
+            agora = time.monotonic()
+            if reler_tudo:
+                self.leituras_completas += 1
+                valores = ler(None)
+            else:
+                self.leituras_parciais += 1
+                valores = dict(self._estado.valores)
+                for produto_id in ids:
+                    valores.pop(produto_id, None)
+                valores.update(ler(ids))
+
+            anterior = self._estado
+            if anterior is not None and valores == anterior.valores:
+                alterado_em = anterior.alterado_em
+            else:
+                alterado_em = datetime.now(timezone.utc).replace(microsecond=0)
+            self._estado = EstadoEstoque(valores, alterado_em)
+            if reler_tudo:
+                self._lido_em = agora
+            return self._estado
+
+    def marcar(self, ids):
+        """
+        Marca produtos cujo estoque ou reservas mudaram (chamar depois do commit)
+        """
+        with self._marcas_lock:
+            self._marcados.update(ids)
+
+    def invalidar(self):
+        """
+        Faz a próxima leitura reler o estoque de todos os produtos
+        """
+        with self._marcas_lock:
+            self._reler_tudo = True
+
+    def estatisticas(self):
+        """
+        Retorna contadores das leituras (útil para monitoramento)
+        """
+        estado = self._estado
+        return {
+            'esgotados': len(estado.esgotados) if estado else 0,
+            'leituras_completas': self.leituras_completas,
+            'leituras_parciais': self.leituras_parciais,
+        }
+
+
+# CACHE DO CATÁLOGO
+# =====================================================
+class CacheCatalogo:
+    """
+    Mantém o snapshot atual do catálogo e conta acertos/falhas
+
+    Conceitos:
+    - Cache: Guarda um resultado caro de calcular para reutilizar depois
+    - Invalidação explícita: init_db() avisa o cache quando o catálogo muda,
+      e só então o próximo acesso reconstrói o snapshot
+    - Lock: Garante que só uma thread reconstrói o snapshot por vez
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._geracao = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obter(self, construtor):
+        """
+        Retorna o snapshot atual, construindo-o se necessário
+
+        Args:
+            construtor: Função sem argumentos que devolve
+                        (versao, produtos, atualizado_em) lendo o catálogo
+                        do banco de dados
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            # Outra thread pode ter reconstruído enquanto esperávamos o lock
+            if self._snapshot is not None:
+                self.hits += 1
+                return self._snapshot
+
+            self.misses += 1
+            geracao = self._geracao
+            snapshot = CatalogoSnapshot(*construtor())
+            # Só publica se ninguém invalidou o cache durante a construção
+            if geracao == self._geracao:
+                self._snapshot = snapshot
+            return snapshot
+
+    def invalidar(self):
+        """
+        Descarta o snapshot atual (chamado quando init_db sincroniza o catálogo)
+        """
+        with self._lock:
+            self._geracao += 1
+            self._snapshot = None
+
+    def estatisticas(self):
+        """
+        Retorna contadores do cache (útil para monitoramento)
+        """
+        snapshot = self._snapshot
+        return {
+            'versao': snapshot.versao if snapshot else None,
+            'produtos': len(snapshot) if snapshot else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidacoes': self._geracao
+        }
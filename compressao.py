@@ -0,0 +1,184 @@
+# compressao.py - Compressão gzip das respostas geradas pela aplicação
+# As páginas HTML (principalmente a inicial, com a grade de produtos) e as
+# respostas JSON saíam sem compressão: o tamanho cresce junto com o
+# catálogo, e HTML repetitivo como os cards dos produtos comprime muito bem
+# (tipicamente para 10-20% do original).
+#
+# O que é comprimido:
+# - Só se o navegador aceitar gzip (cabeçalho Accept-Encoding)
+# - Só tipos de texto (HTML, CSS, JS, JSON, XML, SVG); imagens já vêm
+#   comprimidas no próprio formato
+# - Só respostas com pelo menos COMPRESSAO_MIN_BYTES: em respostas pequenas
+#   o cabeçalho do gzip e o tempo de CPU não compensam
+# - Nunca o que já tem Content-Encoding (os pacotes pré-comprimidos de
+#   assets.py) nem arquivos servidos direto do disco
+#
+# Respostas em streaming (veja agrupar() e a rota index com
+# INDEX_STREAMING=1) são comprimidas pedaço a pedaço: cada pedaço é
+# enviado assim que fica pronto, sem esperar o fim da página.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import threading
+import zlib
+
+# CONFIGURAÇÃO
+# =====================================================
+# Tipos que valem a pena comprimir (além de qualquer text/*)
+TIPOS_COMPRIMIVEIS = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/manifest+json',
+    'image/svg+xml',
+}
+
+# Tamanho padrão dos pedaços enviados em streaming
+PEDACO_STREAMING = 8 * 1024
+
+
+# STREAMING
+# =====================================================
+def agrupar(pedacos, tamanho=PEDACO_STREAMING):
+    """
+    Junta os pedaços de um template em streaming em blocos de ~`tamanho`
+
+    Conceitos:
+    - O Jinja2 em streaming devolve pedaços muito pequenos (cada trecho de
+      texto entre duas tags); enviar cada um como um pedaço HTTP (e, com
+      gzip, forçar um flush para cada um) desperdiçaria bytes e chamadas
+    - O primeiro bloco sai assim que atinge o tamanho: o cabeçalho da
+      página chega ao navegador antes de a grade terminar de renderizar
+
+    Args:
+        pedacos: Iterável de str (ex: flask.stream_template)
+        tamanho: Quantidade de caracteres acumulada antes de enviar
+    """
+    buffer = []
+    acumulado = 0
+    for pedaco in pedacos:
+        buffer.append(pedaco)
+        acumulado += len(pedaco)
+        if acumulado >= tamanho:
+            yield ''.join(buffer)
+            buffer = []
+            acumulado = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _gzip_em_pedacos(pedacos, nivel, fechar=None):
+    """
+    Comprime um iterável de bytes sem juntar tudo na memória
+
+    Z_SYNC_FLUSH ao fim de cada pedaço: o que já foi comprimido é enviado
+    na hora, e o navegador consegue descomprimir e mostrar o começo da
+    página enquanto o resto ainda está sendo gerado
+    """
+    # wbits=31: formato gzip (16) com janela máxima (15)
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    try:
+        for pedaco in pedacos:
+            if pedaco:
+                yield compressor.compress(pedaco) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        if fechar is not None:
+            fechar()
+
+
+# INTEGRAÇÃO COM O FLASK
+# =====================================================
+class Compressao:
+    """
+    Comprime com gzip as respostas da aplicação (hook after_request)
+
+    Conceitos:
+    - Accept-Encoding / Content-Encoding: O navegador diz quais
+      compressões aceita; a resposta diz qual foi usada
+    - Vary: Accept-Encoding: Avisa caches intermediários que a mesma URL
+      tem versões diferentes conforme esse cabeçalho
+    - Nível (1-9): Mais alto comprime um pouco mais, mas gasta mais CPU;
+      6 é o padrão do gzip e um bom meio-termo para HTML gerado na hora
+    - ETag: O corpo comprimido não é byte a byte igual ao original, então
+      a ETag vira fraca (W/"..."); requisições condicionais continuam
+      funcionando, porque a comparação do If-None-Match é fraca
+
+    Args:
+        nivel: Nível de compressão do zlib (1 a 9)
+        minimo_bytes: Respostas menores que isso saem sem compressão
+    """
+
+    def __init__(self, nivel=6, minimo_bytes=500):
+        self.nivel = nivel
+        self.minimo_bytes = minimo_bytes
+        self.comprimidas = 0
+        self.bytes_antes = 0
+        self.bytes_depois = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.nivel = app.config.get('COMPRESSAO_NIVEL', self.nivel)
+        self.minimo_bytes = app.config.get('COMPRESSAO_MIN_BYTES', self.minimo_bytes)
+        app.after_request(self.comprimir)
+
+    def _deve_comprimir(self, resposta, request):
+        if resposta.status_code != 200 or resposta.direct_passthrough:
+            return False
+        if 'Content-Encoding' in resposta.headers:
+            return False
+        if 'no-transform' in resposta.headers.get('Cache-Control', ''):
+            return False
+        tipo = resposta.mimetype or ''
+        if not (tipo.startswith('text/') or tipo in TIPOS_COMPRIMIVEIS):
+            return False
+        if not request.accept_encodings['gzip']:
+            return False
+        return True
+
+    def comprimir(self, resposta):
+        """
+        Hook after_request: troca o corpo pela versão gzip quando vale a pena
+        """
+        from flask import request
+
+        if not self._deve_comprimir(resposta, request):
+            return resposta
+
+        if resposta.is_streamed:
+            # Tamanho desconhecido: comprime pedaço a pedaço, sem Content-Length
+            original = resposta.response
+            resposta.response = _gzip_em_pedacos(
+                resposta.iter_encoded(), self.nivel, getattr(original, 'close', None)
+            )
+            resposta.headers.pop('Content-Length', None)
+        else:
+            dados = resposta.get_data()
+            if len(dados) < self.minimo_bytes:
+                return resposta
+            compressor = zlib.compressobj(self.nivel, zlib.DEFLATED, 31)
+            comprimido = compressor.compress(dados) + compressor.flush()
+            resposta.set_data(comprimido)
+            with self._lock:
+                self.comprimidas += 1
+                self.bytes_antes += len(dados)
+                self.bytes_depois += len(comprimido)
+
+        resposta.headers['Content-Encoding'] = 'gzip'
+        resposta.vary.add('Accept-Encoding')
+        etag, fraca = resposta.get_etag()
+        if etag and not fraca:
+            resposta.set_etag(etag, weak=True)
+        return resposta
+
+    def estatisticas(self):
+        """
+        Contadores das respostas comprimidas (sem contar as em streaming)
+        """
+        return {
+            'nivel': self.nivel,
+            'minimo_bytes': self.minimo_bytes,
+            'comprimidas': self.comprimidas,
+            'bytes_antes': self.bytes_antes,
+            'bytes_depois': self.bytes_depois,
+        }
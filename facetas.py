@@ -0,0 +1,199 @@
+# facetas.py - Categorias, contagens e faixas de preço do catálogo
+# O menu de categorias era uma lista fixa nos templates: não mostrava
+# categorias novas do data/produtos.json (whisky, gin, vodka...) e mostrava
+# categorias que podiam estar vazias. Contar os produtos de cada categoria
+# exigiria uma consulta por categoria a cada página.
+#
+# O índice de facetas é montado uma vez por versão do catálogo e conjunto de
+# produtos esgotados (veja CatalogoSnapshot.facetas em catalogo.py) e guarda:
+# - Para cada categoria: quantidade de produtos ativos, quantos têm
+#   estoque e os preços mínimo e máximo
+# - Para cada categoria (e para o catálogo todo), com e sem o filtro de
+#   estoque: os produtos ordenados por preço e a lista dos preços, usada
+#   pelo bisect para responder filtros de faixa de preço sem percorrer
+#   todos os produtos
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import bisect
+from operator import attrgetter
+from typing import NamedTuple
+
+# CONFIGURAÇÃO
+# =====================================================
+# Categoria -> (ícone, rótulo) exibidos no menu e nos filtros
+# Categorias que não estão aqui aparecem com o nome formatado
+ROTULOS = {
+    'cerveja': ('🍺', 'Cervejas'),
+    'vinho': ('🍷', 'Vinhos'),
+    'whisky': ('🥃', 'Whiskies'),
+    'vodka': ('🍸', 'Vodkas'),
+    'gin': ('🍸', 'Gins'),
+    'destilados': ('🥃', 'Destilados'),
+    'refrigerante': ('🥤', 'Refrigerantes'),
+    'suco': ('🧃', 'Sucos'),
+    'agua': ('💧', 'Água'),
+    'energetico': ('⚡', 'Energéticos'),
+}
+ICONE_PADRAO = '🛒'
+
+
+def rotulo_categoria(categoria):
+    """
+    Tupla (ícone, rótulo) de uma categoria
+    """
+    return ROTULOS.get(categoria, (ICONE_PADRAO, categoria.replace('_', ' ').title()))
+
+
+# REGISTROS
+# =====================================================
+class Faceta(NamedTuple):
+    """
+    Resumo de uma categoria do catálogo
+
+    Conceitos:
+    - Faceta: Um valor de um atributo (aqui, a categoria) com a contagem
+      de produtos que o têm; é o que as lojas mostram como "Vinhos (13)"
+    """
+    categoria: str
+    icone: str
+    rotulo: str
+    quantidade: int
+    em_estoque: int
+    preco_min: float
+    preco_max: float
+
+    def to_dict(self):
+        return self._asdict()
+
+
+class _Faixa(NamedTuple):
+    """
+    Produtos de um recorte (categoria e estoque) em duas ordens
+
+    produtos: Ordem do catálogo (por id), usada sem filtro de preço
+    por_preco: Os mesmos produtos ordenados por (preço, id)
+    precos: Preços de por_preco, na mesma ordem (lista para o bisect)
+    """
+    produtos: tuple
+    por_preco: tuple
+    precos: list
+
+
+def _montar_faixa(produtos):
+    por_preco = tuple(sorted(produtos, key=attrgetter('preco', 'id')))
+    return _Faixa(tuple(produtos), por_preco, [p.preco for p in por_preco])
+
+
+# ÍNDICE
+# =====================================================
+class IndiceFacetas:
+    """
+    Facetas e filtros de preço/estoque de um snapshot do catálogo
+
+    Conceitos:
+    - Pré-cálculo: Tudo é calculado uma vez, quando o índice é montado;
+      as requisições só consultam o índice
+    - bisect: Busca binária em uma lista ordenada. bisect_left(precos, 10)
+      é a posição do primeiro preço >= 10, e bisect_right(precos, 50) a
+      posição depois do último preço <= 50; os produtos da faixa são a
+      fatia entre as duas, encontrada em O(log n)
+    - Estoque: O índice recebe os ids dos produtos esgotados (estoque
+      livre atual, veja EstoqueCatalogo em catalogo.py); quando um produto
+      esgota, um índice novo é montado e o produto sai do filtro "só com
+      estoque" e das contagens logo depois da venda
+
+    Atributos:
+        categorias: Tupla de Faceta, em ordem alfabética da categoria
+        por_categoria: Dicionário categoria -> Faceta
+        total: Quantidade de produtos ativos
+        em_estoque: Quantos têm estoque
+        preco_min, preco_max: Faixa de preços do catálogo (None se vazio)
+    """
+
+    def __init__(self, produtos, esgotados=None):
+        """
+        Args:
+            produtos: Produtos ativos do snapshot
+            esgotados: Ids dos produtos sem estoque (None: usa produto.estoque)
+        """
+        if esgotados is None:
+            tem_estoque = lambda p: p.estoque > 0
+        else:
+            tem_estoque = lambda p: p.id not in esgotados
+
+        agrupados = {}
+        for produto in produtos:
+            agrupados.setdefault(produto.categoria, []).append(produto)
+
+        facetas = []
+        for categoria, itens in agrupados.items():
+            icone, rotulo = rotulo_categoria(categoria)
+            precos = [p.preco for p in itens]
+            facetas.append(Faceta(
+                categoria=categoria,
+                icone=icone,
+                rotulo=rotulo,
+                quantidade=len(itens),
+                em_estoque=sum(1 for p in itens if tem_estoque(p)),
+                preco_min=min(precos),
+                preco_max=max(precos),
+            ))
+        self.categorias = tuple(sorted(facetas, key=lambda f: f.categoria))
+        self.por_categoria = {f.categoria: f for f in self.categorias}
+
+        self.total = len(produtos)
+        self.em_estoque = sum(f.em_estoque for f in self.categorias)
+        self.preco_min = min((f.preco_min for f in self.categorias), default=None)
+        self.preco_max = max((f.preco_max for f in self.categorias), default=None)
+
+        # (categoria ou None, só com estoque) -> _Faixa
+        self._faixas = {}
+        for categoria, itens in [(None, list(produtos))] + list(agrupados.items()):
+            self._faixas[(categoria, False)] = _montar_faixa(itens)
+            self._faixas[(categoria, True)] = _montar_faixa([p for p in itens if tem_estoque(p)])
+
+    def filtrar(self, categoria=None, preco_min=None, preco_max=None, em_estoque=False):
+        """
+        Produtos da categoria, na faixa de preço e (opcionalmente) com estoque
+
+        Args:
+            categoria: Categoria (None ou vazio = todas)
+            preco_min, preco_max: Limites inclusivos (None = sem limite)
+            em_estoque: Se True, só produtos com estoque
+
+        Returns:
+            Tupla de produtos na ordem do catálogo (por id)
+        """
+        faixa = self._faixas.get((categoria or None, bool(em_estoque)))
+        if faixa is None:
+            return ()
+        if preco_min is None and preco_max is None:
+            return faixa.produtos
+
+        inicio = 0 if preco_min is None else bisect.bisect_left(faixa.precos, preco_min)
+        fim = len(faixa.precos) if preco_max is None else bisect.bisect_right(faixa.precos, preco_max)
+        if inicio >= fim:
+            return ()
+        if inicio == 0 and fim == len(faixa.precos):
+            return faixa.produtos
+        # Só a fatia encontrada volta para a ordem do catálogo
+        return tuple(sorted(faixa.por_preco[inicio:fim], key=attrgetter('id')))
+
+    def to_dict(self):
+        """
+        Formato da rota /api/facetas
+        """
+        return {
+            'total': self.total,
+            'em_estoque': self.em_estoque,
+            'preco_min': self.preco_min,
+            'preco_max': self.preco_max,
+            'categorias': [faceta.to_dict() for faceta in self.categorias],
+        }
+
+    def __iter__(self):
+        return iter(self.categorias)
+
+    def __len__(self):
+        return len(self.categorias)
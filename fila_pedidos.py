@@ -0,0 +1,338 @@
+# fila_pedidos.py - Fila durável de pedidos
+# Em horários de pico, gravar o pedido no SQLite durante a requisição faz o
+# checkout esperar pelo lock de escrita do banco. Com a fila, a requisição
+# apenas registra o pedido em um arquivo SQLite separado (rápido) e responde;
+# um grupo de threads (workers) grava os pedidos no banco principal depois.
+#
+# Garantias:
+# - Durável: A fila fica em disco; pedidos pendentes sobrevivem a reinícios
+# - Idempotente: Cada pedido tem um token gerado pelo cliente; reenviar o
+#   mesmo formulário não cria um segundo pedido na fila
+# - Pelo menos uma vez: Um pedido só sai da fila depois de gravado. Se o
+#   processo parar entre a gravação e o concluir(), o pedido é processado
+#   de novo; a função de processamento precisa reconhecer o token (no app,
+#   o token fica em uma coluna única do Pedido e não é gravado duas vezes)
+# - Observável: metricas() informa profundidade da fila e atraso (lag)
+# - Vários processos: Cada pedido em processamento tem um dono (o processo
+#   que o pegou) e um prazo (lease). Só pedidos com o prazo vencido (o dono
+#   parou no meio) voltam para a fila; um processo que inicia não devolve
+#   pedidos que outro processo ainda está gravando
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+# ESTADOS DE UM PEDIDO NA FILA
+# =====================================================
+PENDENTE = 'pendente'
+PROCESSANDO = 'processando'
+CONCLUIDO = 'concluido'
+FALHOU = 'falhou'
+
+# Por quanto tempo um pedido "processando" pertence ao processo que o pegou
+LEASE_PADRAO = 60.0
+
+
+# RECIBO DO PEDIDO
+# =====================================================
+class PedidoRecebido(NamedTuple):
+    """
+    Dados do pedido exibidos na confirmação antes de ele ser gravado no banco
+
+    Tem os mesmos atributos de Pedido usados em pedido_confirmado.html
+    """
+    id: str
+    data_pedido: datetime
+    nome_cliente: str
+    telefone_cliente: str
+    endereco_cliente: str
+    observacoes: Optional[str]
+    valor_total: float
+
+
+class ProdutoRecebido(NamedTuple):
+    """
+    Nome e preço de um produto como estavam no carrinho ao enfileirar
+
+    Tem os atributos usados por Carrinho.adicionar(), então o carrinho do
+    pedido pode ser remontado a partir do payload da fila
+    """
+    id: int
+    nome: str
+    preco: float
+    imagem_url: Optional[str] = None
+
+
+# FILA
+# =====================================================
+class FilaPedidos:
+    """
+    Fila de pedidos persistida em um arquivo SQLite
+
+    Conceitos:
+    - INSERT OR IGNORE: Se o token já existe, o comando não faz nada
+      (é isso que torna o enfileiramento idempotente)
+    - BEGIN IMMEDIATE: Reserva o lock de escrita antes de ler, para que dois
+      workers nunca peguem o mesmo pedido
+    - WAL: Modo de journal do SQLite em que leituras não bloqueiam escritas
+    - Lease: Ao pegar um pedido, o processo grava seu id (dono) e um prazo
+      (lease_ate). Se o processo parar, o prazo vence e o pedido pode ser
+      pego de novo; enquanto não vence, nenhum outro processo mexe nele
+
+    Args:
+        caminho: Arquivo SQLite da fila
+        max_tentativas: Falhas antes de o pedido ser marcado como "falhou"
+        lease_segundos: Prazo de um pedido em processamento (bem maior que
+                        o tempo de gravar um pedido)
+    """
+
+    def __init__(self, caminho, max_tentativas=5, lease_segundos=LEASE_PADRAO):
+        self.caminho = caminho
+        self.max_tentativas = max_tentativas
+        self.lease_segundos = lease_segundos
+        # Identifica este processo (e esta instância) como dono dos pedidos
+        self.dono = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._local = threading.local()
+        conn = self._conexao()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS fila_pedidos ('
+            ' token TEXT PRIMARY KEY,'
+            ' payload TEXT NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' tentativas INTEGER NOT NULL DEFAULT 0,'
+            ' criado_em REAL NOT NULL,'
+            ' processado_em REAL,'
+            ' pedido_id INTEGER,'
+            ' erro TEXT,'
+            ' dono TEXT,'
+            ' lease_ate REAL)'
+        )
+        # Filas criadas antes do lease: acrescenta as colunas
+        colunas = {linha['name'] for linha in conn.execute('PRAGMA table_info(fila_pedidos)')}
+        for coluna, tipo in (('dono', 'TEXT'), ('lease_ate', 'REAL')):
+            if coluna not in colunas:
+                conn.execute(f'ALTER TABLE fila_pedidos ADD COLUMN {coluna} {tipo}')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_fila_status_criado ON fila_pedidos (status, criado_em)')
+
+    def _conexao(self):
+        # isolation_level=None: modo autocommit; as transações são explícitas
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def enfileirar(self, token, payload):
+        """
+        Registra um pedido na fila
+
+        Returns:
+            True se o pedido é novo, False se o token já estava na fila
+        """
+        cursor = self._conexao().execute(
+            'INSERT OR IGNORE INTO fila_pedidos (token, payload, status, criado_em) VALUES (?, ?, ?, ?)',
+            (token, json.dumps(payload, ensure_ascii=False), PENDENTE, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def obter(self, token):
+        """
+        Retorna o registro do pedido (status, payload, pedido_id...) ou None
+        """
+        linha = self._conexao().execute(
+            'SELECT * FROM fila_pedidos WHERE token = ?', (token,)
+        ).fetchone()
+        if linha is None:
+            return None
+        registro = dict(linha)
+        registro['payload'] = json.loads(registro['payload'])
+        return registro
+
+    def reservar_proximo(self):
+        """
+        Marca o pedido pendente mais antigo como "processando" e o retorna
+
+        Pedidos "processando" com o lease vencido (o dono parou no meio)
+        também podem ser pegos
+
+        Returns:
+            Tupla (token, payload, tentativas) ou None se a fila estiver vazia
+        """
+        conn = self._conexao()
+        agora = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            linha = conn.execute(
+                'SELECT token, payload, tentativas FROM fila_pedidos '
+                'WHERE status = ? OR (status = ? AND COALESCE(lease_ate, 0) <= ?) '
+                'ORDER BY criado_em LIMIT 1', (PENDENTE, PROCESSANDO, agora)
+            ).fetchone()
+            if linha is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                'UPDATE fila_pedidos SET status = ?, tentativas = tentativas + 1, '
+                'dono = ?, lease_ate = ? WHERE token = ?',
+                (PROCESSANDO, self.dono, agora + self.lease_segundos, linha['token'])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return linha['token'], json.loads(linha['payload']), linha['tentativas'] + 1
+
+    def concluir(self, token, pedido_id):
+        """
+        Marca o pedido como gravado no banco principal
+        """
+        self._conexao().execute(
+            'UPDATE fila_pedidos SET status = ?, pedido_id = ?, processado_em = ?, erro = NULL, '
+            'dono = NULL, lease_ate = NULL WHERE token = ?',
+            (CONCLUIDO, pedido_id, time.time(), token)
+        )
+
+    def falhar(self, token, erro, definitivo=False):
+        """
+        Registra uma falha; o pedido volta para a fila, a menos que a falha
+        seja definitiva ou as tentativas tenham se esgotado
+        """
+        self._conexao().execute(
+            'UPDATE fila_pedidos SET status = CASE WHEN ? OR tentativas >= ? THEN ? ELSE ? END, '
+            'erro = ?, processado_em = ?, dono = NULL, lease_ate = NULL WHERE token = ?',
+            (definitivo, self.max_tentativas, FALHOU, PENDENTE, str(erro), time.time(), token)
+        )
+
+    def recuperar_em_andamento(self):
+        """
+        Devolve para a fila pedidos que estavam "processando" quando o
+        processo dono parou (chamado ao iniciar os workers)
+
+        Só os pedidos com o lease vencido: os de outros processos ainda
+        ativos continuam com eles. Filas antigas (sem lease) também voltam
+        """
+        cursor = self._conexao().execute(
+            'UPDATE fila_pedidos SET status = ?, dono = NULL, lease_ate = NULL '
+            'WHERE status = ? AND COALESCE(lease_ate, 0) <= ?',
+            (PENDENTE, PROCESSANDO, time.time())
+        )
+        return cursor.rowcount
+
+    def metricas(self):
+        """
+        Profundidade da fila e atraso do pedido pendente mais antigo
+        """
+        conn = self._conexao()
+        contagem = {status: 0 for status in (PENDENTE, PROCESSANDO, CONCLUIDO, FALHOU)}
+        for linha in conn.execute('SELECT status, COUNT(*) AS total FROM fila_pedidos GROUP BY status'):
+            contagem[linha['status']] = linha['total']
+        mais_antigo = conn.execute(
+            'SELECT MIN(criado_em) FROM fila_pedidos WHERE status = ?', (PENDENTE,)
+        ).fetchone()[0]
+        return {
+            'profundidade': contagem[PENDENTE] + contagem[PROCESSANDO],
+            'pendentes': contagem[PENDENTE],
+            'processando': contagem[PROCESSANDO],
+            'concluidos': contagem[CONCLUIDO],
+            'falhas': contagem[FALHOU],
+            'lag_segundos': round(time.time() - mais_antigo, 3) if mais_antigo else 0.0
+        }
+
+
+# WORKERS
+# =====================================================
+class WorkerPool:
+    """
+    Grupo de threads que esvazia a fila de pedidos
+
+    Args:
+        fila: FilaPedidos
+        processar: Função que recebe o token e o payload, grava o pedido e
+                   retorna o id (pode ser chamada mais de uma vez para o
+                   mesmo token)
+        num_workers: Quantidade de threads
+        erros_definitivos: Exceções que não adianta tentar de novo
+                           (ex: estoque insuficiente)
+    """
+
+    def __init__(self, fila, processar, num_workers=2, erros_definitivos=(), intervalo=1.0):
+        self.fila = fila
+        self.processar = processar
+        self.num_workers = num_workers
+        self.erros_definitivos = tuple(erros_definitivos)
+        self.intervalo = intervalo
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """
+        Inicia as threads (chamadas repetidas não fazem nada)
+        """
+        with self._lock:
+            if self._threads:
+                return
+            self.fila.recuperar_em_andamento()
+            self._parar.clear()
+            for numero in range(self.num_workers):
+                # daemon=True: As threads não impedem o processo de encerrar
+                thread = threading.Thread(target=self._executar, name=f'fila-pedidos-{numero}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notificar(self):
+        """
+        Acorda os workers (chamado logo após enfileirar um pedido)
+        """
+        self._acordar.set()
+
+    def parar(self, timeout=5):
+        """
+        Pede para as threads terminarem e espera por elas
+        """
+        self._parar.set()
+        self._acordar.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _executar(self):
+        while not self._parar.is_set():
+            if not self.processar_proximo():
+                # Fila vazia: espera um novo pedido (ou o intervalo)
+                self._acordar.wait(self.intervalo)
+                self._acordar.clear()
+
+    def processar_proximo(self):
+        """
+        Processa um pedido da fila
+
+        Returns:
+            True se havia um pedido, False se a fila estava vazia
+        """
+        reservado = self.fila.reservar_proximo()
+        if reservado is None:
+            return False
+
+        token, payload, _tentativas = reservado
+        try:
+            pedido_id = self.processar(token, payload)
+        except self.erros_definitivos as e:
+            self.fila.falhar(token, e, definitivo=True)
+        except Exception as e:
+            print(f"Erro ao processar pedido {token} da fila: {e}")
+            self.fila.falhar(token, e)
+        else:
+            self.fila.concluir(token, pedido_id)
+        return True
@@ -0,0 +1,354 @@
+# imagens.py - Proxy de imagens com miniaturas e cache em disco
+# As imagens dos produtos (data/produtos.json) apontam para arquivos de
+# 680x510 em lh3.googleusercontent.com, e muitos produtos usam a mesma URL.
+# Sem o proxy, cada card da grade baixa a imagem inteira para exibir uma
+# miniatura de 200 px de altura.
+#
+# Com o proxy, a página usa /img/<hash>/<largura>:
+# - <hash>: hash da URL original (URLs iguais = mesmo hash = um só download)
+# - <largura>: uma das larguras de TAMANHOS; o navegador escolhe pelo srcset
+#
+# O original é baixado uma única vez (pelo "buscador", que pode ser trocado
+# por um que lê arquivos locais) e as variantes (WebP ou JPEG) ficam em um
+# cache em disco endereçado pelo conteúdo, com limite de tamanho (LRU).
+#
+# O Pillow é opcional (pip install Pillow): sem ele as imagens não são
+# redimensionadas, mas continuam servidas pelo cache local.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+# CONFIGURAÇÃO
+# =====================================================
+# Larguras oferecidas no srcset (a maior é a largura das imagens originais)
+TAMANHOS = (160, 320, 480, 680)
+
+FORMATOS = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+
+QUALIDADE = 80
+
+# Limites do download do original
+TIMEOUT_BUSCA = 10
+LIMITE_ORIGINAL_BYTES = 5 * 1024 * 1024
+
+# Depois de uma falha, a mesma URL só é buscada de novo após este intervalo
+# (segundos): com a origem fora do ar, as páginas não esperam o timeout
+# em cada imagem
+ESPERA_APOS_FALHA = 60
+
+# Primeiros bytes de cada formato (para o Content-Type sem o Pillow)
+_ASSINATURAS = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF8', 'image/gif'),
+)
+
+
+def hash_url(url):
+    """
+    Identificador curto e estável de uma URL de imagem
+    """
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:20]
+
+
+def hash_conteudo(dados):
+    return hashlib.sha256(dados).hexdigest()[:20]
+
+
+def tipo_imagem(dados):
+    """
+    Content-Type pelos primeiros bytes do arquivo
+    """
+    if dados[:4] == b'RIFF' and dados[8:12] == b'WEBP':
+        return 'image/webp'
+    for assinatura, tipo in _ASSINATURAS:
+        if dados.startswith(assinatura):
+            return tipo
+    return 'application/octet-stream'
+
+
+class ImagemIndisponivel(Exception):
+    """
+    Erro lançado quando o original não pôde ser obtido (agora ou há pouco)
+    """
+
+
+def formato_preferido(accept):
+    """
+    WebP se o navegador aceitar (cabeçalho Accept), senão JPEG
+    """
+    return 'webp' if 'image/webp' in (accept or '') else 'jpeg'
+
+
+# BUSCADORES (DE ONDE VEM O ORIGINAL)
+# =====================================================
+class BuscadorHTTP:
+    """
+    Baixa o original pela internet
+
+    Conceitos:
+    - __call__: O objeto é usado como função: buscar(url) -> bytes
+    - Só http/https e no máximo LIMITE_ORIGINAL_BYTES: a URL vem do
+      catálogo, mas um arquivo enorme não pode encher a memória
+    """
+
+    def __init__(self, timeout=TIMEOUT_BUSCA, limite_bytes=LIMITE_ORIGINAL_BYTES):
+        self.timeout = timeout
+        self.limite_bytes = limite_bytes
+
+    def __call__(self, url):
+        if not url.startswith(('https://', 'http://')):
+            raise ValueError(f'URL de imagem não suportada: {url}')
+        requisicao = urllib.request.Request(url, headers={'User-Agent': 'adega-imagens/1.0'})
+        with urllib.request.urlopen(requisicao, timeout=self.timeout) as resposta:
+            dados = resposta.read(self.limite_bytes + 1)
+        if len(dados) > self.limite_bytes:
+            raise ValueError(f'Imagem maior que {self.limite_bytes} bytes: {url}')
+        return dados
+
+
+class BuscadorLocal:
+    """
+    Lê o original de uma pasta local, sem rede (desenvolvimento e testes)
+
+    O arquivo de cada URL se chama <hash_url(url)>; se não existir, usa o
+    arquivo "padrao" da pasta (se houver)
+    """
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+
+    def __call__(self, url):
+        for nome in (hash_url(url), 'padrao'):
+            caminho = os.path.join(self.pasta, nome)
+            if os.path.exists(caminho):
+                with open(caminho, 'rb') as f:
+                    return f.read()
+        raise FileNotFoundError(f'Imagem local não encontrada para {url}')
+
+
+# REDIMENSIONAMENTO (PILLOW OPCIONAL)
+# =====================================================
+def redimensionar(dados, largura, formato):
+    """
+    Reduz a imagem para `largura` (mantendo a proporção) e converte o formato
+
+    O Pillow é importado só aqui: quem não usa o proxy (ou roda sem o
+    Pillow instalado) não paga a importação na inicialização
+
+    Returns:
+        Bytes da variante, ou None se o Pillow não estiver instalado
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    with Image.open(io.BytesIO(dados)) as imagem:
+        imagem.load()
+        # thumbnail() só reduz (nunca amplia) e mantém a proporção
+        imagem.thumbnail((largura, largura * 4))
+        if formato == 'jpeg' and imagem.mode not in ('RGB', 'L'):
+            imagem = imagem.convert('RGB')
+        saida = io.BytesIO()
+        imagem.save(saida, format=formato.upper(), quality=QUALIDADE, optimize=True)
+        return saida.getvalue()
+
+
+# CACHE EM DISCO
+# =====================================================
+class CacheDisco:
+    """
+    Arquivos em uma pasta, com tamanho total limitado (LRU)
+
+    Conceitos:
+    - OrderedDict: Ordem de uso dos arquivos (o primeiro é o menos usado)
+    - Na inicialização, a ordem vem da data de modificação dos arquivos;
+      cada leitura atualiza essa data (os.utime), então a ordem sobrevive
+      a um reinício
+    - Gravação atômica: Arquivo temporário + os.replace(); quem lê nunca
+      vê um arquivo pela metade
+
+    Args:
+        pasta: Onde guardar os arquivos
+        capacidade_bytes: Tamanho máximo da pasta; os menos usados saem primeiro
+    """
+
+    def __init__(self, pasta, capacidade_bytes):
+        self.pasta = pasta
+        self.capacidade_bytes = capacidade_bytes
+        self._lock = threading.Lock()
+        self._arquivos = OrderedDict()
+        self.bytes_usados = 0
+        self.hits = 0
+        self.misses = 0
+        self.removidos = 0
+
+        os.makedirs(pasta, exist_ok=True)
+        existentes = []
+        for entrada in os.scandir(pasta):
+            if entrada.is_file() and not entrada.name.endswith('.tmp'):
+                info = entrada.stat()
+                existentes.append((info.st_mtime, entrada.name, info.st_size))
+        for _mtime, nome, tamanho in sorted(existentes):
+            self._arquivos[nome] = tamanho
+            self.bytes_usados += tamanho
+
+    def ler(self, chave):
+        """
+        Returns:
+            Bytes do arquivo, ou None se não estiver no cache
+        """
+        caminho = os.path.join(self.pasta, chave)
+        try:
+            with open(caminho, 'rb') as f:
+                dados = f.read()
+            os.utime(caminho)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                if chave in self._arquivos:
+                    # Removido por outro processo que usa a mesma pasta
+                    self.bytes_usados -= self._arquivos.pop(chave)
+            return None
+        with self._lock:
+            self.hits += 1
+            if chave in self._arquivos:
+                self._arquivos.move_to_end(chave)
+        return dados
+
+    def gravar(self, chave, dados):
+        descritor, temporario = tempfile.mkstemp(dir=self.pasta, suffix='.tmp')
+        with os.fdopen(descritor, 'wb') as f:
+            f.write(dados)
+        os.replace(temporario, os.path.join(self.pasta, chave))
+
+        with self._lock:
+            self.bytes_usados += len(dados) - self._arquivos.pop(chave, 0)
+            self._arquivos[chave] = len(dados)
+            while self.bytes_usados > self.capacidade_bytes and len(self._arquivos) > 1:
+                antigo, tamanho = self._arquivos.popitem(last=False)
+                self.bytes_usados -= tamanho
+                self.removidos += 1
+                try:
+                    os.remove(os.path.join(self.pasta, antigo))
+                except FileNotFoundError:
+                    pass
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'arquivos': len(self._arquivos),
+                'bytes_usados': self.bytes_usados,
+                'capacidade_bytes': self.capacidade_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'removidos': self.removidos,
+            }
+
+
+# PROXY
+# =====================================================
+class ProxyImagens:
+    """
+    Entrega variantes redimensionadas das imagens do catálogo
+
+    Arquivos no cache (todos na mesma pasta, todos sujeitos ao LRU):
+    - url-<hash da URL>: Hash do conteúdo do original daquela URL
+    - orig-<hash do conteúdo>: O original baixado
+    - <hash do conteúdo>-<largura>.<formato>: Uma variante
+
+    As variantes são endereçadas pelo conteúdo: URLs diferentes com a
+    mesma imagem compartilham o original e as variantes.
+
+    Args:
+        pasta: Pasta do cache em disco
+        buscar: Função url -> bytes que baixa o original (ex: BuscadorHTTP())
+        capacidade_bytes: Tamanho máximo do cache
+    """
+
+    def __init__(self, pasta, buscar, capacidade_bytes=100 * 1024 * 1024):
+        self.cache = CacheDisco(pasta, capacidade_bytes)
+        self.buscar = buscar
+        # Um lock por URL: requisições simultâneas da mesma imagem baixam o
+        # original uma vez só
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        # Hash da URL -> instante (time.monotonic) da última falha
+        self._falhas = {}
+        self.buscas = 0
+
+    def _lock_url(self, h):
+        with self._locks_lock:
+            return self._locks.setdefault(h, threading.Lock())
+
+    def _original(self, url):
+        """
+        Returns:
+            Tupla (hash do conteúdo, bytes do original)
+        """
+        h = hash_url(url)
+        with self._lock_url(h):
+            referencia = self.cache.ler(f'url-{h}')
+            if referencia is not None:
+                conteudo = referencia.decode('ascii')
+                dados = self.cache.ler(f'orig-{conteudo}')
+                if dados is not None:
+                    return conteudo, dados
+
+            falha = self._falhas.get(h)
+            if falha is not None and time.monotonic() - falha < ESPERA_APOS_FALHA:
+                raise ImagemIndisponivel(f'Falha recente ao buscar {url}')
+            try:
+                dados = self.buscar(url)
+            except Exception as e:
+                self._falhas[h] = time.monotonic()
+                raise ImagemIndisponivel(f'Não foi possível buscar {url}: {e}') from e
+            self._falhas.pop(h, None)
+            self.buscas += 1
+            conteudo = hash_conteudo(dados)
+            self.cache.gravar(f'orig-{conteudo}', dados)
+            self.cache.gravar(f'url-{h}', conteudo.encode('ascii'))
+            return conteudo, dados
+
+    def obter(self, url, largura, formato):
+        """
+        Variante da imagem na largura e no formato pedidos
+
+        Returns:
+            Tupla (bytes, content_type, etag)
+
+        Raises:
+            ImagemIndisponivel: Se o original não puder ser obtido
+        """
+        h = hash_url(url)
+        referencia = self.cache.ler(f'url-{h}')
+        if referencia is not None:
+            chave = f"{referencia.decode('ascii')}-{largura}.{formato}"
+            dados = self.cache.ler(chave)
+            if dados is not None:
+                return dados, FORMATOS[formato], chave
+
+        conteudo, original = self._original(url)
+        chave = f'{conteudo}-{largura}.{formato}'
+        try:
+            dados = redimensionar(original, largura, formato)
+        except Exception as e:
+            # Arquivo que o Pillow não reconhece como imagem
+            raise ImagemIndisponivel(f'Não foi possível redimensionar {url}: {e}') from e
+        if dados is None:
+            # Sem Pillow: entrega o original (já vem do cache local)
+            return original, tipo_imagem(original), f'orig-{conteudo}'
+        self.cache.gravar(chave, dados)
+        return dados, FORMATOS[formato], chave
+
+    def estatisticas(self):
+        return dict(self.cache.estatisticas(), buscas=self.buscas)
@@ -0,0 +1,367 @@
+# instrumentacao.py - Medição do tempo gasto em cada requisição
+# Camada opcional (variável de ambiente INSTRUMENTACAO=1) que mede, por rota:
+# - Latência total da requisição (histograma)
+# - Quantidade e tempo das consultas SQL
+# - Tempo de renderização dos templates
+# - Trechos marcados no código com medir('nome') (ex: carregar o carrinho)
+# - Tempo para gravar a sessão e tamanho do cookie de sessão
+#
+# Os resultados aparecem:
+# - No cabeçalho Server-Timing de cada resposta (aba "Timing" do DevTools)
+# - Em /metrics, no formato texto do Prometheus
+#
+# Com INSTRUMENTACAO_PROFILE=0.01, 1% das requisições são executadas sob o
+# cProfile e o resultado é salvo em arquivos .prof (abra com pstats ou snakeviz).
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from flask import g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+# LIMITES DOS HISTOGRAMAS (em segundos)
+# =====================================================
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_COOKIE = (128, 256, 512, 1024, 2048, 4096)
+
+
+# HISTOGRAMA
+# =====================================================
+class Histograma:
+    """
+    Histograma cumulativo no formato do Prometheus
+
+    Conceitos:
+    - Buckets: Cada limite conta quantas observações foram <= a ele
+      (o Prometheus calcula percentis a partir disso)
+    - soma e contagem: Permitem calcular a média
+    """
+
+    __slots__ = ('limites', 'contagens', 'soma', 'contagem')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.contagem = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[i] += 1
+        self.soma += valor
+        self.contagem += 1
+
+
+# MÉTRICAS POR ROTA
+# =====================================================
+class MetricasRota:
+    __slots__ = ('latencia', 'sql_consultas', 'sql_segundos', 'template_segundos', 'trechos')
+
+    def __init__(self):
+        self.latencia = Histograma(BUCKETS_LATENCIA)
+        self.sql_consultas = 0
+        self.sql_segundos = 0.0
+        self.template_segundos = 0.0
+        self.trechos = {}
+
+
+def _rotulo(valor):
+    """
+    Escapa um valor para usar como rótulo do Prometheus
+    """
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# INSTRUMENTAÇÃO
+# =====================================================
+class Instrumentacao:
+    """
+    Registra os hooks de medição em um app Flask
+
+    Uso:
+        instrumentacao = Instrumentacao()
+        instrumentacao.init_app(app, db.engine)   # só se estiver ativada
+
+        with instrumentacao.medir('carrinho'):
+            ...
+
+    Args:
+        taxa_profile: Fração das requisições executadas sob o cProfile (0 a 1)
+        pasta_profile: Onde salvar os arquivos .prof
+    """
+
+    def __init__(self, taxa_profile=0.0, pasta_profile=None):
+        self.ativo = False
+        self.taxa_profile = taxa_profile
+        self.pasta_profile = pasta_profile
+        self._rotas = {}
+        self._cookie = Histograma(BUCKETS_COOKIE)
+        self._lock = threading.Lock()
+        # Só uma requisição por vez pode rodar sob o cProfile
+        self._profile_lock = threading.Lock()
+
+    # REGISTRO DOS HOOKS
+    # =================================================
+    def init_app(self, app, engine):
+        """
+        Liga a instrumentação: hooks do Flask, eventos do SQLAlchemy,
+        sinais do Jinja e a rota /metrics
+        """
+        self.ativo = True
+        app.before_request(self._antes_da_requisicao)
+        app.after_request(self._depois_da_requisicao)
+        app.teardown_request(self._encerrar_profile)
+
+        event.listen(engine, 'before_cursor_execute', self._antes_sql)
+        event.listen(engine, 'after_cursor_execute', self._depois_sql)
+
+        before_render_template.connect(self._antes_template, app)
+        template_rendered.connect(self._depois_template, app)
+
+        # A sessão é gravada depois dos after_request; um "envelope" na
+        # interface de sessão mede esse passo e o tamanho do cookie
+        app.session_interface = _SessaoMedida(app.session_interface, self)
+
+        app.add_url_rule('/metrics', 'metrics', self._rota_metrics)
+
+        if self.taxa_profile and self.pasta_profile:
+            os.makedirs(self.pasta_profile, exist_ok=True)
+
+    # MEDIÇÃO DE TRECHOS
+    # =================================================
+    def medir(self, nome):
+        """
+        Context manager que soma o tempo do bloco ao trecho `nome`
+
+        Quando a instrumentação está desligada, não mede nada
+        """
+        if not self.ativo or not has_request_context():
+            return nullcontext()
+        return self._medir(nome)
+
+    @contextmanager
+    def _medir(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            trechos = g._instrumentacao['trechos']
+            trechos[nome] = trechos.get(nome, 0.0) + time.perf_counter() - inicio
+
+    # HOOKS DA REQUISIÇÃO
+    # =================================================
+    def _antes_da_requisicao(self):
+        g._instrumentacao = {
+            'inicio': time.perf_counter(),
+            'sql_consultas': 0,
+            'sql_segundos': 0.0,
+            'template_segundos': 0.0,
+            'template_profundidade': 0,
+            'trechos': {},
+            'profile': None,
+        }
+        if self.taxa_profile and random.random() < self.taxa_profile:
+            if self._profile_lock.acquire(blocking=False):
+                import cProfile  # só carregado quando o profile é usado
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Outro profiler já ativo (ex: Python 3.12 com sys.monitoring)
+                    self._profile_lock.release()
+                else:
+                    g._instrumentacao['profile'] = profile
+
+    def _depois_da_requisicao(self, resposta):
+        dados = g.get('_instrumentacao')
+        if dados is None:
+            return resposta
+
+        duracao = time.perf_counter() - dados['inicio']
+        rota = request.endpoint or 'nao_encontrada'
+
+        with self._lock:
+            metricas = self._rotas.get(rota)
+            if metricas is None:
+                metricas = self._rotas[rota] = MetricasRota()
+            metricas.latencia.observar(duracao)
+            metricas.sql_consultas += dados['sql_consultas']
+            metricas.sql_segundos += dados['sql_segundos']
+            metricas.template_segundos += dados['template_segundos']
+            for nome, segundos in dados['trechos'].items():
+                metricas.trechos[nome] = metricas.trechos.get(nome, 0.0) + segundos
+
+        # Server-Timing: nome;dur=milissegundos;desc="descrição"
+        partes = [
+            f'app;dur={duracao * 1000:.2f}',
+            f'sql;dur={dados["sql_segundos"] * 1000:.2f};desc="{dados["sql_consultas"]} consultas"',
+            f'tpl;dur={dados["template_segundos"] * 1000:.2f}',
+        ]
+        partes += [f'{nome};dur={segundos * 1000:.2f}' for nome, segundos in dados['trechos'].items()]
+
+        profile = dados['profile']
+        if profile is not None:
+            dados['profile'] = None
+            profile.disable()
+            self._profile_lock.release()
+            arquivo = self._salvar_profile(profile, rota)
+            partes.append(f'prof;desc="{os.path.basename(arquivo)}"')
+
+        resposta.headers['Server-Timing'] = ', '.join(partes)
+        return resposta
+
+    def _encerrar_profile(self, _erro=None):
+        # Se a requisição falhou antes do after_request, desliga o cProfile
+        dados = g.get('_instrumentacao')
+        if dados is not None and dados['profile'] is not None:
+            dados['profile'].disable()
+            dados['profile'] = None
+            self._profile_lock.release()
+
+    def _salvar_profile(self, profile, rota):
+        nome = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{rota}.prof"
+        arquivo = os.path.join(self.pasta_profile or '.', nome)
+        profile.dump_stats(arquivo)
+        return arquivo
+
+    # EVENTOS DO SQLALCHEMY
+    # =================================================
+    def _antes_sql(self, conexao, cursor, sql, parametros, contexto, executemany):
+        # conexao.info: Dicionário da conexão, útil para guardar o início
+        conexao.info.setdefault('_instrumentacao_inicio', []).append(time.perf_counter())
+
+    def _depois_sql(self, conexao, cursor, sql, parametros, contexto, executemany):
+        inicio = conexao.info['_instrumentacao_inicio'].pop()
+        # Consultas dos workers da fila não pertencem a nenhuma requisição
+        if has_request_context() and '_instrumentacao' in g:
+            dados = g._instrumentacao
+            dados['sql_consultas'] += 1
+            dados['sql_segundos'] += time.perf_counter() - inicio
+
+    # SINAIS DO JINJA
+    # =================================================
+    def _antes_template(self, app, template, context, **extra):
+        dados = g.get('_instrumentacao')
+        if dados is not None:
+            # Só o template mais externo é cronometrado (evita contar duas vezes)
+            if dados['template_profundidade'] == 0:
+                dados['template_inicio'] = time.perf_counter()
+            dados['template_profundidade'] += 1
+
+    def _depois_template(self, app, template, context, **extra):
+        dados = g.get('_instrumentacao')
+        if dados is not None and dados['template_profundidade']:
+            dados['template_profundidade'] -= 1
+            if dados['template_profundidade'] == 0:
+                dados['template_segundos'] += time.perf_counter() - dados['template_inicio']
+
+    # SESSÃO
+    # =================================================
+    def registrar_sessao(self, segundos, tamanho_cookie, resposta):
+        """
+        Chamado por _SessaoMedida depois de gravar a sessão
+        """
+        if tamanho_cookie:
+            with self._lock:
+                self._cookie.observar(tamanho_cookie)
+        servidor = resposta.headers.get('Server-Timing')
+        entrada = f'sess;dur={segundos * 1000:.2f};desc="cookie {tamanho_cookie} bytes"'
+        resposta.headers['Server-Timing'] = f'{servidor}, {entrada}' if servidor else entrada
+
+    # /metrics (FORMATO PROMETHEUS)
+    # =================================================
+    def texto_prometheus(self):
+        """
+        Gera as métricas no formato texto do Prometheus (versão 0.0.4)
+        """
+        linhas = [
+            '# HELP adega_requisicao_segundos Latência das requisições por rota',
+            '# TYPE adega_requisicao_segundos histogram',
+        ]
+        with self._lock:
+            rotas = sorted(self._rotas.items())
+            for rota, m in rotas:
+                r = _rotulo(rota)
+                for limite, contagem in zip(m.latencia.limites, m.latencia.contagens):
+                    linhas.append(f'adega_requisicao_segundos_bucket{{rota="{r}",le="{limite}"}} {contagem}')
+                linhas.append(f'adega_requisicao_segundos_bucket{{rota="{r}",le="+Inf"}} {m.latencia.contagem}')
+                linhas.append(f'adega_requisicao_segundos_sum{{rota="{r}"}} {m.latencia.soma:.6f}')
+                linhas.append(f'adega_requisicao_segundos_count{{rota="{r}"}} {m.latencia.contagem}')
+
+            linhas += ['# HELP adega_sql_consultas_total Consultas SQL executadas por rota',
+                       '# TYPE adega_sql_consultas_total counter']
+            linhas += [f'adega_sql_consultas_total{{rota="{_rotulo(rota)}"}} {m.sql_consultas}' for rota, m in rotas]
+
+            linhas += ['# HELP adega_sql_segundos_total Tempo gasto em SQL por rota',
+                       '# TYPE adega_sql_segundos_total counter']
+            linhas += [f'adega_sql_segundos_total{{rota="{_rotulo(rota)}"}} {m.sql_segundos:.6f}' for rota, m in rotas]
+
+            linhas += ['# HELP adega_template_segundos_total Tempo renderizando templates por rota',
+                       '# TYPE adega_template_segundos_total counter']
+            linhas += [f'adega_template_segundos_total{{rota="{_rotulo(rota)}"}} {m.template_segundos:.6f}'
+                       for rota, m in rotas]
+
+            linhas += ['# HELP adega_trecho_segundos_total Tempo dos trechos marcados com medir()',
+                       '# TYPE adega_trecho_segundos_total counter']
+            for rota, m in rotas:
+                for nome, segundos in sorted(m.trechos.items()):
+                    linhas.append(f'adega_trecho_segundos_total{{rota="{_rotulo(rota)}",trecho="{_rotulo(nome)}"}} {segundos:.6f}')
+
+            linhas += ['# HELP adega_cookie_sessao_bytes Tamanho do cookie de sessão enviado',
+                       '# TYPE adega_cookie_sessao_bytes histogram']
+            for limite, contagem in zip(self._cookie.limites, self._cookie.contagens):
+                linhas.append(f'adega_cookie_sessao_bytes_bucket{{le="{limite}"}} {contagem}')
+            linhas.append(f'adega_cookie_sessao_bytes_bucket{{le="+Inf"}} {self._cookie.contagem}')
+            linhas.append(f'adega_cookie_sessao_bytes_sum {self._cookie.soma:.0f}')
+            linhas.append(f'adega_cookie_sessao_bytes_count {self._cookie.contagem}')
+
+        return '\n'.join(linhas) + '\n'
+
+    def _rota_metrics(self):
+        from flask import current_app
+        return current_app.response_class(
+            self.texto_prometheus(), mimetype='text/plain; version=0.0.4'
+        )
+
+
+# ENVELOPE DA INTERFACE DE SESSÃO
+# =====================================================
+class _SessaoMedida:
+    """
+    Repassa tudo para a interface de sessão original, medindo save_session
+
+    Conceito: "Envelope" (wrapper) - um objeto que se comporta como outro
+    e acrescenta um comportamento (aqui, a medição)
+    """
+
+    def __init__(self, original, instrumentacao):
+        self._original = original
+        self._instrumentacao = instrumentacao
+
+    def __getattr__(self, nome):
+        return getattr(self._original, nome)
+
+    def open_session(self, app, request):
+        return self._original.open_session(app, request)
+
+    def save_session(self, app, session, resposta):
+        inicio = time.perf_counter()
+        resultado = self._original.save_session(app, session, resposta)
+        segundos = time.perf_counter() - inicio
+
+        # Tamanho do cookie que o navegador vai reenviar a cada requisição:
+        # o novo (Set-Cookie), ou o atual se a sessão não mudou
+        nome_cookie = self._original.get_cookie_name(app)
+        tamanho = len(request.cookies.get(nome_cookie, ''))
+        for cabecalho in resposta.headers.getlist('Set-Cookie'):
+            if cabecalho.startswith(nome_cookie + '='):
+                # Só o valor (sem Path, HttpOnly...), que é o que cresce
+                tamanho = len(cabecalho.split(';', 1)[0]) - len(nome_cookie) - 1
+        self._instrumentacao.registrar_sessao(segundos, tamanho, resposta)
+        return resultado
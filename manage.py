@@ -0,0 +1,50 @@
+# manage.py - Ponto de entrada da linha de comando (comando `flask`)
+# O que só a linha de comando usa fica aqui, fora do app.py, para não pesar
+# na inicialização do site (principalmente no cold start da Vercel):
+# - flask db ...            Migrações do banco (Flask-Migrate/Alembic)
+# - flask plano-consultas   Confere se as consultas usam os índices
+# - flask run               Servidor de desenvolvimento
+#
+# O arquivo .flaskenv (FLASK_APP=manage.py) faz o comando `flask` usar este
+# arquivo automaticamente.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+from flask_migrate import Migrate
+
+from app import criar_app, db, _garantir_colunas_produto, consultas_frequentes
+from plano_consultas import verificar_todas
+
+# APLICAÇÃO E EXTENSÕES DA LINHA DE COMANDO
+# =====================================================
+# banco='preguicoso': comandos como `flask db upgrade` não fazem requisições,
+# então o init_db() só roda no `flask run`, na primeira página aberta
+app = criar_app(banco='preguicoso')
+
+# Migrate - Para criar e gerenciar migrações do banco de dados
+migrate = Migrate(app, db)
+
+
+# COMANDOS
+# =====================================================
+@app.cli.command('plano-consultas')
+def plano_consultas_comando():
+    """
+    Confere se as consultas frequentes usam os índices (EXPLAIN QUERY PLAN)
+
+    Uso: flask plano-consultas
+    Termina com código de saída 1 se alguma consulta ler a tabela inteira
+    """
+    db.create_all()
+    _garantir_colunas_produto()
+    with db.engine.connect() as conexao:
+        resultados = verificar_todas(conexao, consultas_frequentes())
+
+    for resultado in resultados:
+        situacao = 'OK   ' if resultado.ok else 'FALHA'
+        print(f"[{situacao}] {resultado.nome}" + (f" ({resultado.motivo})" if resultado.motivo else ''))
+        for passo in resultado.plano:
+            print(f"          {passo}")
+
+    if not all(resultado.ok for resultado in resultados):
+        raise SystemExit(1)
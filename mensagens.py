@@ -0,0 +1,258 @@
+# mensagens.py - Mensagem do pedido para o WhatsApp
+# A mensagem é montada a partir de modelos (templates) configuráveis por
+# loja e idioma. Os modelos são "compilados" uma única vez: o texto fixo
+# (emojis, títulos, instruções de pagamento) já fica codificado para URL,
+# e a cada pedido só os dados do cliente e dos itens são codificados.
+#
+# Também há um limite de tamanho: carrinhos muito grandes geram links que
+# o WhatsApp não consegue abrir, então a lista de itens é cortada e
+# substituída por um resumo ("... e mais N itens"). O total é sempre exibido.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+from datetime import datetime
+from functools import lru_cache
+from string import Formatter
+from typing import NamedTuple
+from urllib.parse import quote
+
+# LIMITES
+# =====================================================
+# Tamanho máximo do texto codificado no link (caracteres após o %-encoding)
+LIMITE_PADRAO = 8000
+
+
+# CONFIGURAÇÃO DA LOJA
+# =====================================================
+class ConfigLoja(NamedTuple):
+    """
+    Dados da loja usados na mensagem
+
+    Args:
+        nome: Nome exibido no cabeçalho da mensagem
+        whatsapp: Número com código do país, só dígitos (ex: 5511970603441)
+        pix: Chave PIX para pagamento
+    """
+    nome: str
+    whatsapp: str
+    pix: str
+
+
+# MODELOS POR IDIOMA
+# =====================================================
+# Campos disponíveis:
+# - cabecalho: loja, nome, telefone, endereco, observacoes, data_hora
+# - item:      nome, quantidade, preco, subtotal
+# - omitidos:  itens, unidades (itens cortados pelo limite de tamanho)
+# - rodape:    total, total_itens, pix, loja
+MODELOS = {
+    'pt_BR': {
+        'cabecalho': (
+            "🍷 *PEDIDO {loja}* 🍷\n\n"
+            "👤 *Cliente:* {nome}\n"
+            "📞 *Telefone:* {telefone}\n"
+            "📍 *Endereço:* {endereco}\n"
+            "🕐 *Data/Hora:* {data_hora:%d/%m/%Y às %H:%M}\n\n"
+            "🛒 *ITENS DO PEDIDO:*\n"
+            "------------------------------\n"
+        ),
+        'item': (
+            "• {nome}\n"
+            "  Qtd: {quantidade} x R$ {preco:.2f}\n"
+            "  Subtotal: R$ {subtotal:.2f}\n\n"
+        ),
+        'omitidos': "• ... e mais {itens} itens ({unidades} unidades)\n\n",
+        'rodape': (
+            "------------------------------\n"
+            "💰 *TOTAL: R$ {total:.2f}*\n\n"
+            "💳 *PAGAMENTO:*\n"
+            "PIX: {pix}\n\n"
+            "⚠️ *IMPORTANTE:*\n"
+            "• Efetue o pagamento via PIX\n"
+            "• Envie o comprovante para este número\n"
+            "• A entrega será liberada após confirmação\n\n"
+            "Obrigado pela preferência! 🙏"
+        ),
+    },
+    'en_US': {
+        'cabecalho': (
+            "🍷 *ORDER {loja}* 🍷\n\n"
+            "👤 *Customer:* {nome}\n"
+            "📞 *Phone:* {telefone}\n"
+            "📍 *Address:* {endereco}\n"
+            "🕐 *Date/Time:* {data_hora:%m/%d/%Y %I:%M %p}\n\n"
+            "🛒 *ORDER ITEMS:*\n"
+            "------------------------------\n"
+        ),
+        'item': (
+            "• {nome}\n"
+            "  Qty: {quantidade} x R$ {preco:.2f}\n"
+            "  Subtotal: R$ {subtotal:.2f}\n\n"
+        ),
+        'omitidos': "• ... and {itens} more items ({unidades} units)\n\n",
+        'rodape': (
+            "------------------------------\n"
+            "💰 *TOTAL: R$ {total:.2f}*\n\n"
+            "💳 *PAYMENT:*\n"
+            "PIX: {pix}\n\n"
+            "⚠️ *IMPORTANT:*\n"
+            "• Pay via PIX\n"
+            "• Send the receipt to this number\n"
+            "• Delivery is released after confirmation\n\n"
+            "Thank you! 🙏"
+        ),
+    },
+}
+
+
+# MODELO COMPILADO
+# =====================================================
+@lru_cache(maxsize=4096)
+def _codificar(texto):
+    """
+    %-encoding para a URL do WhatsApp (mesmo resultado de urllib.parse.quote)
+
+    lru_cache: Nomes de produtos e preços se repetem entre pedidos, então
+    cada um é codificado uma vez e depois reaproveitado
+    """
+    return quote(texto, safe='/')
+
+
+class ModeloCompilado:
+    """
+    Um modelo de texto já dividido em partes fixas e campos
+
+    Conceitos:
+    - Formatter().parse(): Separa "Olá {nome}!" em ("Olá ", "nome") e ("!", None)
+    - O %-encoding de um texto é a concatenação do %-encoding de cada pedaço,
+      então as partes fixas podem ser codificadas uma única vez aqui
+    """
+
+    __slots__ = ('partes',)
+
+    def __init__(self, modelo):
+        # Cada parte: (texto fixo, texto fixo codificado, campo, formato)
+        self.partes = tuple(
+            (literal, _codificar(literal), campo, formato or '')
+            for literal, campo, formato, _conversao in Formatter().parse(modelo)
+        )
+
+    def renderizar(self, valores, codificar, saida):
+        """
+        Acrescenta o texto renderizado à lista `saida`
+
+        Returns:
+            Quantidade de caracteres acrescentados
+        """
+        tamanho = 0
+        for literal, literal_codificado, campo, formato in self.partes:
+            if literal:
+                pedaco = literal_codificado if codificar else literal
+                saida.append(pedaco)
+                tamanho += len(pedaco)
+            if campo is not None:
+                pedaco = format(valores[campo], formato)
+                if codificar:
+                    pedaco = _codificar(pedaco)
+                saida.append(pedaco)
+                tamanho += len(pedaco)
+        return tamanho
+
+
+# MENSAGEM DO PEDIDO
+# =====================================================
+class MensagemWhatsApp:
+    """
+    Monta a mensagem do pedido (texto ou link wa.me) para uma loja e idioma
+
+    Uso:
+        mensagem = MensagemWhatsApp(ConfigLoja('ADEGA', '5511...', 'pix@...'))
+        url = mensagem.url(pedido_dados, carrinho)
+
+    Args:
+        loja: ConfigLoja
+        locale: Idioma dos modelos (chave de MODELOS)
+        modelos: Modelos próprios (substituem os do idioma, parte a parte)
+        limite: Tamanho máximo do texto (None = sem limite)
+    """
+
+    def __init__(self, loja, locale='pt_BR', modelos=None, limite=LIMITE_PADRAO):
+        if locale not in MODELOS:
+            raise ValueError(f"Idioma de mensagem desconhecido: {locale}")
+        textos = dict(MODELOS[locale], **(modelos or {}))
+        self.loja = loja
+        self.locale = locale
+        self.limite = limite
+        self._modelos = {nome: ModeloCompilado(texto) for nome, texto in textos.items()}
+
+    def texto(self, pedido_dados, carrinho, data_hora=None):
+        """
+        Mensagem em texto puro
+        """
+        return self._montar(pedido_dados, carrinho, data_hora, codificar=False)
+
+    def url(self, pedido_dados, carrinho, data_hora=None):
+        """
+        Link wa.me com a mensagem já codificada
+        """
+        mensagem = self._montar(pedido_dados, carrinho, data_hora, codificar=True)
+        return f"https://wa.me/{self.loja.whatsapp}?text={mensagem}"
+
+    def _montar(self, pedido_dados, carrinho, data_hora, codificar):
+        """
+        Monta a mensagem em uma única passada, com list + join
+
+        O cabeçalho e o rodapé são renderizados primeiro (em listas
+        separadas) para saber quanto espaço sobra para os itens
+        """
+        modelos = self._modelos
+        cabecalho, rodape = [], []
+        tamanho = modelos['cabecalho'].renderizar({
+            'loja': self.loja.nome,
+            'nome': pedido_dados['nome'],
+            'telefone': pedido_dados['telefone'],
+            'endereco': pedido_dados['endereco'],
+            'observacoes': pedido_dados.get('observacoes') or '',
+            'data_hora': data_hora or datetime.now(),
+        }, codificar, cabecalho)
+        tamanho += modelos['rodape'].renderizar({
+            'total': carrinho.total,
+            'total_itens': carrinho.total_itens,
+            'pix': self.loja.pix,
+            'loja': self.loja.nome,
+        }, codificar, rodape)
+
+        itens = []
+        omitidos = omitidas_unidades = 0
+        # Espaço reservado para a linha "... e mais N itens"
+        reserva = 0 if self.limite is None else len(self._texto_omitidos(10 ** 6, 10 ** 6, codificar))
+        for item in carrinho:
+            if omitidos:
+                omitidos += 1
+                omitidas_unidades += item.quantidade
+                continue
+            linhas = []
+            tamanho_item = modelos['item'].renderizar({
+                'nome': item.nome,
+                'quantidade': item.quantidade,
+                'preco': item.preco,
+                'subtotal': item.subtotal,
+            }, codificar, linhas)
+            if self.limite is not None and tamanho + tamanho_item + reserva > self.limite:
+                omitidos = 1
+                omitidas_unidades = item.quantidade
+                continue
+            itens.extend(linhas)
+            tamanho += tamanho_item
+
+        if omitidos:
+            itens.append(self._texto_omitidos(omitidos, omitidas_unidades, codificar))
+
+        cabecalho.extend(itens)
+        cabecalho.extend(rodape)
+        return ''.join(cabecalho)
+
+    def _texto_omitidos(self, itens, unidades, codificar):
+        saida = []
+        self._modelos['omitidos'].renderizar({'itens': itens, 'unidades': unidades}, codificar, saida)
+        return ''.join(saida)
@@ -0,0 +1,72 @@
+"""Esquema inicial: produto, pedido e item_pedido
+
+Tabelas como eram antes das migrações existirem (o que o db.create_all()
+da primeira versão da loja criava). As colunas e índices acrescentados
+depois vêm nas revisões seguintes, então `flask db upgrade` em um banco
+vazio monta o esquema completo.
+
+Bancos criados por db.create_all() (init_db) já têm as tabelas, por isso
+cada tabela só é criada se ainda não existir.
+
+Revision ID: 0c5a9e3b7d21
+Revises:
+Create Date: 2026-10-17 01:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c5a9e3b7d21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tabelas = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'produto' not in tabelas:
+        op.create_table(
+            'produto',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('nome', sa.String(length=100), nullable=False),
+            sa.Column('descricao', sa.Text(), nullable=True),
+            sa.Column('preco', sa.Numeric(10, 2), nullable=False),
+            sa.Column('categoria', sa.String(length=50), nullable=False),
+            sa.Column('imagem_url', sa.String(length=200), nullable=True),
+            sa.Column('estoque', sa.Integer(), nullable=True),
+            sa.Column('ativo', sa.Boolean(), nullable=True),
+            sa.Column('data_criacao', sa.DateTime(), nullable=True),
+        )
+
+    if 'pedido' not in tabelas:
+        op.create_table(
+            'pedido',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('nome_cliente', sa.String(length=100), nullable=False),
+            sa.Column('telefone_cliente', sa.String(length=20), nullable=False),
+            sa.Column('endereco_cliente', sa.Text(), nullable=False),
+            sa.Column('valor_total', sa.Numeric(10, 2), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('data_pedido', sa.DateTime(), nullable=True),
+            sa.Column('observacoes', sa.Text(), nullable=True),
+        )
+
+    if 'item_pedido' not in tabelas:
+        op.create_table(
+            'item_pedido',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('pedido_id', sa.Integer(), sa.ForeignKey('pedido.id'), nullable=False),
+            sa.Column('produto_id', sa.Integer(), sa.ForeignKey('produto.id'), nullable=False),
+            sa.Column('quantidade', sa.Integer(), nullable=False),
+            sa.Column('preco_unitario', sa.Numeric(10, 2), nullable=False),
+        )
+
+
+def downgrade():
+    tabelas = set(sa.inspect(op.get_bind()).get_table_names())
+    for tabela in ('item_pedido', 'pedido', 'produto'):
+        if tabela in tabelas:
+            op.drop_table(tabela)
@@ -0,0 +1,60 @@
+"""Índices para as consultas mais frequentes
+
+- produto (ativo, categoria): catálogo filtrado por categoria
+- produto (nome) único: chave usada por init_db para sincronizar o JSON
+- pedido (data_pedido, id): ordenação e paginação do painel /admin
+- item_pedido (pedido_id) e (produto_id): JOINs e carregamento dos itens
+
+O SQLite não permite adicionar uma UNIQUE constraint a uma tabela
+existente (ALTER TABLE ... ADD CONSTRAINT); um índice único tem o mesmo
+efeito e é o que o próprio SQLite usa para implementar a constraint.
+
+As tabelas vêm da revisão anterior (esquema inicial); bancos criados
+por db.create_all() podem já ter os índices, por isso cada índice só é
+criado se ainda não existir.
+
+Revision ID: 3f1c2a7d9b10
+Revises: 0c5a9e3b7d21
+Create Date: 2026-10-17 02:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9b10'
+down_revision = '0c5a9e3b7d21'
+branch_labels = None
+depends_on = None
+
+
+# (tabela, nome do índice, colunas, único)
+INDICES = (
+    ('produto', 'ix_produto_ativo_categoria', ['ativo', 'categoria'], False),
+    ('produto', 'uq_produto_nome', ['nome'], True),
+    ('pedido', 'ix_pedido_data_pedido_id', ['data_pedido', 'id'], False),
+    ('item_pedido', 'ix_item_pedido_pedido_id', ['pedido_id'], False),
+    ('item_pedido', 'ix_item_pedido_produto_id', ['produto_id'], False),
+)
+
+
+def _indices_existentes(inspector, tabela):
+    return {indice['name'] for indice in inspector.get_indexes(tabela)}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tabelas = set(inspector.get_table_names())
+    for tabela, nome, colunas, unico in INDICES:
+        if tabela not in tabelas or nome in _indices_existentes(inspector, tabela):
+            continue
+        op.create_index(nome, tabela, colunas, unique=unico)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tabelas = set(inspector.get_table_names())
+    for tabela, nome, _colunas, _unico in reversed(INDICES):
+        if tabela in tabelas and nome in _indices_existentes(inspector, tabela):
+            op.drop_index(nome, table_name=tabela)
@@ -0,0 +1,47 @@
+"""Token da fila de pedidos no pedido
+
+- pedido.token_fila: token do pedido na fila (fila_pedidos.py)
+- índice único em token_fila: um pedido da fila processado mais de uma
+  vez (o worker parou antes de marcar a fila) não é gravado de novo
+
+Bancos já atualizados por init_db() têm a coluna e o índice, por isso
+cada etapa só é feita se ainda não existir.
+
+Revision ID: 5e7a1c9d3b62
+Revises: 9d3e6b2f8c40
+Create Date: 2026-10-17 19:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e7a1c9d3b62'
+down_revision = '9d3e6b2f8c40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'pedido' not in inspector.get_table_names():
+        return
+
+    if 'token_fila' not in {c['name'] for c in inspector.get_columns('pedido')}:
+        op.add_column('pedido', sa.Column('token_fila', sa.String(length=64), nullable=True))
+    if 'uq_pedido_token_fila' not in {i['name'] for i in inspector.get_indexes('pedido')}:
+        op.create_index('uq_pedido_token_fila', 'pedido', ['token_fila'], unique=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'pedido' not in inspector.get_table_names():
+        return
+
+    if 'uq_pedido_token_fila' in {i['name'] for i in inspector.get_indexes('pedido')}:
+        op.drop_index('uq_pedido_token_fila', table_name='pedido')
+    if 'token_fila' in {c['name'] for c in inspector.get_columns('pedido')}:
+        # SQLite antigo não tem DROP COLUMN: batch recria a tabela
+        with op.batch_alter_table('pedido') as batch_op:
+            batch_op.drop_column('token_fila')
@@ -0,0 +1,60 @@
+"""Reservas de estoque dos carrinhos
+
+- produto.reservado: soma das reservas ativas (livre = estoque - reservado)
+- reserva_estoque: uma linha por (carrinho, produto) com a quantidade e
+  o instante em que a reserva vence
+- índice único (carrinho_id, produto_id): usado pelo INSERT ... ON CONFLICT
+- índice em expira_em: a limpeza procura só as reservas vencidas
+
+Bancos já atualizados por init_db() (db.create_all e
+_garantir_colunas_produto) têm a coluna e a tabela, por isso cada
+etapa só é feita se ainda não existir.
+
+Revision ID: 7b2e9c4d1a55
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-17 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e9c4d1a55'
+down_revision = '3f1c2a7d9b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tabelas = set(inspector.get_table_names())
+
+    if 'produto' in tabelas and 'reservado' not in {c['name'] for c in inspector.get_columns('produto')}:
+        op.add_column('produto', sa.Column('reservado', sa.Integer(), nullable=False, server_default='0'))
+
+    if 'reserva_estoque' not in tabelas:
+        op.create_table(
+            'reserva_estoque',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('carrinho_id', sa.String(length=32), nullable=False),
+            sa.Column('produto_id', sa.Integer(), sa.ForeignKey('produto.id'), nullable=False),
+            sa.Column('quantidade', sa.Integer(), nullable=False),
+            sa.Column('expira_em', sa.DateTime(), nullable=False),
+            sa.UniqueConstraint('carrinho_id', 'produto_id', name='uq_reserva_carrinho_produto'),
+        )
+        op.create_index('ix_reserva_expira_em', 'reserva_estoque', ['expira_em'])
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tabelas = set(inspector.get_table_names())
+
+    if 'reserva_estoque' in tabelas:
+        op.drop_index('ix_reserva_expira_em', table_name='reserva_estoque')
+        op.drop_table('reserva_estoque')
+
+    if 'produto' in tabelas and 'reservado' in {c['name'] for c in inspector.get_columns('produto')}:
+        # SQLite antigo não tem DROP COLUMN: batch recria a tabela
+        with op.batch_alter_table('produto') as batch_op:
+            batch_op.drop_column('reservado')
@@ -0,0 +1,58 @@
+"""Sincronização incremental do catálogo
+
+- produto.fingerprint: hash dos campos sincronizados com o JSON; init_db
+  regrava só os produtos cujo fingerprint mudou
+- sync_catalogo: histórico das sincronizações, com o hash do
+  data/produtos.json (arquivo igual ao da última sincronização = nada a fazer)
+
+Bancos já atualizados por init_db() (db.create_all e
+_garantir_colunas_produto) têm a coluna e a tabela, por isso cada
+etapa só é feita se ainda não existir.
+
+Revision ID: 9d3e6b2f8c40
+Revises: 7b2e9c4d1a55
+Create Date: 2026-10-17 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3e6b2f8c40'
+down_revision = '7b2e9c4d1a55'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tabelas = set(inspector.get_table_names())
+
+    if 'produto' in tabelas and 'fingerprint' not in {c['name'] for c in inspector.get_columns('produto')}:
+        op.add_column('produto', sa.Column('fingerprint', sa.String(length=40), nullable=True))
+
+    if 'sync_catalogo' not in tabelas:
+        op.create_table(
+            'sync_catalogo',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('hash_conteudo', sa.String(length=64), nullable=False),
+            sa.Column('inseridos', sa.Integer(), nullable=True),
+            sa.Column('atualizados', sa.Integer(), nullable=True),
+            sa.Column('desativados', sa.Integer(), nullable=True),
+            sa.Column('duracao_ms', sa.Float(), nullable=True),
+            sa.Column('data_sync', sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tabelas = set(inspector.get_table_names())
+
+    if 'sync_catalogo' in tabelas:
+        op.drop_table('sync_catalogo')
+
+    if 'produto' in tabelas and 'fingerprint' in {c['name'] for c in inspector.get_columns('produto')}:
+        # SQLite antigo não tem DROP COLUMN: batch recria a tabela
+        with op.batch_alter_table('produto') as batch_op:
+            batch_op.drop_column('fingerprint')
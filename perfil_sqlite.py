@@ -0,0 +1,137 @@
+# perfil_sqlite.py - Perfis de configuração do SQLite
+# Por padrão o SQLite usa o journal "rollback": enquanto um pedido está sendo
+# gravado, quem tenta ler o catálogo espera (ou recebe "database is locked").
+# Os perfis abaixo configuram cada conexão nova com PRAGMAs que mudam isso.
+#
+# Perfil escolhido pela variável de ambiente SQLITE_PERFIL:
+# - desempenho (padrão): WAL, synchronous=NORMAL, cache e mmap maiores
+# - padrao:              Comportamento original do SQLite (para comparação)
+#
+# Os perfis só se aplicam a bancos SQLite; com outro banco (ex: PostgreSQL
+# via DATABASE_URL) as opções padrão do SQLAlchemy são mantidas.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+
+# PERFIS
+# =====================================================
+# Conceitos:
+# - journal_mode=WAL: Escritas vão para um arquivo separado (-wal); leitores
+#   continuam lendo a versão anterior sem esperar o escritor
+# - synchronous=NORMAL: Em WAL, só sincroniza o disco nos checkpoints
+#   (seguro contra falhas do processo; pode perder a última transação se
+#   a máquina desligar)
+# - cache_size negativo: Tamanho do cache de páginas em KiB
+# - mmap_size: Lê o arquivo via memória mapeada (menos cópias)
+# - busy_timeout: Em vez de falhar com "database is locked", espera o lock
+#   por até N milissegundos
+PERFIS = {
+    'padrao': {
+        'pragmas': {},
+        'busy_timeout_ms': 0,
+        'pool_size': 5,
+    },
+    'desempenho': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64000,
+            'mmap_size': 268435456,
+            'temp_store': 'MEMORY',
+        },
+        'busy_timeout_ms': 5000,
+        'pool_size': 10,
+    },
+}
+
+PERFIL_PADRAO = 'desempenho'
+
+
+# FUNÇÕES
+# =====================================================
+def obter_perfil(nome):
+    """
+    Retorna a configuração do perfil (ValueError se o nome não existir)
+    """
+    try:
+        return PERFIS[nome or PERFIL_PADRAO]
+    except KeyError:
+        raise ValueError(f"Perfil SQLite desconhecido: {nome}") from None
+
+
+def _eh_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def _em_memoria(uri):
+    return make_url(uri).database in (None, '', ':memory:')
+
+
+def opcoes_engine(uri, nome_perfil=None):
+    """
+    Opções para SQLALCHEMY_ENGINE_OPTIONS de acordo com o perfil
+
+    Conceitos:
+    - Pool de conexões: As conexões são reaproveitadas entre requisições
+      (abrir uma conexão SQLite e aplicar os PRAGMAs tem custo)
+    - Banco em memória: Cada conexão veria um banco diferente, então todas
+      as threads compartilham uma única conexão (StaticPool)
+    """
+    if not _eh_sqlite(uri):
+        return {}
+
+    perfil = obter_perfil(nome_perfil)
+    if _em_memoria(uri):
+        return {
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False},
+        }
+
+    # check_same_thread=False: A conexão volta ao pool e pode ser usada
+    # depois por outra thread (nunca por duas ao mesmo tempo)
+    connect_args = {'check_same_thread': False}
+    if perfil['busy_timeout_ms']:
+        # timeout do driver sqlite3 (em segundos), equivalente ao busy_timeout
+        connect_args['timeout'] = perfil['busy_timeout_ms'] / 1000
+
+    return {
+        'pool_size': perfil['pool_size'],
+        'max_overflow': perfil['pool_size'],
+        'connect_args': connect_args,
+    }
+
+
+def aplicar_perfil(engine, nome_perfil=None):
+    """
+    Registra os PRAGMAs do perfil para cada conexão nova do engine
+
+    O evento 'connect' roda uma vez por conexão física (não a cada uso do
+    pool), então o custo dos PRAGMAs não se repete a cada requisição
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    perfil = obter_perfil(nome_perfil)
+    pragmas = dict(perfil['pragmas'])
+    if perfil['busy_timeout_ms']:
+        pragmas['busy_timeout'] = perfil['busy_timeout_ms']
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _configurar_conexao(conexao_dbapi, _registro):
+        cursor = conexao_dbapi.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome}={valor}')
+        cursor.close()
+
+
+def pragmas_ativos(conexao):
+    """
+    Lê os valores atuais dos PRAGMAs (para conferir a configuração)
+    """
+    nomes = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'busy_timeout')
+    return {nome: conexao.exec_driver_sql(f'PRAGMA {nome}').scalar() for nome in nomes}
@@ -0,0 +1,88 @@
+# plano_consultas.py - Verificação do plano de execução das consultas
+# O SQLite mostra como vai executar uma consulta com EXPLAIN QUERY PLAN:
+#     SCAN produto                                  -> lê a tabela inteira
+#     SEARCH produto USING INDEX ix_produto_...     -> usa um índice
+#
+# Este módulo roda EXPLAIN QUERY PLAN nas consultas mais usadas pela loja e
+# confere se cada uma usa o índice esperado. Assim, uma mudança no modelo ou
+# na consulta que faça o banco voltar a ler a tabela inteira é detectada:
+#     flask plano-consultas
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+from typing import NamedTuple, Optional
+
+
+# CONSULTA A VERIFICAR
+# =====================================================
+class ConsultaVerificada(NamedTuple):
+    """
+    Uma consulta e o índice que ela deve usar
+
+    Args:
+        nome: Descrição curta (ex: "admin: pedidos por data")
+        consulta: Statement do SQLAlchemy (select, update...)
+        tabela: Tabela que não pode ser lida por inteiro (SCAN)
+        indice: Índice que precisa aparecer no plano (None = qualquer um)
+    """
+    nome: str
+    consulta: object
+    tabela: str
+    indice: Optional[str] = None
+
+
+class ResultadoPlano(NamedTuple):
+    nome: str
+    ok: bool
+    plano: list
+    motivo: str = ''
+
+
+# EXPLAIN QUERY PLAN
+# =====================================================
+def explicar(conexao, consulta):
+    """
+    Retorna as linhas do EXPLAIN QUERY PLAN de uma consulta
+
+    A consulta é compilada para o dialeto da conexão e executada com os
+    próprios valores de exemplo (render_postcompile expande listas do IN)
+    """
+    compilada = consulta.compile(
+        dialect=conexao.dialect,
+        compile_kwargs={'render_postcompile': True}
+    )
+    # O SQLite usa parâmetros posicionais (?); positiontup dá a ordem deles
+    valores = compilada.construct_params()
+    parametros = tuple(valores.get(nome) for nome in compilada.positiontup or ())
+    linhas = conexao.exec_driver_sql(f'EXPLAIN QUERY PLAN {compilada.string}', parametros)
+    # A última coluna de cada linha é a descrição do passo
+    return [linha[-1] for linha in linhas]
+
+
+def verificar(conexao, verificacao):
+    """
+    Confere o plano de uma consulta
+
+    Falha se a tabela for lida por inteiro (SCAN sem índice) ou se o
+    índice esperado não aparecer no plano
+    """
+    plano = explicar(conexao, verificacao.consulta)
+    tabela = verificacao.tabela
+
+    for passo in plano:
+        palavras = passo.split()
+        # "SCAN produto" (sem "USING ... INDEX") é uma leitura completa
+        if palavras[:2] == ['SCAN', tabela] and 'INDEX' not in palavras:
+            return ResultadoPlano(verificacao.nome, False, plano, f'leitura completa de {tabela}')
+
+    if verificacao.indice and not any(verificacao.indice in passo.split() for passo in plano):
+        return ResultadoPlano(verificacao.nome, False, plano, f'índice {verificacao.indice} não utilizado')
+
+    return ResultadoPlano(verificacao.nome, True, plano)
+
+
+def verificar_todas(conexao, verificacoes):
+    """
+    Verifica uma lista de consultas e retorna os resultados
+    """
+    return [verificar(conexao, v) for v in verificacoes]
@@ -0,0 +1,298 @@
+# reservas.py - Reserva de estoque para os carrinhos
+# Quando um cliente coloca um produto no carrinho, a quantidade fica
+# "reservada" por alguns minutos (TTL). Assim, vários carrinhos não passam
+# ao mesmo tempo pela verificação das últimas garrafas: quem chega depois
+# recebe "Estoque insuficiente" na hora, e não no WhatsApp.
+#
+# Como funciona:
+# - produto.reservado: Soma das reservas ativas do produto
+#   (disponível = estoque - reservado)
+# - reserva_estoque: Uma linha por (carrinho, produto), com a quantidade e
+#   o instante em que expira
+# - A reserva usa um UPDATE condicional (compare-and-set) na linha do produto:
+#       UPDATE produto SET reservado = reservado + ?
+#       WHERE id = ? AND estoque - reservado >= ?
+#   Se outro carrinho levou o estoque antes, o UPDATE não altera nenhuma
+#   linha. Não há SELECT ... FOR UPDATE nem trava da tabela
+# - Reservas vencidas são devolvidas em lote (recuperar_expiradas), por
+#   uma thread em segundo plano e também quando uma reserva falha
+# - No checkout, confirmar() transforma as reservas do carrinho em baixa
+#   de estoque definitiva
+#
+# As funções recebem a conexão da sessão atual (db.session.connection()) e
+# não fazem commit: quem chama decide o fim da transação.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+# CONFIGURAÇÃO
+# =====================================================
+TABELA = 'reserva_estoque'
+
+# Tempo de vida padrão de uma reserva
+TTL_PADRAO = timedelta(minutes=15)
+
+
+# SQL
+# =====================================================
+# Renova a reserva existente; por ser uma escrita, é feita primeiro para
+# que a leitura da quantidade atual logo abaixo não mude até o commit
+SQL_RENOVAR_ITEM = text(f"""
+    UPDATE {TABELA} SET expira_em = :expira_em
+    WHERE carrinho_id = :carrinho_id AND produto_id = :produto_id
+""")
+
+SQL_QUANTIDADE_RESERVADA = text(f"""
+    SELECT quantidade FROM {TABELA}
+    WHERE carrinho_id = :carrinho_id AND produto_id = :produto_id
+""")
+
+# Compare-and-set: só reserva se ainda houver estoque livre
+SQL_RESERVAR = text("""
+    UPDATE produto SET reservado = reservado + :delta
+    WHERE id = :produto_id AND ativo = 1 AND estoque - reservado >= :delta
+""")
+
+SQL_DEVOLVER = text("""
+    UPDATE produto SET reservado = reservado - :quantidade
+    WHERE id = :produto_id
+""")
+
+SQL_GRAVAR = text(f"""
+    INSERT INTO {TABELA} (carrinho_id, produto_id, quantidade, expira_em)
+    VALUES (:carrinho_id, :produto_id, :quantidade, :expira_em)
+    ON CONFLICT (carrinho_id, produto_id)
+    DO UPDATE SET quantidade = excluded.quantidade, expira_em = excluded.expira_em
+""")
+
+SQL_APAGAR_ITEM = text(f"""
+    DELETE FROM {TABELA} WHERE carrinho_id = :carrinho_id AND produto_id = :produto_id
+""")
+
+# DELETE ... RETURNING (SQLite 3.35+): apaga e devolve o que foi apagado
+# em um único comando, sem janela entre a leitura e a remoção
+SQL_APAGAR_CARRINHO = text(f"""
+    DELETE FROM {TABELA} WHERE carrinho_id = :carrinho_id
+    RETURNING produto_id, quantidade
+""")
+
+SQL_APAGAR_EXPIRADAS = text(f"""
+    DELETE FROM {TABELA} WHERE expira_em <= :agora
+    RETURNING produto_id, quantidade
+""")
+
+SQL_RENOVAR_CARRINHO = text(f"""
+    UPDATE {TABELA} SET expira_em = :expira_em WHERE carrinho_id = :carrinho_id
+""")
+
+# Baixa definitiva: o estoque cai pela quantidade comprada e a reserva do
+# próprio carrinho (:reserva) deixa de contar como "reservado"
+SQL_CONFIRMAR = text("""
+    UPDATE produto
+    SET estoque = estoque - :quantidade, reservado = reservado - :reserva
+    WHERE id = :produto_id AND estoque - (reservado - :reserva) >= :quantidade
+""")
+
+
+# RESERVA DE UM PRODUTO
+# =====================================================
+def reservar(conexao, carrinho_id, produto_id, quantidade, ttl=TTL_PADRAO, agora=None):
+    """
+    Ajusta a reserva do carrinho para `quantidade` unidades do produto
+
+    A quantidade é a total do carrinho (não a diferença): aumentar reserva
+    só a diferença, diminuir devolve a diferença e 0 remove a reserva.
+    Se faltar estoque livre, as reservas vencidas de todos os carrinhos são
+    devolvidas e a reserva é tentada mais uma vez.
+
+    Returns:
+        True se a reserva foi feita; False se não há estoque disponível
+
+    Raises:
+        ValueError: Se a quantidade for negativa
+    """
+    if quantidade < 0:
+        raise ValueError(f'Quantidade inválida para reserva: {quantidade}')
+    agora = agora or datetime.now()
+    parametros = {'carrinho_id': carrinho_id, 'produto_id': produto_id,
+                  'quantidade': quantidade, 'expira_em': agora + ttl}
+
+    conexao.execute(SQL_RENOVAR_ITEM, parametros)
+    atual = conexao.execute(SQL_QUANTIDADE_RESERVADA, parametros).scalar() or 0
+    delta = quantidade - atual
+
+    if delta > 0:
+        reservado = conexao.execute(SQL_RESERVAR, {'produto_id': produto_id, 'delta': delta}).rowcount
+        if not reservado and recuperar_expiradas(conexao, agora):
+            # A reserva deste carrinho também pode ter vencido e sido devolvida
+            atual = conexao.execute(SQL_QUANTIDADE_RESERVADA, parametros).scalar() or 0
+            delta = quantidade - atual
+            reservado = conexao.execute(SQL_RESERVAR, {'produto_id': produto_id, 'delta': delta}).rowcount
+        if not reservado:
+            return False
+    elif delta < 0:
+        # Nunca devolve mais do que este carrinho tinha reservado: reservado
+        # não pode ficar abaixo da soma das reservas
+        conexao.execute(SQL_DEVOLVER, {'produto_id': produto_id, 'quantidade': min(-delta, atual)})
+
+    if quantidade > 0:
+        conexao.execute(SQL_GRAVAR, parametros)
+    else:
+        conexao.execute(SQL_APAGAR_ITEM, parametros)
+    return True
+
+
+def _devolver(conexao, linhas):
+    """
+    Devolve ao estoque livre as quantidades das reservas apagadas
+
+    As reservas são somadas por produto: um UPDATE por produto, em lote
+    """
+    por_produto = {}
+    for produto_id, quantidade in linhas:
+        por_produto[produto_id] = por_produto.get(produto_id, 0) + quantidade
+    if por_produto:
+        conexao.execute(SQL_DEVOLVER, [
+            {'produto_id': produto_id, 'quantidade': quantidade}
+            for produto_id, quantidade in por_produto.items()
+        ])
+    return por_produto
+
+
+# RESERVAS DO CARRINHO INTEIRO
+# =====================================================
+def reservas_do_carrinho(conexao, carrinho_id):
+    """
+    Returns:
+        Dicionário {produto_id: quantidade reservada} (vencidas incluídas,
+        enquanto não forem devolvidas)
+    """
+    return dict(conexao.execute(
+        text(f"SELECT produto_id, quantidade FROM {TABELA} WHERE carrinho_id = :carrinho_id"),
+        {'carrinho_id': carrinho_id}
+    ).all())
+
+
+def renovar(conexao, carrinho_id, ttl=TTL_PADRAO, agora=None):
+    """
+    Estende o prazo de todas as reservas do carrinho (ex: ao abrir o checkout)
+    """
+    agora = agora or datetime.now()
+    conexao.execute(SQL_RENOVAR_CARRINHO, {'carrinho_id': carrinho_id, 'expira_em': agora + ttl})
+
+
+def liberar(conexao, carrinho_id):
+    """
+    Apaga as reservas do carrinho e devolve as quantidades ao estoque livre
+
+    Returns:
+        Dicionário {produto_id: quantidade devolvida}
+    """
+    return _devolver(conexao, conexao.execute(SQL_APAGAR_CARRINHO, {'carrinho_id': carrinho_id}).all())
+
+
+def recuperar_expiradas(conexao, agora=None):
+    """
+    Devolve em lote todas as reservas vencidas
+
+    Returns:
+        Quantidade de reservas devolvidas
+    """
+    linhas = conexao.execute(SQL_APAGAR_EXPIRADAS, {'agora': agora or datetime.now()}).all()
+    _devolver(conexao, linhas)
+    return len(linhas)
+
+
+# CHECKOUT
+# =====================================================
+def confirmar(conexao, carrinho_id, itens, reservas=None):
+    """
+    Transforma as reservas do carrinho em baixa definitiva de estoque
+
+    Cada produto precisa ter estoque livre para a compra, contando a
+    reserva do próprio carrinho (que pode ser menor que a compra, ou zero
+    se tiver vencido). As reservas do carrinho são apagadas.
+
+    Args:
+        itens: Dicionário {produto_id: quantidade comprada}
+        reservas: Reservas do carrinho já lidas na mesma transação
+                  (None: lê agora)
+
+    Returns:
+        True se todos os produtos foram baixados; False se faltou estoque
+        (nesse caso, quem chama deve desfazer a transação)
+    """
+    if reservas is None:
+        reservas = reservas_do_carrinho(conexao, carrinho_id) if carrinho_id else {}
+    resultado = conexao.execute(SQL_CONFIRMAR, [
+        {'produto_id': produto_id, 'quantidade': quantidade,
+         'reserva': min(reservas.get(produto_id, 0), quantidade)}
+        for produto_id, quantidade in itens.items()
+    ])
+    if resultado.rowcount != len(itens):
+        return False
+
+    # Reserva maior que a compra (ou de produto fora do pedido): devolve o resto
+    sobras = [
+        (produto_id, reserva - min(reserva, itens.get(produto_id, 0)))
+        for produto_id, reserva in reservas.items()
+    ]
+    if carrinho_id:
+        conexao.execute(text(f"DELETE FROM {TABELA} WHERE carrinho_id = :carrinho_id"),
+                        {'carrinho_id': carrinho_id})
+    _devolver(conexao, [(produto_id, sobra) for produto_id, sobra in sobras if sobra])
+    return True
+
+
+# LIMPEZA EM SEGUNDO PLANO
+# =====================================================
+class LimpezaReservas:
+    """
+    Thread que devolve as reservas vencidas a cada `intervalo` segundos
+
+    Conceitos:
+    - daemon=True: A thread não impede o processo de terminar
+    - Event.wait(intervalo): Espera o intervalo, mas acorda na hora se
+      parar() for chamado
+    - Em serverless (processo congelado entre requisições) a thread não
+      roda; nesse caso as reservas vencidas são devolvidas quando uma nova
+      reserva falha por falta de estoque
+
+    Args:
+        executar: Função sem argumentos que faz a limpeza (com app_context e commit)
+        intervalo: Segundos entre duas limpezas
+    """
+
+    def __init__(self, executar, intervalo=60):
+        self.executar = executar
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.execucoes = 0
+        self.devolvidas = 0
+
+    def iniciar(self):
+        """
+        Inicia a thread (só na primeira chamada)
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._laco, name='limpeza-reservas', daemon=True)
+                self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _laco(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.devolvidas += self.executar()
+                self.execucoes += 1
+            except Exception as e:
+                # Um erro (ex: banco ocupado) não pode matar a thread
+                print(f"Erro na limpeza das reservas: {e}")
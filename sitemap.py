@@ -0,0 +1,129 @@
+# sitemap.py - Geração do sitemap.xml
+# O sitemap lista as páginas do site para os buscadores (Google, Bing...).
+# Ele só muda quando o catálogo muda, então é gerado uma vez por versão do
+# catálogo e depois servido da memória, sem consultar o banco.
+#
+# O protocolo limita cada arquivo a 50.000 URLs. Acima disso, /sitemap.xml
+# vira um "índice" que aponta para vários arquivos /sitemap-<n>.xml.gz,
+# cada um comprimido com gzip.
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import zlib
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+# CONFIGURAÇÃO
+# =====================================================
+LIMITE_URLS = 50000
+
+# URLs por bloco de bytes: a resposta é enviada bloco a bloco (streaming)
+TAMANHO_BLOCO = 1000
+
+CABECALHO_URLSET = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+CABECALHO_INDICE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+
+
+# ENTRADA DO SITEMAP
+# =====================================================
+class EntradaSitemap(NamedTuple):
+    """
+    Uma URL do sitemap
+
+    Args:
+        caminho: Caminho relativo (ex: /produto/3); o domínio é
+                 acrescentado na geração
+        lastmod: Data da última alteração (AAAA-MM-DD)
+        changefreq: Frequência de mudança (daily, weekly...)
+        priority: Prioridade relativa (0.0 a 1.0)
+    """
+    caminho: str
+    lastmod: str
+    changefreq: str
+    priority: str
+
+
+# GERAÇÃO DO XML
+# =====================================================
+def _blocos_urlset(base_url, entradas):
+    """
+    Gerador que produz o <urlset> em blocos de bytes
+
+    Conceitos:
+    - Gerador (yield): Produz o XML aos poucos, sem montar uma string
+      gigante com todas as URLs
+    - escape(): Troca &, < e > por entidades XML
+    """
+    yield CABECALHO_URLSET.encode('utf-8')
+    for inicio in range(0, len(entradas), TAMANHO_BLOCO):
+        yield ''.join(
+            f'<url><loc>{escape(base_url + e.caminho)}</loc><lastmod>{e.lastmod}</lastmod>'
+            f'<changefreq>{e.changefreq}</changefreq><priority>{e.priority}</priority></url>\n'
+            for e in entradas[inicio:inicio + TAMANHO_BLOCO]
+        ).encode('utf-8')
+    yield b'</urlset>\n'
+
+
+def _blocos_indice(base_url, quantidade, lastmod):
+    """
+    Gerador que produz o <sitemapindex> apontando para as partes
+    """
+    yield CABECALHO_INDICE.encode('utf-8')
+    for numero in range(1, quantidade + 1):
+        yield (
+            f'<sitemap><loc>{escape(f"{base_url}/sitemap-{numero}.xml.gz")}</loc>'
+            f'<lastmod>{lastmod}</lastmod></sitemap>\n'
+        ).encode('utf-8')
+    yield b'</sitemapindex>\n'
+
+
+def _gzip(blocos):
+    """
+    Comprime os blocos com gzip à medida que são gerados
+
+    wbits=31: Formato gzip (cabeçalho + dados deflate + CRC)
+    """
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    partes = [compressor.compress(bloco) for bloco in blocos]
+    partes.append(compressor.flush())
+    return b''.join(partes)
+
+
+# SITEMAP PRONTO
+# =====================================================
+class Sitemap:
+    """
+    Sitemap gerado para uma versão do catálogo e um domínio
+
+    Atributos:
+        principal: Tupla de blocos de bytes de /sitemap.xml (um <urlset>,
+                   ou um <sitemapindex> quando há mais de LIMITE_URLS)
+        partes: Tupla com o conteúdo gzip de cada /sitemap-<n>.xml.gz
+                (vazia quando tudo cabe em /sitemap.xml)
+        total_urls: Quantidade de URLs
+    """
+
+    __slots__ = ('principal', 'partes', 'total_urls')
+
+    def __init__(self, base_url, entradas, lastmod, limite=LIMITE_URLS):
+        entradas = list(entradas)
+        base_url = base_url.rstrip('/')
+        self.total_urls = len(entradas)
+
+        if len(entradas) <= limite:
+            self.principal = tuple(_blocos_urlset(base_url, entradas))
+            self.partes = ()
+        else:
+            grupos = [entradas[i:i + limite] for i in range(0, len(entradas), limite)]
+            self.partes = tuple(_gzip(_blocos_urlset(base_url, grupo)) for grupo in grupos)
+            self.principal = tuple(_blocos_indice(base_url, len(grupos), lastmod))
+
+    @property
+    def eh_indice(self):
+        return bool(self.partes)
@@ -0,0 +1,167 @@
+# snapshot_banco.py - Banco SQLite pronto para uso (snapshot do catálogo)
+# Na Vercel o banco fica em /tmp, que começa vazio em cada instância nova.
+# Sem o snapshot, a primeira requisição precisa criar as tabelas, inserir o
+# catálogo inteiro e montar o índice de busca antes de responder.
+#
+# Este módulo gera, no build, o arquivo data/catalogo.db com tudo pronto
+# (tabelas, índices, produtos, índice FTS5, estatísticas do ANALYZE e VACUUM).
+# Na inicialização, se o arquivo do banco ainda não existir, o init_db() começa
+# de uma cópia dele e a sincronização com o JSON vira só uma comparação de hash.
+#
+# Build (rode sempre que alterar data/produtos.json ou os modelos):
+#     python snapshot_banco.py
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import os
+import shutil
+import sqlite3
+import tempfile
+
+# CAMINHOS
+# =====================================================
+PASTA_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SNAPSHOT_PATH = os.path.join(PASTA_DADOS, 'catalogo.db')
+
+# Os 16 primeiros bytes de todo arquivo SQLite
+CABECALHO_SQLITE = b'SQLite format 3\x00'
+
+
+# VERIFICAÇÃO
+# =====================================================
+def versao_snapshot(caminho):
+    """
+    Versão do esquema gravada no snapshot (PRAGMA user_version)
+
+    Returns:
+        Número da versão, ou None se o arquivo não existir ou não for SQLite
+    """
+    try:
+        with open(caminho, 'rb') as f:
+            if f.read(len(CABECALHO_SQLITE)) != CABECALHO_SQLITE:
+                return None
+    except OSError:
+        return None
+
+    # mode=ro: só leitura, o snapshot nunca é alterado em produção
+    conexao = sqlite3.connect(f'file:{caminho}?mode=ro', uri=True)
+    try:
+        return conexao.execute('PRAGMA user_version').fetchone()[0]
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conexao.close()
+
+
+# RESTAURAÇÃO (INICIALIZAÇÃO DA APLICAÇÃO)
+# =====================================================
+def restaurar(snapshot, destino, versao_esquema):
+    """
+    Copia o snapshot para `destino` se o banco ainda não existir
+
+    Conceitos:
+    - Só bancos que não existem são criados a partir do snapshot: um banco
+      com pedidos nunca é sobrescrito
+    - A cópia é feita em um arquivo temporário na mesma pasta e depois
+      "publicada" com os.link(), que falha se o destino já existir. Assim,
+      se dois processos iniciarem juntos, só um cria o banco e nenhum
+      deles vê um arquivo pela metade
+
+    Args:
+        snapshot: Caminho do data/catalogo.db
+        destino: Caminho do banco usado pela aplicação
+        versao_esquema: Versão esperada (VERSAO_ESQUEMA do app.py); um
+                        snapshot de outra versão é ignorado
+
+    Returns:
+        True se o banco foi criado a partir do snapshot
+    """
+    if os.path.exists(destino):
+        return False
+    if versao_snapshot(snapshot) != versao_esquema:
+        print(f"Snapshot {snapshot} ausente ou desatualizado (rode: python snapshot_banco.py)")
+        return False
+
+    pasta = os.path.dirname(destino) or '.'
+    os.makedirs(pasta, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix='.snapshot')
+    os.close(descritor)
+    try:
+        shutil.copyfile(snapshot, temporario)
+        try:
+            os.link(temporario, destino)
+        except FileExistsError:
+            # Outro processo criou o banco primeiro
+            return False
+        except OSError:
+            # Sistemas de arquivos sem hard links
+            if os.path.exists(destino):
+                return False
+            os.replace(temporario, destino)
+            return True
+        return True
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+# GERAÇÃO (BUILD)
+# =====================================================
+def compactar(caminho):
+    """
+    Deixa o arquivo pronto para ser distribuído
+
+    - wal_checkpoint + journal_mode=DELETE: Tudo fica no próprio arquivo,
+      sem -wal/-shm ao lado (o perfil do SQLite volta a ativar o WAL na cópia)
+    - ANALYZE: Estatísticas para o planejador de consultas
+    - VACUUM: Remove páginas livres e desfragmenta o arquivo
+    """
+    conexao = sqlite3.connect(caminho)
+    try:
+        conexao.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conexao.execute('PRAGMA journal_mode=DELETE')
+        conexao.execute('ANALYZE')
+        conexao.commit()
+        conexao.execute('VACUUM')
+    finally:
+        conexao.close()
+
+
+def gerar(destino=SNAPSHOT_PATH):
+    """
+    Cria um banco novo com init_db(), compacta e publica em `destino`
+
+    A configuração do banco é lida quando app.py é importado, por isso
+    DATABASE_URL é definida antes da importação (rode em um processo próprio)
+
+    Returns:
+        Dicionário com o resultado da sincronização do init_db()
+    """
+    pasta = tempfile.mkdtemp()
+    temporario = os.path.join(pasta, 'catalogo.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{temporario}'
+    os.environ['BANCO_SNAPSHOT'] = ''        # não parte do snapshot anterior
+    os.environ['CARRINHO_BACKEND'] = 'memoria'
+
+    from app import app, criar_app, db, init_db
+    criar_app(banco=None)  # PRAGMAs, instrumentação e fila; o init_db vem abaixo
+    with app.app_context():
+        resultado = init_db(forcar=True)
+        db.engine.dispose()
+    if resultado is None:
+        raise SystemExit('Falha ao sincronizar o catálogo; snapshot não gerado')
+
+    compactar(temporario)
+    # Mesmo sistema de arquivos do destino para o os.replace ser atômico
+    shutil.copyfile(temporario, destino + '.tmp')
+    os.replace(destino + '.tmp', destino)
+    shutil.rmtree(pasta, ignore_errors=True)
+    return resultado
+
+
+# PONTO DE ENTRADA (BUILD)
+# =====================================================
+if __name__ == '__main__':
+    resultado = gerar()
+    print(f"Snapshot gerado: {SNAPSHOT_PATH} ({resultado['inseridos']} produtos, "
+          f"{os.path.getsize(SNAPSHOT_PATH) / 1024:.0f} KB)")
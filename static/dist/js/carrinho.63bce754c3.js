@@ -0,0 +1,36 @@
+document.addEventListener('DOMContentLoaded',function(){console.log('Página do carrinho carregada');if(document.getElementById('carrinho-table')){setupQuantityButtons();setupRemoveButtons();setupClearCartButton();setupQuantityInputs();}
+});function setupQuantityButtons(){document.querySelectorAll('.qty-btn-increase').forEach(button=>{button.addEventListener('click',function(){const produtoId=this.dataset.produtoId;const input=document.querySelector(`input[data-produto-id="${produtoId}"]`);const novaQuantidade=parseInt(input.value)+1;atualizarQuantidade(produtoId,novaQuantidade,input);});});document.querySelectorAll('.qty-btn-decrease').forEach(button=>{button.addEventListener('click',function(){const produtoId=this.dataset.produtoId;const input=document.querySelector(`input[data-produto-id="${produtoId}"]`);const quantidadeAtual=parseInt(input.value);if(quantidadeAtual>1){const novaQuantidade=quantidadeAtual-1;atualizarQuantidade(produtoId,novaQuantidade,input);}
+});});}
+function setupQuantityInputs(){document.querySelectorAll('.quantidade-input').forEach(input=>{input.addEventListener('change',function(){const produtoId=this.dataset.produtoId;const novaQuantidade=parseInt(this.value);if(novaQuantidade>=1){atualizarQuantidade(produtoId,novaQuantidade,this);}else{this.value=1;}
+});input.addEventListener('input',function(){if(this.value<1){this.value=1;}
+});});}
+const carrinhoBatch=new window.ADEGA.CarrinhoBatch({aoResponder:function(data){if(data.success){aplicarEstadoCarrinho(data);showToast('Quantidade atualizada!','success');}else{if(data.carrinho){aplicarEstadoCarrinho(data.carrinho);}
+showToast(data.error||'Erro ao atualizar quantidade','error');}
+}
+});function atualizarQuantidade(produtoId,novaQuantidade,inputElement){inputElement.value=novaQuantidade;inputElement.style.opacity='0.5';carrinhoBatch.atualizar(parseInt(produtoId),novaQuantidade)
+.catch(error=>{console.error('Erro:',error);showToast('Erro de conexão','error');})
+.finally(()=>{inputElement.style.opacity='1';});}
+function aplicarEstadoCarrinho(estado){Object.entries(estado.itens).forEach(([produtoId,item])=>{const input=document.querySelector(`input.quantidade-input[data-produto-id="${produtoId}"]`);if(input){input.value=item.quantidade;}
+const subtotalElement=document.querySelector(`span.subtotal[data-produto-id="${produtoId}"]`);if(subtotalElement){subtotalElement.textContent=formatarMoeda(item.subtotal);}
+});atualizarTotalGeral(estado.total);atualizarBadgeCarrinho(estado.total_itens);}
+function setupRemoveButtons(){document.querySelectorAll('.remover-item').forEach(button=>{button.addEventListener('click',function(){const produtoId=this.dataset.produtoId;const nomeProduto=this.dataset.nome;if(confirm(`Tem certeza que deseja remover "${nomeProduto}" do carrinho?`)){removerItem(produtoId);}
+});});}
+function removerItem(produtoId){window.location.href=`/remover_carrinho/${produtoId}`;}
+function setupClearCartButton(){const clearButton=document.getElementById('limpar-carrinho');if(clearButton){clearButton.addEventListener('click',function(){if(confirm('Tem certeza que deseja limpar todo o carrinho?')){limparCarrinho();}
+});}
+}
+function limparCarrinho(){const itens=document.querySelectorAll('.carrinho-item');if(itens.length>0){fetch('/limpar_carrinho',{method:'POST'})
+.then(()=>{location.reload();})
+.catch(()=>{window.location.href='/';});}
+}
+function calcularTotalItens(){let total=0;document.querySelectorAll('.quantidade-input').forEach(input=>{total+=parseInt(input.value);});return total;}
+function atualizarTotalGeral(novoTotal){const totalElement=document.getElementById('valor-total');if(totalElement){totalElement.textContent=formatarMoeda(novoTotal);}
+const totalItens=calcularTotalItens();const totalItensElement=document.getElementById('total-itens');if(totalItensElement){totalItensElement.textContent=totalItens;}
+}
+function formatarMoeda(valor){return new Intl.NumberFormat('pt-BR',{style:'currency',currency:'BRL'
+}).format(valor);}
+function showToast(message,type='info'){const toast=document.createElement('div');toast.className=`alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed`;toast.style.cssText='top: 20px; right: 20px; z-index: 1050; min-width: 300px;';toast.innerHTML=`
+        ${message}
+        <button type="button" class="btn-close" onclick="this.parentElement.remove()"></button>
+    `;document.body.appendChild(toast);setTimeout(()=>{if(toast.parentNode){toast.remove();}
+},3000);}
@@ -0,0 +1,22 @@
+document.addEventListener('DOMContentLoaded',function(){console.log('Página de checkout carregada');setupFormValidation();setupPhoneMask();gerarTokenPedido();});function gerarTokenPedido(){const campo=document.getElementById('token_pedido');if(window.crypto&&crypto.randomUUID){campo.value=crypto.randomUUID().replace(/-/g,'');}else{campo.value=Date.now().toString(16)+Math.random().toString(16).slice(2);}
+}
+function setupFormValidation(){const form=document.getElementById('checkout-form');form.addEventListener('submit',function(event){event.preventDefault();event.stopPropagation();form.classList.remove('was-validated');let isValid=true;const nome=document.getElementById('nome');if(nome.value.trim().length<3){markFieldAsInvalid(nome,'Nome deve ter pelo menos 3 caracteres');isValid=false;}else{markFieldAsValid(nome);}
+const telefone=document.getElementById('telefone');const telefoneRegex=/^\(\d{2}\)\s\d{4,5}-\d{4}$/;if(!telefoneRegex.test(telefone.value)){markFieldAsInvalid(telefone,'Formato: (11) 99999-9999');isValid=false;}else{markFieldAsValid(telefone);}
+const endereco=document.getElementById('endereco');if(endereco.value.trim().length<10){markFieldAsInvalid(endereco,'Endereço deve ser mais detalhado');isValid=false;}else{markFieldAsValid(endereco);}
+const termos=document.getElementById('aceitar-termos');if(!termos.checked){markFieldAsInvalid(termos,'Você deve aceitar os termos');isValid=false;}else{markFieldAsValid(termos);}
+if(isValid){const submitButton=form.querySelector('button[type="submit"]');submitButton.disabled=true;submitButton.innerHTML='<i class="fas fa-spinner fa-spin me-2"></i>Processando...';form.submit();}else{showToast('Por favor, corrija os erros no formulário','error');const firstInvalidField=form.querySelector('.is-invalid');if(firstInvalidField){firstInvalidField.focus();}
+}
+});}
+function setupPhoneMask(){const telefoneInput=document.getElementById('telefone');telefoneInput.addEventListener('input',function(){let value=this.value.replace(/\D/g,'');if(value.length<=10){value=value.replace(/^(\d{2})(\d{4})(\d{0,4}).*/,'($1) $2-$3');}else{value=value.replace(/^(\d{2})(\d{5})(\d{0,4}).*/,'($1) $2-$3');}
+this.value=value;});telefoneInput.addEventListener('keypress',function(e){const char=String.fromCharCode(e.which);if(!/[\d\(\)\s\-]/.test(char)){e.preventDefault();}
+});}
+function markFieldAsValid(field){field.classList.remove('is-invalid');field.classList.add('is-valid');}
+function markFieldAsInvalid(field,message){field.classList.remove('is-valid');field.classList.add('is-invalid');const feedback=field.nextElementSibling;if(feedback&&feedback.classList.contains('invalid-feedback')){feedback.textContent=message;}
+}
+function copiarPix(){const chavePix=document.getElementById('chave-pix');chavePix.select();chavePix.setSelectionRange(0,99999);try{document.execCommand('copy');showToast('Chave PIX copiada!','success');const botaoCopiar=event.target.closest('button');const iconeOriginal=botaoCopiar.innerHTML;botaoCopiar.innerHTML='<i class="fas fa-check text-success"></i>';setTimeout(()=>{botaoCopiar.innerHTML=iconeOriginal;},2000);}catch(err){showToast('Erro ao copiar. Copie manualmente: radiotatuapefm@gmail.com','error');}
+}
+function showToast(message,type='info'){const toast=document.createElement('div');toast.className=`alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed`;toast.style.cssText='top: 20px; right: 20px; z-index: 1050; min-width: 300px;';toast.innerHTML=`
+        ${message}
+        <button type="button" class="btn-close" onclick="this.parentElement.remove()"></button>
+    `;document.body.appendChild(toast);setTimeout(()=>{if(toast.parentNode){toast.remove();}
+},5000);}
@@ -0,0 +1,17 @@
+document.addEventListener('DOMContentLoaded',function(){console.log('Página inicial carregada. Inicializando funcionalidades...');setupQuantityButtons();setupAddToCartForms();setupCardAnimations();});function setupQuantityButtons(){const decreaseButtons=document.querySelectorAll('.qty-decrease');const increaseButtons=document.querySelectorAll('.qty-increase');decreaseButtons.forEach(button=>{button.addEventListener('click',function(){const input=this.parentNode.querySelector('.quantidade-input');let value=parseInt(input.value);if(value>1){input.value=value-1;}
+});});increaseButtons.forEach(button=>{button.addEventListener('click',function(){const input=this.parentNode.querySelector('.quantidade-input');const max=parseInt(input.getAttribute('max'));let value=parseInt(input.value);if(value<max){input.value=value+1;}
+});});}
+function setupAddToCartForms(){const forms=document.querySelectorAll('.add-to-cart-form');forms.forEach(form=>{form.addEventListener('submit',function(e){e.preventDefault();const produtoId=this.dataset.produtoId;const quantidade=this.querySelector('input[name="quantidade"]').value;const submitButton=this.querySelector('button[type="submit"]');submitButton.disabled=true;submitButton.innerHTML='<i class="fas fa-spinner fa-spin"></i>';fetch('/adicionar_carrinho',{method:'POST',headers:{'Content-Type':'application/json',},body:JSON.stringify({produto_id:parseInt(produtoId),quantidade:parseInt(quantidade)
+})
+})
+.then(response=>response.json())
+.then(data=>{if(data.success){atualizarBadgeCarrinho(data.total_itens);showToast('Produto adicionado ao carrinho!','success');this.querySelector('input[name="quantidade"]').value=1;}else{showToast(data.error||'Erro ao adicionar produto','error');}
+})
+.catch(error=>{console.error('Erro:',error);showToast('Erro de conexão','error');})
+.finally(()=>{submitButton.disabled=false;submitButton.innerHTML='<i class="fas fa-cart-plus"></i>';});});});}
+function setupCardAnimations(){const cards=document.querySelectorAll('.produto-card');cards.forEach(card=>{card.addEventListener('mouseenter',function(){this.style.transform='translateY(-5px)';this.style.transition='transform 0.3s ease';});card.addEventListener('mouseleave',function(){this.style.transform='translateY(0)';});});}
+function showToast(message,type='info'){const toast=document.createElement('div');toast.className=`alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed`;toast.style.cssText='top: 20px; right: 20px; z-index: 1050; min-width: 300px;';toast.innerHTML=`
+        ${message}
+        <button type="button" class="btn-close" onclick="this.parentElement.remove()"></button>
+    `;document.body.appendChild(toast);setTimeout(()=>{if(toast.parentNode){toast.remove();}
+},3000);}
@@ -0,0 +1,136 @@
+const ADEGA_CONFIG={API_BASE:window.location.origin,WHATSAPP_NUMBER:'5511970603441',PIX_EMAIL:'radiotatuapefm@gmail.com',TOAST_DURATION:3000,LOADING_MIN_TIME:500,DEBUG:true,MESSAGES:{CARRINHO_VAZIO:'Carrinho vazio',PRODUTO_ADICIONADO:'Produto adicionado ao carrinho!',PRODUTO_REMOVIDO:'Produto removido do carrinho',ERRO_CONEXAO:'Erro de conexão. Tente novamente.',ERRO_GENERICO:'Algo deu errado. Tente novamente.',CONFIRMACAO_REMOCAO:'Tem certeza que deseja remover este item?',PIX_COPIADO:'Chave PIX copiada!'
+}
+};const Logger={log:(message,data=null)=>{if(ADEGA_CONFIG.DEBUG){console.log(`[ADEGA] ${message}`,data||'');}
+},error:(message,error=null)=>{if(ADEGA_CONFIG.DEBUG){console.error(`[ADEGA ERROR] ${message}`,error||'');}
+},warn:(message,data=null)=>{if(ADEGA_CONFIG.DEBUG){console.warn(`[ADEGA WARN] ${message}`,data||'');}
+}
+};const Formatter={currency:(value)=>{return new Intl.NumberFormat('pt-BR',{style:'currency',currency:'BRL'
+}).format(value);},phone:(phone)=>{const cleaned=phone.replace(/\D/g,'');if(cleaned.length===11){return cleaned.replace(/^(\d{2})(\d{5})(\d{4}).*/,'($1) $2-$3');}else if(cleaned.length===10){return cleaned.replace(/^(\d{2})(\d{4})(\d{4}).*/,'($1) $2-$3');}
+return phone;},date:(date)=>{const d=new Date(date);return d.toLocaleDateString('pt-BR');},datetime:(datetime)=>{const d=new Date(datetime);return d.toLocaleString('pt-BR');}
+};const Validator={email:(email)=>{const regex=/^[^\s@]+@[^\s@]+\.[^\s@]+$/;return regex.test(email);},phone:(phone)=>{const cleaned=phone.replace(/\D/g,'');return cleaned.length>=10&&cleaned.length<=11;},required:(value)=>{return value&&value.trim().length>0;},minLength:(value,min)=>{return value&&value.trim().length>=min;}
+};const Storage={set:(key,value)=>{try{localStorage.setItem(`adega_${key}`,JSON.stringify(value));return true;}catch(error){Logger.error('Erro ao salvar no localStorage',error);return false;}
+},get:(key,defaultValue=null)=>{try{const item=localStorage.getItem(`adega_${key}`);return item?JSON.parse(item):defaultValue;}catch(error){Logger.error('Erro ao ler do localStorage',error);return defaultValue;}
+},remove:(key)=>{try{localStorage.removeItem(`adega_${key}`);return true;}catch(error){Logger.error('Erro ao remover do localStorage',error);return false;}
+},clear:()=>{try{const keys=Object.keys(localStorage).filter(key=>key.startsWith('adega_'));keys.forEach(key=>localStorage.removeItem(key));return true;}catch(error){Logger.error('Erro ao limpar localStorage',error);return false;}
+}
+};class NotificationSystem{constructor(){this.container=null;this.init();}
+init(){this.createContainer();}
+createContainer(){if(!this.container){this.container=document.createElement('div');this.container.id='toast-container';this.container.className='position-fixed';this.container.style.cssText=`
+                top: 20px;
+                right: 20px;
+                z-index: 1050;
+                max-width: 350px;
+            `;document.body.appendChild(this.container);}
+}
+show(message,type='info',duration=ADEGA_CONFIG.TOAST_DURATION){const toast=this.createToast(message,type);this.container.appendChild(toast);requestAnimationFrame(()=>{toast.classList.add('show');});if(duration>0){setTimeout(()=>{this.remove(toast);},duration);}
+return toast;}
+createToast(message,type){const toast=document.createElement('div');toast.className=`alert alert-${this.getAlertClass(type)} alert-dismissible fade mb-2`;toast.style.cssText='margin-bottom: 10px;';toast.innerHTML=`
+            <i class="fas fa-${this.getIcon(type)} me-2"></i>
+            ${message}
+            <button type="button" class="btn-close" data-dismiss="toast"></button>
+        `;const closeBtn=toast.querySelector('.btn-close');closeBtn.addEventListener('click',()=>{this.remove(toast);});return toast;}
+remove(toast){if(toast&&toast.parentNode){toast.classList.remove('show');toast.classList.add('fade');setTimeout(()=>{if(toast.parentNode){toast.remove();}
+},150);}
+}
+getAlertClass(type){const classes={success:'success',error:'danger',warning:'warning',info:'info'
+};return classes[type]||'info';}
+getIcon(type){const icons={success:'check-circle',error:'exclamation-triangle',warning:'exclamation-triangle',info:'info-circle'
+};return icons[type]||'info-circle';}
+success(message,duration){return this.show(message,'success',duration);}
+error(message,duration){return this.show(message,'error',duration);}
+warning(message,duration){return this.show(message,'warning',duration);}
+info(message,duration){return this.show(message,'info',duration);}
+}
+class LoadingSystem{constructor(){this.overlay=null;this.activeRequests=0;}
+show(message='Carregando...'){this.activeRequests++;if(!this.overlay){this.createOverlay(message);}else{this.updateMessage(message);}
+this.overlay.style.display='flex';}
+hide(){this.activeRequests=Math.max(0,this.activeRequests-1);if(this.activeRequests===0&&this.overlay){this.overlay.style.display='none';}
+}
+forceHide(){this.activeRequests=0;if(this.overlay){this.overlay.style.display='none';}
+}
+createOverlay(message){this.overlay=document.createElement('div');this.overlay.id='loading-overlay';this.overlay.style.cssText=`
+            position: fixed;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 100%;
+            background: rgba(0, 0, 0, 0.5);
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            z-index: 9999;
+            flex-direction: column;
+        `;this.overlay.innerHTML=`
+            <div class="loading-spinner mb-3"></div>
+            <div class="text-white" id="loading-message">${message}</div>
+        `;document.body.appendChild(this.overlay);}
+updateMessage(message){const messageEl=this.overlay?.querySelector('#loading-message');if(messageEl){messageEl.textContent=message;}
+}
+}
+class HttpClient{constructor(){this.baseURL=ADEGA_CONFIG.API_BASE;this.loading=new LoadingSystem();}
+async get(url,options={}){return this.request(url,{...options,method:'GET'});}
+async post(url,data=null,options={}){return this.request(url,{...options,method:'POST',body:data?JSON.stringify(data):null,headers:{'Content-Type':'application/json',...options.headers
+}
+});}
+async put(url,data=null,options={}){return this.request(url,{...options,method:'PUT',body:data?JSON.stringify(data):null,headers:{'Content-Type':'application/json',...options.headers
+}
+});}
+async delete(url,options={}){return this.request(url,{...options,method:'DELETE'});}
+async request(url,options={}){const fullURL=url.startsWith('http')?url:`${this.baseURL}${url}`;if(options.showLoading!==false){this.loading.show();}
+try{Logger.log(`HTTP ${options.method || 'GET'}`,fullURL);const response=await fetch(fullURL,{...options,headers:{'X-Requested-With':'XMLHttpRequest',...options.headers
+}
+});if(!response.ok){throw new Error(`HTTP Error ${response.status}: ${response.statusText}`);}
+const contentType=response.headers.get('Content-Type');let data;if(contentType&&contentType.includes('application/json')){data=await response.json();}else{data=await response.text();}
+Logger.log('HTTP Response',data);return data;}catch(error){Logger.error('HTTP Error',error);throw error;}finally{if(options.showLoading!==false){this.loading.hide();}
+}
+}
+}
+const notifications=new NotificationSystem();const loading=new LoadingSystem();const http=new HttpClient();function showSuccess(message,duration){return notifications.success(message,duration);}
+function showError(message,duration){return notifications.error(message,duration);}
+function showWarning(message,duration){return notifications.warning(message,duration);}
+function showInfo(message,duration){return notifications.info(message,duration);}
+async function copyToClipboard(text,successMessage='Copiado!'){try{if(navigator.clipboard){await navigator.clipboard.writeText(text);}else{const textArea=document.createElement('textarea');textArea.value=text;textArea.style.position='fixed';textArea.style.left='-999999px';textArea.style.top='-999999px';document.body.appendChild(textArea);textArea.focus();textArea.select();document.execCommand('copy');textArea.remove();}
+showSuccess(successMessage);return true;}catch(error){Logger.error('Erro ao copiar para clipboard',error);showError('Erro ao copiar. Tente copiar manualmente.');return false;}
+}
+function formatCurrency(value){return Formatter.currency(value);}
+function debounce(func,wait,immediate=false){let timeout;return function executedFunction(...args){const later=()=>{timeout=null;if(!immediate)func.apply(this,args);};const callNow=immediate&&!timeout;clearTimeout(timeout);timeout=setTimeout(later,wait);if(callNow)func.apply(this,args);};}
+function throttle(func,limit){let inThrottle;return function(...args){if(!inThrottle){func.apply(this,args);inThrottle=true;setTimeout(()=>inThrottle=false,limit);}
+};}
+class CarrinhoBatch{constructor(options={}){this.url=options.url||'/carrinho/batch';this.aoResponder=options.aoResponder||null;this.operacoes=[];this.promessas=[];this.agendarEnvio=debounce(()=>this.enviar(),options.espera||400);}
+adicionar(produtoId,quantidade=1){return this.enfileirar({acao:'adicionar',produto_id:produtoId,quantidade});}
+atualizar(produtoId,quantidade){return this.enfileirar({acao:'atualizar',produto_id:produtoId,quantidade});}
+remover(produtoId){return this.enfileirar({acao:'remover',produto_id:produtoId});}
+enfileirar(operacao){const ultima=this.operacoes[this.operacoes.length-1];if(ultima&&ultima.produto_id===operacao.produto_id&&ultima.acao===operacao.acao){if(operacao.acao==='adicionar'){ultima.quantidade+=operacao.quantidade;}else{ultima.quantidade=operacao.quantidade;}
+}else{this.operacoes.push({...operacao});}
+const promessa=new Promise((resolve,reject)=>{this.promessas.push({resolve,reject});});this.agendarEnvio();return promessa;}
+async enviar(){const operacoes=this.operacoes;const promessas=this.promessas;this.operacoes=[];this.promessas=[];if(operacoes.length===0){return;}
+try{Logger.log('Carrinho em lote',operacoes);const response=await fetch(this.url,{method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({operacoes})
+});const data=await response.json();if(this.aoResponder){this.aoResponder(data);}
+promessas.forEach(p=>p.resolve(data));}catch(error){Logger.error('Erro no carrinho em lote',error);promessas.forEach(p=>p.reject(error));}
+}
+}
+document.addEventListener('DOMContentLoaded',function(){Logger.log('Aplicação inicializada');initGlobalFeatures();setupGlobalEventListeners();initPageSpecificFeatures();});function initGlobalFeatures(){setupSmoothScroll();setupTooltips();setupAutoHideAlerts();}
+function setupSmoothScroll(){document.querySelectorAll('a[href^="#"]').forEach(anchor=>{anchor.addEventListener('click',function(e){e.preventDefault();const target=document.querySelector(this.getAttribute('href'));if(target){target.scrollIntoView({behavior:'smooth',block:'start'
+});}
+});});}
+function setupTooltips(){if(typeof bootstrap!=='undefined'){const tooltipTriggerList=[].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));tooltipTriggerList.map(tooltipTriggerEl=>{return new bootstrap.Tooltip(tooltipTriggerEl);});}
+}
+function setupAutoHideAlerts(){document.querySelectorAll('.alert:not(.alert-permanent)').forEach(alert=>{setTimeout(()=>{if(alert.parentNode){alert.classList.remove('show');setTimeout(()=>{if(alert.parentNode){alert.remove();}
+},150);}
+},5000);});}
+function setupGlobalEventListeners(){window.addEventListener('error',function(e){Logger.error('JavaScript Error',{message:e.message,filename:e.filename,lineno:e.lineno,colno:e.colno,error:e.error
+});});window.addEventListener('unhandledrejection',function(e){Logger.error('Unhandled Promise Rejection',e.reason);});}
+function initPageSpecificFeatures(){const currentPage=getCurrentPageName();Logger.log('Página atual detectada',currentPage);switch(currentPage){case'index':
+Logger.log('Inicializando funcionalidades da página inicial');break;case'carrinho':
+Logger.log('Inicializando funcionalidades do carrinho');break;case'checkout':
+Logger.log('Inicializando funcionalidades do checkout');break;case'pedido_confirmado':
+Logger.log('Inicializando funcionalidades da confirmação');break;}
+}
+function getCurrentPageName(){const path=window.location.pathname;if(path==='/'||path==='/index'||path.includes('index')){return'index';}else if(path.includes('carrinho')){return'carrinho';}else if(path.includes('checkout')){return'checkout';}else if(path.includes('pedido_confirmado')){return'pedido_confirmado';}
+return'unknown';}
+window.ADEGA={config:ADEGA_CONFIG,Logger,Formatter,Validator,Storage,notifications,loading,http,showSuccess,showError,showWarning,showInfo,copyToClipboard,formatCurrency,debounce,throttle,CarrinhoBatch
+};Logger.log('Sistema JavaScript da Adega carregado com sucesso!');function atualizarBadgeCarrinho(totalItens){const badge=document.getElementById('carrinho-badge');if(totalItens>0){if(badge){badge.textContent=totalItens;}else{const carrinhoLink=document.querySelector('a[href*="carrinho"]');const novoBadge=document.createElement('span');novoBadge.className='position-absolute top-0 start-100 translate-middle badge rounded-pill bg-danger';novoBadge.id='carrinho-badge';novoBadge.textContent=totalItens;carrinhoLink.appendChild(novoBadge);}
+}else{if(badge){badge.remove();}
+}
+}
+document.addEventListener('DOMContentLoaded',function(){console.log('Página carregada! Sistema da adega pronto.');});
@@ -646,6 +646,92 @@ function throttle(func, limit) {
     };
 }
 
+// CARRINHO EM LOTE
+// ================
+
+/**
+ * Fila de alterações do carrinho
+ * Junta alterações feitas em sequência (ex: vários cliques no "+")
+ * em uma única requisição para /carrinho/batch, usando debounce
+ */
+class CarrinhoBatch {
+    constructor(options = {}) {
+        this.url = options.url || '/carrinho/batch';
+        this.aoResponder = options.aoResponder || null;
+        this.operacoes = [];
+        this.promessas = [];
+        this.agendarEnvio = debounce(() => this.enviar(), options.espera || 400);
+    }
+    
+    adicionar(produtoId, quantidade = 1) {
+        return this.enfileirar({ acao: 'adicionar', produto_id: produtoId, quantidade });
+    }
+    
+    atualizar(produtoId, quantidade) {
+        return this.enfileirar({ acao: 'atualizar', produto_id: produtoId, quantidade });
+    }
+    
+    remover(produtoId) {
+        return this.enfileirar({ acao: 'remover', produto_id: produtoId });
+    }
+    
+    /**
+     * Coloca a operação na fila, juntando com a anterior do mesmo produto
+     * quando possível (duas "atualizar" viram uma; duas "adicionar" somam)
+     */
+    enfileirar(operacao) {
+        const ultima = this.operacoes[this.operacoes.length - 1];
+        
+        if (ultima && ultima.produto_id === operacao.produto_id && ultima.acao === operacao.acao) {
+            if (operacao.acao === 'adicionar') {
+                ultima.quantidade += operacao.quantidade;
+            } else {
+                ultima.quantidade = operacao.quantidade;
+            }
+        } else {
+            this.operacoes.push({ ...operacao });
+        }
+        
+        const promessa = new Promise((resolve, reject) => {
+            this.promessas.push({ resolve, reject });
+        });
+        this.agendarEnvio();
+        return promessa;
+    }
+    
+    /**
+     * Envia todas as operações pendentes em uma única requisição
+     */
+    async enviar() {
+        const operacoes = this.operacoes;
+        const promessas = this.promessas;
+        this.operacoes = [];
+        this.promessas = [];
+        
+        if (operacoes.length === 0) {
+            return;
+        }
+        
+        try {
+            Logger.log('Carrinho em lote', operacoes);
+            const response = await fetch(this.url, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ operacoes })
+            });
+            const data = await response.json();
+            
+            if (this.aoResponder) {
+                this.aoResponder(data);
+            }
+            promessas.forEach(p => p.resolve(data));
+        } catch (error) {
+            Logger.error('Erro no carrinho em lote', error);
+            promessas.forEach(p => p.reject(error));
+        }
+    }
+}
+
 // INICIALIZAÇÃO
 // =============
 
@@ -809,7 +895,8 @@ window.ADEGA = {
     copyToClipboard,
     formatCurrency,
     debounce,
-    throttle
+    throttle,
+    CarrinhoBatch
 };
 
 Logger.log('Sistema JavaScript da Adega carregado com sucesso!');
@@ -0,0 +1,39 @@
+// base.js - Scripts comuns a todas as páginas (antes no final de templates/base.html)
+// Empacotado por assets.py junto com app.js em js/loja.js
+
+// SCRIPT PARA ATUALIZAR BADGE DO CARRINHO VIA AJAX
+// Função JavaScript para atualizar o badge do carrinho
+// Este é um exemplo de JavaScript vanilla (sem jQuery)
+
+function atualizarBadgeCarrinho(totalItens) {
+    // Busca o elemento do badge pelo ID
+    const badge = document.getElementById('carrinho-badge');
+
+    if (totalItens > 0) {
+        if (badge) {
+            // Se o badge existe, atualiza o número
+            badge.textContent = totalItens;
+        } else {
+            // Se não existe, cria um novo badge
+            const carrinhoLink = document.querySelector('a[href*="carrinho"]');
+            const novoBadge = document.createElement('span');
+            novoBadge.className = 'position-absolute top-0 start-100 translate-middle badge rounded-pill bg-danger';
+            novoBadge.id = 'carrinho-badge';
+            novoBadge.textContent = totalItens;
+            carrinhoLink.appendChild(novoBadge);
+        }
+    } else {
+        // Remove o badge se não há itens
+        if (badge) {
+            badge.remove();
+        }
+    }
+}
+
+// Event listener que executa quando a página carrega
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Página carregada! Sistema da adega pronto.');
+
+    // Aqui podemos adicionar mais funcionalidades JavaScript
+    // que devem executar quando a página carrega
+});
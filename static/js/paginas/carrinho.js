@@ -0,0 +1,223 @@
+// carrinho.js - Scripts da página do carrinho (templates/carrinho.html)
+// Empacotado por assets.py em js/carrinho.js
+
+// JavaScript para funcionalidades do carrinho
+// ===========================================
+
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Página do carrinho carregada');
+
+    // Configurar funcionalidades apenas se há itens no carrinho
+    // (a tabela só é renderizada quando o carrinho não está vazio)
+    if (document.getElementById('carrinho-table')) {
+        setupQuantityButtons();
+        setupRemoveButtons();
+        setupClearCartButton();
+        setupQuantityInputs();
+    }
+});
+
+function setupQuantityButtons() {
+    // Botões de aumentar quantidade
+    document.querySelectorAll('.qty-btn-increase').forEach(button => {
+        button.addEventListener('click', function() {
+            const produtoId = this.dataset.produtoId;
+            const input = document.querySelector(`input[data-produto-id="${produtoId}"]`);
+            const novaQuantidade = parseInt(input.value) + 1;
+
+            atualizarQuantidade(produtoId, novaQuantidade, input);
+        });
+    });
+
+    // Botões de diminuir quantidade
+    document.querySelectorAll('.qty-btn-decrease').forEach(button => {
+        button.addEventListener('click', function() {
+            const produtoId = this.dataset.produtoId;
+            const input = document.querySelector(`input[data-produto-id="${produtoId}"]`);
+            const quantidadeAtual = parseInt(input.value);
+
+            if (quantidadeAtual > 1) {
+                const novaQuantidade = quantidadeAtual - 1;
+                atualizarQuantidade(produtoId, novaQuantidade, input);
+            }
+        });
+    });
+}
+
+function setupQuantityInputs() {
+    // Event listeners para inputs de quantidade
+    document.querySelectorAll('.quantidade-input').forEach(input => {
+        // Atualiza quando o usuário digita diretamente
+        input.addEventListener('change', function() {
+            const produtoId = this.dataset.produtoId;
+            const novaQuantidade = parseInt(this.value);
+
+            if (novaQuantidade >= 1) {
+                atualizarQuantidade(produtoId, novaQuantidade, this);
+            } else {
+                this.value = 1; // Reset para 1 se valor inválido
+            }
+        });
+
+        // Previne valores negativos durante digitação
+        input.addEventListener('input', function() {
+            if (this.value < 1) {
+                this.value = 1;
+            }
+        });
+    });
+}
+
+// Fila que junta alterações rápidas de quantidade em uma única
+// requisição para /carrinho/batch (veja CarrinhoBatch em app.js)
+const carrinhoBatch = new window.ADEGA.CarrinhoBatch({
+    aoResponder: function(data) {
+        if (data.success) {
+            aplicarEstadoCarrinho(data);
+            showToast('Quantidade atualizada!', 'success');
+        } else {
+            // Nada foi salvo: volta a interface para o estado do servidor
+            if (data.carrinho) {
+                aplicarEstadoCarrinho(data.carrinho);
+            }
+            showToast(data.error || 'Erro ao atualizar quantidade', 'error');
+        }
+    }
+});
+
+function atualizarQuantidade(produtoId, novaQuantidade, inputElement) {
+    // Atualiza o input na hora; o envio ao servidor é agrupado
+    inputElement.value = novaQuantidade;
+    inputElement.style.opacity = '0.5';
+
+    carrinhoBatch.atualizar(parseInt(produtoId), novaQuantidade)
+    .catch(error => {
+        console.error('Erro:', error);
+        showToast('Erro de conexão', 'error');
+    })
+    .finally(() => {
+        // Remove indicador de carregamento
+        inputElement.style.opacity = '1';
+    });
+}
+
+function aplicarEstadoCarrinho(estado) {
+    // Atualiza quantidades e subtotais com o estado devolvido pelo servidor
+    Object.entries(estado.itens).forEach(([produtoId, item]) => {
+        const input = document.querySelector(`input.quantidade-input[data-produto-id="${produtoId}"]`);
+        if (input) {
+            input.value = item.quantidade;
+        }
+        const subtotalElement = document.querySelector(`span.subtotal[data-produto-id="${produtoId}"]`);
+        if (subtotalElement) {
+            subtotalElement.textContent = formatarMoeda(item.subtotal);
+        }
+    });
+
+    // Atualiza total geral e badge do carrinho na navbar
+    atualizarTotalGeral(estado.total);
+    atualizarBadgeCarrinho(estado.total_itens);
+}
+
+function setupRemoveButtons() {
+    document.querySelectorAll('.remover-item').forEach(button => {
+        button.addEventListener('click', function() {
+            const produtoId = this.dataset.produtoId;
+            const nomeProduto = this.dataset.nome;
+
+            // Confirmação antes de remover
+            if (confirm(`Tem certeza que deseja remover "${nomeProduto}" do carrinho?`)) {
+                removerItem(produtoId);
+            }
+        });
+    });
+}
+
+function removerItem(produtoId) {
+    // Faz requisição para remover item
+    window.location.href = `/remover_carrinho/${produtoId}`;
+}
+
+function setupClearCartButton() {
+    const clearButton = document.getElementById('limpar-carrinho');
+    if (clearButton) {
+        clearButton.addEventListener('click', function() {
+            if (confirm('Tem certeza que deseja limpar todo o carrinho?')) {
+                // Implementar lógica para limpar carrinho
+                // Por enquanto, vamos redirecionar para uma URL que limpe a sessão
+                limparCarrinho();
+            }
+        });
+    }
+}
+
+function limparCarrinho() {
+    // Remove cada item individualmente
+    // (Pode ser implementado uma rota específica para limpar tudo)
+    const itens = document.querySelectorAll('.carrinho-item');
+    if (itens.length > 0) {
+        // Por simplicidade, vamos recarregar a página após limpar a sessão
+        fetch('/limpar_carrinho', { method: 'POST' })
+        .then(() => {
+            location.reload();
+        })
+        .catch(() => {
+            // Fallback: redirecionar para index
+            window.location.href = '/';
+        });
+    }
+}
+
+// FUNÇÕES AUXILIARES
+// ==================
+
+function calcularTotalItens() {
+    // Calcula total de itens no carrinho
+    let total = 0;
+    document.querySelectorAll('.quantidade-input').forEach(input => {
+        total += parseInt(input.value);
+    });
+    return total;
+}
+
+function atualizarTotalGeral(novoTotal) {
+    // Atualiza o valor total na interface
+    const totalElement = document.getElementById('valor-total');
+    if (totalElement) {
+        totalElement.textContent = formatarMoeda(novoTotal);
+    }
+
+    // Atualiza total de itens
+    const totalItens = calcularTotalItens();
+    const totalItensElement = document.getElementById('total-itens');
+    if (totalItensElement) {
+        totalItensElement.textContent = totalItens;
+    }
+}
+
+function formatarMoeda(valor) {
+    // Formata valor como moeda brasileira
+    return new Intl.NumberFormat('pt-BR', {
+        style: 'currency',
+        currency: 'BRL'
+    }).format(valor);
+}
+
+// Reutiliza função do template base para mostrar toasts
+function showToast(message, type = 'info') {
+    const toast = document.createElement('div');
+    toast.className = `alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed`;
+    toast.style.cssText = 'top: 20px; right: 20px; z-index: 1050; min-width: 300px;';
+    toast.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" onclick="this.parentElement.remove()"></button>
+    `;
+
+    document.body.appendChild(toast);
+
+    setTimeout(() => {
+        if (toast.parentNode) {
+            toast.remove();
+        }
+    }, 3000);
+}
@@ -0,0 +1,183 @@
+// checkout.js - Scripts da página de checkout (templates/checkout.html)
+// Empacotado por assets.py em js/checkout.js
+
+// JavaScript para funcionalidades do checkout
+// ===========================================
+
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Página de checkout carregada');
+
+    setupFormValidation();
+    setupPhoneMask();
+    gerarTokenPedido();
+});
+
+function gerarTokenPedido() {
+    // Identificador único do pedido, criado uma vez por carregamento da página
+    const campo = document.getElementById('token_pedido');
+    if (window.crypto && crypto.randomUUID) {
+        campo.value = crypto.randomUUID().replace(/-/g, '');
+    } else {
+        campo.value = Date.now().toString(16) + Math.random().toString(16).slice(2);
+    }
+}
+
+function setupFormValidation() {
+    // Validação customizada do formulário
+    const form = document.getElementById('checkout-form');
+
+    form.addEventListener('submit', function(event) {
+        event.preventDefault(); // Previne envio padrão
+        event.stopPropagation();
+
+        // Remove classes de validação anteriores
+        form.classList.remove('was-validated');
+
+        // Validação customizada
+        let isValid = true;
+
+        // Valida nome
+        const nome = document.getElementById('nome');
+        if (nome.value.trim().length < 3) {
+            markFieldAsInvalid(nome, 'Nome deve ter pelo menos 3 caracteres');
+            isValid = false;
+        } else {
+            markFieldAsValid(nome);
+        }
+
+        // Valida telefone
+        const telefone = document.getElementById('telefone');
+        const telefoneRegex = /^\(\d{2}\)\s\d{4,5}-\d{4}$/;
+        if (!telefoneRegex.test(telefone.value)) {
+            markFieldAsInvalid(telefone, 'Formato: (11) 99999-9999');
+            isValid = false;
+        } else {
+            markFieldAsValid(telefone);
+        }
+
+        // Valida endereço
+        const endereco = document.getElementById('endereco');
+        if (endereco.value.trim().length < 10) {
+            markFieldAsInvalid(endereco, 'Endereço deve ser mais detalhado');
+            isValid = false;
+        } else {
+            markFieldAsValid(endereco);
+        }
+
+        // Valida checkbox de termos
+        const termos = document.getElementById('aceitar-termos');
+        if (!termos.checked) {
+            markFieldAsInvalid(termos, 'Você deve aceitar os termos');
+            isValid = false;
+        } else {
+            markFieldAsValid(termos);
+        }
+
+        if (isValid) {
+            // Se tudo válido, mostra loading e envia
+            const submitButton = form.querySelector('button[type="submit"]');
+            submitButton.disabled = true;
+            submitButton.innerHTML = '<i class="fas fa-spinner fa-spin me-2"></i>Processando...';
+
+            // Envia o formulário
+            form.submit();
+        } else {
+            // Mostra feedback de erro
+            showToast('Por favor, corrija os erros no formulário', 'error');
+
+            // Foca no primeiro campo com erro
+            const firstInvalidField = form.querySelector('.is-invalid');
+            if (firstInvalidField) {
+                firstInvalidField.focus();
+            }
+        }
+    });
+}
+
+function setupPhoneMask() {
+    // Máscara para telefone
+    const telefoneInput = document.getElementById('telefone');
+
+    telefoneInput.addEventListener('input', function() {
+        let value = this.value.replace(/\D/g, ''); // Remove não-dígitos
+
+        if (value.length <= 10) {
+            // Formato: (11) 9999-9999
+            value = value.replace(/^(\d{2})(\d{4})(\d{0,4}).*/, '($1) $2-$3');
+        } else {
+            // Formato: (11) 99999-9999
+            value = value.replace(/^(\d{2})(\d{5})(\d{0,4}).*/, '($1) $2-$3');
+        }
+
+        this.value = value;
+    });
+
+    // Permite apenas números, parênteses, espaços e hífens
+    telefoneInput.addEventListener('keypress', function(e) {
+        const char = String.fromCharCode(e.which);
+        if (!/[\d\(\)\s\-]/.test(char)) {
+            e.preventDefault();
+        }
+    });
+}
+
+function markFieldAsValid(field) {
+    // Marca campo como válido
+    field.classList.remove('is-invalid');
+    field.classList.add('is-valid');
+}
+
+function markFieldAsInvalid(field, message) {
+    // Marca campo como inválido
+    field.classList.remove('is-valid');
+    field.classList.add('is-invalid');
+
+    // Atualiza mensagem de erro
+    const feedback = field.nextElementSibling;
+    if (feedback && feedback.classList.contains('invalid-feedback')) {
+        feedback.textContent = message;
+    }
+}
+
+function copiarPix() {
+    // Copia chave PIX para clipboard
+    const chavePix = document.getElementById('chave-pix');
+    chavePix.select();
+    chavePix.setSelectionRange(0, 99999); // Para mobile
+
+    try {
+        document.execCommand('copy');
+        showToast('Chave PIX copiada!', 'success');
+
+        // Feedback visual no botão
+        const botaoCopiar = event.target.closest('button');
+        const iconeOriginal = botaoCopiar.innerHTML;
+        botaoCopiar.innerHTML = '<i class="fas fa-check text-success"></i>';
+
+        setTimeout(() => {
+            botaoCopiar.innerHTML = iconeOriginal;
+        }, 2000);
+
+    } catch (err) {
+        showToast('Erro ao copiar. Copie manualmente: radiotatuapefm@gmail.com', 'error');
+    }
+}
+
+// Função para mostrar toasts (reutilizada)
+function showToast(message, type = 'info') {
+    const toast = document.createElement('div');
+    toast.className = `alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed`;
+    toast.style.cssText = 'top: 20px; right: 20px; z-index: 1050; min-width: 300px;';
+    toast.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" onclick="this.parentElement.remove()"></button>
+    `;
+
+    document.body.appendChild(toast);
+
+    setTimeout(() => {
+        if (toast.parentNode) {
+            toast.remove();
+        }
+    }, 5000); // 5 segundos para mensagens do checkout
+}
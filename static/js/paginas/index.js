@@ -0,0 +1,146 @@
+// index.js - Scripts da página inicial (templates/index.html)
+// Empacotado por assets.py em js/index.js
+
+// JavaScript específico da página inicial
+// =======================================
+
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('Página inicial carregada. Inicializando funcionalidades...');
+
+    // FUNCIONALIDADE: Botões +/- para quantidade
+    // ==========================================
+    setupQuantityButtons();
+
+    // FUNCIONALIDADE: Adicionar ao carrinho via AJAX
+    // ==============================================
+    setupAddToCartForms();
+
+    // FUNCIONALIDADE: Animação nos cards
+    // =================================
+    setupCardAnimations();
+});
+
+function setupQuantityButtons() {
+    // Busca todos os botões de quantidade
+    const decreaseButtons = document.querySelectorAll('.qty-decrease');
+    const increaseButtons = document.querySelectorAll('.qty-increase');
+
+    // Event listeners para botões de diminuir
+    decreaseButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const input = this.parentNode.querySelector('.quantidade-input');
+            let value = parseInt(input.value);
+
+            if (value > 1) {  // Mínimo 1
+                input.value = value - 1;
+            }
+        });
+    });
+
+    // Event listeners para botões de aumentar
+    increaseButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const input = this.parentNode.querySelector('.quantidade-input');
+            const max = parseInt(input.getAttribute('max'));
+            let value = parseInt(input.value);
+
+            if (value < max) {  // Respeitando estoque máximo
+                input.value = value + 1;
+            }
+        });
+    });
+}
+
+function setupAddToCartForms() {
+    // Busca todos os formulários de adicionar ao carrinho
+    const forms = document.querySelectorAll('.add-to-cart-form');
+
+    forms.forEach(form => {
+        form.addEventListener('submit', function(e) {
+            e.preventDefault();  // Previne envio tradicional do formulário
+
+            // Coleta dados do formulário
+            const produtoId = this.dataset.produtoId;
+            const quantidade = this.querySelector('input[name="quantidade"]').value;
+            const submitButton = this.querySelector('button[type="submit"]');
+
+            // Desabilita botão durante envio
+            submitButton.disabled = true;
+            submitButton.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+
+            // Faz requisição AJAX
+            fetch('/adicionar_carrinho', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    produto_id: parseInt(produtoId),
+                    quantidade: parseInt(quantidade)
+                })
+            })
+            .then(response => response.json())  // Converte resposta para JSON
+            .then(data => {
+                if (data.success) {
+                    // Atualiza badge do carrinho
+                    atualizarBadgeCarrinho(data.total_itens);
+
+                    // Mostra feedback visual
+                    showToast('Produto adicionado ao carrinho!', 'success');
+
+                    // Reset do formulário
+                    this.querySelector('input[name="quantidade"]').value = 1;
+                } else {
+                    showToast(data.error || 'Erro ao adicionar produto', 'error');
+                }
+            })
+            .catch(error => {
+                console.error('Erro:', error);
+                showToast('Erro de conexão', 'error');
+            })
+            .finally(() => {
+                // Reabilita botão
+                submitButton.disabled = false;
+                submitButton.innerHTML = '<i class="fas fa-cart-plus"></i>';
+            });
+        });
+    });
+}
+
+function setupCardAnimations() {
+    // Animação sutil ao passar mouse nos cards
+    const cards = document.querySelectorAll('.produto-card');
+
+    cards.forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-5px)';
+            this.style.transition = 'transform 0.3s ease';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+}
+
+// Função para mostrar notificações toast
+function showToast(message, type = 'info') {
+    // Cria elemento toast
+    const toast = document.createElement('div');
+    toast.className = `alert alert-${type === 'success' ? 'success' : 'danger'} position-fixed`;
+    toast.style.cssText = 'top: 20px; right: 20px; z-index: 1050; min-width: 300px;';
+    toast.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" onclick="this.parentElement.remove()"></button>
+    `;
+
+    // Adiciona ao DOM
+    document.body.appendChild(toast);
+
+    // Remove automaticamente após 3 segundos
+    setTimeout(() => {
+        if (toast.parentNode) {
+            toast.remove();
+        }
+    }, 3000);
+}
@@ -0,0 +1,47 @@
+# conftest.py - Configuração compartilhada dos testes (pytest)
+# app.py lê a configuração do banco quando é importado, então as variáveis
+# de ambiente são definidas aqui, antes de qualquer teste importar o app:
+# cada execução usa um banco SQLite novo em uma pasta temporária.
+#
+# Uso (na raiz do projeto):
+#     python -m pytest
+
+# IMPORTAÇÕES NECESSÁRIAS
+# =====================================================
+import os
+import sys
+import tempfile
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+PASTA_TESTES = tempfile.mkdtemp(prefix='adega-testes-')
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(PASTA_TESTES, 'adega.db')}",
+    'CARRINHO_BACKEND': 'memoria',
+    'FILA_PEDIDOS': '0',
+    'RESERVAS_LIMPEZA_SEGUNDOS': '0',
+    'INSTRUMENTACAO': '0',
+    'IMAGENS_CACHE_PASTA': os.path.join(PASTA_TESTES, 'imagens'),
+})
+
+
+# FIXTURES
+# =====================================================
+@pytest.fixture(scope='session')
+def app():
+    """
+    Aplicação com o banco já criado (a partir do snapshot do catálogo)
+    """
+    import app as modulo_app
+    return modulo_app.criar_app(banco='imediato')
+
+
+@pytest.fixture
+def cliente(app):
+    """
+    Cliente de testes do Flask (cada teste começa com uma sessão nova)
+    """
+    return app.test_client()
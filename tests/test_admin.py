@@ -0,0 +1,97 @@
+# test_admin.py - Painel /admin com paginação por cursor e agregações no banco
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db, resumo_pedidos, ItemPedido, Pedido, Produto
+
+QUANTIDADE_PEDIDOS = 25
+
+
+@pytest.fixture
+def pedidos(app):
+    """
+    Pedidos com dois itens cada; vários no mesmo instante (o id desempata)
+    """
+    base = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+    with app.app_context():
+        produtos = db.session.execute(db.select(Produto).order_by(Produto.id).limit(3)).scalars().all()
+        criados = []
+        for numero in range(QUANTIDADE_PEDIDOS):
+            pedido = Pedido(nome_cliente=f'Cliente {numero}', telefone_cliente='11999999999',
+                            endereco_cliente='Rua Tuiuti, 1000', valor_total=0,
+                            data_pedido=base + timedelta(minutes=numero // 3))
+            for produto in produtos[:2] if numero % 2 else produtos[1:]:
+                pedido.itens.append(ItemPedido(produto_id=produto.id, quantidade=numero % 4 + 1,
+                                               preco_unitario=produto.preco))
+            pedido.valor_total = sum(item.quantidade * item.preco_unitario for item in pedido.itens)
+            db.session.add(pedido)
+            criados.append(pedido)
+        db.session.commit()
+        ids = [pedido.id for pedido in criados]
+    yield ids
+    with app.app_context():
+        db.session.execute(db.delete(ItemPedido).where(ItemPedido.pedido_id.in_(ids)))
+        db.session.execute(db.delete(Pedido).where(Pedido.id.in_(ids)))
+        db.session.commit()
+
+
+def ids_da_pagina(html):
+    return [int(pedido_id) for pedido_id in re.findall(r'<tr>\s*<td>(\d+)</td>', html)]
+
+
+def contar_consultas(app, funcao):
+    executadas = []
+    registrar = lambda *args: executadas.append(1)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', registrar)
+    try:
+        funcao()
+    finally:
+        event.remove(engine, 'before_cursor_execute', registrar)
+    return len(executadas)
+
+
+def test_paginas_percorrem_todos_os_pedidos_em_ordem(app, cliente, pedidos):
+    vistos = []
+    url = '/admin?limite=7'
+    while url:
+        html = cliente.get(url).get_data(as_text=True)
+        pagina = ids_da_pagina(html)
+        assert 0 < len(pagina) <= 7
+        vistos.extend(pagina)
+        proxima = re.search(r'href="(/admin\?antes=[^"]+)"', html)
+        url = proxima.group(1).replace('&amp;', '&') if proxima else None
+
+    with app.app_context():
+        esperado = db.session.execute(
+            db.select(Pedido.id).order_by(Pedido.data_pedido.desc(), Pedido.id.desc())
+        ).scalars().all()
+    assert vistos == esperado
+    assert set(pedidos) <= set(vistos)
+
+
+def test_consultas_nao_crescem_com_o_tamanho_da_pagina(app, cliente, pedidos):
+    pequena = contar_consultas(app, lambda: cliente.get('/admin?limite=2'))
+    grande = contar_consultas(app, lambda: cliente.get(f'/admin?limite={QUANTIDADE_PEDIDOS}'))
+    assert grande == pequena
+
+
+def test_resumo_calculado_no_banco(app, pedidos):
+    with app.app_context():
+        resumo = resumo_pedidos()
+        todos = Pedido.query.all()
+        itens = ItemPedido.query.all()
+
+    assert resumo['total_pedidos'] == len(todos)
+    assert float(resumo['faturamento_total']) == pytest.approx(float(sum(p.valor_total for p in todos)))
+
+    vendidos = {}
+    for item in itens:
+        vendidos[item.produto_id] = vendidos.get(item.produto_id, 0) + item.quantidade
+    assert resumo['mais_vendidos'][0].quantidade == max(vendidos.values())
+    assert sum(dia.pedidos for dia in resumo['por_dia']) == len(todos)
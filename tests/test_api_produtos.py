@@ -0,0 +1,51 @@
+# test_api_produtos.py - API JSON do catálogo com projeção, cursor e ETag
+
+import app as app_module
+from app import cache_catalogo, obter_catalogo
+
+
+def test_cursor_percorre_a_categoria_com_os_campos_pedidos(app, cliente):
+    with app.app_context():
+        esperado = [p.id for p in obter_catalogo().filtrar('vinho')]
+
+    vistos = []
+    apos = 0
+    while apos is not None:
+        corpo = cliente.get(f'/api/produtos?categoria=vinho&campos=id,nome,id&limite=4&apos={apos}').get_json()
+        assert all(list(produto) == ['id', 'nome'] for produto in corpo['produtos'])
+        vistos.extend(produto['id'] for produto in corpo['produtos'])
+        apos = corpo['proximo_cursor']
+    assert vistos == esperado
+
+
+def test_campos_invalidos(cliente):
+    resposta = cliente.get('/api/produtos?campos=id,senha')
+    assert resposta.status_code == 400
+    assert 'senha' in resposta.get_json()['error']
+
+
+def test_etag_e_corpo_guardado_por_versao(cliente, monkeypatch):
+    serializadas = []
+    serializar = app_module._serializar_pagina_produtos
+    monkeypatch.setattr(app_module, '_serializar_pagina_produtos',
+                        lambda *args: serializadas.append(1) or serializar(*args))
+    cache_catalogo.invalidar()
+
+    url = '/api/produtos?campos=id,preco&limite=13'
+    primeira = cliente.get(url)
+    assert primeira.status_code == 200
+    etag = primeira.headers['ETag']
+    assert primeira.get_json()['versao'] in etag
+
+    # Mesma página de novo: vem da memória
+    assert cliente.get(url).get_data() == primeira.get_data()
+    # Cliente com a versão atual: 304, sem corpo
+    resposta = cliente.get(url, headers={'If-None-Match': etag})
+    assert resposta.status_code == 304
+    assert resposta.get_data() == b''
+    resposta = cliente.get(url, headers={'If-Modified-Since': primeira.headers['Last-Modified']})
+    assert resposta.status_code == 304
+    assert serializadas == [1]
+
+    # Outros parâmetros, outra ETag
+    assert cliente.get(url + '&apos=5').headers['ETag'] != etag
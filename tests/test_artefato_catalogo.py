@@ -0,0 +1,60 @@
+# test_artefato_catalogo.py - Catálogo pré-compilado (data/produtos.catalogo)
+
+import json
+import os
+import shutil
+
+import pytest
+
+import artefato_catalogo
+from artefato_catalogo import TabelaCatalogo
+
+
+@pytest.fixture
+def arquivos(tmp_path):
+    """
+    Cópia do data/produtos.json e o artefato compilado a partir dela
+    """
+    json_path = str(tmp_path / 'produtos.json')
+    artefato = str(tmp_path / 'produtos.catalogo')
+    shutil.copy(artefato_catalogo.JSON_PATH, json_path)
+    tabela = artefato_catalogo.compilar(json_path, artefato)
+    return json_path, artefato, tabela
+
+
+def test_json_igual_ao_da_compilacao_nao_e_lido(arquivos):
+    json_path, artefato, tabela = arquivos
+    assert artefato_catalogo.hash_json_atual(json_path, artefato) == (tabela.hash_json, None)
+
+
+def test_json_com_outra_data_e_lido_e_o_artefato_continua_valendo(arquivos):
+    json_path, artefato, tabela = arquivos
+    # Como depois de um git clone: mesmo conteúdo, outra data de modificação
+    estado = os.stat(json_path)
+    os.utime(json_path, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10**9))
+
+    hash_json, conteudo = artefato_catalogo.hash_json_atual(json_path, artefato)
+    assert hash_json == tabela.hash_json
+    assert conteudo is not None
+    assert isinstance(artefato_catalogo.carregar(hash_json, artefato), TabelaCatalogo)
+
+
+def test_json_alterado_volta_a_ler_o_json(arquivos):
+    json_path, artefato, tabela = arquivos
+    with open(json_path, encoding='utf-8') as f:
+        dados = json.load(f)
+    dados['produtos'] = dados['produtos'][:3]
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(dados, f)
+
+    hash_json, conteudo = artefato_catalogo.hash_json_atual(json_path, artefato)
+    assert hash_json != tabela.hash_json
+    assert artefato_catalogo.carregar(hash_json, artefato) is None
+    assert len(artefato_catalogo.carregar_produtos(conteudo, hash_json)) == 3
+
+
+def test_artefato_do_repositorio_corresponde_ao_json():
+    with open(artefato_catalogo.JSON_PATH, 'rb') as f:
+        hash_json = artefato_catalogo.hash_conteudo(f.read())
+    assert artefato_catalogo.ler_cabecalho()['hash_json'] == hash_json
+    assert isinstance(artefato_catalogo.carregar(hash_json), TabelaCatalogo)
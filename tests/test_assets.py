@@ -0,0 +1,106 @@
+# test_assets.py - Pacotes de CSS/JS minificados, com hash e pré-comprimidos
+
+import gzip
+import os
+import shutil
+
+import pytest
+from flask import Flask
+
+import assets
+
+
+def test_minificar_css_mantem_strings_e_calc():
+    codigo = '''
+    /* cabeçalho */
+    .a  >  .b {
+        content: "  /* não é comentário */  ";
+        width: calc(100% - 2rem);
+    }
+    '''
+    assert assets.minificar_css(codigo) == \
+        '.a>.b{content:"  /* não é comentário */  ";width:calc(100% - 2rem)}\n'
+
+
+def test_minificar_js_mantem_strings_regex_e_quebras_necessarias():
+    codigo = '''
+    // comentário de linha
+    const url = "http://exemplo.com"; /* bloco */
+    const padrao = /\\/\\*[^/]*\\//g;
+    let total = a
+    ++b
+    return `linha 1
+       linha 2`
+    '''
+    minificado = assets.minificar_js(codigo)
+    assert 'comentário' not in minificado and 'bloco' not in minificado
+    assert 'const url="http://exemplo.com";' in minificado
+    assert 'const padrao=/\\/\\*[^/]*\\//g;' in minificado
+    # Sem ";" no fim da linha: a quebra é mantida (a + (++b) seria outro código)
+    assert 'let total=a\n++b' in minificado
+    assert '`linha 1\n       linha 2`' in minificado
+
+
+def test_build_distribuido_esta_atualizado():
+    # static/dist vai junto com o código: precisa corresponder aos fontes
+    assert assets.carregar_manifesto() is not None
+
+
+@pytest.fixture
+def static_copia(tmp_path):
+    pasta = tmp_path / 'static'
+    shutil.copytree(assets.PASTA_STATIC, pasta, ignore=shutil.ignore_patterns('dist', 'images'))
+    return str(pasta)
+
+
+def test_construir_gera_nomes_com_hash_e_comprimidos(static_copia):
+    manifesto = assets.construir(static_copia)
+    dist = os.path.join(static_copia, assets.PASTA_DIST)
+
+    for nome, final in manifesto['arquivos'].items():
+        with open(os.path.join(dist, final), 'rb') as f:
+            dados = f.read()
+        assert assets._hash(dados) in final
+        with open(os.path.join(dist, final + '.gz'), 'rb') as f:
+            assert gzip.decompress(f.read()) == dados
+        assert len(dados) < len(assets.montar_pacote(static_copia, nome))
+
+    # Mesmos fontes, mesmo build (os nomes só mudam quando o conteúdo muda)
+    assert assets.construir(static_copia) == manifesto
+    assert assets.carregar_manifesto(static_copia) == manifesto['arquivos']
+
+    # Fonte alterado depois do build: o manifest deixa de valer
+    with open(os.path.join(static_copia, 'css', 'style.css'), 'a', encoding='utf-8') as f:
+        f.write('\n.novo { color: red; }\n')
+    assert assets.carregar_manifesto(static_copia) is None
+
+
+def test_url_for_e_variante_pre_comprimida(cliente):
+    html = cliente.get('/').get_data(as_text=True)
+    nome = assets.carregar_manifesto()['js/loja.js']
+    caminho = f'/static/dist/{nome}'
+    assert caminho in html
+
+    resposta = cliente.get(caminho, headers={'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert resposta.headers['Cache-Control'] == assets.CACHE_IMUTAVEL
+    assert resposta.headers['Vary'] == 'Accept-Encoding'
+    assert resposta.mimetype in ('application/javascript', 'text/javascript')
+    sem_compressao = cliente.get(caminho, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in sem_compressao.headers
+    assert gzip.decompress(resposta.get_data()) == sem_compressao.get_data()
+    resposta.close()
+    sem_compressao.close()
+
+
+def test_sem_build_monta_o_pacote_na_hora(static_copia):
+    app = Flask(__name__, static_folder=static_copia)
+    pacotes = assets.Assets(static_copia)
+    pacotes.init_app(app)
+    with app.test_request_context():
+        from flask import url_for
+        assert url_for('static', filename='js/loja.js') == '/static/js/loja.js'
+
+    resposta = app.test_client().get('/static/js/loja.js')
+    assert resposta.headers['Cache-Control'] == 'no-cache'
+    assert resposta.get_data() == assets.montar_pacote(static_copia, 'js/loja.js')
@@ -0,0 +1,64 @@
+# test_benchmark_carga.py - Suíte de carga (benchmarks/carga.py)
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+from conftest import RAIZ
+
+CAMINHO = os.path.join(RAIZ, 'benchmarks', 'carga.py')
+_spec = importlib.util.spec_from_file_location('carga', CAMINHO)
+carga = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(carga)
+
+
+def medida(p95_ms, req_s):
+    return {'requisicoes': 10, 'erros': 0, 'req_s': req_s, 'media_ms': p95_ms,
+            'p50_ms': p95_ms, 'p95_ms': p95_ms, 'p99_ms': p95_ms}
+
+
+def test_percentis_e_resumo():
+    valores = [i / 1000 for i in range(1, 101)]    # 1 ms a 100 ms
+    assert carga.percentil(valores, 50) == 0.05
+    assert carga.percentil(valores, 99) == 0.099
+    assert carga.percentil([], 50) is None
+
+    resumo = carga.resumir(valores, erros=2, concorrencia=1)
+    assert resumo['requisicoes'] == 100
+    assert resumo['erros'] == 2
+    assert (resumo['p50_ms'], resumo['p95_ms'], resumo['p99_ms']) == (50.0, 95.0, 99.0)
+
+
+def test_comparar_baseline():
+    baseline = {'resultados': {'100': {'test_client': {'index': medida(10, 100),
+                                                       'admin': medida(20, 50)}}}}
+    atual = {'resultados': {'100': {'test_client': {'index': medida(12, 90),
+                                                    'admin': medida(40, 20)}},
+                            '10000': {'test_client': {'index': medida(99, 1)}}}}
+
+    regressoes = carga.comparar_baseline(atual, baseline, tolerancia=0.25)
+    assert [(fluxo, metrica) for _t, _m, fluxo, metrica, *_ in regressoes] == \
+        [('admin', 'p95_ms'), ('admin', 'req_s')]
+
+    atual['resultados']['100']['test_client'] = {'erro': 'processo terminou com sinal 9'}
+    assert carga.comparar_baseline(atual, baseline, 0.25)[0][3] == 'erro'
+
+
+def test_execucao_grava_json_e_compara_com_o_baseline(tmp_path):
+    saida = tmp_path / 'carga.json'
+    comando = [sys.executable, CAMINHO, '--tamanhos', '100', '--modos', 'test_client',
+               '--requisicoes', '3', '--aquecimento', '1', '--saida', str(saida)]
+    subprocess.run(comando, cwd=RAIZ, check=True, capture_output=True)
+
+    resultado = json.loads(saida.read_text(encoding='utf-8'))
+    medidas = resultado['resultados']['100']['test_client']
+    assert set(medidas) == set(carga.FLUXOS)
+    assert all(m['erros'] == 0 and m['requisicoes'] == 3 for m in medidas.values())
+
+    # Comparado com ele mesmo (tolerância alta): sem regressões
+    processo = subprocess.run(comando + ['--baseline', str(saida), '--tolerancia', '100'],
+                              cwd=RAIZ, capture_output=True, text=True)
+    assert processo.returncode == 0
+    assert 'Sem regressões' in processo.stdout
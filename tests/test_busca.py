@@ -0,0 +1,61 @@
+# test_busca.py - Busca de produtos (/buscar) com o índice FTS5
+
+import pytest
+
+import busca
+from app import db, obter_catalogo
+
+
+def buscar(cliente, termo, **parametros):
+    resposta = cliente.get('/buscar', query_string=dict(q=termo, formato='json', **parametros))
+    assert resposta.status_code == 200
+    return [produto['nome'] for produto in resposta.get_json()['produtos']]
+
+
+def test_prefixo_sem_acentos_e_relevancia(cliente):
+    nomes = buscar(cliente, 'gin apo')
+    assert set(nomes) == {'Gin Apogee 1l', 'Gin Brasileiro Apogee Negroni 1l'}
+    # Sem acentos nos dois sentidos
+    assert 'Cerveja Império 269ml' in buscar(cliente, 'imperio')
+    assert 'Água Mineral Sem Gás São Lourenço 1260ml' in buscar(cliente, 'AGUA sao lour')
+    # Palavra encontrada no nome vem antes da encontrada só na descrição
+    nomes = buscar(cliente, 'garrafa', limite=100)
+    no_nome = [nome for nome in nomes if 'garrafa' in nome.lower()]
+    assert no_nome and len(nomes) > len(no_nome)
+    assert nomes[:len(no_nome)] == no_nome
+    assert buscar(cliente, 'energ')[0].startswith('Energético')
+
+
+def test_limite_e_termos_vazios(cliente):
+    assert len(buscar(cliente, 'gin', limite=2)) == 2
+    assert buscar(cliente, '') == []
+    # Operadores do FTS5 são tratados como texto
+    assert buscar(cliente, 'gin OR "vinho" NEAR(') == []
+
+
+def test_fts_e_busca_em_memoria_encontram_os_mesmos_produtos(app):
+    with app.app_context():
+        catalogo = obter_catalogo()
+        for termo in ('gin apo', 'cerveja', 'sao lourenco', 'baly 2l', 'xyz'):
+            ids = busca.buscar_ids(db.session.connection(), termo, limite=100)
+            assert ids is not None
+            em_memoria = [p.id for p in busca.buscar_em_memoria(catalogo.produtos, termo, limite=100)]
+            assert sorted(ids) == sorted(em_memoria), termo
+
+
+def test_pagina_html(cliente):
+    html = cliente.get('/buscar?q=apogee').get_data(as_text=True)
+    assert 'Gin Apogee 1l' in html
+
+
+@pytest.mark.parametrize('termo, esperado', [
+    ('gin apo', '"gin"* "apo"*'),
+    ('Cachaça "51"', '"Cachaça"* "51"*'),
+    ('  ', ''),
+])
+def test_expressao_fts(termo, esperado):
+    assert busca.expressao_fts(termo) == esperado
+
+
+def test_sem_acentos():
+    assert busca.sem_acentos('Cachaça São João') == 'cachaca sao joao'
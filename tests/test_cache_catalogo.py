@@ -0,0 +1,54 @@
+# test_cache_catalogo.py - Páginas do catálogo servidas do snapshot em memória
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import db, cache_catalogo, init_db, obter_catalogo
+
+
+@contextmanager
+def consultas_sql(app):
+    """
+    Lista das consultas SQL executadas dentro do bloco
+    """
+    executadas = []
+    registrar = lambda conn, cursor, sql, *args: executadas.append(sql)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', registrar)
+    try:
+        yield executadas
+    finally:
+        event.remove(engine, 'before_cursor_execute', registrar)
+
+
+def test_paginas_do_catalogo_nao_consultam_o_banco(app, cliente):
+    # Primeiro acesso: monta o snapshot e lê o estoque
+    assert cliente.get('/').status_code == 200
+    misses = cache_catalogo.misses
+
+    with consultas_sql(app) as executadas:
+        assert cliente.get('/').status_code == 200
+        assert cliente.get('/?categoria=cerveja').status_code == 200
+        assert cliente.get('/produto/1').status_code == 200
+        assert cliente.get('/sitemap.xml').status_code == 200
+
+    assert executadas == []
+    assert cache_catalogo.misses == misses
+    assert cache_catalogo.estatisticas()['hits'] >= 4
+
+
+def test_init_db_invalida_o_snapshot(app):
+    with app.app_context():
+        antes = obter_catalogo()
+        assert obter_catalogo() is antes
+        invalidacoes = cache_catalogo.estatisticas()['invalidacoes']
+
+        assert init_db(forcar=True)['alterado'] is True
+
+        assert cache_catalogo.estatisticas()['invalidacoes'] == invalidacoes + 1
+        depois = obter_catalogo()
+    assert depois is not antes
+    # Mesmo conteúdo: a versão (usada nas chaves dos caches) não muda
+    assert depois.versao == antes.versao
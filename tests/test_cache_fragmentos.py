@@ -0,0 +1,56 @@
+# test_cache_fragmentos.py - Cache LRU da grade de produtos já renderizada
+
+import re
+
+from cache_fragmentos import CacheFragmentos
+from app import cache_fragmentos
+
+
+def test_lru_limitado_por_bytes():
+    cache = CacheFragmentos(capacidade_bytes=10)
+    renderizadas = []
+    renderizar = lambda html: lambda: renderizadas.append(html) or html
+
+    assert cache.obter('a', renderizar('aaaa')) == 'aaaa'
+    assert cache.obter('b', renderizar('bbbb')) == 'bbbb'
+    cache.obter('a', renderizar('aaaa'))          # 'a' passa a ser o mais recente
+    cache.obter('c', renderizar('cccc'))          # 12 bytes: descarta 'b'
+    assert renderizadas == ['aaaa', 'bbbb', 'cccc']
+
+    cache.obter('a', renderizar('aaaa'))
+    cache.obter('b', renderizar('bbbb'))
+    assert renderizadas == ['aaaa', 'bbbb', 'cccc', 'bbbb']
+    estatisticas = cache.estatisticas()
+    assert estatisticas['bytes'] <= 10
+    assert estatisticas['descartes'] == 2
+
+    # Maior que o cache inteiro: é renderizado mas não guardado
+    cache.obter('grande', renderizar('x' * 11))
+    assert 'grande' not in cache._fragmentos
+
+
+def test_cache_desligado_sempre_renderiza():
+    cache = CacheFragmentos(ativo=False)
+    renderizadas = []
+    for _ in range(3):
+        cache.obter('a', lambda: renderizadas.append(1) or 'html')
+    assert len(renderizadas) == 3
+    assert cache.estatisticas()['fragmentos'] == 0
+
+
+def contador_do_carrinho(html):
+    return re.search(r'id="carrinho-badge">.*?-->\s*(\d+)', html, re.S)
+
+
+def test_grade_guardada_e_carrinho_fora_do_fragmento(app, cliente):
+    cache_fragmentos.limpar()
+    primeira = cliente.get('/?categoria=cerveja').get_data(as_text=True)
+    hits = cache_fragmentos.hits
+
+    outro_cliente = app.test_client()
+    outro_cliente.post('/adicionar_carrinho', json={'produto_id': 1, 'quantidade': 3})
+    segunda = outro_cliente.get('/?categoria=cerveja').get_data(as_text=True)
+
+    assert cache_fragmentos.hits == hits + 1
+    assert contador_do_carrinho(primeira) is None
+    assert contador_do_carrinho(segunda).group(1) == '3'
@@ -0,0 +1,92 @@
+# test_carrinho.py - Carrinho indexado por produto_id com totais acumulados
+
+from typing import NamedTuple
+
+import pytest
+
+from carrinho import Carrinho
+
+
+class Produto(NamedTuple):
+    id: int
+    nome: str
+    preco: float
+    imagem_url: str = None
+
+
+CERVEJA = Produto(1, 'Heineken Long Neck', 7.9)
+VINHO = Produto(2, 'Vinho Tinto', 49.9)
+
+
+def totais_recalculados(carrinho):
+    return (round(sum(item.subtotal for item in carrinho), 2),
+            sum(item.quantidade for item in carrinho))
+
+
+def test_totais_acompanham_as_alteracoes():
+    carrinho = Carrinho()
+    carrinho.adicionar(CERVEJA, 3)
+    carrinho.adicionar(VINHO)
+    carrinho.adicionar(CERVEJA, 2)
+    assert len(carrinho) == 2
+    assert carrinho.get(CERVEJA.id).quantidade == 5
+    assert (carrinho.total, carrinho.total_itens) == (89.4, 6)
+
+    assert carrinho.definir_quantidade(VINHO.id, 3) is True
+    assert carrinho.definir_quantidade(99, 1) is False
+    assert (carrinho.total, carrinho.total_itens) == totais_recalculados(carrinho)
+
+    carrinho.definir_quantidade(CERVEJA.id, 0)
+    assert CERVEJA.id not in carrinho
+    assert (carrinho.total, carrinho.total_itens) == (149.7, 3)
+
+    carrinho.remover(VINHO.id)
+    assert not carrinho
+    assert (carrinho.total, carrinho.total_itens) == (0, 0)
+
+
+def test_centavos_nao_acumulam_erro_de_arredondamento():
+    carrinho = Carrinho()
+    for _ in range(1000):
+        carrinho.adicionar(Produto(3, 'Água', 0.1))
+    assert carrinho.total == 100.0
+
+
+def test_formato_compacto_e_copia():
+    carrinho = Carrinho()
+    carrinho.adicionar(CERVEJA, 2)
+    carrinho.adicionar(VINHO, 1)
+
+    compacto = carrinho.to_compacto()
+    assert compacto == {1: 2, 2: 1}
+    # Produtos que saíram do catálogo são descartados na volta
+    recuperado = Carrinho.de_compacto({**compacto, 99: 4}, {1: CERVEJA, 2: VINHO})
+    assert recuperado.to_dict() == carrinho.to_dict()
+
+    copia = carrinho.copia()
+    copia.adicionar(CERVEJA, 10)
+    assert carrinho.get(CERVEJA.id).quantidade == 2
+    assert carrinho.total_itens == 3
+
+
+def test_item_usa_slots():
+    item = Carrinho().adicionar(CERVEJA)
+    with pytest.raises(AttributeError):
+        item.desconto = 1
+
+
+def test_rotas_do_carrinho_usam_os_totais(app, cliente):
+    from app import obter_catalogo
+    with app.app_context():
+        preco = obter_catalogo().por_id[1].preco
+
+    resposta = cliente.post('/adicionar_carrinho', json={'produto_id': 1, 'quantidade': 2})
+    assert resposta.get_json()['total_itens'] == 2
+    resposta = cliente.post('/atualizar_quantidade', json={'produto_id': 1, 'quantidade': 3})
+    assert resposta.get_json() == {'success': True, 'total_itens': 3,
+                                   'novo_total': round(3 * preco, 2)}
+
+    assert cliente.get('/remover_carrinho/1').status_code == 302
+    # Produto fora do carrinho: a quantidade não é alterada
+    resposta = cliente.post('/atualizar_quantidade', json={'produto_id': 1, 'quantidade': 1})
+    assert resposta.get_json()['total_itens'] == 0
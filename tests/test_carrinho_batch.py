@@ -0,0 +1,70 @@
+# test_carrinho_batch.py - Rota /carrinho/batch (várias alterações de uma vez)
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import reservas
+from app import db, Produto
+
+PRODUTO_ID = 1
+
+
+@pytest.fixture
+def produto(app):
+    with app.app_context():
+        db.session.execute(db.text('DELETE FROM reserva_estoque'))
+        db.session.execute(db.update(Produto).where(Produto.id == PRODUTO_ID)
+                           .values(estoque=20, reservado=0, ativo=True))
+        db.session.commit()
+    return PRODUTO_ID
+
+
+def reservado(app, produto_id):
+    with app.app_context():
+        return db.session.execute(
+            db.select(Produto.reservado).where(Produto.id == produto_id)
+        ).scalar()
+
+
+@pytest.mark.parametrize('operacoes', [['x'], [1], [None], [[PRODUTO_ID]], 'x'])
+def test_operacao_que_nao_e_objeto_responde_400(cliente, operacoes):
+    resposta = cliente.post('/carrinho/batch', json={'operacoes': operacoes})
+    assert resposta.status_code == 400
+    assert 'carrinho' in resposta.get_json()
+
+
+@pytest.mark.parametrize('erro, status', [
+    (OperationalError('UPDATE produto', {}, Exception('database is locked')), 503),
+    (RuntimeError('erro inesperado'), 500),
+])
+def test_erro_do_banco_no_meio_do_lote_desfaz_as_reservas(app, cliente, produto, monkeypatch, erro, status):
+    original = reservas.reservar
+    chamadas = []
+
+    def reservar_e_falhar(conexao, carrinho_id, produto_id, quantidade, **kwargs):
+        chamadas.append(produto_id)
+        if len(chamadas) == 2:
+            raise erro
+        return original(conexao, carrinho_id, produto_id, quantidade, **kwargs)
+
+    # A rota precisa desfazer a transação ela mesma (sem esperar o fim da
+    # requisição), para não segurar a escrita do SQLite com o erro
+    rollback_original = db.session.rollback
+    rollbacks = []
+
+    def rollback():
+        rollbacks.append(True)
+        rollback_original()
+
+    monkeypatch.setattr(reservas, 'reservar', reservar_e_falhar)
+    monkeypatch.setattr(db.session, 'rollback', rollback)
+    resposta = cliente.post('/carrinho/batch', json={'operacoes': [
+        {'acao': 'adicionar', 'produto_id': produto, 'quantidade': 2},
+        {'acao': 'adicionar', 'produto_id': produto + 1, 'quantidade': 1},
+    ]})
+    # Resposta em JSON (o CarrinhoBatch do app.js não entende a página de erro)
+    assert resposta.status_code == status
+    dados = resposta.get_json()
+    assert dados['error'] and dados['carrinho']['itens'] == {}
+    assert rollbacks
+    assert reservado(app, produto) == 0
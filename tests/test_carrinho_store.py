@@ -0,0 +1,44 @@
+# test_carrinho_store.py - Backends do carrinho e limpeza dos carrinhos abandonados
+
+import time
+
+import app as app_module
+from carrinho_store import MemoriaCarrinhoStore, SQLiteCarrinhoStore
+from reservas import LimpezaReservas
+
+
+def test_sqlite_apaga_so_os_carrinhos_expirados(tmp_path):
+    store = SQLiteCarrinhoStore(str(tmp_path / 'carrinhos.db'), expiracao=0.05)
+    store.salvar('abandonado', {1: 2})
+    time.sleep(0.1)
+    store.salvar('ativo', {3: 1})
+
+    assert store.limpar_expirados() == 1
+    assert store.carregar('abandonado') == {}
+    assert store.carregar('ativo') == {3: 1}
+
+
+def test_backend_sem_expiracao_nao_apaga_nada():
+    store = MemoriaCarrinhoStore()
+    store.salvar('c1', {1: 1})
+    assert store.limpar_expirados() == 0
+    assert store.carregar('c1') == {1: 1}
+
+
+def test_thread_de_limpeza_apaga_os_carrinhos_abandonados(app, tmp_path, monkeypatch):
+    store = SQLiteCarrinhoStore(str(tmp_path / 'carrinhos.db'), expiracao=0.05)
+    store.salvar('abandonado', {1: 2})
+    time.sleep(0.1)
+    monkeypatch.setattr(app_module, 'carrinho_store', store)
+
+    limpeza = LimpezaReservas(app_module._recuperar_reservas_expiradas, intervalo=0.01)
+    limpeza.iniciar()
+    try:
+        limite = time.monotonic() + 5
+        while limpeza.execucoes == 0 and time.monotonic() < limite:
+            time.sleep(0.01)
+    finally:
+        limpeza.parar()
+
+    assert limpeza.execucoes > 0
+    assert store.carregar('abandonado') == {}
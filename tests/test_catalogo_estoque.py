@@ -0,0 +1,77 @@
+# test_catalogo_estoque.py - As páginas do catálogo acompanham o estoque vendido
+
+import re
+
+import pytest
+
+from app import db, estoque_catalogo, obter_catalogo, Produto
+
+PRODUTO_ID = 42
+DADOS_CLIENTE = {'nome': 'Cliente Teste', 'telefone': '11999999999',
+                 'endereco': 'Rua Dante Pellacani, 92 - Tatuapé', 'observacoes': ''}
+
+
+@pytest.fixture
+def produto(app):
+    """
+    Produto com 5 unidades e sem reservas
+    """
+    with app.app_context():
+        db.session.execute(db.text('DELETE FROM reserva_estoque'))
+        db.session.execute(db.update(Produto).where(Produto.id == PRODUTO_ID)
+                           .values(estoque=5, reservado=0, ativo=True))
+        db.session.commit()
+    estoque_catalogo.invalidar()
+    return PRODUTO_ID
+
+
+def comprar_tudo(cliente, produto_id, quantidade):
+    resposta = cliente.post('/adicionar_carrinho',
+                            json={'produto_id': produto_id, 'quantidade': quantidade})
+    assert resposta.status_code == 200
+    resposta = cliente.post('/finalizar_pedido', data=DADOS_CLIENTE)
+    assert resposta.status_code in (200, 302)
+
+
+def estoque_na_api(cliente, produto_id):
+    produtos = cliente.get(f'/api/produtos?apos={produto_id - 1}&limite=1').get_json()['produtos']
+    return produtos[0]['estoque']
+
+
+def test_pedido_atualiza_estoque_das_paginas(app, cliente, produto):
+    # Páginas vistas antes da venda (enchem o snapshot e o cache da grade)
+    with app.app_context():
+        catalogo = obter_catalogo()
+    assert 'Estoque: 5' in cliente.get(f'/produto/{produto}').get_data(as_text=True)
+    assert estoque_na_api(cliente, produto) == 5
+    cliente.get('/')
+
+    comprar_tudo(cliente, produto, 5)
+
+    with app.app_context():
+        assert db.session.get(Produto, produto).estoque == 0
+    assert 'Estoque: 0' in cliente.get(f'/produto/{produto}').get_data(as_text=True)
+    assert estoque_na_api(cliente, produto) == 0
+
+    # Na grade (vinda do cache de fragmentos), o botão do produto fica desabilitado
+    html = cliente.get('/').get_data(as_text=True)
+    card = re.search(rf'<form class="add-to-cart-form" data-produto-id="{produto}">.*?</form>', html, re.S)
+    assert card and 'disabled' in card.group(0)
+
+    # O snapshot (e o que foi calculado a partir dele) continua o mesmo
+    with app.app_context():
+        assert obter_catalogo() is catalogo
+
+
+def test_venda_de_outro_processo_aparece_depois_da_validade(app, cliente, produto, monkeypatch):
+    assert 'Estoque: 5' in cliente.get(f'/produto/{produto}').get_data(as_text=True)
+
+    # Outro processo vende 2 unidades (sem passar pelo estoque_catalogo deste)
+    with app.app_context():
+        db.session.execute(db.update(Produto).where(Produto.id == produto).values(estoque=3))
+        db.session.commit()
+    assert 'Estoque: 5' in cliente.get(f'/produto/{produto}').get_data(as_text=True)
+
+    monkeypatch.setattr(estoque_catalogo, 'validade', 0)
+    assert 'Estoque: 3' in cliente.get(f'/produto/{produto}').get_data(as_text=True)
+    assert estoque_na_api(cliente, produto) == 3
@@ -0,0 +1,113 @@
+# test_compressao.py - Compressão gzip das respostas e página inicial em streaming
+
+import gzip
+import re
+import zlib
+
+import pytest
+from flask import Flask, jsonify
+
+import compressao
+from compressao import Compressao
+
+HTML_GRANDE = '<div class="card">Produto</div>\n' * 200
+
+
+@pytest.fixture
+def loja():
+    app = Flask(__name__)
+    app.config.update(COMPRESSAO_NIVEL=9, COMPRESSAO_MIN_BYTES=1000)
+    compressor = Compressao()
+    compressor.init_app(app)
+    eventos = []
+
+    @app.route('/grande')
+    def grande():
+        resposta = app.response_class(HTML_GRANDE, mimetype='text/html')
+        resposta.set_etag('v1')
+        return resposta
+
+    @app.route('/pequena')
+    def pequena():
+        return jsonify(ok=True)
+
+    @app.route('/imagem')
+    def imagem():
+        return app.response_class(b'\x89PNG' + b'0' * 5000, mimetype='image/png')
+
+    @app.route('/streaming')
+    def streaming():
+        def gerar():
+            for numero in range(3):
+                eventos.append(f'gerou {numero}')
+                yield f'<p>pedaço {numero}</p>' * 100
+        return app.response_class(gerar(), mimetype='text/html')
+
+    return app.test_client(), compressor, eventos
+
+
+def test_comprime_so_o_que_vale_a_pena(loja):
+    cliente, compressor, _eventos = loja
+    resposta = cliente.get('/grande', headers={'Accept-Encoding': 'gzip, br'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resposta.headers['Vary']
+    assert gzip.decompress(resposta.get_data()).decode() == HTML_GRANDE
+    assert int(resposta.headers['Content-Length']) < len(HTML_GRANDE) / 10
+    # Corpo diferente do original: ETag fraca
+    assert resposta.headers['ETag'] == 'W/"v1"'
+    assert compressor.estatisticas()['nivel'] == 9
+
+    # Abaixo do mínimo, tipo já comprimido ou navegador sem gzip: sem compressão
+    assert 'Content-Encoding' not in cliente.get('/pequena', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in cliente.get('/imagem', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in cliente.get('/grande').headers
+    assert compressor.estatisticas()['comprimidas'] == 1
+
+
+def test_streaming_comprimido_pedaco_a_pedaco(loja):
+    cliente, _compressor, eventos = loja
+    resposta = cliente.get('/streaming', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in resposta.headers
+
+    descompressor = zlib.decompressobj(31)
+    pedacos = resposta.response
+    primeiro = descompressor.decompress(next(iter(pedacos)))
+    # O primeiro pedaço já pode ser mostrado antes de o resto ser gerado
+    assert primeiro.decode().startswith('<p>pedaço 0</p>')
+    assert eventos == ['gerou 0']
+    resto = b''.join(descompressor.decompress(p) for p in pedacos) + descompressor.flush()
+    assert (primeiro + resto).decode().count('<p>') == 300
+    resposta.close()
+
+
+def test_agrupar():
+    assert list(compressao.agrupar(['ab', 'cd', 'e', 'fgh', 'i'], tamanho=4)) == ['abcd', 'efgh', 'i']
+    assert list(compressao.agrupar([], tamanho=4)) == []
+
+
+def cards(html):
+    return re.findall(r'data-produto-id="(\d+)"', html)
+
+
+def test_index_em_streaming_igual_ao_normal(app, cliente, monkeypatch):
+    normal = cliente.get('/?categoria=cerveja', headers={'Accept-Encoding': 'gzip'})
+    html_normal = gzip.decompress(normal.get_data()).decode()
+
+    monkeypatch.setitem(app.config, 'INDEX_STREAMING', True)
+    streaming = cliente.get('/?categoria=cerveja', headers={'Accept-Encoding': 'gzip'})
+    assert streaming.is_streamed
+    assert streaming.headers['Content-Encoding'] == 'gzip'
+    html_streaming = gzip.decompress(streaming.get_data()).decode()
+
+    assert cards(html_streaming) and cards(html_streaming) == cards(html_normal)
+    assert html_streaming.rstrip().endswith('</html>')
+
+
+def test_resposta_condicional_com_etag_fraca(cliente):
+    primeira = cliente.get('/api/produtos', headers={'Accept-Encoding': 'gzip'})
+    assert primeira.headers['Content-Encoding'] == 'gzip'
+    assert primeira.headers['ETag'].startswith('W/')
+    resposta = cliente.get('/api/produtos', headers={'Accept-Encoding': 'gzip',
+                                                     'If-None-Match': primeira.headers['ETag']})
+    assert resposta.status_code == 304
@@ -0,0 +1,51 @@
+# test_facetas.py - Índice de facetas (facetas.py) e filtros da página inicial
+
+import pytest
+
+from app import db, estoque_catalogo, obter_catalogo, Produto
+from test_catalogo_estoque import comprar_tudo
+
+PRODUTO_ID = 42
+
+
+@pytest.fixture
+def produto(app):
+    """
+    Produto com 3 unidades, sem reservas, já visto pelo snapshot do catálogo
+    """
+    with app.app_context():
+        db.session.execute(db.text('DELETE FROM reserva_estoque'))
+        db.session.execute(db.update(Produto).where(Produto.id == PRODUTO_ID)
+                           .values(estoque=3, reservado=0, ativo=True))
+        db.session.commit()
+    estoque_catalogo.invalidar()
+    return PRODUTO_ID
+
+
+def test_filtros_iguais_a_percorrer_o_catalogo(app):
+    with app.app_context():
+        catalogo = obter_catalogo()
+    facetas = catalogo.facetas()
+    for categoria in (None,) + catalogo.categorias:
+        for preco_min, preco_max in ((None, None), (20, 80), (0, 10), (100, None), (None, 30)):
+            for em_estoque in (False, True):
+                esperado = tuple(
+                    p for p in catalogo.filtrar(categoria)
+                    if (preco_min is None or p.preco >= preco_min)
+                    and (preco_max is None or p.preco <= preco_max)
+                    and (not em_estoque or p.estoque > 0)
+                )
+                assert facetas.filtrar(categoria, preco_min, preco_max, em_estoque) == esperado
+
+
+def test_produto_esgotado_sai_do_filtro_e_das_contagens(app, cliente, produto):
+    antes = cliente.get('/api/facetas').get_json()
+    assert f'data-produto-id="{produto}"' in cliente.get('/?em_estoque=1').get_data(as_text=True)
+
+    comprar_tudo(cliente, produto, 3)
+
+    depois = cliente.get('/api/facetas').get_json()
+    assert depois['em_estoque'] == antes['em_estoque'] - 1
+    assert f'data-produto-id="{produto}"' not in cliente.get('/?em_estoque=1').get_data(as_text=True)
+    # Sem o filtro, o produto continua na grade (esgotado)
+    assert f'data-produto-id="{produto}"' in cliente.get('/').get_data(as_text=True)
@@ -0,0 +1,183 @@
+# test_fila_pedidos.py - Fila durável de pedidos com vários processos
+
+import sqlite3
+import time
+
+import pytest
+
+import app as app_module
+from app import db, _processar_pedido_da_fila, Pedido, Produto
+from fila_pedidos import FilaPedidos, WorkerPool, CONCLUIDO, FALHOU, PENDENTE, PROCESSANDO
+
+PRODUTO_ID = 7
+PAYLOAD = {
+    'dados': {'nome': 'Cliente Fila', 'telefone': '11988887777',
+              'endereco': 'Rua Tuiuti, 1000 - Tatuapé', 'observacoes': ''},
+    'itens': {str(PRODUTO_ID): 2},
+    'valor_total': 0,
+    'carrinho_id': None,
+}
+
+
+@pytest.fixture
+def produto(app):
+    """
+    Produto com 10 unidades e sem pedidos vindos da fila
+    """
+    with app.app_context():
+        db.session.execute(db.update(Produto).where(Produto.id == PRODUTO_ID)
+                           .values(estoque=10, reservado=0, ativo=True))
+        db.session.commit()
+    return PRODUTO_ID
+
+
+@pytest.fixture
+def fila_ativa(app, tmp_path, monkeypatch):
+    """
+    Aplicação no modo FILA_PEDIDOS, com uma fila só do teste (sem workers)
+    """
+    fila = FilaPedidos(str(tmp_path / 'fila.db'))
+    monkeypatch.setattr(app_module, 'fila_pedidos', fila)
+    monkeypatch.setitem(app.config, 'FILA_PEDIDOS', True)
+    return fila
+
+
+def pedidos_do_token(app, token):
+    with app.app_context():
+        return db.session.execute(
+            db.select(db.func.count(Pedido.id)).where(Pedido.token_fila == token)
+        ).scalar()
+
+
+def estoque(app, produto_id):
+    with app.app_context():
+        return db.session.get(Produto, produto_id).estoque
+
+
+def test_processo_que_inicia_nao_devolve_pedido_de_outro(tmp_path):
+    caminho = str(tmp_path / 'fila.db')
+    processo_a = FilaPedidos(caminho)
+    processo_b = FilaPedidos(caminho)
+    processo_a.enfileirar('token-1', {'itens': {}})
+
+    assert processo_a.reservar_proximo()[0] == 'token-1'
+
+    # O processo B inicia seus workers enquanto A ainda grava o pedido
+    assert processo_b.recuperar_em_andamento() == 0
+    assert processo_b.reservar_proximo() is None
+    registro = processo_b.obter('token-1')
+    assert registro['status'] == PROCESSANDO
+    assert registro['dono'] == processo_a.dono
+
+
+def test_workers_de_outro_processo_nao_processam_pedido_em_andamento(tmp_path):
+    caminho = str(tmp_path / 'fila.db')
+    processo_a = FilaPedidos(caminho)
+    processo_a.enfileirar('token-1', {'itens': {}})
+    processo_a.reservar_proximo()
+
+    processados = []
+    pool_b = WorkerPool(FilaPedidos(caminho), lambda token, payload: processados.append(token),
+                        num_workers=1)
+    pool_b.fila.recuperar_em_andamento()
+    assert pool_b.processar_proximo() is False
+    assert processados == []
+
+
+def test_lease_vencido_volta_para_a_fila(tmp_path):
+    caminho = str(tmp_path / 'fila.db')
+    processo_a = FilaPedidos(caminho, lease_segundos=0.05)
+    processo_b = FilaPedidos(caminho)
+    processo_a.enfileirar('token-1', {'itens': {}})
+    processo_a.reservar_proximo()
+
+    # O processo A parou sem concluir: depois do prazo, B retoma o pedido
+    time.sleep(0.1)
+    assert processo_b.recuperar_em_andamento() == 1
+    token, _payload, tentativas = processo_b.reservar_proximo()
+    assert (token, tentativas) == ('token-1', 2)
+    assert processo_b.obter('token-1')['dono'] == processo_b.dono
+
+
+def test_fila_antiga_ganha_colunas_do_lease(tmp_path):
+    caminho = str(tmp_path / 'fila.db')
+    conn = sqlite3.connect(caminho)
+    conn.execute(
+        'CREATE TABLE fila_pedidos (token TEXT PRIMARY KEY, payload TEXT NOT NULL,'
+        ' status TEXT NOT NULL, tentativas INTEGER NOT NULL DEFAULT 0, criado_em REAL NOT NULL,'
+        ' processado_em REAL, pedido_id INTEGER, erro TEXT)'
+    )
+    conn.execute("INSERT INTO fila_pedidos (token, payload, status, criado_em) VALUES ('t', '{}', ?, 0)",
+                 (PROCESSANDO,))
+    conn.commit()
+    conn.close()
+
+    fila = FilaPedidos(caminho)
+    # Sem lease gravado (versão anterior): o pedido volta para a fila
+    assert fila.recuperar_em_andamento() == 1
+    assert fila.obter('t')['status'] == PENDENTE
+
+
+def test_pedido_processado_duas_vezes_e_gravado_uma_vez(app, produto):
+    primeiro = _processar_pedido_da_fila('token-repetido', PAYLOAD)
+    segundo = _processar_pedido_da_fila('token-repetido', PAYLOAD)
+
+    assert primeiro == segundo
+    assert pedidos_do_token(app, 'token-repetido') == 1
+    assert estoque(app, produto) == 8
+
+
+def test_processo_que_parou_antes_de_concluir_nao_duplica_o_pedido(app, produto, tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'fila.db')
+    fila_a = FilaPedidos(caminho, lease_segundos=0.05)
+    fila_a.enfileirar('token-parado', PAYLOAD)
+
+    # O processo A grava o pedido e para antes de marcar a fila como concluída
+    def parar(token, pedido_id):
+        raise SystemExit('processo encerrado')
+
+    monkeypatch.setattr(fila_a, 'concluir', parar)
+    with pytest.raises(SystemExit):
+        WorkerPool(fila_a, _processar_pedido_da_fila).processar_proximo()
+    assert pedidos_do_token(app, 'token-parado') == 1
+
+    # Depois do lease, o processo B pega o mesmo pedido
+    time.sleep(0.1)
+    fila_b = FilaPedidos(caminho)
+    assert WorkerPool(fila_b, _processar_pedido_da_fila).processar_proximo() is True
+
+    registro = fila_b.obter('token-parado')
+    assert registro['status'] == CONCLUIDO
+    assert pedidos_do_token(app, 'token-parado') == 1
+    assert estoque(app, produto) == 8
+
+
+def test_pedido_que_falhou_nao_mostra_confirmacao_nem_whatsapp(cliente, fila_ativa):
+    fila_ativa.enfileirar('token-falhou', PAYLOAD)
+    fila_ativa.reservar_proximo()
+    fila_ativa.falhar('token-falhou', 'Estoque insuficiente para Produto Teste', definitivo=True)
+    assert fila_ativa.obter('token-falhou')['status'] == FALHOU
+
+    resposta = cliente.get('/pedido/token-falhou/whatsapp')
+    assert resposta.status_code == 409
+    assert 'Estoque insuficiente para Produto Teste' in resposta.get_data(as_text=True)
+
+    # Reenvio do mesmo formulário: mostra o erro, não a confirmação
+    resposta = cliente.post('/finalizar_pedido', data={'token_pedido': 'token-falhou'})
+    assert resposta.status_code == 409
+    assert 'Pedido Não Confirmado' in resposta.get_data(as_text=True)
+
+
+def test_whatsapp_usa_os_precos_do_pedido_na_fila(cliente, fila_ativa, monkeypatch):
+    payload = dict(PAYLOAD, produtos={str(PRODUTO_ID): {'nome': 'Nome no pedido', 'preco': 1.5}},
+                   valor_total=3.0)
+    fila_ativa.enfileirar('token-precos', payload)
+
+    carrinhos = []
+    monkeypatch.setattr(app_module, 'montar_whatsapp_url',
+                        lambda dados, carrinho: carrinhos.append(carrinho) or 'https://wa.me/')
+    resposta = cliente.get('/pedido/token-precos/whatsapp')
+
+    assert resposta.status_code == 302
+    item, = list(carrinhos[0])
+    assert (item.nome, item.preco, item.quantidade) == ('Nome no pedido', 1.5, 2)
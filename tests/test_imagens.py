@@ -0,0 +1,120 @@
+# test_imagens.py - Proxy de imagens com miniaturas e cache em disco
+
+import importlib.util
+import io
+import os
+import time
+
+import pytest
+
+import app as app_module
+import imagens
+from app import obter_catalogo
+
+# O Pillow é opcional (veja imagens.py)
+requer_pillow = pytest.mark.skipif(importlib.util.find_spec('PIL') is None,
+                                   reason='Pillow não instalado')
+
+
+def png(largura=680, altura=510, cor=(200, 30, 30)):
+    from PIL import Image
+    saida = io.BytesIO()
+    Image.new('RGB', (largura, altura), cor).save(saida, format='PNG')
+    return saida.getvalue()
+
+
+class BuscadorContado:
+    """
+    Buscador falso: devolve os bytes de cada URL e conta as chamadas
+    """
+
+    def __init__(self, originais):
+        self.originais = originais
+        self.chamadas = []
+
+    def __call__(self, url):
+        self.chamadas.append(url)
+        if url not in self.originais:
+            raise OSError('origem fora do ar')
+        return self.originais[url]
+
+
+@requer_pillow
+def test_variantes_redimensionadas_e_originais_deduplicados(tmp_path):
+    from PIL import Image
+    original = png()
+    buscar = BuscadorContado({'https://a/1.png': original, 'https://b/1.png': original})
+    proxy = imagens.ProxyImagens(str(tmp_path), buscar)
+
+    dados, tipo, etag = proxy.obter('https://a/1.png', 160, 'webp')
+    assert tipo == 'image/webp'
+    assert Image.open(io.BytesIO(dados)).size == (160, 120)
+
+    # Mesma URL: tudo vem do disco
+    assert proxy.obter('https://a/1.png', 160, 'webp') == (dados, tipo, etag)
+    # Outra URL com o mesmo conteúdo: baixa uma vez e reaproveita a variante
+    assert proxy.obter('https://b/1.png', 160, 'webp')[2] == etag
+    assert buscar.chamadas == ['https://a/1.png', 'https://b/1.png']
+    assert len([nome for nome in os.listdir(tmp_path) if nome.startswith('orig-')]) == 1
+
+    dados, tipo, _etag = proxy.obter('https://a/1.png', 320, 'jpeg')
+    assert tipo == 'image/jpeg' and imagens.tipo_imagem(dados) == 'image/jpeg'
+    assert len(buscar.chamadas) == 2
+
+
+def test_falha_da_origem_nao_e_repetida_logo_em_seguida(tmp_path):
+    buscar = BuscadorContado({})
+    proxy = imagens.ProxyImagens(str(tmp_path), buscar)
+    for _ in range(2):
+        with pytest.raises(imagens.ImagemIndisponivel):
+            proxy.obter('https://fora/1.png', 160, 'jpeg')
+    assert buscar.chamadas == ['https://fora/1.png']
+
+
+def test_cache_em_disco_lru_sobrevive_ao_reinicio(tmp_path):
+    cache = imagens.CacheDisco(str(tmp_path), capacidade_bytes=30)
+    for chave in ('a', 'b', 'c'):
+        cache.gravar(chave, chave.encode() * 10)
+        time.sleep(0.01)
+    cache.ler('a')                      # 'a' passa a ser o mais recente
+    time.sleep(0.01)
+
+    # Outro processo abre a mesma pasta: a ordem vem das datas dos arquivos
+    reaberto = imagens.CacheDisco(str(tmp_path), capacidade_bytes=30)
+    reaberto.gravar('d', b'd' * 10)
+    assert sorted(os.listdir(tmp_path)) == ['a', 'c', 'd']
+    assert reaberto.estatisticas()['bytes_usados'] == 30
+
+
+def test_formato_preferido():
+    assert imagens.formato_preferido('image/avif,image/webp,*/*') == 'webp'
+    assert imagens.formato_preferido('image/*') == 'jpeg'
+    assert imagens.formato_preferido(None) == 'jpeg'
+
+
+@requer_pillow
+def test_rota_da_imagem(app, cliente, tmp_path, monkeypatch):
+    with app.app_context():
+        url = next(p.imagem_url for p in obter_catalogo().produtos if p.imagem_url)
+    buscar = BuscadorContado({url: png()})
+    monkeypatch.setattr(app_module, 'proxy_imagens', imagens.ProxyImagens(str(tmp_path), buscar))
+    caminho = f'/img/{imagens.hash_url(url)}/320'
+
+    resposta = cliente.get(caminho, headers={'Accept': 'image/webp'})
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'image/webp'
+    assert resposta.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert resposta.headers['Vary'] == 'Accept'
+
+    resposta = cliente.get(caminho, headers={'Accept': 'image/webp',
+                                             'If-None-Match': resposta.headers['ETag']})
+    assert resposta.status_code == 304
+    assert buscar.chamadas == [url]
+
+    # Só imagens do catálogo e larguras de TAMANHOS
+    assert cliente.get(f'/img/{imagens.hash_url("https://outro.site/x.png")}/320').status_code == 404
+    assert cliente.get(f'/img/{imagens.hash_url(url)}/321').status_code == 404
+
+    # Cards da grade com srcset apontando para o proxy
+    html = cliente.get('/').get_data(as_text=True)
+    assert f'{caminho} 320w' in html
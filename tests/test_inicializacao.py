@@ -0,0 +1,64 @@
+# test_inicializacao.py - Importar o app.py não abre o banco nem liga serviços
+# Cada teste roda em um processo Python novo: o app.py deste processo já foi
+# importado (e configurado) pelos outros testes
+
+import json
+import os
+import subprocess
+import sys
+
+from conftest import RAIZ
+
+SCRIPT = '''
+import json, sys
+import app as modulo
+def pragmas():
+    # aplicar_perfil registra _configurar_conexao no evento 'connect'
+    eventos = modulo.db._app_engines[modulo.app][None].pool.dispatch.connect
+    return any(f.__name__ == '_configurar_conexao' for f in eventos)
+estado = {
+    'pragmas': pragmas(),
+    'carrinho_store': modulo.carrinho_store is not None,
+    'modulos': sorted(m for m in ('fila_pedidos', 'sitemap', 'plano_consultas',
+                                  'artefato_catalogo', 'cProfile') if m in sys.modules),
+}
+modulo.criar_app(banco='preguicoso')
+estado['hooks'] = [f.__name__ for f in modulo.app.before_request_funcs[None]]
+estado['pragmas_depois'] = pragmas()
+modulo.criar_app(banco='preguicoso')
+estado['hooks_de_novo'] = len(modulo.app.before_request_funcs[None])
+print(json.dumps(estado))
+'''
+
+
+def executar(tmp_path, **ambiente):
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{tmp_path / 'adega.db'}",
+               FILA_PEDIDOS_PATH=str(tmp_path / 'fila.db'),
+               **ambiente)
+    saida = subprocess.run([sys.executable, '-c', SCRIPT], cwd=RAIZ, env=env,
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.splitlines()[-1])
+
+
+def test_importar_o_app_nao_abre_banco_nem_store(tmp_path):
+    estado = executar(tmp_path, CARRINHO_BACKEND='sqlite',
+                      CARRINHO_SQLITE_PATH=str(tmp_path / 'carrinhos.db'))
+
+    assert estado['pragmas'] is False
+    assert estado['carrinho_store'] is False
+    assert estado['modulos'] == []
+    assert not (tmp_path / 'carrinhos.db').exists()
+    # criar_app liga os PRAGMAs, mas o init_db fica para a 1ª requisição
+    assert estado['pragmas_depois'] is True
+    assert not (tmp_path / 'adega.db').exists()
+
+
+def test_hook_do_banco_vem_antes_da_fila_e_da_limpeza(tmp_path):
+    estado = executar(tmp_path, FILA_PEDIDOS='1', RESERVAS_LIMPEZA_SEGUNDOS='60')
+
+    hooks = estado['hooks']
+    assert hooks.index('_inicializar_banco_preguicoso') < hooks.index('iniciar_workers_fila')
+    assert hooks.index('_inicializar_banco_preguicoso') < hooks.index('iniciar_limpeza_reservas')
+    # Chamar criar_app() de novo não registra os hooks outra vez
+    assert estado['hooks_de_novo'] == len(hooks)
@@ -0,0 +1,84 @@
+# test_instrumentacao.py - Server-Timing, /metrics e amostragem com cProfile
+
+import re
+
+import pytest
+from flask import Flask, render_template_string, session
+from sqlalchemy import create_engine, text
+
+from instrumentacao import Histograma, Instrumentacao
+
+
+@pytest.fixture
+def loja(tmp_path):
+    """
+    App Flask mínimo com a instrumentação ligada (o app da loja roda os
+    testes com INSTRUMENTACAO=0)
+    """
+    app = Flask(__name__)
+    app.secret_key = 'teste'
+    engine = create_engine('sqlite://')
+    instrumentacao = Instrumentacao(taxa_profile=1.0, pasta_profile=str(tmp_path / 'profiles'))
+    instrumentacao.init_app(app, engine)
+
+    @app.route('/produtos')
+    def produtos():
+        with instrumentacao.medir('carrinho'):
+            session['carrinho'] = 'x' * 300
+        with engine.connect() as conexao:
+            for _ in range(3):
+                conexao.execute(text('SELECT 1'))
+        return render_template_string('{% for i in range(3) %}{{ i }}{% endfor %}')
+
+    return app.test_client(), instrumentacao, tmp_path / 'profiles'
+
+
+def test_server_timing_da_requisicao(loja):
+    cliente, _instrumentacao, pasta = loja
+    resposta = cliente.get('/produtos')
+
+    timing = resposta.headers['Server-Timing']
+    assert re.search(r'app;dur=[\d.]+', timing)
+    assert 'desc="3 consultas"' in timing
+    assert re.search(r'tpl;dur=[\d.]+', timing)
+    assert re.search(r'carrinho;dur=[\d.]+', timing)
+    assert re.search(r'sess;dur=[\d.]+;desc="cookie \d+ bytes"', timing)
+    # taxa_profile=1: toda requisição é perfilada e salva em .prof
+    arquivo = re.search(r'prof;desc="([^"]+)"', timing).group(1)
+    assert (pasta / arquivo).exists()
+
+
+def test_metrics_no_formato_prometheus(loja):
+    cliente, _instrumentacao, _pasta = loja
+    cliente.get('/produtos')
+    cliente.get('/produtos')
+
+    resposta = cliente.get('/metrics')
+    assert resposta.mimetype == 'text/plain'
+    metricas = resposta.get_data(as_text=True)
+    assert 'adega_requisicao_segundos_count{rota="produtos"} 2' in metricas
+    assert 'adega_requisicao_segundos_bucket{rota="produtos",le="+Inf"} 2' in metricas
+    assert 'adega_sql_consultas_total{rota="produtos"} 6' in metricas
+    assert re.search(r'adega_trecho_segundos_total\{rota="produtos",trecho="carrinho"\} [\d.]+', metricas)
+    assert re.search(r'adega_cookie_sessao_bytes_bucket\{le="512"\} [1-9]', metricas)
+
+
+def test_histograma_cumulativo():
+    histograma = Histograma((0.1, 1.0))
+    for valor in (0.05, 0.5, 2.0):
+        histograma.observar(valor)
+    assert histograma.contagens == [1, 2]
+    assert histograma.contagem == 3
+    assert histograma.soma == pytest.approx(2.55)
+
+
+def test_medir_desligado_nao_mede():
+    instrumentacao = Instrumentacao()
+    with instrumentacao.medir('trecho'):
+        pass
+    assert instrumentacao.texto_prometheus().count('rota=') == 0
+
+
+def test_app_sem_instrumentacao_nao_tem_metrics(cliente):
+    assert cliente.get('/metrics').status_code == 404
+    assert 'Server-Timing' not in cliente.get('/robots.txt').headers
@@ -0,0 +1,81 @@
+# test_mensagens.py - Mensagem do pedido para o WhatsApp a partir de modelos
+
+from datetime import datetime
+from typing import NamedTuple
+from urllib.parse import quote
+
+import pytest
+
+from carrinho import Carrinho
+from mensagens import ConfigLoja, MensagemWhatsApp
+
+LOJA = ConfigLoja('ADEGA TESTE', '5511900000000', 'pix@adega.teste')
+DADOS = {'nome': 'José da Silva', 'telefone': '11999999999',
+         'endereco': 'Rua Tuiuti, 1000 - Tatuapé & Cia', 'observacoes': ''}
+DATA_HORA = datetime(2024, 5, 17, 21, 30)
+
+
+class Produto(NamedTuple):
+    id: int
+    nome: str
+    preco: float
+    imagem_url: str = None
+
+
+def carrinho_com(linhas):
+    carrinho = Carrinho()
+    for numero in range(linhas):
+        carrinho.adicionar(Produto(numero + 1, f'Cerveja Artesanal nº {numero + 1} 🍺', 12.5), 2)
+    return carrinho
+
+
+def test_url_e_o_texto_codificado():
+    mensagem = MensagemWhatsApp(LOJA)
+    carrinho = carrinho_com(3)
+    texto = mensagem.texto(DADOS, carrinho, DATA_HORA)
+
+    assert texto.startswith('🍷 *PEDIDO ADEGA TESTE* 🍷')
+    assert '17/05/2024 às 21:30' in texto
+    assert 'Qtd: 2 x R$ 12.50' in texto
+    assert '*TOTAL: R$ 75.00*' in texto
+    assert 'PIX: pix@adega.teste' in texto
+    assert mensagem.url(DADOS, carrinho, DATA_HORA) == \
+        f"https://wa.me/5511900000000?text={quote(texto, safe='/')}"
+
+
+def test_limite_corta_a_lista_de_itens():
+    mensagem = MensagemWhatsApp(LOJA, limite=2000)
+    carrinho = carrinho_com(500)
+    url = mensagem.url(DADOS, carrinho, DATA_HORA)
+    texto = mensagem.texto(DADOS, carrinho, DATA_HORA)
+
+    assert len(url.split('?text=', 1)[1]) <= 2000
+    # O total (de todos os itens) continua na mensagem
+    assert '*TOTAL: R$ 12500.00*' in texto
+    exibidos = texto.count('• Cerveja')
+    assert 0 < exibidos < 500
+    omitidos = 500 - exibidos
+    assert f'... e mais {omitidos} itens ({2 * omitidos} unidades)' in texto
+
+
+def test_sem_limite_mostra_todos_os_itens():
+    texto = MensagemWhatsApp(LOJA, limite=None).texto(DADOS, carrinho_com(500), DATA_HORA)
+    assert texto.count('• Cerveja') == 500
+
+
+def test_idioma_e_modelos_proprios():
+    texto = MensagemWhatsApp(LOJA, locale='en_US').texto(DADOS, carrinho_com(1), DATA_HORA)
+    assert '*ORDER ADEGA TESTE*' in texto
+    assert '05/17/2024 09:30 PM' in texto
+
+    proprio = MensagemWhatsApp(LOJA, modelos={'rodape': 'Total {total:.2f} - {loja}'})
+    assert proprio.texto(DADOS, carrinho_com(1), DATA_HORA).endswith('Total 25.00 - ADEGA TESTE')
+
+    with pytest.raises(ValueError):
+        MensagemWhatsApp(LOJA, locale='xx_XX')
+
+
+def test_loja_vem_da_configuracao(app):
+    from app import mensagem_whatsapp
+    assert mensagem_whatsapp.loja == ConfigLoja(app.config['LOJA_NOME'], app.config['LOJA_WHATSAPP'],
+                                                app.config['LOJA_PIX'])
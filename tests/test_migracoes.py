@@ -0,0 +1,54 @@
+# test_migracoes.py - `flask db upgrade` em um banco vazio monta o esquema
+# As migrações rodam de verdade (Flask-Migrate/Alembic, com o env.py do
+# projeto) em um banco novo, ligado a uma aplicação Flask só do teste.
+
+import os
+
+import pytest
+from flask import Flask
+from flask_migrate import Migrate, upgrade
+from sqlalchemy import create_engine, inspect
+
+from app import db, consultas_frequentes
+from conftest import RAIZ
+from plano_consultas import verificar_todas
+
+
+@pytest.fixture
+def banco_migrado(app, tmp_path):
+    """
+    Caminho de um banco SQLite criado só pelas migrações
+    """
+    caminho = tmp_path / 'migrado.db'
+    app_migracoes = Flask('migracoes')
+    app_migracoes.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{caminho}'
+    db.init_app(app_migracoes)
+    Migrate(app_migracoes, db, directory=os.path.join(RAIZ, 'migrations'))
+    with app_migracoes.app_context():
+        upgrade()
+    return caminho
+
+
+def test_upgrade_em_banco_vazio_cria_as_tabelas(banco_migrado):
+    engine = create_engine(f'sqlite:///{banco_migrado}')
+    tabelas = set(inspect(engine).get_table_names())
+    engine.dispose()
+    assert {'produto', 'pedido', 'item_pedido', 'reserva_estoque', 'alembic_version'} <= tabelas
+
+
+def test_upgrade_cria_as_colunas_dos_modelos(banco_migrado):
+    engine = create_engine(f'sqlite:///{banco_migrado}')
+    inspector = inspect(engine)
+    for tabela in db.metadata.sorted_tables:
+        colunas = {coluna['name'] for coluna in inspector.get_columns(tabela.name)}
+        assert colunas == set(tabela.columns.keys()), tabela.name
+    engine.dispose()
+
+
+def test_consultas_usam_indices_do_banco_migrado(banco_migrado):
+    engine = create_engine(f'sqlite:///{banco_migrado}')
+    with engine.connect() as conexao:
+        resultados = verificar_todas(conexao, consultas_frequentes())
+    engine.dispose()
+    falhas = [f'{r.nome}: {r.motivo} {list(r.plano)}' for r in resultados if not r.ok]
+    assert all(r.ok for r in resultados), '\n'.join(falhas)
@@ -0,0 +1,61 @@
+# test_perfil_sqlite.py - Perfis de PRAGMAs e opções do engine do SQLite
+
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import perfil_sqlite
+from app import db
+
+
+def engine_com_perfil(caminho, nome_perfil):
+    uri = f'sqlite:///{caminho}'
+    engine = create_engine(uri, **perfil_sqlite.opcoes_engine(uri, nome_perfil))
+    perfil_sqlite.aplicar_perfil(engine, nome_perfil)
+    return engine
+
+
+def test_perfil_desempenho_configura_cada_conexao(tmp_path):
+    engine = engine_com_perfil(tmp_path / 'desempenho.db', 'desempenho')
+    with engine.connect() as conexao:
+        pragmas = perfil_sqlite.pragmas_ativos(conexao)
+    engine.dispose()
+
+    assert pragmas['journal_mode'] == 'wal'
+    assert pragmas['synchronous'] == 1  # NORMAL
+    assert pragmas['cache_size'] == -64000
+    assert pragmas['busy_timeout'] == 5000
+
+
+def test_perfil_padrao_mantem_o_sqlite_original(tmp_path):
+    engine = engine_com_perfil(tmp_path / 'padrao.db', 'padrao')
+    with engine.connect() as conexao:
+        pragmas = perfil_sqlite.pragmas_ativos(conexao)
+    engine.dispose()
+
+    assert pragmas['journal_mode'] == 'delete'
+    assert pragmas['synchronous'] == 2  # FULL
+
+
+def test_opcoes_do_engine():
+    arquivo = perfil_sqlite.opcoes_engine('sqlite:////tmp/adega.db', 'desempenho')
+    assert arquivo['pool_size'] == 10
+    assert arquivo['connect_args'] == {'check_same_thread': False, 'timeout': 5.0}
+
+    # Banco em memória: uma conexão compartilhada por todas as threads
+    assert perfil_sqlite.opcoes_engine('sqlite://', 'desempenho')['poolclass'] is StaticPool
+    # Outros bancos ficam com as opções padrão do SQLAlchemy
+    assert perfil_sqlite.opcoes_engine('postgresql://adega@localhost/adega') == {}
+
+    with pytest.raises(ValueError):
+        perfil_sqlite.obter_perfil('inexistente')
+
+
+def test_app_usa_database_url_e_o_perfil(app):
+    # conftest.py define DATABASE_URL com um banco na pasta temporária
+    assert app.config['SQLALCHEMY_DATABASE_URI'] == os.environ['DATABASE_URL']
+    with app.app_context():
+        with db.engine.connect() as conexao:
+            assert perfil_sqlite.pragmas_ativos(conexao)['journal_mode'] == 'wal'
@@ -0,0 +1,28 @@
+# test_plano_consultas.py - As consultas frequentes continuam usando os índices
+# Mesma verificação do comando `flask plano-consultas`, em um banco novo
+# criado só a partir dos modelos: se um índice for removido (ou uma
+# consulta mudar e deixar de usá-lo), o teste falha.
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import db, consultas_frequentes
+from plano_consultas import verificar_todas
+
+
+@pytest.fixture
+def conexao(app, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plano.db'}")
+    # Tabelas e índices exatamente como declarados nos modelos
+    with app.app_context():
+        db.metadata.create_all(engine)
+    with engine.connect() as conexao:
+        yield conexao
+    engine.dispose()
+
+
+def test_consultas_frequentes_usam_indices(conexao):
+    resultados = verificar_todas(conexao, consultas_frequentes())
+    assert resultados
+    falhas = [f'{r.nome}: {r.motivo} {list(r.plano)}' for r in resultados if not r.ok]
+    assert all(r.ok for r in resultados), '\n'.join(falhas)
@@ -0,0 +1,76 @@
+# test_reservas.py - Reservas de estoque (reservas.py e rotas do carrinho)
+
+import pytest
+
+import reservas
+from app import db, Produto
+
+PRODUTO_ID = 1
+
+
+@pytest.fixture
+def produto(app):
+    """
+    Produto com 20 unidades, sem reservas de nenhum carrinho
+    """
+    with app.app_context():
+        db.session.execute(db.text('DELETE FROM reserva_estoque'))
+        db.session.execute(db.update(Produto).where(Produto.id == PRODUTO_ID)
+                           .values(estoque=20, reservado=0, ativo=True))
+        db.session.commit()
+    return PRODUTO_ID
+
+
+def estado(app, produto_id):
+    with app.app_context():
+        linha = db.session.execute(
+            db.select(Produto.estoque, Produto.reservado).where(Produto.id == produto_id)
+        ).one()
+        return linha.estoque, linha.reservado
+
+
+@pytest.mark.parametrize('quantidade', [-50, 0, 2.5, True, 'abc', None])
+def test_adicionar_quantidade_invalida_nao_reserva(app, cliente, produto, quantidade):
+    resposta = cliente.post('/adicionar_carrinho',
+                            json={'produto_id': produto, 'quantidade': quantidade})
+    assert resposta.status_code == 400
+    assert estado(app, produto) == (20, 0)
+
+
+def test_batch_quantidade_negativa_nao_reserva(app, cliente, produto):
+    resposta = cliente.post('/carrinho/batch', json={'operacoes': [
+        {'acao': 'adicionar', 'produto_id': produto, 'quantidade': -50},
+    ]})
+    assert resposta.status_code == 400
+    assert estado(app, produto) == (20, 0)
+
+
+def test_reservar_recusa_quantidade_negativa(app, produto):
+    with app.app_context():
+        conexao = db.session.connection()
+        with pytest.raises(ValueError):
+            reservas.reservar(conexao, 'carrinho-teste', produto, -50)
+        db.session.rollback()
+    assert estado(app, produto) == (20, 0)
+
+
+def test_quantidade_negativa_nao_permite_vender_acima_do_estoque(app, cliente, produto):
+    cliente.post('/adicionar_carrinho', json={'produto_id': produto, 'quantidade': -50})
+
+    # Outro carrinho não consegue reservar mais do que as 20 unidades
+    outro = app.test_client()
+    resposta = outro.post('/adicionar_carrinho', json={'produto_id': produto, 'quantidade': 60})
+    assert resposta.status_code == 400
+    resposta = outro.post('/adicionar_carrinho', json={'produto_id': produto, 'quantidade': 20})
+    assert resposta.status_code == 200
+    assert estado(app, produto) == (20, 20)
+
+
+def test_diminuir_devolve_so_a_diferenca(app, produto):
+    with app.app_context():
+        conexao = db.session.connection()
+        assert reservas.reservar(conexao, 'carrinho-teste', produto, 5)
+        assert reservas.reservar(conexao, 'carrinho-teste', produto, 2)
+        assert reservas.reservar(conexao, 'carrinho-teste', produto, 0)
+        db.session.commit()
+    assert estado(app, produto) == (20, 0)
@@ -0,0 +1,35 @@
+# test_sitemap.py - sitemap.xml com endereço canônico e validadores estáveis
+
+import time
+
+from app import cache_catalogo
+
+SITE_URL = 'https://adega-24-horas-ifood.vercel.app'
+
+
+def test_host_da_requisicao_nao_entra_no_sitemap(app, cliente):
+    # O primeiro acesso (que gera o sitemap guardado em memória) vem com outro Host
+    cache_catalogo.invalidar()
+    corpo = cliente.get('/sitemap.xml', headers={'Host': 'atacante.example'}).get_data(as_text=True)
+
+    assert 'atacante.example' not in corpo
+    assert f'<loc>{SITE_URL}/</loc>' in corpo
+    assert cliente.get('/sitemap.xml').get_data(as_text=True) == corpo
+
+
+def test_validadores_nao_mudam_quando_o_snapshot_e_refeito(cliente):
+    primeira = cliente.get('/sitemap.xml')
+
+    # Outro processo (ou a mesma instância depois de reiniciar) monta o
+    # snapshot de novo, em outro segundo
+    time.sleep(1.1)
+    cache_catalogo.invalidar()
+    segunda = cliente.get('/sitemap.xml')
+    assert segunda.headers['ETag'] == primeira.headers['ETag']
+    assert segunda.headers['Last-Modified'] == primeira.headers['Last-Modified']
+    assert segunda.get_data() == primeira.get_data()
+
+    cache_catalogo.invalidar()
+    resposta = cliente.get('/sitemap.xml',
+                           headers={'If-Modified-Since': primeira.headers['Last-Modified']})
+    assert resposta.status_code == 304
@@ -0,0 +1,72 @@
+# test_snapshot_banco.py - Banco pronto para uso gerado no build (data/catalogo.db)
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import snapshot_banco
+from app import VERSAO_ESQUEMA
+from conftest import RAIZ
+
+
+def criar_snapshot(caminho, versao):
+    conexao = sqlite3.connect(caminho)
+    conexao.execute('CREATE TABLE produto (id INTEGER PRIMARY KEY)')
+    conexao.execute(f'PRAGMA user_version = {versao}')
+    conexao.commit()
+    conexao.close()
+
+
+def test_versao_do_snapshot(tmp_path):
+    assert snapshot_banco.versao_snapshot(str(tmp_path / 'nao_existe.db')) is None
+    (tmp_path / 'texto.db').write_text('não é um banco SQLite')
+    assert snapshot_banco.versao_snapshot(str(tmp_path / 'texto.db')) is None
+    # O snapshot distribuído com o código precisa estar na versão atual
+    assert snapshot_banco.versao_snapshot(snapshot_banco.SNAPSHOT_PATH) == VERSAO_ESQUEMA
+
+
+def test_restaurar_so_cria_bancos_novos(tmp_path):
+    snapshot = str(tmp_path / 'catalogo.db')
+    criar_snapshot(snapshot, 7)
+    destino = str(tmp_path / 'tmp' / 'adega.db')
+
+    assert snapshot_banco.restaurar(snapshot, destino, versao_esquema=8) is False
+    assert not os.path.exists(destino)
+
+    assert snapshot_banco.restaurar(snapshot, destino, versao_esquema=7) is True
+    assert snapshot_banco.versao_snapshot(destino) == 7
+    # Nenhum temporário (.snapshot) fica para trás
+    assert os.listdir(tmp_path / 'tmp') == ['adega.db']
+
+    # Banco existente (com pedidos) nunca é sobrescrito
+    conexao = sqlite3.connect(destino)
+    conexao.execute('INSERT INTO produto (id) VALUES (1)')
+    conexao.commit()
+    conexao.close()
+    assert snapshot_banco.restaurar(snapshot, destino, versao_esquema=7) is False
+    conexao = sqlite3.connect(destino)
+    assert conexao.execute('SELECT COUNT(*) FROM produto').fetchone()[0] == 1
+    conexao.close()
+
+
+def test_gerar_snapshot_compactado(tmp_path):
+    destino = tmp_path / 'catalogo.db'
+    # Processo próprio: gerar() define DATABASE_URL antes de importar o app
+    subprocess.run([sys.executable, '-c', f'import snapshot_banco; snapshot_banco.gerar({str(destino)!r})'],
+                   cwd=RAIZ, check=True, capture_output=True)
+
+    assert sorted(os.listdir(tmp_path)) == ['catalogo.db']    # sem -wal/-shm
+    conexao = sqlite3.connect(destino)
+    try:
+        assert conexao.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+        assert conexao.execute('PRAGMA user_version').fetchone()[0] == VERSAO_ESQUEMA
+        assert conexao.execute('PRAGMA freelist_count').fetchone()[0] == 0
+        assert conexao.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()[0] == 1
+        with open(os.path.join(RAIZ, 'data', 'produtos.json'), encoding='utf-8') as f:
+            total_json = len(json.load(f)['produtos'])
+        ativos = conexao.execute('SELECT COUNT(*) FROM produto WHERE ativo').fetchone()[0]
+    finally:
+        conexao.close()
+    assert ativos == total_json